@@ -11,11 +11,14 @@
 #
 # Timing knobs via env:
 #   VERT_STEP_WAIT=12
-#   VERT_POLL_SECS=1.5
+#   VERT_POLL_SECS=1.5       (slowest poll when the order streamer is down)
+#   VERT_POLL_MIN_SECS=0.25  (first poll after submit / after a change)
 #   VERT_CANCEL_SETTLE=1.0
 #   VERT_MAX_LADDER=3
 #   VERT_CANCEL_TRIES=4
 #   VERT_DRY_RUN=true/false
+#   TT_QUOTE_FEED=1   (keep one DXLink quote subscription open for the placement)
+#   TT_ORDER_STREAM=1 (order/fill notifications from the account streamer)
 
 import os, sys, time, random, csv
 import requests
@@ -38,12 +41,13 @@ def _add_scripts_root():
 
 _add_scripts_root()
 from tt_client import request as tt_request
-from tt_dxlink import get_quotes_once
+from tt_dxlink import QuoteFeed, get_quotes_once
+from tt_order_events import OrderTracker
 
 TICK = 0.05
 ET = ZoneInfo("America/New_York")
 
-FINAL_STATUSES = {"FILLED", "CANCELED", "REJECTED", "EXPIRED"}
+FINAL_STATUSES = {"FILLED", "CANCELED", "CANCELLED", "REJECTED", "EXPIRED"}
 _TT_SYMBOL_CACHE: dict[str, dict[str, str]] = {}
 
 
@@ -455,6 +459,38 @@ def _extract_quote_list(j):
     return []
 
 
+# One DXLink subscription held open for the whole placement: every REFRESH
+# rung reads the legs' current bid/ask from memory instead of opening a new
+# websocket (or REST call) per leg.
+_QUOTE_FEED = None
+
+
+def quote_feed():
+    """The placement's shared QuoteFeed, started on first use (None when disabled)."""
+    global _QUOTE_FEED
+    if _QUOTE_FEED is None and truthy(os.environ.get("TT_STREAM_QUOTES", "1")) \
+            and truthy(os.environ.get("TT_QUOTE_FEED", "1")):
+        _QUOTE_FEED = QuoteFeed().start()
+    return _QUOTE_FEED
+
+
+def close_quote_feed():
+    global _QUOTE_FEED
+    if _QUOTE_FEED is not None:
+        print(f"CS_VERT_PLACE QUOTE_FEED_CLOSE updates={_QUOTE_FEED.updates}")
+        _QUOTE_FEED.close()
+        _QUOTE_FEED = None
+
+
+def prime_quote_feed(osis):
+    """Subscribe every leg in one message so the first NBBO waits once, not per leg."""
+    feed = quote_feed()
+    if feed is None:
+        return
+    syms = [resolve_tt_option_symbols(o).get("streamer") for o in osis if o]
+    feed.subscribe([s for s in syms if s])
+
+
 def fetch_bid_ask(c, osi: str):
     use_stream = truthy(os.environ.get("TT_STREAM_QUOTES", "1"))
     allow_rest = truthy(os.environ.get("TT_STREAM_FALLBACK_REST", "0"))
@@ -463,12 +499,20 @@ def fetch_bid_ask(c, osi: str):
     info = resolve_tt_option_symbols(osi)
     if use_stream and info.get("streamer"):
         sym = info["streamer"]
-        try:
-            quotes = get_quotes_once([sym], timeout_s=stream_timeout)
-            if sym in quotes:
-                return quotes[sym]
-        except Exception as e:
-            print(f"CS_VERT_PLACE STREAM_WARN: {str(e)[:160]}")
+        feed = quote_feed()
+        if feed is not None:
+            # Returns at once when the leg is already quoted
+            quote = feed.wait_for([sym], timeout_s=stream_timeout).get(sym)
+            if quote is not None:
+                return quote
+            print(f"CS_VERT_PLACE QUOTE_FEED_MISS sym={sym} connected={feed.connected} err={feed.error}")
+        if feed is None or not feed.connected:
+            try:
+                quotes = get_quotes_once([sym], timeout_s=stream_timeout)
+                if sym in quotes:
+                    return quotes[sym]
+            except Exception as e:
+                print(f"CS_VERT_PLACE STREAM_WARN: {str(e)[:160]}")
         if not allow_rest:
             if allow_no_quote:
                 fallback = float(os.environ.get("TT_NO_QUOTE_MID", "0.05"))
@@ -491,6 +535,7 @@ def fetch_bid_ask(c, osi: str):
 
 
 def vertical_nbbo(side: str, short_osi: str, long_osi: str, c):
+    prime_quote_feed([short_osi, long_osi])
     sb, sa = fetch_bid_ask(c, short_osi)
     lb, la = fetch_bid_ask(c, long_osi)
     if None in (sb, sa, lb, la):
@@ -520,6 +565,7 @@ def bundle_nbbo(long_osi_1: str, short_osi_1: str, long_osi_2: str, short_osi_2:
     If net_cash is positive -> NET_CREDIT
     If net_cash is negative -> NET_DEBIT  (debit = -net_cash)
     """
+    prime_quote_feed([short_osi_1, long_osi_1, short_osi_2, long_osi_2])
     s1b, s1a = fetch_bid_ask(c, short_osi_1)
     l1b, l1a = fetch_bid_ask(c, long_osi_1)
     s2b, s2a = fetch_bid_ask(c, short_osi_2)
@@ -717,6 +763,50 @@ def delete_with_retry(c, url, tag="", tries=4):
     return False
 
 
+# Order/fill notifications from the account streamer: a rung's wait returns
+# as soon as its order fills or reaches a final status; get_status is the
+# adaptive-poll fallback (and a periodic check while the stream is up).
+_ORDER_TRACKER = None
+
+
+def order_tracker(acct_hash: str):
+    global _ORDER_TRACKER
+    if _ORDER_TRACKER is None:
+        _ORDER_TRACKER = OrderTracker(
+            acct_hash,
+            stream=truthy(os.environ.get("TT_ORDER_STREAM", "1")),
+            poll_min_s=float(os.environ.get("VERT_POLL_MIN_SECS", "0.25")),
+            poll_max_s=float(os.environ.get("VERT_POLL_SECS", "1.5")),
+            verify_s=float(os.environ.get("TT_ORDER_STREAM_VERIFY_SECS", "5")),
+        ).start()
+    return _ORDER_TRACKER
+
+
+def close_order_tracker():
+    global _ORDER_TRACKER
+    if _ORDER_TRACKER is not None:
+        print(f"CS_VERT_PLACE ORDER_STREAM_CLOSE events={_ORDER_TRACKER.events} polls={_ORDER_TRACKER.polls}")
+        _ORDER_TRACKER.close()
+        _ORDER_TRACKER = None
+
+
+def await_orders(c, acct_hash: str, wants: dict, wait_secs: float) -> dict:
+    """Wait until each order {oid: qty} is fully filled or final, or wait_secs passes.
+
+    Returns {oid: latest order JSON} ({} for an order never seen).
+    """
+    wants = {oid: q for oid, q in wants.items() if oid}
+    if not wants:
+        return {}
+
+    def done(oid, st):
+        return status_upper(st) in FINAL_STATUSES or extract_filled_quantity(st) >= wants[oid] > 0
+
+    return order_tracker(acct_hash).wait(
+        list(wants), done, wait_secs, poll=lambda oid: get_status(c, acct_hash, oid),
+    )
+
+
 def log_row(row: dict):
     path = os.environ.get("CS_LOG_PATH", "logs/constantstable_vertical_trades.csv")
     d = os.path.dirname(path)
@@ -812,7 +902,7 @@ def place_order_with_ladder(
 
         price = price_from_mid(cur_mid, off, cur_bid, cur_ask)
         last_price = price
-        print(f"CS_VERT_PLACE rung#{idx}: price={price:.2f} remaining={remaining} wait={STEP_WAIT:.2f}s poll={POLL_SECS:.2f}s")
+        print(f"CS_VERT_PLACE rung#{idx}: price={price:.2f} remaining={remaining} wait={STEP_WAIT:.2f}s poll<={POLL_SECS:.2f}s")
 
         payload = payload_fn(price, remaining)
 
@@ -833,11 +923,11 @@ def place_order_with_ladder(
             print("CS_VERT_PLACE ORDER_ID: missing")
 
         this_order_filled = 0
+        s = ""
 
-        # Work the rung
-        t_end = time.time() + STEP_WAIT
-        while time.time() < t_end and oid:
-            st = get_status(c, acct_hash, oid) or {}
+        # Work the rung: returns on fill / reject / cancel, else after STEP_WAIT
+        if oid:
+            st = await_orders(c, acct_hash, {oid: remaining}, STEP_WAIT).get(oid) or {}
             s = status_upper(st)
 
             fq = extract_filled_quantity(st)
@@ -848,16 +938,14 @@ def place_order_with_ladder(
                 filled_total += (fq - this_order_filled)
                 this_order_filled = fq
 
-            if s in FINAL_STATUSES:
-                break
-
-            time.sleep(POLL_SECS)
-
         if filled_total >= qty:
             placed_reason = "OK"
             break
 
-        # Cancel before next rung
+        # Cancel before next rung (a rejected / cancelled order is already gone)
+        if oid and s in FINAL_STATUSES:
+            print(f"CS_VERT_PLACE ORDER {oid} {s} → next rung")
+            continue
         if oid:
             url_del = f"/accounts/{acct_hash}/orders/{oid}"
             ok = delete_with_retry(c, url_del, tag=f"CANCEL {oid}", tries=CANCEL_TRIES)
@@ -889,7 +977,7 @@ def place_order_with_ladder(
                 placed_reason = "OK" if filled_total >= qty else "PARTIAL_FILL"
                 break
 
-            if s_final in ("CANCELED", "REJECTED", "EXPIRED"):
+            if s_final in ("CANCELED", "CANCELLED", "REJECTED", "EXPIRED"):
                 time.sleep(CANCEL_SETTLE)
                 continue
 
@@ -929,7 +1017,6 @@ def place_order_at_price(
     danger = False
     placed_reason = "UNKNOWN"
 
-    POLL_SECS = float(os.environ.get("VERT_POLL_SECS", "1.5"))
     CANCEL_SETTLE = float(os.environ.get("VERT_CANCEL_SETTLE", "1.0"))
     CANCEL_TRIES = int(os.environ.get("VERT_CANCEL_TRIES", "4"))
 
@@ -959,21 +1046,12 @@ def place_order_at_price(
             "danger": False,
         }
 
-    t_end = time.time() + wait_secs
-    while time.time() < t_end and oid:
-        st = get_status(c, acct_hash, oid) or {}
-        s = status_upper(st)
-
-        fq = extract_filled_quantity(st)
-        if s == "FILLED" and fq <= 0:
-            fq = qty
-        if fq > filled:
-            filled = fq
-
-        if s in FINAL_STATUSES:
-            break
-
-        time.sleep(POLL_SECS)
+    st = await_orders(c, acct_hash, {oid: qty}, wait_secs).get(oid) or {}
+    fq = extract_filled_quantity(st)
+    if status_upper(st) == "FILLED" and fq <= 0:
+        fq = qty
+    if fq > filled:
+        filled = fq
 
     remaining = max(0, qty - filled)
 
@@ -1032,7 +1110,6 @@ def place_two_verticals_simul(
 ):
     FIRST_WAIT = float(os.environ.get("VERT_FIRST_WAIT", "20"))
     ADJUST_WAIT = float(os.environ.get("VERT_ADJUST_WAIT", "20"))
-    POLL_SECS = float(os.environ.get("VERT_POLL_SECS", "1.5"))
     CANCEL_SETTLE = float(os.environ.get("VERT_CANCEL_SETTLE", "1.0"))
     CANCEL_TRIES = int(os.environ.get("VERT_CANCEL_TRIES", "4"))
 
@@ -1047,35 +1124,26 @@ def place_two_verticals_simul(
         return parse_order_id(r)
 
     def poll_orders(states, wait_secs):
-        t_end = time.time() + wait_secs
-        while time.time() < t_end:
-            all_done = True
-            for st in states:
-                if not st["oid"]:
-                    continue
-                if st["cur_filled"] >= st["cur_qty"]:
-                    continue
-                all_done = False
-                res = get_status(c, acct_hash, st["oid"]) or {}
-                s = status_upper(res)
-                fq = extract_filled_quantity(res)
-                if s == "FILLED" and fq <= 0:
-                    fq = st["cur_qty"]
-                if fq > st["cur_filled"]:
-                    delta = fq - st["cur_filled"]
-                    st["cur_filled"] = fq
-                    st["total_filled"] += delta
-                if s in FINAL_STATUSES:
-                    st["done"] = True
-            if all_done:
-                break
-            time.sleep(POLL_SECS)
+        live = [st for st in states if st["oid"] and st["cur_filled"] < st["cur_qty"]]
+        latest = await_orders(c, acct_hash, {st["oid"]: st["cur_qty"] for st in live}, wait_secs)
+        for st in live:
+            res = latest.get(st["oid"]) or {}
+            s = status_upper(res)
+            fq = extract_filled_quantity(res)
+            if s == "FILLED" and fq <= 0:
+                fq = st["cur_qty"]
+            if fq > st["cur_filled"]:
+                delta = fq - st["cur_filled"]
+                st["cur_filled"] = fq
+                st["total_filled"] += delta
+            if s in FINAL_STATUSES:
+                st["done"] = True
 
     def cancel_if_open(st):
         if not st["oid"]:
             return False, ""
         remaining = max(0, st["cur_qty"] - st["cur_filled"])
-        if remaining <= 0:
+        if remaining <= 0 or st["done"]:
             return True, ""
         url_del = f"/accounts/{acct_hash}/orders/{st['oid']}"
         ok = delete_with_retry(c, url_del, tag=f"CANCEL {st['oid']}", tries=CANCEL_TRIES)
@@ -1202,7 +1270,6 @@ def place_two_verticals_alternating(
     qty2: int,
 ):
     STEP_WAIT = float(os.environ.get("VERT_STEP_WAIT", "12"))
-    POLL_SECS = float(os.environ.get("VERT_POLL_SECS", "1.5"))
     CANCEL_SETTLE = float(os.environ.get("VERT_CANCEL_SETTLE", "1.0"))
     CANCEL_TRIES = int(os.environ.get("VERT_CANCEL_TRIES", "4"))
     STRIKE_CHECK = truthy(os.environ.get("VERT_STRIKE_CHECK", "1"))
@@ -1276,32 +1343,24 @@ def place_two_verticals_alternating(
             if o2["oid"]:
                 s2["order_ids"].append(o2["oid"])
 
-        # wait once after submitting both
+        # wait once after submitting both (returns when both are filled / final)
         if o1["oid"] or o2["oid"]:
-            t_end = time.time() + STEP_WAIT
-            while time.time() < t_end:
-                all_done = True
-                for o in (o1, o2):
-                    if not o["oid"] or o["cur_filled"] >= o["cur_qty"]:
-                        continue
-                    all_done = False
-                    st = get_status(c, acct_hash, o["oid"]) or {}
-                    s = status_upper(st)
-                    fq = extract_filled_quantity(st)
-                    if s == "FILLED" and fq <= 0:
-                        fq = o["cur_qty"]
-                    if fq > o["cur_filled"]:
-                        o["cur_filled"] = fq
-                    if s in FINAL_STATUSES:
-                        o["cur_filled"] = max(o["cur_filled"], fq)
-                if all_done:
-                    break
-                time.sleep(POLL_SECS)
+            latest = await_orders(c, acct_hash, {o["oid"]: o["cur_qty"] for o in (o1, o2)}, STEP_WAIT)
+            for o in (o1, o2):
+                if not o["oid"]:
+                    continue
+                st = latest.get(o["oid"]) or {}
+                o["final"] = status_upper(st) in FINAL_STATUSES
+                fq = extract_filled_quantity(st)
+                if status_upper(st) == "FILLED" and fq <= 0:
+                    fq = o["cur_qty"]
+                if fq > o["cur_filled"]:
+                    o["cur_filled"] = fq
 
         # cancel both after wait
         for o in (o1, o2):
             remaining = max(0, o["cur_qty"] - o["cur_filled"])
-            if not o["oid"] or remaining <= 0:
+            if not o["oid"] or remaining <= 0 or o.get("final"):
                 continue
             url_del = f"/accounts/{acct_hash}/orders/{o['oid']}"
             ok = delete_with_retry(c, url_del, tag=f"CANCEL {o['oid']}", tries=CANCEL_TRIES)
@@ -1472,6 +1531,10 @@ def main():
     acct_hash = tt_account_number()
 
     if not DRY_RUN:
+        # Connect the quote feed while the cancels go out
+        prime_quote_feed([v1["short_osi"], v1["long_osi"]]
+                         + ([v2["short_osi"], v2["long_osi"]] if v2 else []))
+        order_tracker(acct_hash)
         cancel_all_working_orders(acct_hash)
 
     ts_utc = datetime.now(timezone.utc)
@@ -1792,4 +1855,9 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    try:
+        rc = main()
+    finally:
+        close_quote_feed()
+        close_order_tracker()
+    sys.exit(rc)
@@ -172,7 +172,25 @@ def _sanitize_token(t: str) -> str:
     return t.split(None, 1)[1] if t.lower().startswith("bearer ") else t
 
 
+def _read_shared_signal(path: str):
+    """GW payload fetched once for all accounts by the multi-account Lambda run."""
+    deadline = time.time() + float(os.environ.get("GW_SIGNAL_WAIT_SECS", "90"))
+    while not os.path.exists(path):
+        if time.time() >= deadline:
+            raise RuntimeError(f"GW_SIGNAL_FILE_TIMEOUT: {path}")
+        time.sleep(0.1)
+    with open(path, "r") as f:
+        j = json.load(f)
+    if isinstance(j, dict) and j.get("_error"):
+        raise RuntimeError(j["_error"])
+    print("LEO ORCH: SIGNAL_SOURCE: SHARED (GW_SIGNAL_FILE)")
+    return j
+
+
 def gw_fetch():
+    shared = (os.environ.get("GW_SIGNAL_FILE") or "").strip()
+    if shared:
+        return _read_shared_signal(shared)
     base = os.environ.get("GW_BASE", "https://gandalf.gammawizard.com").rstrip("/")
     endpoint = os.environ.get("LEO_GW_ENDPOINT", "/rapi/GetLeoProfit")
     tok = _sanitize_token(os.environ.get("GW_TOKEN", "") or "")
@@ -305,6 +323,15 @@ def _wait_for_gw_ready():
 
 # ---------------- main ----------------
 
+def _run_placer(script: str, env: dict) -> int:
+    """Run the placer in this process when the Lambda runs us in-process
+    (lambda/script_runner.py), otherwise as a child interpreter."""
+    runner = sys.modules.get("script_runner")
+    if runner is not None and runner.active():
+        return runner.run_nested(script, env)
+    return subprocess.call([sys.executable, script], env=env)
+
+
 def main():
     dry_run = (os.environ.get("VERT_DRY_RUN", "false") or "false").lower() in ("1", "true", "yes")
     today = date.today()
@@ -455,7 +482,7 @@ def main():
     })
 
     placer = os.path.join(os.path.dirname(__file__), "place.py")
-    rc = subprocess.call([sys.executable, placer], env=env)
+    rc = _run_placer(placer, env)
     if rc != 0:
         _emit("error", message=f"placer rc={rc}", stage="placement")
     else:
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Process-wide HTTP session pool and rate budget for the broker clients.
+
+- session(name): one pooled requests.Session per API, so a run's hundreds
+  of REST calls reuse a few keep-alive connections instead of paying a
+  TLS handshake each. Pool size from HTTP_POOL_MAXSIZE (default 16).
+- budget(name): one RateBudget per API shared by every caller in the
+  process. It counts calls, optionally paces them to <NAME>_RATE_LIMIT
+  calls per <NAME>_RATE_WINDOW_SECS (off by default), and after a 429
+  pauses every caller until Retry-After / backoff has passed.
+- send(): requests.request through both, retrying 429s.
+
+Usage:
+    import http_pool
+    r = http_pool.send("GET", url, name="tt", headers=h, timeout=20)
+    http_pool.budget("tt").stats()
+"""
+
+import collections
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 8.0
+IDLE_RESET_S = 120.0   # drop pooled connections the server has likely closed
+
+_lock = threading.Lock()
+_sessions = {}         # name -> [session, last_used]
+_budgets = {}          # name -> RateBudget
+
+
+def _retry_after(value) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class RateBudget:
+    """Calls per rolling window for one API, plus a shared 429 pause."""
+
+    def __init__(self, name: str, limit: int = 0, window_s: float = 1.0):
+        self.name = name
+        self.limit = int(limit)
+        self.window_s = float(window_s)
+        self._lock = threading.Lock()
+        self._recent = collections.deque()
+        self._paused_until = 0.0
+        self.calls = 0
+        self.throttled = 0
+        self.waited_s = 0.0
+
+    def acquire(self) -> None:
+        """Block until a call fits the budget and any 429 pause is over."""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._paused_until - now
+                if wait <= 0 and self.limit > 0:
+                    while self._recent and self._recent[0] <= now - self.window_s:
+                        self._recent.popleft()
+                    if len(self._recent) >= self.limit:
+                        wait = self._recent[0] + self.window_s - now
+                if wait <= 0:
+                    if self.limit > 0:
+                        self._recent.append(now)
+                    self.calls += 1
+                    return
+                self.waited_s += wait
+            time.sleep(wait)
+
+    def record(self, status: int, retry_after=None, attempt: int = 0) -> float:
+        """Note a response status; a 429 pauses all callers. Returns the pause."""
+        if status != 429:
+            return 0.0
+        delay = _retry_after(retry_after) or min(BACKOFF_BASE_S * 2 ** attempt, BACKOFF_MAX_S)
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.time() + delay)
+        print(f"HTTP_429 {self.name}: backing off {delay:.1f}s")
+        return delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "throttled": self.throttled,
+                    "waited_s": round(self.waited_s, 2)}
+
+
+def budget(name: str = "default") -> RateBudget:
+    with _lock:
+        b = _budgets.get(name)
+        if b is None:
+            prefix = name.upper()
+            b = RateBudget(
+                name,
+                limit=int(os.environ.get(f"{prefix}_RATE_LIMIT", "0") or 0),
+                window_s=float(os.environ.get(f"{prefix}_RATE_WINDOW_SECS", "1") or 1),
+            )
+            _budgets[name] = b
+        return b
+
+
+def _new_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4,
+                          pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", "16")))
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def session(name: str = "default") -> requests.Session:
+    """The shared keep-alive session for an API (recreated after a long idle)."""
+    now = time.time()
+    with _lock:
+        entry = _sessions.get(name)
+        if entry is not None and now - entry[1] > IDLE_RESET_S:
+            entry[0].close()
+            entry = None
+        if entry is None:
+            entry = [_new_session(), now]
+            _sessions[name] = entry
+        entry[1] = now
+        return entry[0]
+
+
+def send(method: str, url: str, name: str = "default", retries: int = 3, **kwargs):
+    """requests.request via the shared session and budget; 429s are retried.
+
+    A 429 means the request was not processed, so retrying is safe even
+    for order POSTs. The last 429 is returned to the caller as-is.
+    """
+    kwargs.setdefault("timeout", 20)
+    b = budget(name)
+    for attempt in range(retries + 1):
+        b.acquire()
+        r = session(name).request(method, url, **kwargs)
+        delay = b.record(r.status_code, r.headers.get("Retry-After"), attempt)
+        if not delay or attempt >= retries:
+            return r
+
+
+def close_all() -> None:
+    with _lock:
+        for s, _ in _sessions.values():
+            s.close()
+        _sessions.clear()
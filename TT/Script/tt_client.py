@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """
 Minimal Tastytrade API client with auto-refresh.
+
+Calls go through the process-wide keep-alive session and rate budget in
+http_pool (name "tt"); 429s back off there, 401s refresh the token once.
+Writes (order POSTs, cancels) are sent once: the placers retry them with
+their own backoff, and the shared 429 pause still holds every caller.
 """
 
 import os
-import requests
 
+import http_pool
 from tt_token_keeper import get_access_token, refresh_token, load_token
 
 
@@ -13,6 +18,10 @@ def _base_url() -> str:
     return os.environ.get("TT_BASE_URL", "https://api.tastyworks.com").rstrip("/")
 
 
+# Retried by the callers' own loops (post_with_retry, delete_with_retry, ...)
+_WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
 def _auth_header() -> dict:
     tok = get_access_token()
     return {"Authorization": f"Bearer {tok}"}
@@ -20,15 +29,14 @@ def _auth_header() -> dict:
 
 def request(method: str, path: str, **kwargs):
     url = f"{_base_url()}/{path.lstrip('/')}"
-    headers = kwargs.pop("headers", {})
-    headers.update(_auth_header())
-    r = requests.request(method, url, headers=headers, timeout=20, **kwargs)
+    headers = dict(kwargs.pop("headers", None) or {})
+    kwargs.setdefault("timeout", 20)
+    if method.upper() in _WRITE_METHODS:
+        kwargs.setdefault("retries", 0)
+    r = http_pool.send(method, url, name="tt", headers=dict(headers, **_auth_header()), **kwargs)
     if r.status_code == 401:
         token = load_token()
         refresh_token(token)
-        headers = kwargs.pop("headers", {})
-        headers.update(_auth_header())
-        r = requests.request(method, url, headers=headers, timeout=20, **kwargs)
+        r = http_pool.send(method, url, name="tt", headers=dict(headers, **_auth_header()), **kwargs)
     r.raise_for_status()
     return r
-
@@ -6,6 +6,7 @@ DXLink streaming quotes with cached quote-token.
 import asyncio
 import json
 import os
+import threading
 import time
 from typing import Dict, Iterable, Tuple
 
@@ -245,3 +246,370 @@ async def _fetch_quotes_async(symbols: Iterable[str], timeout_s: float) -> Dict[
 
 def get_quotes_once(symbols: Iterable[str], timeout_s: float = 6.0) -> Dict[str, Tuple[float, float]]:
     return asyncio.run(_fetch_quotes_async(symbols, timeout_s))
+
+
+# ---------------------------------------------------------------------------
+# Multi-event collector (whole strike window in one subscription)
+# ---------------------------------------------------------------------------
+
+STREAM_EVENT_FIELDS = {
+    "Quote": ["eventType", "eventSymbol", "bidPrice", "askPrice", "bidSize", "askSize"],
+    "Greeks": ["eventType", "eventSymbol", "volatility", "delta", "gamma", "theta", "rho", "vega"],
+    "Summary": ["eventType", "eventSymbol", "openInterest", "dayOpenPrice", "prevDayClosePrice"],
+    "Trade": ["eventType", "eventSymbol", "price", "dayVolume"],
+}
+
+
+def _clean_value(v):
+    # DXLink sends "NaN"/"Infinity" strings (or NaN floats) for unset fields
+    if isinstance(v, str):
+        try:
+            v = float(v)
+        except ValueError:
+            return v
+    if isinstance(v, float) and (v != v or v in (float("inf"), float("-inf"))):
+        return None
+    return v
+
+
+def _iter_feed_events(msg: dict, field_maps: Dict[str, list]):
+    """Yield (event_type, {field: value}) from a FEED_DATA message.
+
+    Handles FULL format (list of dicts) and COMPACT format, where data is
+    ["Type", [values...]] with one or more events flattened into the list
+    (or ["Type", [[row], [row]]]) and sometimes several such pairs.
+    """
+    data = msg.get("data") or []
+    if data and isinstance(data[0], dict):
+        for row in data:
+            etype = row.get("eventType")
+            if etype:
+                yield etype, {k: _clean_value(v) for k, v in row.items()}
+        return
+
+    for i in range(0, len(data) - 1, 2):
+        etype, values = data[i], data[i + 1]
+        fields = field_maps.get(etype)
+        if not fields or not isinstance(values, list):
+            continue
+        rows = values if values and isinstance(values[0], list) else [
+            values[j:j + len(fields)] for j in range(0, len(values), len(fields))
+        ]
+        for row in rows:
+            if len(row) == len(fields):
+                yield etype, {f: _clean_value(v) for f, v in zip(fields, row)}
+
+
+async def _await_type(ws, want_type: str, deadline: float) -> dict:
+    while time.time() < deadline:
+        try:
+            raw = await asyncio.wait_for(ws.recv(), timeout=max(0.05, deadline - time.time()))
+        except asyncio.TimeoutError:
+            break
+        msg = json.loads(raw)
+        if msg.get("type") == "ERROR":
+            raise RuntimeError(f"DXLink error: {msg.get('error')} {msg.get('message', '')}")
+        if msg.get("type") == want_type and (
+            want_type != "AUTH_STATE" or msg.get("state") == "AUTHORIZED"
+        ):
+            return msg
+    raise TimeoutError(f"DXLink: no {want_type} before deadline")
+
+
+async def collect_events_async(symbols: Iterable[str], timeout_s: float = 10.0,
+                               required: Iterable[str] = ("Quote", "Greeks"),
+                               event_types: Iterable[str] = ("Quote", "Greeks", "Summary"),
+                               token: str = "", url: str = "") -> Dict[str, Dict[str, dict]]:
+    """Subscribe every symbol at once and gather events until complete.
+
+    Returns {symbol: {event_type: {field: value}}}. Collection stops when
+    every symbol has at least one event of each ``required`` type, or at
+    the deadline (whatever arrived is returned; callers fill the gaps).
+    """
+    if not token or not url:
+        token, url = get_quote_token()
+    want = set(symbols)
+    required = tuple(required)
+    event_types = tuple(dict.fromkeys(tuple(event_types) + required))
+    deadline = time.time() + timeout_s
+    out: Dict[str, Dict[str, dict]] = {}
+    complete: set[str] = set()
+
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.send(json.dumps({
+            "type": "SETUP", "channel": 0,
+            "keepaliveTimeout": 60, "acceptKeepaliveTimeout": 60,
+            "version": "0.1-js/1.0.0",
+        }))
+        await ws.send(json.dumps({"type": "AUTH", "channel": 0, "token": token}))
+        await _await_type(ws, "AUTH_STATE", deadline)
+
+        await ws.send(json.dumps({
+            "type": "CHANNEL_REQUEST", "channel": 1,
+            "service": "FEED", "parameters": {"contract": "AUTO"},
+        }))
+        await _await_type(ws, "CHANNEL_OPENED", deadline)
+
+        await ws.send(json.dumps({
+            "type": "FEED_SETUP", "channel": 1,
+            "acceptAggregationPeriod": 0.1,
+            "acceptDataFormat": "COMPACT",
+            "acceptEventFields": {t: STREAM_EVENT_FIELDS[t] for t in event_types},
+        }))
+        config = await _await_type(ws, "FEED_CONFIG", deadline)
+        field_maps = {t: STREAM_EVENT_FIELDS[t] for t in event_types}
+        field_maps.update(config.get("eventFields") or {})
+
+        await ws.send(json.dumps({
+            "type": "FEED_SUBSCRIPTION", "channel": 1,
+            "add": [{"symbol": s, "type": t} for s in sorted(want) for t in event_types],
+        }))
+
+        while time.time() < deadline and len(complete) < len(want):
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=max(0.05, deadline - time.time()))
+            except asyncio.TimeoutError:
+                break
+            msg = json.loads(raw)
+            mtype = msg.get("type")
+            if mtype == "KEEPALIVE":
+                await ws.send(json.dumps({"type": "KEEPALIVE", "channel": 0}))
+                continue
+            if mtype != "FEED_DATA":
+                continue
+            for etype, event in _iter_feed_events(msg, field_maps):
+                sym = event.get("eventSymbol")
+                if sym not in want:
+                    continue
+                by_type = out.setdefault(sym, {})
+                by_type[etype] = event
+                if all(t in by_type for t in required):
+                    complete.add(sym)
+
+    return out
+
+
+def collect_events(symbols: Iterable[str], timeout_s: float = 10.0,
+                   required: Iterable[str] = ("Quote", "Greeks"),
+                   event_types: Iterable[str] = ("Quote", "Greeks", "Summary"),
+                   token: str = "", url: str = "") -> Dict[str, Dict[str, dict]]:
+    return asyncio.run(collect_events_async(
+        symbols, timeout_s, required=required, event_types=event_types,
+        token=token, url=url,
+    ))
+
+
+# ---------------------------------------------------------------------------
+# Persistent quote feed (one subscription held open for a whole placement)
+# ---------------------------------------------------------------------------
+
+class QuoteFeed:
+    """Latest bid/ask per symbol from one long-lived DXLink subscription.
+
+    A background thread owns the websocket and its event loop; callers
+    subscribe symbols from any thread and read the current quote
+    synchronously. Quotes are dropped when the connection is lost so a
+    reader never prices off a frozen book; the feed reconnects (fresh
+    quote token, same symbols) until closed.
+
+    Usage:
+        with QuoteFeed() as feed:
+            feed.subscribe([".SPXW260313P5900", ".SPXW260313P5895"])
+            quotes = feed.wait_for([".SPXW260313P5900"], timeout_s=6.0)
+            bid, ask = feed.get(".SPXW260313P5895") or (None, None)
+    """
+
+    def __init__(self, token: str = "", url: str = "",
+                 connect_timeout_s: float = 10.0, reconnect_s: float = 1.0):
+        self._token = token
+        self._url = url
+        self._connect_timeout_s = connect_timeout_s
+        self._reconnect_s = reconnect_s
+        self._cond = threading.Condition()
+        self._symbols: set[str] = set()
+        self._quotes: Dict[str, Tuple[float, float, float]] = {}  # sym -> (bid, ask, ts)
+        self._loop = None
+        self._ws = None
+        self._wake = None
+        self._thread = None
+        self._closed = False
+        self.connected = False
+        self.error = ""
+        self.updates = 0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> "QuoteFeed":
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name="tt-quote-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, timeout_s: float = 2.0) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        except RuntimeError:
+            pass  # loop already stopped
+        self._thread.join(timeout_s)
+
+    def __enter__(self) -> "QuoteFeed":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- reads (any thread) ------------------------------------------------
+
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        """Add symbols to the live subscription (no-op for known symbols)."""
+        with self._cond:
+            new = sorted(set(symbols) - self._symbols)
+            self._symbols.update(new)
+            ws = self._ws if self.connected else None
+        if new and ws is not None:
+            asyncio.run_coroutine_threadsafe(self._send_subscription(ws, new), self._loop)
+
+    def get(self, symbol: str, max_age_s: float | None = None):
+        """Current (bid, ask) for symbol, or None when not (recently) quoted."""
+        with self._cond:
+            q = self._quotes.get(symbol)
+        if q is None or (max_age_s is not None and time.time() - q[2] > max_age_s):
+            return None
+        return q[0], q[1]
+
+    def age(self, symbol: str):
+        """Seconds since the last quote update for symbol (None if never)."""
+        with self._cond:
+            q = self._quotes.get(symbol)
+        return None if q is None else time.time() - q[2]
+
+    def wait_for(self, symbols: Iterable[str], timeout_s: float = 6.0) -> Dict[str, Tuple[float, float]]:
+        """Block until every symbol has a quote (or timeout); returns those that do."""
+        want = set(symbols)
+        self.subscribe(want)
+        deadline = time.time() + timeout_s
+        with self._cond:
+            while not self._closed and not want <= set(self._quotes):
+                left = deadline - time.time()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            return {s: self._quotes[s][:2] for s in want if s in self._quotes}
+
+    # -- feed thread -------------------------------------------------------
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    async def _serve(self) -> None:
+        self._wake = asyncio.Event()
+        backoff = self._reconnect_s
+        while not self._closed:
+            try:
+                await self._session()
+                backoff = self._reconnect_s
+            except Exception as e:
+                self.error = str(e)[:200]
+                print(f"TT_DXLINK FEED_WARN: {self.error}")
+            finally:
+                with self._cond:
+                    self.connected = False
+                    self._ws = None
+                    self._quotes.clear()
+                    self._cond.notify_all()
+            if self._closed:
+                break
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 10.0)
+
+    async def _shutdown(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _send_subscription(self, ws, symbols) -> None:
+        await ws.send(json.dumps({
+            "type": "FEED_SUBSCRIPTION", "channel": 1,
+            "add": [{"symbol": s, "type": "Quote"} for s in symbols],
+        }))
+
+    async def _session(self) -> None:
+        token, url = self._token, self._url
+        if not token or not url:
+            token, url = get_quote_token()
+        deadline = time.time() + self._connect_timeout_s
+
+        async with websockets.connect(url, max_size=None) as ws:
+            await ws.send(json.dumps({
+                "type": "SETUP", "channel": 0,
+                "keepaliveTimeout": 60, "acceptKeepaliveTimeout": 60,
+                "version": "0.1-js/1.0.0",
+            }))
+            await ws.send(json.dumps({"type": "AUTH", "channel": 0, "token": token}))
+            await _await_type(ws, "AUTH_STATE", deadline)
+
+            await ws.send(json.dumps({
+                "type": "CHANNEL_REQUEST", "channel": 1,
+                "service": "FEED", "parameters": {"contract": "AUTO"},
+            }))
+            await _await_type(ws, "CHANNEL_OPENED", deadline)
+
+            await ws.send(json.dumps({
+                "type": "FEED_SETUP", "channel": 1,
+                "acceptAggregationPeriod": 0.1,
+                "acceptDataFormat": "COMPACT",
+                "acceptEventFields": {"Quote": STREAM_EVENT_FIELDS["Quote"]},
+            }))
+            config = await _await_type(ws, "FEED_CONFIG", deadline)
+            field_maps = {"Quote": STREAM_EVENT_FIELDS["Quote"]}
+            field_maps.update(config.get("eventFields") or {})
+
+            # Symbols subscribed from here on are sent by subscribe() itself
+            with self._cond:
+                if self._closed:
+                    return
+                self._ws = ws
+                self.connected = True
+                self.error = ""
+                symbols = sorted(self._symbols)
+            if symbols:
+                await self._send_subscription(ws, symbols)
+
+            async for raw in ws:
+                msg = json.loads(raw)
+                mtype = msg.get("type")
+                if mtype == "KEEPALIVE":
+                    await ws.send(json.dumps({"type": "KEEPALIVE", "channel": 0}))
+                elif mtype == "FEED_DATA":
+                    self._apply(msg, field_maps)
+                elif mtype == "ERROR":
+                    raise RuntimeError(f"DXLink error: {msg.get('error')} {msg.get('message', '')}")
+
+    def _apply(self, msg: dict, field_maps: Dict[str, list]) -> None:
+        now = time.time()
+        fresh = {}
+        for etype, event in _iter_feed_events(msg, field_maps):
+            bid, ask = event.get("bidPrice"), event.get("askPrice")
+            if etype == "Quote" and bid is not None and ask is not None:
+                fresh[event.get("eventSymbol")] = (float(bid), float(ask), now)
+        if fresh:
+            with self._cond:
+                self._quotes.update(fresh)
+                self.updates += len(fresh)
+                self._cond.notify_all()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Order status tracking from the Tastytrade account streamer, with polling fallback.
+
+The account streamer websocket pushes an ``Order`` notification for every
+status change and fill on the connected accounts. OrderTracker keeps the
+latest order JSON per order id in memory (fed by a background thread that
+owns the websocket), and ``wait`` blocks until every watched order is done
+by the caller's definition (filled / final) or the timeout passes.
+
+While the streamer is down (or disabled) ``wait`` polls the caller's REST
+lookup adaptively: fast right after submit, backing off toward
+``poll_max_s``, and back to fast after any change. While it is connected
+the REST lookup only runs every ``verify_s`` as a guard against a missed
+notification.
+
+Usage:
+    tracker = OrderTracker("5WT00001").start()
+    latest = tracker.wait([oid], done=lambda oid, st: status_upper(st) in FINAL,
+                          timeout_s=12, poll=lambda oid: get_status(c, acct, oid))
+    tracker.close()
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import websockets
+
+from tt_token_keeper import get_access_token
+
+_FINAL = {"FILLED", "CANCELED", "CANCELLED", "REJECTED", "EXPIRED", "REMOVED"}
+
+
+def streamer_url() -> str:
+    url = (os.environ.get("TT_ACCOUNT_STREAMER_URL") or "").strip()
+    if url:
+        return url
+    base = os.environ.get("TT_BASE_URL", "https://api.tastyworks.com")
+    return "wss://streamer.cert.tastyworks.com" if "cert" in base else "wss://streamer.tastyworks.com"
+
+
+def _order_id(order: dict) -> str:
+    oid = order.get("id") or order.get("order-id") or order.get("orderId")
+    return str(oid) if oid not in (None, "") else ""
+
+
+def _status(order: dict) -> str:
+    return str(order.get("status") or "").upper().strip()
+
+
+class OrderTracker:
+    """Latest order state per id, pushed by the account streamer or polled."""
+
+    def __init__(self, account: str, stream: bool = True, url: str = "",
+                 poll_min_s: float = 0.25, poll_max_s: float = 1.5,
+                 verify_s: float = 5.0, heartbeat_s: float = 20.0,
+                 reconnect_s: float = 1.0, token_fn: Callable[[], str] = get_access_token):
+        self.account = account
+        self.stream = stream
+        self.url = url
+        self.poll_min_s = poll_min_s
+        self.poll_max_s = max(poll_min_s, poll_max_s)
+        self.verify_s = verify_s
+        self.heartbeat_s = heartbeat_s
+        self._reconnect_s = reconnect_s
+        self._token_fn = token_fn
+        self._cond = threading.Condition()
+        self._orders: Dict[str, dict] = {}
+        self._loop = None
+        self._ws = None
+        self._wake = None
+        self._thread = None
+        self._closed = False
+        self.connected = False
+        self.error = ""
+        self.events = 0
+        self.polls = 0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> "OrderTracker":
+        if self.stream and self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name="tt-order-events", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, timeout_s: float = 2.0) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        except RuntimeError:
+            pass  # loop already stopped
+        self._thread.join(timeout_s)
+
+    def wait_connected(self, timeout_s: float) -> bool:
+        deadline = time.time() + timeout_s
+        with self._cond:
+            while self.stream and not self.connected and not self._closed:
+                left = deadline - time.time()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            return self.connected
+
+    # -- state -------------------------------------------------------------
+
+    def latest(self, oid: str) -> dict:
+        with self._cond:
+            return self._orders.get(str(oid)) or {}
+
+    def update(self, order: dict, oid: str = "") -> bool:
+        """Record an order snapshot; returns True when it changed the state.
+
+        A final status is never replaced by a non-final one, so a slow REST
+        answer can't roll back a fill the streamer already delivered.
+        """
+        if isinstance(order, dict) and isinstance(order.get("data"), dict):
+            order = order["data"]  # REST envelope
+        if not isinstance(order, dict) or not order:
+            return False
+        oid = str(oid or _order_id(order))
+        if not oid:
+            return False
+        with self._cond:
+            prev = self._orders.get(oid)
+            if prev is not None and _status(prev) in _FINAL and _status(order) not in _FINAL:
+                return False
+            if prev == order:
+                return False
+            self._orders[oid] = order
+            self._cond.notify_all()
+            return True
+
+    def wait(self, oids: Iterable[str], done: Callable[[str, dict], bool], timeout_s: float,
+             poll: Optional[Callable[[str], dict]] = None) -> Dict[str, dict]:
+        """Block until done(oid, order) for every oid, or timeout.
+
+        Returns {oid: latest order} ({} for orders never seen). Stream
+        notifications wake the wait immediately; ``poll`` (REST lookup
+        returning the order JSON) runs adaptively while the stream is down,
+        and every ``verify_s`` while it is up.
+        """
+        oids = [str(o) for o in oids if o]
+        deadline = time.time() + timeout_s
+        interval = self.poll_min_s
+        next_poll = time.time() if not self.connected else time.time() + self.verify_s
+
+        while True:
+            states = {oid: self.latest(oid) for oid in oids}
+            pending = [oid for oid in oids if not done(oid, states[oid])]
+            now = time.time()
+            if not pending or now >= deadline:
+                return states
+
+            if poll is not None and now >= next_poll:
+                changed = False
+                for oid in pending:
+                    self.polls += 1
+                    changed |= self.update(poll(oid) or {}, oid)
+                interval = self.poll_min_s if changed else min(interval * 1.6, self.poll_max_s)
+                next_poll = time.time() + (self.verify_s if self.connected else interval)
+                continue
+
+            wake_at = min(deadline, next_poll) if poll is not None else deadline
+            with self._cond:
+                # Recheck under the lock so a notification can't slip in unseen
+                if all((self._orders.get(oid) or {}) == states[oid] for oid in pending):
+                    self._cond.wait(max(0.0, wake_at - time.time()))
+            if not self.connected:
+                # Stream dropped mid-wait: resume polling at the current pace
+                next_poll = min(next_poll, time.time() + interval)
+
+    # -- streamer thread ---------------------------------------------------
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    async def _serve(self) -> None:
+        self._wake = asyncio.Event()
+        backoff = self._reconnect_s
+        while not self._closed:
+            try:
+                await self._session()
+                backoff = self._reconnect_s
+            except Exception as e:
+                self.error = str(e)[:200]
+                print(f"TT_ORDER_STREAM WARN: {self.error}")
+            finally:
+                with self._cond:
+                    self.connected = False
+                    self._ws = None
+                    self._cond.notify_all()
+            if self._closed:
+                break
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 10.0)
+
+    async def _shutdown(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _heartbeat(self, ws, token: str) -> None:
+        req = 100
+        while True:
+            await asyncio.sleep(self.heartbeat_s)
+            req += 1
+            await ws.send(json.dumps({"action": "heartbeat", "auth-token": token, "request-id": req}))
+
+    async def _session(self) -> None:
+        token = f"Bearer {self._token_fn()}"
+        async with websockets.connect(self.url or streamer_url(), max_size=None) as ws:
+            await ws.send(json.dumps({
+                "action": "connect", "value": [self.account],
+                "auth-token": token, "request-id": 1,
+            }))
+            beat = None
+            try:
+                async for raw in ws:
+                    msg = json.loads(raw)
+                    if msg.get("action") == "connect" and "status" in msg:
+                        if str(msg.get("status")).lower() != "ok":
+                            raise RuntimeError(f"account streamer connect: {str(msg)[:160]}")
+                        with self._cond:
+                            if self._closed:
+                                return
+                            self._ws = ws
+                            self.connected = True
+                            self.error = ""
+                            self._cond.notify_all()
+                        beat = asyncio.ensure_future(self._heartbeat(ws, token))
+                    elif msg.get("type") == "Order" and isinstance(msg.get("data"), dict):
+                        self.events += 1
+                        self.update(msg["data"])
+            finally:
+                if beat is not None:
+                    beat.cancel()
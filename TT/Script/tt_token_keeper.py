@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 """
 Tastytrade token keeper with refresh + single-writer locking.
+
+Tokens are cached in memory per token path and re-read only when the file
+changes (another process refreshed it). refresh_token stamps ``expires_at``
+from ``expires_in``, and get_access_token refreshes ahead of that expiry.
 """
 
 import json
 import os
+import threading
 import time
 from contextlib import contextmanager
 
@@ -15,6 +20,12 @@ try:
 except Exception:  # pragma: no cover - non-posix
     fcntl = None
 
+EXPIRY_SKEW_S = 60
+
+_cache = {}                       # token path -> (mtime_ns, token)
+_cache_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
 
 def _ensure_dir(path: str):
     d = os.path.dirname(path)
@@ -66,16 +77,36 @@ def _token_path() -> str:
     return default_path
 
 
+def _remember(token_path: str, token: dict):
+    try:
+        mtime = os.stat(token_path).st_mtime_ns
+    except OSError:
+        return
+    with _cache_lock:
+        _cache[token_path] = (mtime, dict(token))
+
+
 def load_token() -> dict:
     token_path = _token_path()
-    if not os.path.exists(token_path):
+    try:
+        mtime = os.stat(token_path).st_mtime_ns
+    except OSError:
         raise RuntimeError(f"TT token file missing: {token_path}")
+    with _cache_lock:
+        hit = _cache.get(token_path)
+        if hit is not None and hit[0] == mtime:
+            return dict(hit[1])
     with open(token_path, "r") as f:
-        return json.load(f)
+        token = json.load(f)
+    with _cache_lock:
+        _cache[token_path] = (mtime, dict(token))
+    return token
 
 
 def save_token(token: dict):
-    _write_token_locked(_token_path(), token)
+    token_path = _token_path()
+    _write_token_locked(token_path, token)
+    _remember(token_path, token)
 
 
 def refresh_token(token: dict) -> dict:
@@ -107,16 +138,31 @@ def refresh_token(token: dict) -> dict:
     new_token = r.json() or {}
     merged = dict(token or {})
     merged.update({k: v for k, v in new_token.items() if v not in (None, "")})
+    try:
+        merged["expires_at"] = int(time.time()) + int(new_token["expires_in"])
+    except (KeyError, TypeError, ValueError):
+        merged.pop("expires_at", None)  # the old stamp belongs to the old access token
     if not merged.get("refresh_token") and token.get("refresh_token"):
         merged["refresh_token"] = token.get("refresh_token")
     save_token(merged)
     return merged
 
 
+def _needs_refresh(token: dict) -> bool:
+    if not token.get("access_token"):
+        return True
+    try:
+        expires_at = float(token.get("expires_at") or 0)
+    except (TypeError, ValueError):
+        expires_at = 0
+    return bool(expires_at) and time.time() >= expires_at - EXPIRY_SKEW_S
+
+
 def get_access_token() -> str:
     token = load_token()
-    access = token.get("access_token") or ""
-    if not access:
-        token = refresh_token(token)
-        access = token.get("access_token") or ""
-    return access
+    if _needs_refresh(token):
+        with _refresh_lock:
+            token = load_token()  # another thread may have refreshed meanwhile
+            if _needs_refresh(token):
+                token = refresh_token(token)
+    return token.get("access_token") or ""
@@ -1,25 +1,43 @@
 #!/usr/bin/env python3
 """AWS Lambda handler for ConstantStableVerticals trading.
 
-Wraps existing orchestrator scripts via subprocess — no trading code is modified.
-EventBridge Scheduler invokes this with {"account": "schwab"|"tt-ira"|"tt-individual"}.
+Wraps existing orchestrator scripts — no trading code is modified. Scripts run
+in-process (script_runner) so imports and the placer hop stay warm; set
+SCRIPT_RUN_MODE=subprocess (Lambda env or event env_override) to go back to a
+fresh interpreter per script.
+EventBridge Scheduler invokes this with {"account": "schwab"|"tt-ira"|"tt-individual"},
+or {"account": "multi"} to run several trade accounts in one invocation with
+shared SSM/GW inputs (see _handle_multi).
 """
 
+import asyncio
 import hashlib
 import json
 import os
+import shutil
 import subprocess
 import sys
 import time
 from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 import boto3
 
+import script_runner
+
 TASK_ROOT = os.environ.get("LAMBDA_TASK_ROOT", "/var/task")
 REPORT_STEPS = {"cs_summary_to_gsheet.py", "cs_performance_to_gsheet.py"}
 DEFAULT_REPORT_OWNER = "tt-individual"
 DEFAULT_REPORT_DELAY_SECS = 90
 DISABLE_SCHWAB_CS_DEFAULT = False
+SCRIPT_RUN_MODE_DEFAULT = "inprocess"  # or "subprocess"
+MULTI_ACCOUNTS_DEFAULT = "schwab,tt-ira-leo,tt-individual"
+MULTI_DIR = "/tmp/multi"
+# GW endpoint an orchestrator fetches: (env var, default); others use GW_ENDPOINT
+SIGNAL_ENDPOINT_ENV = {
+    "TT/Script/LeoProfit/orchestrator.py": ("LEO_GW_ENDPOINT", "/rapi/GetLeoProfit"),
+}
+DEFAULT_SIGNAL_ENDPOINT = ("GW_ENDPOINT", "rapi/GetUltraPureConstantStable")
 
 # ---------------------------------------------------------------------------
 # Account configurations
@@ -323,13 +341,57 @@ def persist_token_if_changed(ssm_path, file_path, original_hash):
     return False
 
 
+def _schwab_cs_disabled() -> bool:
+    return str(
+        os.environ.get(
+            "DISABLE_SCHWAB_CS",
+            "1" if DISABLE_SCHWAB_CS_DEFAULT else "0",
+        )
+    ).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def _script_run_mode(env) -> str:
+    mode = (env.get("SCRIPT_RUN_MODE") or SCRIPT_RUN_MODE_DEFAULT).strip().lower()
+    return "subprocess" if mode == "subprocess" else "inprocess"
+
+
+def _print_script_output(stdout, stderr):
+    if stdout:
+        for line in stdout.rstrip().split("\n"):
+            print(f"  {line}")
+    if stderr:
+        for line in stderr.rstrip().split("\n"):
+            print(f"  ERR: {line}")
+
+
 def run_script(script, env, timeout_s=100, label=""):
-    """Run a Python script as a subprocess from the task root."""
+    """Run a Python script from the task root, in-process or as a subprocess."""
     full_path = os.path.join(TASK_ROOT, script)
     if not os.path.isfile(full_path):
         print(f"SKIP {label or script}: file not found")
         return -1
-    print(f"RUN  {label or script}")
+    mode = _script_run_mode(env)
+    print(f"RUN  {label or script} ({mode})")
+    if mode == "inprocess":
+        ctx = script_runner.ScriptContext(
+            script, dict(env), cwd=TASK_ROOT, timeout_s=timeout_s, label=label,
+        )
+        try:
+            rc, stdout, stderr = script_runner.run_in_process(ctx)
+        except script_runner.RunnerBusy:
+            print("  in-process runner busy, falling back to subprocess")
+        else:
+            if rc == script_runner.TIMEOUT_RC:
+                print(f"TIMEOUT {label or script} after {timeout_s}s")
+                if stdout:
+                    print(stdout[-2000:])
+                if stderr:
+                    print(stderr[-2000:])
+                return rc
+            _print_script_output(stdout, stderr)
+            if rc != 0:
+                print(f"EXIT {rc}: {label or script}")
+            return rc
     try:
         result = subprocess.run(
             [sys.executable, full_path],
@@ -346,12 +408,7 @@ def run_script(script, env, timeout_s=100, label=""):
         if e.stderr:
             print(e.stderr[-2000:])
         return 124  # standard timeout exit code
-    if result.stdout:
-        for line in result.stdout.rstrip().split("\n"):
-            print(f"  {line}")
-    if result.stderr:
-        for line in result.stderr.rstrip().split("\n"):
-            print(f"  ERR: {line}")
+    _print_script_output(result.stdout, result.stderr)
     if result.returncode != 0:
         print(f"EXIT {result.returncode}: {label or script}")
     return result.returncode
@@ -390,20 +447,22 @@ def upload_event_files(env, trade_date: str) -> dict:
         print(f"EVENT_UPLOAD SKIP: no event dir at {trade_path}")
         return stats
 
-    s3 = boto3.client("s3")
+    from sim.data.s3_transfer import upload_many
+
+    pairs = []
     for name in sorted(os.listdir(trade_path)):
         if not name.endswith(".jsonl"):
             continue
         stats["files"] += 1
-        local_path = os.path.join(trade_path, name)
-        key = f"{prefix}/{trade_date}/{name}"
-        try:
-            s3.upload_file(local_path, bucket, key)
-            stats["uploaded"] += 1
+        pairs.append((os.path.join(trade_path, name), f"{prefix}/{trade_date}/{name}"))
+
+    done, stats["errors"] = upload_many(bucket, pairs)
+    stats["uploaded"] = len(done)
+    for local_path, key in pairs:
+        if (local_path, key) in done:
             print(f"EVENT_UPLOAD OK: s3://{bucket}/{key}")
-        except Exception as e:
-            stats["errors"] += 1
-            print(f"EVENT_UPLOAD FAIL: {local_path} -> s3://{bucket}/{key} ({e})")
+        else:
+            print(f"EVENT_UPLOAD FAIL: {local_path} -> s3://{bucket}/{key}")
 
     return stats
 
@@ -754,6 +813,11 @@ def _handle_daily_pnl(event, t0):
     os.environ["SCHWAB_APP_SECRET"] = params.get("/gamma/schwab/app_secret", "")
     os.environ["SMTP_USER"] = params.get("/gamma/shared/smtp_user", "")
     os.environ["SMTP_PASS"] = params.get("/gamma/shared/smtp_pass", "")
+    os.environ.setdefault("SETTLEMENT_INDEX_PATH", "/tmp/settlement_index.json")
+    # P&L mart works in the writable /tmp (task root is read-only) and is
+    # mirrored to S3 so every container starts from the same history
+    os.environ.setdefault("GAMMA_DB_PATH", "/tmp/portfolio.duckdb")
+    os.environ.setdefault("PNL_MART_S3", "1")
 
     # Seed Schwab token
     token_content = params.get("/gamma/schwab/token_json", "")
@@ -827,6 +891,7 @@ def _handle_weekly_pnl(event, t0):
     os.environ["SCHWAB_APP_SECRET"] = params.get("/gamma/schwab/app_secret", "")
     os.environ["SMTP_USER"] = params.get("/gamma/shared/smtp_user", "")
     os.environ["SMTP_PASS"] = params.get("/gamma/shared/smtp_pass", "")
+    os.environ.setdefault("SETTLEMENT_INDEX_PATH", "/tmp/settlement_index.json")
 
     # Seed Schwab token
     token_content = params.get("/gamma/schwab/token_json", "")
@@ -902,88 +967,12 @@ def _handle_weekly_pnl(event, t0):
 
 
 # ---------------------------------------------------------------------------
-# Lambda entry point
+# Account setup / post-steps (single- and multi-account runs)
 # ---------------------------------------------------------------------------
 
 
-def lambda_handler(event, context):
-    t0 = time.time()
-    trade_date = datetime.now(timezone.utc).date().isoformat()
-    account = event.get("account", "")
-    dry_run = event.get("dry_run", False)
-    disable_schwab_cs = str(
-        os.environ.get(
-            "DISABLE_SCHWAB_CS",
-            "1" if DISABLE_SCHWAB_CS_DEFAULT else "0",
-        )
-    ).strip().lower() in ("1", "true", "yes", "y", "on")
-
-    # Warm-up ping — pre-warm containers for parallel trade invocations.
-    # The first warmup invocation spawns additional async self-invocations
-    # so that Lambda provisions enough containers for all concurrent accounts.
-    if account == "warmup":
-        depth = event.get("warmup_depth", 0)
-        # Count how many concurrent trade schedules fire at the same time
-        # (schwab + tt-ira + tt-individual = 3)
-        target_containers = int(os.environ.get("WARMUP_CONTAINERS", "5"))
-        if depth == 0 and target_containers > 1:
-            # Spawn (N-1) additional invocations to force parallel containers
-            fn_name = context.function_name if context else os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "")
-            if fn_name:
-                lam = boto3.client("lambda")
-                for i in range(1, target_containers):
-                    try:
-                        lam.invoke(
-                            FunctionName=fn_name,
-                            InvocationType="Event",  # async, non-blocking
-                            Payload=json.dumps({"account": "warmup", "warmup_depth": i}).encode(),
-                        )
-                    except Exception as e:
-                        print(f"WARMUP spawn {i} failed: {e}")
-                print(f"WARMUP: spawned {target_containers - 1} additional containers")
-        print(f"WARMUP ping — container is warm (depth={depth})")
-        # Hold the container alive briefly so Lambda doesn't reclaim it
-        # before the sibling warmups finish initializing
-        if depth == 0:
-            time.sleep(3)
-        return {"status": "ok", "account": "warmup", "depth": depth, "duration_s": round(time.time() - t0, 1)}
-
-    # Sim chain collection — separate flow (no subprocess, writes to S3)
-    if account == "sim-collect":
-        return _handle_sim_collect(event)
-
-    # Daily P&L email — pulls Schwab orders, computes P&L, sends email
-    if account == "daily-pnl":
-        return _handle_daily_pnl(event, t0)
-
-    # Weekly P&L report — Saturday morning summary email
-    if account == "weekly-pnl":
-        return _handle_weekly_pnl(event, t0)
-
-    # CS reporting refresh — runs full pipeline independently of trading accounts
-    if account == "cs-refresh":
-        return _handle_cs_refresh(event, t0)
-
-    # Safety switch: keep ConstantStable disabled on Schwab while TT stays active.
-    if account == "schwab" and disable_schwab_cs:
-        print("SKIP schwab: ConstantStable disabled by DISABLE_SCHWAB_CS")
-        return {
-            "status": "ok",
-            "account": "schwab",
-            "skipped": True,
-            "reason": "SCHWAB_CS_DISABLED",
-            "duration_s": round(time.time() - t0, 1),
-        }
-
-    if account not in ACCOUNTS:
-        msg = f"Unknown account: {account!r}. Expected one of {list(ACCOUNTS)}"
-        print(msg)
-        return {"status": "error", "message": msg}
-
-    cfg = ACCOUNTS[account]
-    print(f"=== {account} | orchestrator={cfg['orchestrator']} ===")
-
-    # -- 1. Collect all SSM param names we need --
+def _ssm_names(account, cfg):
+    """env_var -> SSM path for everything an account run needs."""
     ssm_names = {}
     ssm_names.update(cfg["env_from_ssm"])          # env_var -> ssm_path
     ssm_names.update(SHARED_SSM)                    # env_var -> ssm_path
@@ -992,12 +981,16 @@ def lambda_handler(event, context):
     # Manual account needs both Schwab (primary) + TT token
     if account == "manual":
         ssm_names["_tt_token"] = "/gamma/tt/token_json"
+    return ssm_names
 
-    all_ssm_paths = list(set(ssm_names.values()))
-    params = get_ssm_params(all_ssm_paths)
-    print(f"Fetched {len(params)}/{len(all_ssm_paths)} SSM params")
 
-    # -- 2. Build subprocess environment --
+def _account_env(account, cfg, params, event, dry_run, token_dir=""):
+    """Build an account's script env and seed its token file.
+
+    With ``token_dir`` the token files (and the CS trade log) live under that
+    directory instead of /tmp, so accounts running side by side never share
+    a file. Returns (env, token_file).
+    """
     env = dict(os.environ)
     env.update(COMMON_ENV)
     env.update(cfg["static_env"])
@@ -1018,10 +1011,18 @@ def lambda_handler(event, context):
     for env_key, ssm_path in SHARED_SSM.items():
         env[env_key] = params.get(ssm_path, "")
 
-    # -- 3. Seed token files --
+    token_file = cfg["token_file"]
+    if token_dir:
+        os.makedirs(token_dir, exist_ok=True)
+        token_file = os.path.join(token_dir, os.path.basename(token_file))
+        for key in ("SCHWAB_TOKEN_PATH", "TT_TOKEN_PATH", "TT_QUOTE_TOKEN_PATH", "CS_LOG_PATH"):
+            if env.get(key):
+                env[key] = os.path.join(token_dir, os.path.basename(env[key]))
+
+    # -- Seed token files --
     token_content = params.get(cfg["token_ssm_path"], "")
     if token_content:
-        seed_file(cfg["token_file"], token_content)
+        seed_file(token_file, token_content)
     else:
         print(f"WARNING: no token content from {cfg['token_ssm_path']}")
 
@@ -1039,27 +1040,14 @@ def lambda_handler(event, context):
         # TT: set token content as env var (orchestrator passes to placer)
         env["TT_TOKEN_JSON"] = token_content
 
-    token_hash = file_hash(cfg["token_file"])
-    tt_token_hash = file_hash("/tmp/tt_token.json") if account == "manual" else None
-
-    # Ensure /tmp writability for logs
-    os.makedirs("/tmp/logs", exist_ok=True)
+    return env, token_file
 
-    # -- 4. Signal wait moved into orchestrator (prep runs while waiting) --
 
-    # -- 4b. Run orchestrator (critical path) --
-    orch_timeout = 330 if account == "manual" else 100
-    orch_rc = run_script(cfg["orchestrator"], env, timeout_s=orch_timeout, label="orchestrator")
-
-    # -- 4c. Finalize pending BF plan if orchestrator failed/timed out --
-    if account == "butterfly" and orch_rc != 0:
-        _finalize_bf_plan(env, orch_rc)
-
-    # -- 5. Post-trade steps (best-effort, time-permitting) --
+def _run_post_steps(account, cfg, env, context, dry_run, report_delay_secs):
+    """Run an account's post-trade steps (best-effort, time-permitting)."""
     remaining_ms = context.get_remaining_time_in_millis() if context else 30000
     remaining_s = max(5, int(remaining_ms / 1000) - 5)
     report_owner = (env.get("CS_REPORT_OWNER") or DEFAULT_REPORT_OWNER).strip()
-    report_delay_secs = int(env.get("CS_REPORT_DELAY_SECS") or str(DEFAULT_REPORT_DELAY_SECS))
     report_delay_applied = False
 
     post_results = {}
@@ -1100,6 +1088,332 @@ def lambda_handler(event, context):
         except Exception as e:
             post_results[step_name] = f"ERROR:{e}"
             print(f"WARN post-step {step}: {e}")
+    return post_results
+
+
+# ---------------------------------------------------------------------------
+# Multi-account trade run (one invocation, accounts side by side)
+# ---------------------------------------------------------------------------
+
+
+async def _run_account_async(account, script, env, timeout_s):
+    """Run one account's orchestrator as a child process, streaming its output."""
+    full_path = os.path.join(TASK_ROOT, script)
+    if not os.path.isfile(full_path):
+        print(f"SKIP [{account}] {script}: file not found")
+        return -1
+    print(f"RUN  [{account}] {script} (subprocess)")
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, full_path,
+        env=env, cwd=TASK_ROOT,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+    )
+
+    async def pump():
+        async for line in proc.stdout:
+            print(f"  [{account}] {line.decode(errors='replace').rstrip()}")
+
+    try:
+        await asyncio.wait_for(asyncio.gather(pump(), proc.wait()), timeout_s)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        print(f"TIMEOUT [{account}] after {timeout_s}s")
+        return 124
+    if proc.returncode != 0:
+        print(f"EXIT {proc.returncode}: [{account}] {script}")
+    return proc.returncode
+
+
+def _seconds_until_et(hhmmss):
+    """Seconds until today's HH:MM[:SS] ET (0 if past/unset, capped at 120 like the orchestrators)."""
+    if not hhmmss:
+        return 0.0
+    try:
+        parts = [int(x) for x in hhmmss.split(":")]
+        now_et = datetime.now(ZoneInfo("America/New_York"))
+        target = now_et.replace(hour=parts[0], minute=parts[1],
+                                second=parts[2] if len(parts) > 2 else 0, microsecond=0)
+        wait = (target - now_et).total_seconds()
+    except Exception as e:
+        print(f"WARN: CS_GW_READY_ET parse error ({e})")
+        return 0.0
+    return wait if 0 < wait <= 120 else 0.0
+
+
+def _gw_fetch(env, endpoint):
+    """GET a GammaWizard endpoint with the account env's credentials."""
+    import requests
+
+    base = (env.get("GW_BASE") or "https://gandalf.gammawizard.com").rstrip("/")
+    url = f"{base}/{endpoint.lstrip('/')}"
+    token = (env.get("GW_TOKEN") or "").strip().strip('"').strip("'")
+    if token.lower().startswith("bearer "):
+        token = token.split(None, 1)[1]
+    headers = {"Accept": "application/json"}
+    r = requests.get(url, headers=dict(headers, Authorization=f"Bearer {token}"), timeout=30) if token else None
+    if r is None or r.status_code in (401, 403):
+        rr = requests.post(
+            f"{base}/goauth/authenticateFireUser",
+            data={"email": env.get("GW_EMAIL", ""), "password": env.get("GW_PASSWORD", "")},
+            timeout=30,
+        )
+        rr.raise_for_status()
+        token = rr.json().get("token") or ""
+        r = requests.get(url, headers=dict(headers, Authorization=f"Bearer {token}"), timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+async def _share_signal(endpoint, env, path):
+    """Fetch one GW endpoint once (after CS_GW_READY_ET) and publish it at ``path``."""
+    await asyncio.sleep(_seconds_until_et(env.get("CS_GW_READY_ET", "")))
+    t = time.time()
+    try:
+        payload = await asyncio.get_running_loop().run_in_executor(None, _gw_fetch, env, endpoint)
+        print(f"SIGNAL {endpoint}: fetched in {time.time() - t:.1f}s")
+    except Exception as e:
+        payload = {"_error": f"GW fetch failed: {e}"}
+        print(f"SIGNAL {endpoint}: FAILED {e}")
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)  # orchestrators poll for the final name
+
+
+async def _fan_out(runs, signals, timeout_s):
+    """Run every account's orchestrator concurrently; returns {account: rc}."""
+    signal_tasks = [
+        asyncio.ensure_future(_share_signal(endpoint, env, path))
+        for endpoint, (env, path) in signals.items()
+    ]
+    results = await asyncio.gather(
+        *(_run_account_async(a, r["cfg"]["orchestrator"], r["env"], timeout_s) for a, r in runs.items()),
+        return_exceptions=True,
+    )
+    for task in signal_tasks:
+        task.cancel()  # no-op once published; stops a wait nobody needs any more
+    rcs = {}
+    for account, result in zip(runs, results):
+        if isinstance(result, BaseException):
+            print(f"ERROR [{account}] orchestrator: {result}")
+            result = 1
+        rcs[account] = result
+    return rcs
+
+
+def _handle_multi(event, context, t0):
+    """Run several trade accounts in one invocation, sharing their inputs.
+
+    Event payload: {"account": "multi", "accounts": ["schwab", "tt-ira-leo", "tt-individual"],
+                    "dry_run": false, "env_override": {...}}
+
+    SSM parameters are fetched in one batch, and each GW endpoint once
+    (after CS_GW_READY_ET) for every account that reads it; orchestrators
+    pick it up from GW_SIGNAL_FILE while their broker prep runs. Each
+    account's orchestrator runs as its own child process in one asyncio
+    loop — the in-process runner swaps the process-wide os.environ, so it
+    can't host two accounts at once — with its token files under
+    /tmp/multi/<account>, so one account's failure, timeout or token
+    refresh never touches another. Post-steps then run per account as in
+    single-account mode, with the reporting owner last (no delay needed).
+    """
+    trade_date = datetime.now(timezone.utc).date().isoformat()
+    dry_run = event.get("dry_run", False)
+    names = event.get("accounts") or [
+        a.strip() for a in (os.environ.get("MULTI_ACCOUNTS") or MULTI_ACCOUNTS_DEFAULT).split(",") if a.strip()
+    ]
+    unknown = [a for a in names if a not in ACCOUNTS or a == "manual"]
+    if unknown:
+        msg = f"Unknown multi accounts: {unknown}. Expected from {[a for a in ACCOUNTS if a != 'manual']}"
+        print(msg)
+        return {"status": "error", "message": msg}
+    if _schwab_cs_disabled() and "schwab" in names:
+        print("SKIP schwab: ConstantStable disabled by DISABLE_SCHWAB_CS")
+        names = [a for a in names if a != "schwab"]
+    print(f"=== multi | accounts={','.join(names)} ===")
+
+    # -- 1. One SSM batch for every account --
+    ssm_paths = set()
+    for account in names:
+        ssm_paths.update(_ssm_names(account, ACCOUNTS[account]).values())
+    params = get_ssm_params(sorted(ssm_paths))
+    print(f"Fetched {len(params)}/{len(ssm_paths)} SSM params")
+
+    # -- 2. Per-account env + token files; one signal file per GW endpoint --
+    shutil.rmtree(MULTI_DIR, ignore_errors=True)
+    os.makedirs("/tmp/logs", exist_ok=True)
+    runs, signals = {}, {}
+    for account in names:
+        cfg = ACCOUNTS[account]
+        env, token_file = _account_env(account, cfg, params, event, dry_run,
+                                       token_dir=os.path.join(MULTI_DIR, account))
+        env_key, default = SIGNAL_ENDPOINT_ENV.get(cfg["orchestrator"], DEFAULT_SIGNAL_ENDPOINT)
+        endpoint = env.get(env_key) or default
+        if "CS_SIGNAL_JSON" not in env:
+            slug = "".join(ch if ch.isalnum() else "_" for ch in endpoint.strip("/"))
+            path = os.path.join(MULTI_DIR, f"signal_{slug}.json")
+            signals.setdefault(endpoint, (env, path))
+            env["GW_SIGNAL_FILE"] = path
+        runs[account] = {"cfg": cfg, "env": env, "token_file": token_file,
+                         "token_hash": file_hash(token_file)}
+
+    # -- 3. Orchestrators side by side --
+    rcs = asyncio.run(_fan_out(runs, signals, timeout_s=100))
+
+    # -- 4. Post-steps, reporting owner last --
+    report_owner = (COMMON_ENV.get("CS_REPORT_OWNER") or DEFAULT_REPORT_OWNER).strip()
+    results = {}
+    for account in sorted(runs, key=lambda a: runs[a]["env"].get("CS_REPORT_OWNER", report_owner) == a):
+        run = runs[account]
+        print(f"--- post-steps {account} ---")
+        post_results = _run_post_steps(account, run["cfg"], run["env"], context, dry_run, 0)
+        results[account] = {"orchestrator_rc": rcs[account], "post_results": post_results}
+        summary = {"account": account, "orchestrator_rc": rcs[account], "steps": post_results}
+        print(f"REPORT_SUMMARY {json.dumps(summary)}")
+
+    if dry_run or not runs:
+        event_upload = {"skipped": "dry_run" if dry_run else "no_accounts"}
+    else:
+        event_upload = upload_event_files(next(iter(runs.values()))["env"], trade_date)
+    print(f"EVENT_UPLOAD_SUMMARY {json.dumps(event_upload)}")
+
+    # -- 5. Persist each token once: the most recently refreshed copy wins --
+    persisted = set()
+    for account in sorted(runs, key=lambda a: -(os.path.getmtime(runs[a]["token_file"])
+                                                if os.path.exists(runs[a]["token_file"]) else 0)):
+        run = runs[account]
+        ssm_path = run["cfg"]["token_ssm_path"]
+        if ssm_path in persisted:
+            continue
+        try:
+            if persist_token_if_changed(ssm_path, run["token_file"], run["token_hash"]):
+                persisted.add(ssm_path)
+        except Exception as e:
+            print(f"ERROR persisting token ({account}): {e}")
+
+    duration = round(time.time() - t0, 1)
+    status = "ok" if all(rc == 0 for rc in rcs.values()) else "error"
+    print(f"=== DONE multi | status={status} | {duration}s ===")
+    return {
+        "status": status,
+        "account": "multi",
+        "accounts": results,
+        "event_upload": event_upload,
+        "duration_s": duration,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Lambda entry point
+# ---------------------------------------------------------------------------
+
+
+def lambda_handler(event, context):
+    t0 = time.time()
+    trade_date = datetime.now(timezone.utc).date().isoformat()
+    account = event.get("account", "")
+    dry_run = event.get("dry_run", False)
+    disable_schwab_cs = _schwab_cs_disabled()
+
+    # Warm-up ping — pre-warm containers for parallel trade invocations.
+    # The first warmup invocation spawns additional async self-invocations
+    # so that Lambda provisions enough containers for all concurrent accounts.
+    if account == "warmup":
+        depth = event.get("warmup_depth", 0)
+        # Count how many concurrent trade schedules fire at the same time
+        # (schwab + tt-ira + tt-individual = 3)
+        target_containers = int(os.environ.get("WARMUP_CONTAINERS", "5"))
+        if depth == 0 and target_containers > 1:
+            # Spawn (N-1) additional invocations to force parallel containers
+            fn_name = context.function_name if context else os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "")
+            if fn_name:
+                lam = boto3.client("lambda")
+                for i in range(1, target_containers):
+                    try:
+                        lam.invoke(
+                            FunctionName=fn_name,
+                            InvocationType="Event",  # async, non-blocking
+                            Payload=json.dumps({"account": "warmup", "warmup_depth": i}).encode(),
+                        )
+                    except Exception as e:
+                        print(f"WARMUP spawn {i} failed: {e}")
+                print(f"WARMUP: spawned {target_containers - 1} additional containers")
+        # Import the trading stack now so the first in-process run doesn't pay for it
+        preloaded = script_runner.preload()
+        print(f"WARMUP ping — container is warm (depth={depth}, preloaded={preloaded})")
+        # Hold the container alive briefly so Lambda doesn't reclaim it
+        # before the sibling warmups finish initializing
+        if depth == 0:
+            time.sleep(3)
+        return {"status": "ok", "account": "warmup", "depth": depth, "duration_s": round(time.time() - t0, 1)}
+
+    # Sim chain collection — separate flow (no subprocess, writes to S3)
+    if account == "sim-collect":
+        return _handle_sim_collect(event)
+
+    # Daily P&L email — pulls Schwab orders, computes P&L, sends email
+    if account == "daily-pnl":
+        return _handle_daily_pnl(event, t0)
+
+    # Weekly P&L report — Saturday morning summary email
+    if account == "weekly-pnl":
+        return _handle_weekly_pnl(event, t0)
+
+    # CS reporting refresh — runs full pipeline independently of trading accounts
+    if account == "cs-refresh":
+        return _handle_cs_refresh(event, t0)
+
+    # Several trade accounts in one invocation with shared inputs
+    if account == "multi":
+        return _handle_multi(event, context, t0)
+
+    # Safety switch: keep ConstantStable disabled on Schwab while TT stays active.
+    if account == "schwab" and disable_schwab_cs:
+        print("SKIP schwab: ConstantStable disabled by DISABLE_SCHWAB_CS")
+        return {
+            "status": "ok",
+            "account": "schwab",
+            "skipped": True,
+            "reason": "SCHWAB_CS_DISABLED",
+            "duration_s": round(time.time() - t0, 1),
+        }
+
+    if account not in ACCOUNTS:
+        msg = f"Unknown account: {account!r}. Expected one of {list(ACCOUNTS)}"
+        print(msg)
+        return {"status": "error", "message": msg}
+
+    cfg = ACCOUNTS[account]
+    print(f"=== {account} | orchestrator={cfg['orchestrator']} ===")
+
+    # -- 1. Collect all SSM param names we need --
+    ssm_names = _ssm_names(account, cfg)
+    all_ssm_paths = list(set(ssm_names.values()))
+    params = get_ssm_params(all_ssm_paths)
+    print(f"Fetched {len(params)}/{len(all_ssm_paths)} SSM params")
+
+    # -- 2./3. Build subprocess environment, seed token files --
+    env, token_file = _account_env(account, cfg, params, event, dry_run)
+    token_hash = file_hash(token_file)
+    tt_token_hash = file_hash("/tmp/tt_token.json") if account == "manual" else None
+
+    # Ensure /tmp writability for logs
+    os.makedirs("/tmp/logs", exist_ok=True)
+
+    # -- 4. Signal wait moved into orchestrator (prep runs while waiting) --
+
+    # -- 4b. Run orchestrator (critical path) --
+    orch_timeout = 330 if account == "manual" else 100
+    orch_rc = run_script(cfg["orchestrator"], env, timeout_s=orch_timeout, label="orchestrator")
+
+    # -- 4c. Finalize pending BF plan if orchestrator failed/timed out --
+    if account == "butterfly" and orch_rc != 0:
+        _finalize_bf_plan(env, orch_rc)
+
+    # -- 5. Post-trade steps (best-effort, time-permitting) --
+    report_delay_secs = int(env.get("CS_REPORT_DELAY_SECS") or str(DEFAULT_REPORT_DELAY_SECS))
+    post_results = _run_post_steps(account, cfg, env, context, dry_run, report_delay_secs)
 
     # Structured log line for CloudWatch Insights queries
     summary = {"account": account, "orchestrator_rc": orch_rc, "steps": post_results}
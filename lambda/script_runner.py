@@ -0,0 +1,205 @@
+"""In-process runner for orchestrator / placer / post-step scripts.
+
+run_script in handler.py used to start every script with a fresh
+``subprocess.run([sys.executable, ...])``, and the TT ConstantStable
+orchestrator started place.py the same way, so each hop re-imported
+requests, boto3, pandas and schwab-py. Here a script runs as
+``__main__`` inside the Lambda process (runpy): third-party modules
+imported by one run stay in sys.modules for the next hop and the next
+warm invocation. Project modules loaded from the task root are dropped
+after each top-level run, so same-named helpers of different strategies
+(e.g. two ``guard.py``) never leak between accounts.
+
+Each run gets an explicit ScriptContext (script, env, cwd, timeout,
+label). The trading scripts still read os.environ, so the runner swaps
+os.environ to the context's env for the run, along with cwd, sys.argv,
+sys.path[0] and stdout/stderr capture, and restores all of it afterwards.
+Runs are serialized by a lock since that state is process-global.
+
+Timeouts use SIGALRM when called from the main thread (raising a
+BaseException so scripts' ``except Exception`` can't swallow it), and a
+watchdog thread join otherwise. A nested run (orchestrator → place.py)
+shares the outer run's timeout and output capture, the way a child
+process writes to its parent's pipe.
+
+Exit codes match subprocess mode: sys.exit(n) → n, uncaught exception
+→ 1, timeout → 124.
+
+Usage:
+    import script_runner
+    ctx = script_runner.ScriptContext("TT/Script/ConstantStable/orchestrator.py",
+                                      env, cwd="/var/task", timeout_s=100)
+    rc, out, err = script_runner.run_in_process(ctx)
+"""
+
+import io
+import os
+import runpy
+import signal
+import sys
+import threading
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+
+TIMEOUT_RC = 124
+
+
+@dataclass
+class ScriptContext:
+    script: str                        # path relative to cwd (or absolute)
+    env: dict = field(default_factory=dict)
+    cwd: str = "."
+    timeout_s: float = 100
+    label: str = ""
+
+
+class ScriptTimeout(BaseException):
+    """Raised inside a running script when its timeout expires."""
+
+
+class RunnerBusy(RuntimeError):
+    """Another in-process run (e.g. a timed-out one) still holds the runner."""
+
+
+_lock = threading.RLock()
+_stack: list = []
+
+
+def current():
+    """The ScriptContext of the innermost running script, or None."""
+    return _stack[-1] if _stack else None
+
+
+def active() -> bool:
+    """True while a script is running in-process in this thread's run."""
+    return bool(_stack)
+
+
+def preload(modules=("requests", "boto3", "pandas", "schwab")) -> list:
+    """Import heavy modules ahead of the first trade run; returns those loaded."""
+    loaded = []
+    for name in modules:
+        try:
+            __import__(name)
+            loaded.append(name)
+        except ImportError:
+            pass
+    return loaded
+
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _execute(ctx: ScriptContext) -> int:
+    """Run ctx.script as __main__ with env/cwd/argv/path swapped in."""
+    path = os.path.abspath(os.path.join(ctx.cwd, ctx.script))
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    saved_argv = sys.argv
+    saved_path = list(sys.path)
+    _stack.append(ctx)
+    try:
+        os.environ.clear()
+        os.environ.update(ctx.env)
+        os.chdir(ctx.cwd)
+        sys.argv = [path]
+        sys.path.insert(0, os.path.dirname(path))
+        try:
+            runpy.run_path(path, run_name="__main__")
+            return 0
+        except SystemExit as e:
+            return _exit_code(e)
+        except Exception:
+            traceback.print_exc()
+            return 1
+    finally:
+        _stack.pop()
+        sys.path[:] = saved_path
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
+def _drop_project_modules(before: set, root: str) -> None:
+    root = os.path.abspath(root) + os.sep
+    for name in set(sys.modules) - before:
+        f = getattr(sys.modules.get(name), "__file__", None) or ""
+        if f.startswith(root) and os.sep + "site-packages" + os.sep not in f:
+            sys.modules.pop(name, None)
+
+
+def _run_top(ctx: ScriptContext, out: io.StringIO, err: io.StringIO) -> int:
+    before = set(sys.modules)
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                return _execute(ctx)
+            except ScriptTimeout:
+                return TIMEOUT_RC
+    finally:
+        _drop_project_modules(before, ctx.cwd)
+
+
+def _on_alarm(signum, frame):
+    if _stack:
+        raise ScriptTimeout()
+
+
+def run_in_process(ctx: ScriptContext) -> tuple:
+    """Run a top-level script in this process. Returns (rc, stdout, stderr).
+
+    Raises RunnerBusy when a previous run (a timed-out watchdog thread)
+    has not finished yet; callers fall back to a subprocess.
+    """
+    out, err = io.StringIO(), io.StringIO()
+
+    if threading.current_thread() is threading.main_thread():
+        if not _lock.acquire(blocking=False):
+            raise RunnerBusy(ctx.label or ctx.script)
+        old = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, ctx.timeout_s)
+        try:
+            rc = _run_top(ctx, out, err)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, old)
+            _lock.release()
+        return rc, out.getvalue(), err.getvalue()
+
+    # Off the main thread: watchdog join; a timed-out run keeps the lock
+    # (and its swapped env) until it ends, so later runs see RunnerBusy.
+    if not _lock.acquire(blocking=False):
+        raise RunnerBusy(ctx.label or ctx.script)
+    _lock.release()
+    result = {}
+
+    def target():
+        with _lock:
+            result["rc"] = _run_top(ctx, out, err)
+
+    worker = threading.Thread(target=target, name=f"script:{ctx.label}", daemon=True)
+    worker.start()
+    worker.join(ctx.timeout_s)
+    if worker.is_alive():
+        return TIMEOUT_RC, out.getvalue(), err.getvalue()
+    return result.get("rc", 1), out.getvalue(), err.getvalue()
+
+
+def run_nested(script: str, env: dict) -> int:
+    """Run a script from inside an in-process run (orchestrator → placer).
+
+    Shares the outer run's cwd, timeout and output capture.
+    """
+    outer = current()
+    return _execute(ScriptContext(
+        script, dict(env), cwd=outer.cwd, timeout_s=outer.timeout_s,
+        label=os.path.basename(script),
+    ))
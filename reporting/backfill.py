@@ -25,7 +25,8 @@ from datetime import date, datetime, timezone
 from pathlib import Path
 from typing import Iterable
 
-from reporting.db import get_connection, init_schema, query_df, query_one
+from reporting.broker_orders import normalize_broker_orders
+from reporting.db import get_connection, init_schema, query_one
 from reporting.events import _idem_key
 from reporting.ingest import _MATERIALIZERS, _ingest_raw_event
 from reporting.position_engine import materialize_positions
@@ -104,23 +105,6 @@ def _parse_ts(ts: str, fallback_date: str) -> str:
     return f"{fallback_date}T21:00:00+00:00"
 
 
-def _parse_entered_trade_date(entered_time: str) -> str:
-    text = _s(entered_time)
-    if not text:
-        return ""
-    try:
-        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
-    except ValueError:
-        return ""
-    try:
-        import zoneinfo
-
-        et = zoneinfo.ZoneInfo("America/New_York")
-        return dt.astimezone(et).date().isoformat()
-    except Exception:
-        return dt.date().isoformat()
-
-
 def _event(
     *,
     strategy: str,
@@ -183,21 +167,15 @@ def _has_activity(row: dict) -> bool:
     return _i(row.get("qty_filled")) > 0 or _i(row.get("filled_qty")) > 0 or bool(_s(row.get("order_ids")))
 
 
-def _query_broker_order_payloads(con, account: str, order_ids: list[str]) -> dict[str, dict]:
-    if not order_ids:
-        return {}
-    placeholders = ", ".join(["?"] * len(order_ids))
-    rows = con.execute(
-        f"""SELECT order_id, raw_payload
-            FROM broker_raw_orders
-            WHERE account = ?
-              AND order_id IN ({placeholders})""",
-        [account, *order_ids],
-    ).fetchall()
-    out: dict[str, dict] = {}
-    for oid, raw in rows:
-        out[str(oid)] = json.loads(raw) if isinstance(raw, str) else raw
-    return out
+def _broker_order_match(row) -> BrokerOrderMatch:
+    order_id, entered_at, price, filled_qty, status = row
+    return BrokerOrderMatch(
+        order_id=str(order_id),
+        entered_time=entered_at.isoformat() if entered_at else "",
+        price=_f(price),
+        filled_qty=_i(filled_qty),
+        status=_s(status),
+    )
 
 
 def _match_broker_orders(
@@ -209,58 +187,35 @@ def _match_broker_orders(
     explicit_order_ids: list[str] | None = None,
 ) -> list[BrokerOrderMatch]:
     order_ids = [oid for oid in (explicit_order_ids or []) if oid]
-    payloads = _query_broker_order_payloads(con, account, order_ids)
-    matches: list[BrokerOrderMatch] = []
-
-    for oid in order_ids:
-        payload = payloads.get(oid)
-        if payload is None:
-            matches.append(BrokerOrderMatch(oid, "", 0.0, 0, ""))
-            continue
-        matches.append(
-            BrokerOrderMatch(
-                order_id=oid,
-                entered_time=_s(payload.get("enteredTime")),
-                price=_f(payload.get("price")),
-                filled_qty=_i(payload.get("filledQuantity")),
-                status=_s(payload.get("status")),
-            )
-        )
-    if matches:
-        return matches
-
-    if not symbols:
+    if order_ids:
+        placeholders = ", ".join(["?"] * len(order_ids))
+        rows = con.execute(
+            f"""SELECT order_id, entered_at, price, filled_qty, status
+                FROM broker_orders
+                WHERE account = ?
+                  AND order_id IN ({placeholders})""",
+            [account, *order_ids],
+        ).fetchall()
+        found = {str(row[0]): _broker_order_match(row) for row in rows}
+        return [found.get(oid) or BrokerOrderMatch(oid, "", 0.0, 0, "") for oid in order_ids]
+
+    target_syms = sorted({_norm_osi(s) for s in symbols if _norm_osi(s)})
+    if not target_syms:
         return []
 
+    # Orders entered that ET day whose leg set is exactly the CSV row's legs
     rows = con.execute(
-        """SELECT order_id, raw_payload
-           FROM broker_raw_orders
-           WHERE account = ?""",
-        [account],
+        """SELECT o.order_id, o.entered_at, o.price, o.filled_qty, o.status
+           FROM broker_orders o
+           JOIN broker_order_legs l USING (account, order_id)
+           WHERE o.account = ?
+             AND o.trade_date = TRY_CAST(? AS DATE)
+             AND l.osi IS NOT NULL
+           GROUP BY ALL
+           HAVING list_sort(list(DISTINCT l.osi)) = ?""",
+        [account, trade_date, target_syms],
     ).fetchall()
-
-    target_syms = {_norm_osi(s) for s in symbols if _norm_osi(s)}
-    for oid, raw in rows:
-        payload = json.loads(raw) if isinstance(raw, str) else raw
-        if _parse_entered_trade_date(payload.get("enteredTime", "")) != trade_date:
-            continue
-        payload_syms = {
-            _norm_osi(leg.get("instrument", {}).get("symbol", ""))
-            for leg in payload.get("orderLegCollection", [])
-        }
-        payload_syms.discard("")
-        if payload_syms != target_syms:
-            continue
-        matches.append(
-            BrokerOrderMatch(
-                order_id=str(oid),
-                entered_time=_s(payload.get("enteredTime")),
-                price=_f(payload.get("price")),
-                filled_qty=_i(payload.get("filledQuantity")),
-                status=_s(payload.get("status")),
-            )
-        )
-
+    matches = [_broker_order_match(row) for row in rows]
     return sorted(matches, key=lambda m: (m.entered_time, m.order_id))
 
 
@@ -657,6 +612,8 @@ def backfill_csv_logs(
     if con is None:
         con = get_connection()
     init_schema(con)
+    if enrich_from_broker:
+        normalize_broker_orders(con)
 
     totals = {
         "strategies": {},
@@ -705,67 +662,51 @@ API_TAG = "TA_1michaelbelaygmailcom1755679459"
 BACKFILL_BROKER_CONFIG_VERSION = "backfill-broker-v1"
 
 
-def _infer_strategy_from_order(payload: dict, trade_date_et: str, all_orders_on_date: list[dict]) -> str:
+def _infer_strategy_from_order(legs: list[dict], peer_legs: list[list[dict]]) -> str:
     """Infer strategy from broker order leg structure and context.
 
+    ``peer_legs`` holds the legs of the other orders entered the same day.
+
     Rules:
       - 3+ legs → butterfly
       - 2 legs with both PUT and CALL debit orders on same date → dualside
       - 2 legs otherwise → constantstable
     """
-    legs = payload.get("orderLegCollection", [])
     if len(legs) >= 3:
         return "butterfly"
 
     # Check if there's a complementary PUT+CALL pair on same date → dualside
-    this_types = {
-        leg.get("instrument", {}).get("putCall", "").upper()
-        for leg in legs
-        if leg.get("instrument", {}).get("putCall")
-    }
-
-    peer_types: set[str] = set()
-    this_oid = str(payload.get("orderId", ""))
-    for peer in all_orders_on_date:
-        if str(peer.get("orderId", "")) == this_oid:
-            continue
-        for leg in peer.get("orderLegCollection", []):
-            pc = leg.get("instrument", {}).get("putCall", "").upper()
-            if pc:
-                peer_types.add(pc)
+    combined = {leg["option_type"] for leg in legs}
+    for peer in peer_legs:
+        combined.update(leg["option_type"] for leg in peer)
 
     # If this date has both PUT and CALL verticals → dualside
-    combined = this_types | peer_types
     if "PUT" in combined and "CALL" in combined and len(legs) == 2:
         return "dualside"
 
     return "constantstable"
 
 
-def _extract_legs_from_broker(payload: dict) -> list[dict]:
-    """Extract canonical leg dicts from a Schwab order payload."""
-    legs = []
-    for leg in payload.get("orderLegCollection", []):
-        inst = leg.get("instrument", {})
-        sym = _norm_osi(inst.get("symbol", ""))
-        instruction = _s(leg.get("instruction")).upper()
-        option_type = _s(inst.get("putCall")).upper() or "CALL"
-        qty = _i(leg.get("quantity"), 1)
-
-        # Parse strike from OSI if available (last 8 chars = price * 1000)
-        strike = 0.0
-        if len(sym) >= 8:
-            try:
-                strike = int(sym[-8:]) / 1000.0
-            except ValueError:
-                pass
-
-        legs.append({
-            "osi": sym,
-            "strike": strike,
-            "option_type": option_type,
-            "action": instruction,
-            "qty": qty,
+def _query_broker_legs(con, account: str, order_ids: list[str]) -> dict[str, list[dict]]:
+    """Canonical leg dicts per order from broker_order_legs, in leg order."""
+    if not order_ids:
+        return {}
+    rows = con.execute(
+        """SELECT order_id, osi, strike, option_type, instruction, qty
+           FROM broker_order_legs
+           WHERE account = ?
+             AND order_id IN (SELECT unnest(?))
+           ORDER BY order_id, leg_index""",
+        [account, order_ids],
+    ).fetchall()
+    legs: dict[str, list[dict]] = defaultdict(list)
+    for order_id, osi, strike, option_type, instruction, qty in rows:
+        legs[str(order_id)].append({
+            "osi": osi or "",
+            "strike": strike or 0.0,
+            "option_type": option_type or "CALL",
+            "action": instruction or "",
+            "qty": _i(qty, 1),
         })
     return legs
 
@@ -788,32 +729,34 @@ def _extract_expiry_from_legs(legs: list[dict]) -> str:
     return ""
 
 
-def _infer_side_direction(payload: dict) -> tuple[str, str]:
+def _infer_side_direction(order_type: str | None) -> tuple[str, str]:
     """Infer side (CREDIT/DEBIT) and direction (LONG/SHORT) from order type."""
-    order_type = _s(payload.get("orderType")).upper()
-    if "CREDIT" in order_type:
+    if "CREDIT" in _s(order_type).upper():
         return "CREDIT", "SHORT"
     return "DEBIT", "LONG"
 
 
+def _utc_iso(ts: datetime | None, fallback_date: str) -> str:
+    if ts is None:
+        return f"{fallback_date}T21:00:00+00:00"
+    return ts.replace(tzinfo=timezone.utc).isoformat()
+
+
 def _broker_order_events(
-    payload: dict,
+    order: dict,
+    legs: list[dict],
     strategy: str,
     account: str,
 ) -> list[dict]:
-    """Generate canonical events from a single broker order payload."""
-    order_id = str(payload.get("orderId", ""))
-    entered_time = _s(payload.get("enteredTime"))
-    ts_utc = _parse_ts(entered_time, "")
-    price = _f(payload.get("price"))
-    filled_qty = _i(payload.get("filledQuantity"))
-
-    # Parse trade_date in ET from enteredTime
-    trade_date = _parse_entered_trade_date(entered_time)
+    """Generate canonical events from one broker_orders row and its legs."""
+    order_id = order["order_id"]
+    ts_utc = _utc_iso(order["entered_at"], "")
+    price = _f(order["price"])
+    filled_qty = _i(order["filled_qty"])
+    trade_date = order["trade_date"].isoformat() if order["trade_date"] else ""
 
-    legs = _extract_legs_from_broker(payload)
     expiry = _extract_expiry_from_legs(legs)
-    side, direction = _infer_side_direction(payload)
+    side, direction = _infer_side_direction(order["order_type"])
 
     run_id = _stable_id("broker-run", strategy, account, trade_date, order_id)
     trade_group_id = _stable_id("broker-group", strategy, account, order_id)
@@ -881,18 +824,10 @@ def _broker_order_events(
 
     # fill
     if filled_qty > 0:
-        # Use execution data for precise fill price if available
         fill_price = price
         fill_ts = ts_utc
-        for activity in payload.get("orderActivityCollection", []):
-            if str(activity.get("activityType", "")).upper() != "EXECUTION":
-                continue
-            for exec_leg in activity.get("executionLegs", []):
-                t = _s(exec_leg.get("time"))
-                if t:
-                    fill_ts = _parse_ts(t, trade_date)
-                    break
-            break
+        if order["first_fill_at"] is not None:
+            fill_ts = _utc_iso(order["first_fill_at"], trade_date)
 
         events.append(_event(
             strategy=strategy,
@@ -936,43 +871,50 @@ def backfill_from_broker(
         con = get_connection()
     init_schema(con)
 
-    orders_df = query_df(
-        """SELECT order_id, raw_payload
-           FROM broker_raw_orders
+    normalize_broker_orders(con)
+    rows = con.execute(
+        """SELECT order_id, entered_at, price, filled_qty, order_type,
+                  first_fill_at, trade_date
+           FROM broker_orders
            WHERE account = ?
-             AND json_extract_string(raw_payload, '$.tag') = ?
-             AND json_extract_string(raw_payload, '$.status') = 'FILLED'
-           ORDER BY json_extract_string(raw_payload, '$.enteredTime')""",
+             AND tag = ?
+             AND status = 'FILLED'
+           ORDER BY entered_at""",
         [account, tag],
-        con=con,
-    )
+    ).fetchall()
 
-    if orders_df.empty:
+    if not rows:
         return {
             "orders": 0, "events": 0, "inserted": 0,
             "duplicates": 0, "materialized": 0, "positions": 0,
             "strategies": {},
         }
 
-    # Parse all payloads and group by trade date for strategy inference
-    parsed: list[dict] = []
-    by_date: dict[str, list[dict]] = defaultdict(list)
-    for _, row in orders_df.iterrows():
-        payload = json.loads(row["raw_payload"]) if isinstance(row["raw_payload"], str) else row["raw_payload"]
-        trade_date = _parse_entered_trade_date(_s(payload.get("enteredTime")))
-        parsed.append(payload)
-        by_date[trade_date].append(payload)
+    columns = ("order_id", "entered_at", "price", "filled_qty", "order_type",
+               "first_fill_at", "trade_date")
+    orders = [dict(zip(columns, row)) for row in rows]
+    legs_by_order = _query_broker_legs(con, account, [o["order_id"] for o in orders])
+
+    # Group by trade date for strategy inference
+    by_date: dict[object, list[str]] = defaultdict(list)
+    for order in orders:
+        by_date[order["trade_date"]].append(order["order_id"])
 
     # Generate events
     all_events: list[dict] = []
     strategy_counts: dict[str, int] = defaultdict(int)
 
-    for payload in parsed:
-        trade_date = _parse_entered_trade_date(_s(payload.get("enteredTime")))
-        strategy = _infer_strategy_from_order(payload, trade_date, by_date[trade_date])
+    for order in orders:
+        order_id = order["order_id"]
+        legs = legs_by_order.get(order_id, [])
+        peer_legs = [
+            legs_by_order.get(peer, [])
+            for peer in by_date[order["trade_date"]] if peer != order_id
+        ]
+        strategy = _infer_strategy_from_order(legs, peer_legs)
         strategy_counts[strategy] += 1
 
-        events = _broker_order_events(payload, strategy, account)
+        events = _broker_order_events(order, legs, strategy, account)
         all_events.extend(events)
 
     # Apply events
@@ -980,7 +922,7 @@ def backfill_from_broker(
     positions = materialize_positions(con)
 
     return {
-        "orders": len(parsed),
+        "orders": len(orders),
         "events": stats["events"],
         "inserted": stats["inserted"],
         "duplicates": stats["duplicates"],
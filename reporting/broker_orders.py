@@ -0,0 +1,205 @@
+"""Typed broker order store: broker_raw_orders exploded into columnar tables.
+
+broker_raw_orders keeps every fetched version of an order as raw JSON.
+This stage parses the latest version of each order once, at sync time,
+into two typed tables that reports can query with plain SQL:
+
+  broker_orders      one row per (account, order_id): status, tag, order
+                     type, price, quantities, UTC timestamps, ET trade_date
+  broker_order_legs  one row per leg: OSI, underlying, expiry, PUT/CALL,
+                     strike, instruction, qty, execution qty / avg price
+
+Schwab (orderLegCollection / orderActivityCollection) and TastyTrade
+(legs[].fills[], kebab-case keys) payloads are both handled. Parsing is
+one set of DuckDB statements; a run only touches raw rows newer than the
+version already normalized, so calling it before every report is cheap.
+
+Usage:
+    from reporting.broker_orders import normalize_broker_orders
+    stats = normalize_broker_orders(con)              # incremental
+    stats = normalize_broker_orders(con, full=True)   # rebuild
+"""
+
+from __future__ import annotations
+
+from reporting.db import get_connection, query_one
+
+
+# Raw rows newer than the normalized version of their order (latest wins)
+_PENDING_SQL = """
+CREATE OR REPLACE TEMP TABLE _bo_pending AS
+SELECT r.id, r.broker, r.account, r.order_id, r.fetched_at, r.raw_payload AS p
+FROM broker_raw_orders r
+LEFT JOIN broker_orders o ON o.account = r.account AND o.order_id = r.order_id
+WHERE o.order_id IS NULL
+   OR r.fetched_at > o.fetched_at
+   OR (r.fetched_at = o.fetched_at AND r.id > o.raw_id)
+QUALIFY row_number() OVER (
+    PARTITION BY r.account, r.order_id ORDER BY r.fetched_at DESC, r.id DESC
+) = 1
+"""
+
+# Broker timestamps ('...+0000', '...Z', '...+00:00') → naive UTC / ET date
+_MACROS_SQL = """
+CREATE OR REPLACE TEMP MACRO _bo_utc(s) AS TRY_CAST(s AS TIMESTAMPTZ) AT TIME ZONE 'UTC';
+CREATE OR REPLACE TEMP MACRO _bo_et_date(s) AS
+    CAST(timezone('America/New_York', TRY_CAST(s AS TIMESTAMPTZ)) AS DATE);
+"""
+
+_LEGS_SQL = r"""
+CREATE OR REPLACE TEMP TABLE _bo_legs AS
+WITH exploded AS (
+    SELECT account, order_id,
+           unnest(legs) AS leg,
+           generate_subscripts(legs, 1) - 1 AS leg_index
+    FROM (
+        SELECT account, order_id,
+               CASE WHEN json_exists(p, '$.orderLegCollection')
+                    THEN json_extract(p, '$.orderLegCollection[*]')
+                    ELSE json_extract(p, '$.legs[*]') END AS legs
+        FROM _bo_pending
+    )
+)
+SELECT account, order_id, leg_index, leg,
+       coalesce(TRY_CAST(leg->>'legId' AS INTEGER), leg_index + 1) AS leg_id,
+       trim(coalesce(leg->>'$.instrument.symbol', leg->>'symbol', '')) AS symbol,
+       regexp_extract(
+           trim(coalesce(leg->>'$.instrument.symbol', leg->>'symbol', '')),
+           '^([A-Z.]+)\s*([0-9]{6})([CP])([0-9]{8})$',
+           ['root', 'ymd', 'cp', 'strike']
+       ) AS osi_parts
+FROM exploded
+"""
+
+# One row per execution: Schwab executionLegs (matched to legs by legId)
+# and TastyTrade legs[].fills[].
+_FILLS_SQL = """
+CREATE OR REPLACE TEMP TABLE _bo_fills AS
+WITH activities AS (
+    SELECT account, order_id,
+           unnest(json_extract(p, '$.orderActivityCollection[*]')) AS a
+    FROM _bo_pending
+),
+executions AS (
+    SELECT account, order_id, unnest(json_extract(a, '$.executionLegs[*]')) AS x
+    FROM activities
+    WHERE upper(a->>'activityType') = 'EXECUTION'
+),
+tt_fills AS (
+    SELECT account, order_id, leg_index, unnest(json_extract(leg, '$.fills[*]')) AS f
+    FROM _bo_legs
+)
+SELECT e.account, e.order_id, l.leg_index,
+       TRY_CAST(e.x->>'quantity' AS DOUBLE) AS qty,
+       TRY_CAST(e.x->>'price' AS DOUBLE) AS price,
+       _bo_utc(e.x->>'time') AS ts
+FROM executions e
+LEFT JOIN _bo_legs l
+  ON l.account = e.account AND l.order_id = e.order_id
+ AND l.leg_id = TRY_CAST(e.x->>'legId' AS INTEGER)
+UNION ALL
+SELECT account, order_id, leg_index,
+       TRY_CAST(f->>'quantity' AS DOUBLE),
+       TRY_CAST(f->>'$."fill-price"' AS DOUBLE),
+       _bo_utc(f->>'$."filled-at"')
+FROM tt_fills
+"""
+
+_INSERT_ORDERS_SQL = """
+INSERT INTO broker_orders
+SELECT p.account, p.order_id, p.broker, p.id, p.fetched_at,
+       NULLIF(coalesce(p.p->>'accountNumber', p.p->>'$."account-number"'), ''),
+       NULLIF(upper(p.p->>'status'), ''),
+       NULLIF(p.p->>'tag', ''),
+       NULLIF(upper(replace(coalesce(p.p->>'orderType', p.p->>'$."order-type"'), ' ', '_')), ''),
+       NULLIF(p.p->>'complexOrderStrategyType', ''),
+       CASE p.p->>'orderType'
+            WHEN 'NET_CREDIT' THEN 'CREDIT'
+            WHEN 'NET_DEBIT' THEN 'DEBIT'
+            ELSE NULLIF(upper(p.p->>'$."price-effect"'), '') END,
+       TRY_CAST(p.p->>'price' AS DOUBLE),
+       TRY_CAST(coalesce(p.p->>'quantity', p.p->>'size') AS DOUBLE),
+       -- TT leaves filled-quantity empty; a Filled order filled its size
+       coalesce(
+           TRY_CAST(coalesce(p.p->>'filledQuantity', p.p->>'$."filled-quantity"') AS DOUBLE),
+           CASE WHEN upper(p.p->>'status') = 'FILLED' THEN TRY_CAST(p.p->>'size' AS DOUBLE) END,
+           0),
+       coalesce(json_array_length(coalesce(p.p->'orderLegCollection', p.p->'legs')), 0),
+       _bo_utc(coalesce(p.p->>'enteredTime', p.p->>'$."received-at"', p.p->>'$."created-at"')),
+       _bo_utc(coalesce(p.p->>'closeTime', p.p->>'$."terminal-at"')),
+       f.first_fill_at,
+       _bo_et_date(coalesce(p.p->>'enteredTime', p.p->>'$."received-at"', p.p->>'$."created-at"'))
+FROM _bo_pending p
+LEFT JOIN (
+    SELECT account, order_id, min(ts) AS first_fill_at
+    FROM _bo_fills
+    GROUP BY ALL
+) f ON f.account = p.account AND f.order_id = p.order_id
+"""
+
+_INSERT_LEGS_SQL = """
+INSERT INTO broker_order_legs
+SELECT l.account, l.order_id, l.leg_index, o.trade_date,
+       NULLIF(l.symbol, ''),
+       NULLIF(replace(l.symbol, ' ', ''), ''),
+       NULLIF(l.osi_parts.root, ''),
+       CAST(try_strptime('20' || l.osi_parts.ymd, '%Y%m%d') AS DATE),
+       CASE l.osi_parts.cp
+            WHEN 'P' THEN 'PUT'
+            WHEN 'C' THEN 'CALL'
+            ELSE NULLIF(upper(l.leg->>'$.instrument.putCall'), '') END,
+       TRY_CAST(NULLIF(l.osi_parts.strike, '') AS DOUBLE) / 1000,
+       NULLIF(upper(replace(coalesce(l.leg->>'instruction', l.leg->>'action'), ' ', '_')), ''),
+       TRY_CAST(l.leg->>'quantity' AS DOUBLE),
+       f.filled_qty, f.fill_price, f.last_fill_at
+FROM _bo_legs l
+JOIN broker_orders o ON o.account = l.account AND o.order_id = l.order_id
+LEFT JOIN (
+    SELECT account, order_id, leg_index,
+           sum(qty) AS filled_qty,
+           sum(qty * price) / NULLIF(sum(qty), 0) AS fill_price,
+           max(ts) AS last_fill_at
+    FROM _bo_fills
+    WHERE leg_index IS NOT NULL
+    GROUP BY ALL
+) f ON f.account = l.account AND f.order_id = l.order_id AND f.leg_index = l.leg_index
+"""
+
+
+def normalize_broker_orders(con=None, full: bool = False) -> dict:
+    """Explode new/changed broker_raw_orders into broker_orders + broker_order_legs.
+
+    Only orders whose latest raw version is not yet normalized are parsed;
+    ``full`` rebuilds both tables from scratch. Returns {orders, legs}.
+    """
+    if con is None:
+        con = get_connection()
+
+    con.execute(_MACROS_SQL)
+    con.execute("BEGIN TRANSACTION")
+    try:
+        if full:
+            con.execute("DELETE FROM broker_order_legs")
+            con.execute("DELETE FROM broker_orders")
+        con.execute(_PENDING_SQL)
+        n_orders = query_one("SELECT count(*) FROM _bo_pending", con=con)[0]
+        n_legs = 0
+        if n_orders:
+            con.execute(_LEGS_SQL)
+            con.execute(_FILLS_SQL)
+            con.execute(
+                """DELETE FROM broker_order_legs l USING _bo_pending p
+                   WHERE l.account = p.account AND l.order_id = p.order_id"""
+            )
+            con.execute(
+                """DELETE FROM broker_orders o USING _bo_pending p
+                   WHERE o.account = p.account AND o.order_id = p.order_id"""
+            )
+            con.execute(_INSERT_ORDERS_SQL)
+            con.execute(_INSERT_LEGS_SQL)
+            n_legs = query_one("SELECT count(*) FROM _bo_legs", con=con)[0]
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return {"orders": n_orders, "legs": n_legs}
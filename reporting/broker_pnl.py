@@ -60,20 +60,12 @@ def parse_osi(symbol: str) -> tuple[str | None, str | None, float | None]:
 
 def classify_order(order: dict) -> str:
     """Classify a Schwab order into a strategy based on tag, time, structure."""
-    api_tagged = order.get("tag", "") == API_TAG
-    ctype = order.get("complexOrderStrategyType", "")
-
-    legs = order.get("orderLegCollection", [])
     strikes = set()
-    for leg in legs:
+    for leg in order.get("orderLegCollection", []):
         _, _, strike = parse_osi(leg.get("instrument", {}).get("symbol", ""))
         if strike:
             strikes.add(strike)
 
-    sorted_strikes = sorted(strikes)
-    width = sorted_strikes[-1] - sorted_strikes[0] if len(sorted_strikes) >= 2 else 0
-    num_distinct_strikes = len(sorted_strikes)
-
     # Parse fill time
     fill_utc = order.get("closeTime", order.get("enteredTime", ""))
     dt_et = None
@@ -84,6 +76,19 @@ def classify_order(order: dict) -> str:
         except Exception:
             pass
 
+    return _classify(
+        order.get("tag", "") == API_TAG,
+        order.get("complexOrderStrategyType", ""),
+        strikes,
+        dt_et,
+    )
+
+
+def _classify(api_tagged: bool, ctype: str, strikes: set, dt_et: datetime | None) -> str:
+    sorted_strikes = sorted(strikes)
+    width = sorted_strikes[-1] - sorted_strikes[0] if len(sorted_strikes) >= 2 else 0
+    num_distinct_strikes = len(sorted_strikes)
+
     time_dec = (dt_et.hour + dt_et.minute / 60) if dt_et else 0
 
     if not api_tagged:
@@ -138,149 +143,86 @@ def parse_filled_orders(raw_orders: list[dict]) -> list[dict]:
         if not parsed_legs:
             continue
 
-        strikes = sorted(set(l["strike"] for l in parsed_legs if l["strike"]))
-        expiries = sorted(set(l["expiry"] for l in parsed_legs if l["expiry"]))
-        option_types = sorted(set(l["option_type"] for l in parsed_legs if l["option_type"]))
-        instructions = set(l["instruction"] for l in parsed_legs)
-
-        order_type = o.get("orderType", "")
-        signal = "SHORT" if order_type == "NET_CREDIT" else "LONG"
-
-        strategy = classify_order(o)
-
-        trades.append({
-            "order_id": o.get("orderId"),
-            "account": o.get("accountNumber"),
-            "dt_et": dt_et,
-            "fill_date": dt_et.strftime("%Y-%m-%d") if dt_et else None,
-            "fill_time": dt_et.strftime("%H:%M") if dt_et else None,
-            "strategy": strategy,
-            "strategy_type": o.get("complexOrderStrategyType", ""),
-            "order_type": order_type,
-            "price": o.get("price", 0),
-            "qty": int(o.get("filledQuantity", 0)),
-            "legs": parsed_legs,
-            "strikes": strikes,
-            "expiries": expiries,
-            "option_types": option_types,
-            "width": strikes[-1] - strikes[0] if len(strikes) >= 2 else 0,
-            "is_opening": any("OPEN" in i for i in instructions),
-            "is_closing": any("CLOSE" in i for i in instructions),
-            "signal": signal,
-        })
+        trades.append(_trade_record(
+            order_id=o.get("orderId"),
+            account=o.get("accountNumber"),
+            dt_et=dt_et,
+            strategy=classify_order(o),
+            strategy_type=o.get("complexOrderStrategyType", ""),
+            order_type=o.get("orderType", ""),
+            price=o.get("price", 0),
+            qty=int(o.get("filledQuantity", 0)),
+            legs=parsed_legs,
+        ))
 
     return trades
 
 
+def _trade_record(*, order_id, account, dt_et: datetime | None, strategy: str,
+                  strategy_type: str, order_type: str, price, qty: int,
+                  legs: list[dict]) -> dict:
+    strikes = sorted(set(l["strike"] for l in legs if l["strike"]))
+    expiries = sorted(set(l["expiry"] for l in legs if l["expiry"]))
+    option_types = sorted(set(l["option_type"] for l in legs if l["option_type"]))
+    instructions = set(l["instruction"] for l in legs)
+
+    return {
+        "order_id": order_id,
+        "account": account,
+        "dt_et": dt_et,
+        "fill_date": dt_et.strftime("%Y-%m-%d") if dt_et else None,
+        "fill_time": dt_et.strftime("%H:%M") if dt_et else None,
+        "strategy": strategy,
+        "strategy_type": strategy_type,
+        "order_type": order_type,
+        "price": price,
+        "qty": qty,
+        "legs": legs,
+        "strikes": strikes,
+        "expiries": expiries,
+        "option_types": option_types,
+        "width": strikes[-1] - strikes[0] if len(strikes) >= 2 else 0,
+        "is_opening": any("OPEN" in i for i in instructions),
+        "is_closing": any("CLOSE" in i for i in instructions),
+        "signal": "SHORT" if order_type == "NET_CREDIT" else "LONG",
+    }
+
+
 # ---------------------------------------------------------------------------
 # Settlement lookup
 # ---------------------------------------------------------------------------
 
-def _extract_spot_from_close5(data: dict) -> float | None:
-    """Extract SPX spot price from a close5.json payload."""
-    chain = data.get("chain", {})
-    for key in ("_underlying_price", "underlyingPrice"):
-        val = chain.get(key)
-        if isinstance(val, (int, float)) and val > 0:
-            return float(val)
-    return None
-
-
-def _extract_spot_from_features(data: dict) -> float | None:
-    """Extract SPX spot price from a close5_features.json payload."""
-    spot = data.get("spot")
-    if spot:
-        return float(spot)
-    return None
-
-
 def load_settlements() -> dict[str, float]:
-    """Load SPX settlement prices from sim cache (local + S3) and Leo signal rows.
+    """Load SPX settlement prices from the persisted settlement index.
 
-    Lookup chain:
+    Lookup chain (first source with a price wins):
       1. Local sim/cache/{date}/close5_features.json  (spot field)
       2. Local sim/cache/{date}/close5.json           (chain._underlying_price)
       3. S3 gamma-sim-cache/{date}/features_close5.json  (spot field)
       4. S3 gamma-sim-cache/{date}/close5.json           (chain._underlying_price)
       5. DuckDB strategy_signal_rows.forward              (Leo forward)
-    """
-    settlements: dict[str, float] = {}
-    repo_root = Path(__file__).resolve().parent.parent
-    cache_dir = repo_root / "sim" / "cache"
-
-    # 1. Scan local cache
-    if cache_dir.is_dir():
-        for date_dir in sorted(cache_dir.iterdir()):
-            if not date_dir.is_dir():
-                continue
-            d = date_dir.name
-
-            feat_path = date_dir / "close5_features.json"
-            if feat_path.exists():
-                try:
-                    with open(feat_path) as f:
-                        data = json.load(f)
-                    spot = _extract_spot_from_features(data)
-                    if spot:
-                        settlements[d] = spot
-                        continue
-                except Exception:
-                    pass
-
-            c5_path = date_dir / "close5.json"
-            if c5_path.exists():
-                try:
-                    with open(c5_path) as f:
-                        data = json.load(f)
-                    spot = _extract_spot_from_close5(data)
-                    if spot:
-                        settlements[d] = spot
-                except Exception:
-                    pass
-
-    # 2. Supplement from S3 (for Lambda where local cache doesn't exist)
-    try:
-        from sim.data.s3_cache import s3_get_json, s3_list_dates
-
-        s3_dates = s3_list_dates()
-        for d in s3_dates:
-            if d in settlements:
-                continue
 
-            # Try features_close5.json first (lighter payload)
-            feat_data = s3_get_json(d, "features_close5.json")
-            if feat_data:
-                spot = _extract_spot_from_features(feat_data)
-                if spot:
-                    settlements[d] = spot
-                    continue
-
-            # Fall back to close5.json
-            c5_data = s3_get_json(d, "close5.json")
-            if c5_data:
-                spot = _extract_spot_from_close5(c5_data)
-                if spot:
-                    settlements[d] = spot
-    except Exception:
-        pass  # S3 not available (local dev without AWS creds)
+    The index (reporting/settlement_index.py) is refreshed incrementally, so
+    only dates not seen before are read from disk or fetched from S3.
+    """
+    from reporting.settlement_index import SettlementIndex
 
-    # 3. Supplement from DuckDB Leo signal rows
+    idx = SettlementIndex.load(s3=True)
+    con = None
     try:
-        from reporting.db import get_connection, query_df
+        from reporting.db import get_connection
         con = get_connection()
-        df = query_df(
-            "SELECT expiry_date, forward FROM strategy_signal_rows WHERE forward IS NOT NULL",
-            con=con,
-        )
-        if not df.empty:
-            for _, row in df.iterrows():
-                exp = str(row["expiry_date"])[:10]
-                if exp not in settlements and row["forward"]:
-                    settlements[exp] = float(row["forward"])
     except Exception:
         pass
 
-    return settlements
+    stats = idx.refresh(con)
+    if stats["added"] and con is not None:
+        try:
+            idx.sync_table(con)
+        except Exception:
+            pass  # schema not initialized on this connection
+    idx.save(s3=stats["s3_listed"] > 0)
+    return idx.settlements()
 
 
 # ---------------------------------------------------------------------------
@@ -576,21 +518,74 @@ def load_orders_from_file(path: str | Path) -> list[dict]:
         return json.load(f)
 
 
-def load_orders_from_db() -> list[dict]:
-    """Load raw Schwab orders from DuckDB broker_raw_orders table."""
-    try:
-        from reporting.db import get_connection, query_df
+def load_trades_from_db(con=None) -> list[dict]:
+    """Load filled Schwab orders from the typed broker_orders tables.
+
+    Returns trade records shaped like parse_filled_orders(), built with SQL
+    over broker_orders / broker_order_legs instead of re-parsing raw JSON.
+    Read-only: the broker syncs and the pipeline's normalize step keep the
+    typed tables current.
+    """
+    import duckdb
+
+    from reporting.db import get_connection
+
+    if con is None:
         con = get_connection()
-        df = query_df(
-            "SELECT raw_payload FROM broker_raw_orders ORDER BY as_of DESC",
-            con=con,
-        )
-        if df.empty:
-            return []
-        return [json.loads(row["raw_payload"]) for _, row in df.iterrows()]
-    except Exception:
+    try:
+        orders = con.execute(
+            """SELECT account, order_id, account_number, tag, strategy_type,
+                      order_type, price, filled_qty, coalesce(closed_at, entered_at)
+               FROM broker_orders
+               WHERE broker = 'schwab' AND status = 'FILLED'
+               ORDER BY coalesce(closed_at, entered_at)"""
+        ).fetchall()
+        leg_rows = con.execute(
+            """SELECT l.account, l.order_id, l.instruction, l.qty,
+                      CASE WHEN l.underlying IN ('SPX', 'SPXW')
+                           THEN CAST(l.expiry AS VARCHAR) END,
+                      CASE WHEN l.underlying IN ('SPX', 'SPXW') THEN l.option_type END,
+                      CASE WHEN l.underlying IN ('SPX', 'SPXW') THEN l.strike END
+               FROM broker_order_legs l
+               JOIN broker_orders o USING (account, order_id)
+               WHERE o.broker = 'schwab' AND o.status = 'FILLED'
+               ORDER BY l.account, l.order_id, l.leg_index"""
+        ).fetchall()
+    except duckdb.Error as e:
+        print(f"  [warn] broker_orders unreadable, no trades from DB: {e}")
         return []
 
+    legs: dict[tuple, list[dict]] = defaultdict(list)
+    for account, order_id, instruction, qty, expiry, option_type, strike in leg_rows:
+        legs[(account, order_id)].append({
+            "instruction": instruction or "",
+            "qty": qty if qty is not None else 0,
+            "expiry": expiry,
+            "option_type": option_type,
+            "strike": strike,
+        })
+
+    trades = []
+    for (account, order_id, account_number, tag, ctype, order_type,
+         price, filled_qty, fill_at) in orders:
+        parsed_legs = legs.get((account, order_id))
+        if not parsed_legs:
+            continue
+        dt_et = fill_at.replace(tzinfo=timezone.utc).astimezone(ET) if fill_at else None
+        strikes = {l["strike"] for l in parsed_legs if l["strike"]}
+        trades.append(_trade_record(
+            order_id=order_id,
+            account=account_number,
+            dt_et=dt_et,
+            strategy=_classify(tag == API_TAG, ctype or "", strikes, dt_et),
+            strategy_type=ctype or "",
+            order_type=order_type or "",
+            price=price if price is not None else 0,
+            qty=int(filled_qty or 0),
+            legs=parsed_legs,
+        ))
+    return trades
+
 
 def load_orders_from_schwab(lookback_days: int = 30, max_retries: int = 3) -> list[dict]:
     """Pull orders directly from Schwab API (with retry on timeout)."""
@@ -664,38 +659,39 @@ def main():
     args = parser.parse_args()
 
     # Load orders
-    raw_orders = []
+    trades = []
     if args.source == "file" or args.file:
         path = args.file or "/tmp/schwab_orders_raw.json"
         raw_orders = load_orders_from_file(path)
         print(f"[source] Loaded {len(raw_orders)} orders from {path}")
+        trades = parse_filled_orders(raw_orders)
     elif args.source == "db":
-        raw_orders = load_orders_from_db()
-        print(f"[source] Loaded {len(raw_orders)} orders from DuckDB")
+        trades = load_trades_from_db()
+        print(f"[source] Loaded {len(trades)} filled orders from DuckDB")
     elif args.source == "api":
         raw_orders = load_orders_from_schwab()
         print(f"[source] Loaded {len(raw_orders)} orders from Schwab API")
+        trades = parse_filled_orders(raw_orders)
     else:
         # Auto: try file first, then DB, then API
         for loader, label in [
-            (lambda: load_orders_from_file("/tmp/schwab_orders_raw.json"), "file"),
-            (load_orders_from_db, "db"),
-            (load_orders_from_schwab, "api"),
+            (lambda: parse_filled_orders(load_orders_from_file("/tmp/schwab_orders_raw.json")), "file"),
+            (load_trades_from_db, "db"),
+            (lambda: parse_filled_orders(load_orders_from_schwab()), "api"),
         ]:
             try:
-                raw_orders = loader()
-                if raw_orders:
-                    print(f"[source] {label}: {len(raw_orders)} orders")
+                trades = loader()
+                if trades:
+                    print(f"[source] {label}: {len(trades)} filled orders")
                     break
             except Exception:
                 continue
 
-    if not raw_orders:
+    if not trades:
         print("No orders found. Run with --source api to pull from Schwab.")
         return
 
     # Process
-    trades = parse_filled_orders(raw_orders)
     settlements = load_settlements()
     positions = build_positions(trades, settlements)
 
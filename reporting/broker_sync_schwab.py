@@ -22,6 +22,7 @@ from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+from reporting.broker_orders import normalize_broker_orders
 from reporting.db import execute, get_connection, init_schema, query_df, query_one
 
 
@@ -353,11 +354,14 @@ def sync_schwab(
     con=None,
     as_of_date: date | None = None,
     lookback_days: int = 7,
+    normalize: bool = True,
 ) -> dict:
     """Run full Schwab broker sync.
 
     Fetches orders (last N days), current positions, and balances.
-    Stores raw payloads and materializes account snapshots.
+    Stores raw payloads and materializes account snapshots. ``normalize``
+    refreshes broker_orders / broker_order_legs after the order fetch;
+    run_pipeline turns it off and normalizes once after every broker.
 
     Returns aggregate stats.
     """
@@ -388,6 +392,13 @@ def sync_schwab(
             stats["orders"] = {"error": str(e)}
             _update_freshness(con, "schwab_orders", False, str(e))
 
+        # Typed broker_orders / broker_order_legs for downstream reports
+        if normalize:
+            try:
+                stats["normalized"] = normalize_broker_orders(con)
+            except Exception as e:
+                stats["normalized"] = {"error": str(e)}
+
         # Positions
         try:
             stats["positions"] = _sync_positions(c, acct_hash, con)
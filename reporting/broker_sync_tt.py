@@ -26,6 +26,7 @@ from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+from reporting.broker_orders import normalize_broker_orders
 from reporting.db import execute, get_connection, init_schema, query_df, query_one
 
 
@@ -377,11 +378,13 @@ def sync_tt(
     as_of_date: date | None = None,
     lookback_days: int = 7,
     accounts: dict[str, str] | None = None,
+    normalize: bool = True,
 ) -> dict:
     """Run full TastyTrade broker sync for all accounts.
 
     Fetches orders (last N days), transactions, current positions, and balances.
-    Stores raw payloads and materializes account snapshots.
+    Stores raw payloads and materializes account snapshots. ``normalize``
+    refreshes broker_orders / broker_order_legs after each account's orders.
 
     Returns aggregate stats keyed by account label.
     """
@@ -421,6 +424,13 @@ def sync_tt(
             stats["orders"] = {"error": str(e)}
             _update_freshness(con, f"{label}_orders", False, str(e))
 
+        # Typed broker_orders / broker_order_legs for downstream reports
+        if normalize:
+            try:
+                stats["normalized"] = normalize_broker_orders(con)
+            except Exception as e:
+                stats["normalized"] = {"error": str(e)}
+
         # Transactions
         try:
             stats["transactions"] = _sync_transactions(acct_num, label, tt_request, con, since_date)
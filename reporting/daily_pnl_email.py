@@ -40,6 +40,16 @@ from reporting.broker_pnl import (
     parse_filled_orders,
     parse_osi,
 )
+from reporting.pnl_mart import (
+    PORTFOLIO,
+    SOURCE_BROKER,
+    PnlMart,
+    broker_position_records,
+    load_mart_mirror,
+    mart_as_of,
+    refresh_pnl_mart,
+    save_mart_mirror,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -66,31 +76,11 @@ def _fmt_avg(total: float, trades: int) -> str:
     return _fmt(avg)
 
 
-def _settle_date(position: dict) -> date | None:
-    if position["exit_method"] == "CLOSED_EARLY" and position.get("close_date"):
-        return date.fromisoformat(position["close_date"])
-    if position["exit_method"] == "EXPIRED" and position.get("expiry"):
-        return date.fromisoformat(position["expiry"])
-    return None
-
-
-def _settled_positions(positions: list[dict]) -> list[dict]:
-    return [p for p in positions if p["exit_method"] in ("EXPIRED", "CLOSED_EARLY")]
-
-
-def _window_positions(positions: list[dict], start: date, end: date) -> list[dict]:
-    out = []
-    for p in positions:
-        settled = _settle_date(p)
-        if settled is not None and start <= settled <= end:
-            out.append(p)
-    return out
-
-
-def _stats(positions: list[dict]) -> dict[str, Any]:
-    trades = len(positions)
-    pnl = float(sum(p["pnl"] or 0 for p in positions))
-    wins = sum(1 for p in positions if (p["pnl"] or 0) > 0)
+def _stats(window: dict) -> dict[str, Any]:
+    """Display stats for a PnlMart window ({trades, wins, pnl})."""
+    trades = window["trades"]
+    pnl = float(window["pnl"])
+    wins = window["wins"]
     return {
         "trades": trades,
         "wins": wins,
@@ -100,58 +90,6 @@ def _stats(positions: list[dict]) -> dict[str, Any]:
     }
 
 
-def _sorted_settled(positions: list[dict]) -> list[dict]:
-    return sorted(
-        _settled_positions(positions),
-        key=lambda p: (
-            _settle_date(p) or date.min,
-            p.get("fill_date") or "",
-            p.get("strategy") or "",
-        ),
-    )
-
-
-def _current_streak(positions: list[dict]) -> str:
-    streak = 0
-    direction = None
-    for p in reversed(_sorted_settled(positions)):
-        pnl = float(p["pnl"] or 0)
-        if pnl == 0:
-            continue
-        sign = "W" if pnl > 0 else "L"
-        if direction is None:
-            direction = sign
-            streak = 1
-            continue
-        if sign == direction:
-            streak += 1
-        else:
-            break
-    if direction is None:
-        return "—"
-    return f"{direction}{streak}"
-
-
-def _drawdown_stats(positions: list[dict], start: date, end: date) -> tuple[float, float]:
-    """Return (current_drawdown, max_drawdown) for realized P&L in the window."""
-    daily = defaultdict(float)
-    for p in _window_positions(positions, start, end):
-        settled = _settle_date(p)
-        if settled is not None:
-            daily[settled] += float(p["pnl"] or 0)
-
-    equity = 0.0
-    peak = 0.0
-    max_dd = 0.0
-    for day in sorted(daily):
-        equity += daily[day]
-        peak = max(peak, equity)
-        dd = peak - equity
-        max_dd = max(max_dd, dd)
-    current_dd = max(peak - equity, 0.0)
-    return current_dd, max_dd
-
-
 def _first_of_month(report_date: date) -> date:
     return report_date.replace(day=1)
 
@@ -670,7 +608,17 @@ def _load_spx_spot(for_date: date | None = None) -> float | None:
 
     If for_date is today or None, uses the live quote API.
     If for_date is a past date, uses price history to get that day's close.
+    Past closes are kept in the settlement index, so a date is fetched once.
     """
+    from reporting.settlement_index import SCHWAB_SOURCE, SettlementIndex
+
+    idx = SettlementIndex.load()
+    today_str = date.today().isoformat()
+    if for_date and for_date.isoformat() < today_str:
+        cached = idx.price(for_date, sources=(SCHWAB_SOURCE,))
+        if cached is not None:
+            return cached
+
     try:
         repo_root = Path(__file__).resolve().parent.parent
         scripts_dir = repo_root / "scripts"
@@ -699,6 +647,8 @@ def _load_spx_spot(for_date: date | None = None) -> float | None:
                 ts = candle.get("datetime", 0)
                 dt = datetime.fromtimestamp(ts / 1000)
                 closes[dt.strftime("%Y-%m-%d")] = candle["close"]
+            idx.record(SCHWAB_SOURCE, {d: p for d, p in closes.items() if d < today_str})
+            idx.save()
 
             # If specific date requested, return that date's close
             if for_date:
@@ -1029,56 +979,170 @@ EMAIL_GROUPS = (
 )
 
 
-def _build_email(
-    positions: list[dict],
-    report_date: date,
-    today_trades_section: str = "",
-    discretionary_section: str = "",
-    discretionary_pnl: float = 0.0,
-) -> tuple[str, str]:
-    """Build the portfolio-health email.
+# Positions come from the Schwab order history only
+EMAIL_ACCOUNT = "schwab"
 
-    Returns (subject, body).
+# Settled positions are complete for settlement days at least this far
+# inside the order lookback (longest hold of the automated strategies)
+MART_MAX_HOLD_DAYS = 14
+
+# Shortest order lookback once the mart holds the history (covers the
+# open positions the email lists)
+MART_MIN_LOOKBACK_DAYS = 30
+
+
+def _mart_books() -> dict[str, tuple[str, ...] | None]:
+    books: dict[str, tuple[str, ...] | None] = {
+        group["key"]: group["members"] for group in EMAIL_GROUPS
+    }
+    books[PORTFOLIO] = None
+    return books
+
+
+def _mart_mirrored() -> bool:
+    """Mirror the mart to S3 (set where the store is ephemeral, e.g. Lambda /tmp)."""
+    return os.environ.get("PNL_MART_S3", "").strip().lower() in ("1", "true", "yes")
+
+
+def _open_mart():
+    """Persisted mart connection, seeded from the S3 mirror when enabled.
+
+    Returns None if the store is unavailable.
     """
-    as_of_str = report_date.isoformat()
-    settled = _settled_positions(positions)
+    try:
+        from reporting.db import get_connection, init_schema
+
+        con = get_connection()
+        init_schema(con)
+        if _mart_mirrored():
+            loaded = load_mart_mirror(con, SOURCE_BROKER)
+            print(f"[daily_pnl] P&L mart: {loaded} rows from S3 mirror")
+        return con
+    except Exception as e:
+        print(f"[daily_pnl] P&L mart unavailable, using positions: {e}")
+        return None
+
+
+def _order_lookback(con, report_date: date, lookback_days: int) -> int:
+    """Shortest order lookback that still rewrites every day the mart may lack.
+
+    Settlement days after the last refresh must be rebuilt, which needs
+    orders from MART_MAX_HOLD_DAYS before the refresh on (plus a day for
+    the UTC refresh timestamp). Never shorter
+    than MART_MIN_LOOKBACK_DAYS (open positions) nor longer than
+    ``lookback_days`` (the full rebuild window used with an empty mart).
+    """
+    as_of = mart_as_of(con, SOURCE_BROKER)
+    if as_of is None:
+        return lookback_days
+    needed = (report_date - as_of).days + MART_MAX_HOLD_DAYS + 1
+    return min(lookback_days, max(MART_MIN_LOOKBACK_DAYS, needed))
+
+
+def _refresh_mart(con, positions: list[dict], report_date: date,
+                  lookback_days: int) -> PnlMart | None:
+    """Fold today's positions into the persisted P&L mart and load the windows.
+
+    Settlement days from MART_MAX_HOLD_DAYS past the lookback start on are
+    rewritten from ``positions``; earlier days keep their stored rows, so
+    YTD reaches back past the order lookback. The refreshed rows are
+    mirrored back to S3 when enabled. Loads only the rows the email
+    windows need. Returns None if the store is unavailable.
+    """
+    try:
+        since = report_date - timedelta(days=max(lookback_days - MART_MAX_HOLD_DAYS, 0))
+        refresh_pnl_mart(
+            con, SOURCE_BROKER,
+            broker_position_records(positions, EMAIL_ACCOUNT),
+            _mart_books(), since=since,
+        )
+        if _mart_mirrored():
+            save_mart_mirror(con, SOURCE_BROKER)
+        start = min(_first_of_year(report_date), _recent_business_days(report_date)[0])
+        return PnlMart.load(con, SOURCE_BROKER, start, report_date)
+    except Exception as e:
+        print(f"[daily_pnl] P&L mart unavailable, using positions: {e}")
+        return None
+
+
+def _health_metrics(positions: list[dict], report_date: date, mart: PnlMart | None) -> dict:
+    """Window, strategy, drawdown and streak figures shared by both email bodies."""
+    if mart is None:
+        mart = PnlMart.from_records(
+            broker_position_records(positions, EMAIL_ACCOUNT), _mart_books(),
+        )
+    acct = EMAIL_ACCOUNT
     recent_days = _recent_business_days(report_date, count=5)
-    five_day_start = recent_days[0]
-    five_day_end = recent_days[-1]
-    five_day_positions = _window_positions(settled, five_day_start, five_day_end)
-    mtd_positions = _window_positions(settled, _first_of_month(report_date), report_date)
-    ytd_positions = _window_positions(settled, _first_of_year(report_date), report_date)
-
-    today_positions = _window_positions(settled, report_date, report_date)
-    today_stats = _stats(today_positions)
-    five_day_stats = _stats(five_day_positions)
-    mtd_stats = _stats(mtd_positions)
-    ytd_stats = _stats(ytd_positions)
+    month_start = _first_of_month(report_date)
+    year_start = _first_of_year(report_date)
+
+    def window(book: str, start: date, end: date = report_date) -> dict:
+        return mart.window(book, acct, start, end)
 
     strat_rows = []
     for group in EMAIL_GROUPS:
-        members = set(group["members"])
-        strat_all = [p for p in settled if p["strategy"] in members]
-        strat_ytd = [p for p in ytd_positions if p["strategy"] in members]
-        strat_mtd = [p for p in mtd_positions if p["strategy"] in members]
-        strat_5d = [p for p in five_day_positions if p["strategy"] in members]
-        if not strat_ytd and not strat_mtd and not strat_5d:
+        key = group["key"]
+        five_day, mtd, ytd = (
+            window(key, recent_days[0], recent_days[-1]),
+            window(key, month_start),
+            window(key, year_start),
+        )
+        if not (ytd["trades"] or mtd["trades"] or five_day["trades"]):
             continue
-        ytd_stats_strat = _stats(strat_ytd)
+        ytd_stats_strat = _stats(ytd)
         strat_rows.append({
             "label": group["label"],
-            "five_day_pnl": float(sum(p["pnl"] or 0 for p in strat_5d)),
-            "mtd_pnl": float(sum(p["pnl"] or 0 for p in strat_mtd)),
-            "ytd_pnl": float(sum(p["pnl"] or 0 for p in strat_ytd)),
+            "five_day_pnl": float(five_day["pnl"]),
+            "mtd_pnl": float(mtd["pnl"]),
+            "ytd_pnl": float(ytd["pnl"]),
             "trades_ytd": ytd_stats_strat["trades"],
             "wr_ytd": ytd_stats_strat["win_rate"],
-            "streak": _current_streak(strat_all),
+            "streak": mart.streak(key, acct, report_date),
         })
     strat_rows.sort(key=lambda r: r["ytd_pnl"], reverse=True)
 
-    current_dd_ytd, max_dd_ytd = _drawdown_stats(settled, _first_of_year(report_date), report_date)
-    current_dd_mtd, max_dd_mtd = _drawdown_stats(settled, _first_of_month(report_date), report_date)
-    portfolio_streak = _current_streak(settled)
+    return {
+        "today": _stats(window(PORTFOLIO, report_date)),
+        "five_day": _stats(window(PORTFOLIO, recent_days[0], recent_days[-1])),
+        "mtd": _stats(window(PORTFOLIO, month_start)),
+        "ytd": _stats(window(PORTFOLIO, year_start)),
+        "strat_rows": strat_rows,
+        "dd_mtd": mart.drawdown(PORTFOLIO, acct, "mtd", report_date),
+        "dd_ytd": mart.drawdown(PORTFOLIO, acct, "ytd", report_date),
+        "streak": mart.streak(PORTFOLIO, acct, report_date),
+        "recent_days": recent_days,
+        "recent_map": {
+            (day, group["key"]): mart.day(group["key"], acct, day)
+            for day in recent_days for group in EMAIL_GROUPS
+        },
+    }
+
+
+def _build_email(
+    positions: list[dict],
+    report_date: date,
+    today_trades_section: str = "",
+    discretionary_section: str = "",
+    discretionary_pnl: float = 0.0,
+    mart: PnlMart | None = None,
+) -> tuple[str, str]:
+    """Build the portfolio-health email.
+
+    Window stats come from ``mart`` (built from ``positions`` if not given).
+    Returns (subject, body).
+    """
+    as_of_str = report_date.isoformat()
+    m = _health_metrics(positions, report_date, mart)
+    today_stats = m["today"]
+    five_day_stats = m["five_day"]
+    mtd_stats = m["mtd"]
+    ytd_stats = m["ytd"]
+    strat_rows = m["strat_rows"]
+    current_dd_ytd, max_dd_ytd = m["dd_ytd"]
+    current_dd_mtd, max_dd_mtd = m["dd_mtd"]
+    portfolio_streak = m["streak"]
+    recent_days = m["recent_days"]
+    recent_map = m["recent_map"]
 
     today_combined = today_stats['pnl'] + discretionary_pnl
     subject = (
@@ -1086,15 +1150,6 @@ def _build_email(
         f"MTD {_fmt(mtd_stats['pnl'])} | YTD {_fmt(ytd_stats['pnl'])} — {as_of_str}"
     )
 
-    recent_map: dict[tuple[date, str], float] = defaultdict(float)
-    for p in settled:
-        settled_day = _settle_date(p)
-        if settled_day in recent_days:
-            for group in EMAIL_GROUPS:
-                if p["strategy"] in group["members"]:
-                    recent_map[(settled_day, group["key"])] += float(p["pnl"] or 0)
-                    break
-
     lines = [
         f"Gamma Portfolio Pulse — {as_of_str}",
         f"{'=' * 50}",
@@ -1181,9 +1236,7 @@ def _build_email(
         lines.append(discretionary_section)
 
         # Combined bottom line
-        today_auto = sum(
-            float(p["pnl"] or 0) for p in _window_positions(settled, report_date, report_date)
-        )
+        today_auto = today_stats["pnl"]
         combined = today_auto + discretionary_pnl
         lines.append("Combined (Auto + Discretionary)")
         lines.append(f"  Today auto:         {_fmt(today_auto)}")
@@ -1256,20 +1309,16 @@ def _build_email_html(
     today_trades_data: dict,
     discretionary_section_data: dict | None = None,
     discretionary_pnl: float = 0.0,
+    mart: PnlMart | None = None,
 ) -> str:
     """Build the HTML email body."""
-    settled = _settled_positions(positions)
-    recent_days = _recent_business_days(report_date, count=5)
-    five_day_start = recent_days[0]
-    five_day_end = recent_days[-1]
-    five_day_positions = _window_positions(settled, five_day_start, five_day_end)
-    mtd_positions = _window_positions(settled, _first_of_month(report_date), report_date)
-    ytd_positions = _window_positions(settled, _first_of_year(report_date), report_date)
-    today_positions = _window_positions(settled, report_date, report_date)
-    today_stats = _stats(today_positions)
-    five_day_stats = _stats(five_day_positions)
-    mtd_stats = _stats(mtd_positions)
-    ytd_stats = _stats(ytd_positions)
+    m = _health_metrics(positions, report_date, mart)
+    today_stats = m["today"]
+    five_day_stats = m["five_day"]
+    mtd_stats = m["mtd"]
+    ytd_stats = m["ytd"]
+    recent_days = m["recent_days"]
+    recent_map = m["recent_map"]
 
     # --- KPI cards ---
     def _kpi_card(label: str, stats: dict) -> str:
@@ -1320,15 +1369,6 @@ def _build_email_html(
     ) if trades_rows else '<p class="muted">No automated trades today.</p>'
 
     # --- Last 5 Sessions ---
-    recent_map: dict[tuple[date, str], float] = defaultdict(float)
-    for p in settled:
-        settled_day = _settle_date(p)
-        if settled_day in recent_days:
-            for group in EMAIL_GROUPS:
-                if p["strategy"] in group["members"]:
-                    recent_map[(settled_day, group["key"])] += float(p["pnl"] or 0)
-                    break
-
     session_rows = ""
     for day in recent_days:
         cs = recent_map[(day, "constantstable")]
@@ -1350,26 +1390,7 @@ def _build_email_html(
     )
 
     # --- Strategy Contribution ---
-    strat_rows_data = []
-    for group in EMAIL_GROUPS:
-        members = set(group["members"])
-        strat_ytd = [p for p in ytd_positions if p["strategy"] in members]
-        strat_mtd = [p for p in mtd_positions if p["strategy"] in members]
-        strat_5d = [p for p in five_day_positions if p["strategy"] in members]
-        strat_all = [p for p in settled if p["strategy"] in members]
-        if not strat_ytd and not strat_mtd and not strat_5d:
-            continue
-        ytd_s = _stats(strat_ytd)
-        strat_rows_data.append({
-            "label": group["label"],
-            "five_day_pnl": float(sum(p["pnl"] or 0 for p in strat_5d)),
-            "mtd_pnl": float(sum(p["pnl"] or 0 for p in strat_mtd)),
-            "ytd_pnl": float(sum(p["pnl"] or 0 for p in strat_ytd)),
-            "trades_ytd": ytd_s["trades"],
-            "wr_ytd": ytd_s["win_rate"],
-            "streak": _current_streak(strat_all),
-        })
-    strat_rows_data.sort(key=lambda r: r["ytd_pnl"], reverse=True)
+    strat_rows_data = m["strat_rows"]
 
     strat_rows_html = ""
     for r in strat_rows_data:
@@ -1391,9 +1412,9 @@ def _build_email_html(
     )
 
     # --- Risk State ---
-    current_dd_ytd, max_dd_ytd = _drawdown_stats(settled, _first_of_year(report_date), report_date)
-    current_dd_mtd, max_dd_mtd = _drawdown_stats(settled, _first_of_month(report_date), report_date)
-    portfolio_streak = _current_streak(settled)
+    current_dd_ytd, max_dd_ytd = m["dd_ytd"]
+    current_dd_mtd, max_dd_mtd = m["dd_mtd"]
+    portfolio_streak = m["streak"]
 
     risk_html = (
         f'<table style="font-size:13px;">'
@@ -1434,9 +1455,7 @@ def _build_email_html(
     # --- Combined bottom line ---
     combined_html = ""
     if disc_html:
-        today_auto = sum(
-            float(p["pnl"] or 0) for p in _window_positions(settled, report_date, report_date)
-        )
+        today_auto = today_stats["pnl"]
         combined = today_auto + discretionary_pnl
         combined_html = (
             f'<div class="section">'
@@ -1760,6 +1779,15 @@ def run_daily_pnl_email(
     """Full pipeline: load orders → classify → compute P&L → send email."""
     report_date = report_date or datetime.now(ET).date()
 
+    # Window stats: persisted mart for live runs (orders are then only
+    # fetched back far enough to rebuild what the mart lacks); backdated
+    # or file runs compute them from these positions alone
+    mart_con = None
+    if not orders_file and report_date == datetime.now(ET).date():
+        mart_con = _open_mart()
+        if mart_con is not None:
+            lookback_days = _order_lookback(mart_con, report_date, lookback_days)
+
     # Load orders
     if orders_file:
         raw_orders = load_orders_from_file(orders_file)
@@ -1789,6 +1817,10 @@ def run_daily_pnl_email(
           f"({sum(1 for p in auto if p['exit_method'] in ('EXPIRED','CLOSED_EARLY'))} settled, "
           f"{sum(1 for p in auto if p['exit_method'] == 'OPEN')} open)")
 
+    mart = None
+    if mart_con is not None:
+        mart = _refresh_mart(mart_con, auto, report_date, lookback_days)
+
     # Today's trade summary (Schwab + TT)
     tt_orders: list[dict] = []
     try:
@@ -1826,6 +1858,7 @@ def run_daily_pnl_email(
         today_trades_section=today_trades_section,
         discretionary_section=disc_section,
         discretionary_pnl=disc_pnl,
+        mart=mart,
     )
 
     # Build HTML email
@@ -1834,6 +1867,7 @@ def run_daily_pnl_email(
         today_trades_data=today_trades_data,
         discretionary_section_data=disc_result_data,
         discretionary_pnl=disc_pnl,
+        mart=mart,
     )
 
     result = _send_email(subject, body, dry_run=dry_run, html_body=html_body)
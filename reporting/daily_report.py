@@ -270,6 +270,44 @@ def _section_strategy_daily(con, report_date: str) -> str:
     return "\n".join(lines) + "\n"
 
 
+def _section_realized_pnl(con, report_date: str) -> str:
+    """Today / MTD / YTD realized P&L, drawdown and streak from the P&L mart."""
+    df = query_df(
+        """SELECT book, account,
+                  CASE WHEN settle_date = CAST(? AS DATE) THEN pnl ELSE 0 END AS today,
+                  CASE WHEN date_trunc('month', settle_date) = date_trunc('month', CAST(? AS DATE))
+                       THEN mtd_equity ELSE 0 END AS mtd,
+                  CASE WHEN year(settle_date) = year(CAST(? AS DATE))
+                       THEN ytd_equity ELSE 0 END AS ytd,
+                  equity, drawdown, max_drawdown, streak
+           FROM pnl_daily_mart
+           WHERE source = 'positions' AND settle_date <= ?
+           QUALIFY row_number() OVER (
+               PARTITION BY book, account ORDER BY settle_date DESC) = 1
+           ORDER BY book = 'portfolio', book, account""",
+        [report_date] * 4, con=con,
+    )
+
+    if df.empty:
+        return "## Realized P&L\nNo realized P&L yet.\n"
+
+    lines = ["## Realized P&L\n"]
+    lines.append("| Book | Account | Today | MTD | YTD | Total | Drawdown | Max DD | Streak |")
+    lines.append("|------|---------|------:|----:|----:|------:|---------:|-------:|-------:|")
+
+    for _, r in df.iterrows():
+        streak = int(r["streak"])
+        streak_str = f"W{streak}" if streak > 0 else f"L{-streak}" if streak < 0 else "—"
+        lines.append(
+            f"| {r['book']} | {r['account']} "
+            f"| ${float(r['today']):+,.0f} | ${float(r['mtd']):+,.0f} | ${float(r['ytd']):+,.0f} "
+            f"| ${float(r['equity']):+,.0f} | ${-float(r['drawdown']):+,.0f} "
+            f"| ${-float(r['max_drawdown']):+,.0f} | {streak_str} |"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
 def _section_recon_issues(con) -> str:
     """Unresolved reconciliation issues with classification breakdown."""
     df = query_df(
@@ -431,6 +469,7 @@ def generate_report(
             _section_open_positions(con),
             _section_account_snapshot(con, date_str),
             _section_strategy_daily(con, date_str),
+            _section_realized_pnl(con, date_str),
         ]
 
     report = "\n".join(sections)
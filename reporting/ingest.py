@@ -4,6 +4,17 @@ Reads JSONL files from the event directory, deduplicates by idempotency_key,
 and materializes into normalized tables (strategy_runs, intended_trades,
 order_events, fills).
 
+ingest_all_pending consults the ingest_ledger table: files whose size is
+unchanged since the last run are skipped and grown files are read from
+the last ingested byte offset, so a daily run costs the new bytes only.
+It does not sync S3 itself — run_pipeline syncs the whole window once.
+
+Files are ingested in bulk: every JSONL file is loaded into a DuckDB
+staging table with read_json, anti-joined against raw_events on
+idempotency_key, and each materializer runs once as a set-based
+INSERT ... SELECT / UPDATE ... FROM over the new events. The per-event
+materializers (_MATERIALIZERS) remain for backfill's synthesized events.
+
 Usage:
     from reporting.ingest import ingest_events
 
@@ -16,13 +27,13 @@ Usage:
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import tempfile
 from datetime import date, datetime
 from pathlib import Path
 
-import boto3
-
 from reporting.db import execute, get_connection, init_schema, query_one
 
 
@@ -55,6 +66,9 @@ def sync_events_from_s3(
     Objects are expected under:
       s3://<bucket>/<prefix>/YYYY-MM-DD/*.jsonl
 
+    The whole window is one listing; new or changed objects (ETag/size
+    manifest, sim.data.s3_transfer) are downloaded in parallel.
+
     Returns aggregate stats. Missing bucket/prefix or auth issues are non-fatal.
     """
     if isinstance(start_date, date):
@@ -70,54 +84,44 @@ def sync_events_from_s3(
         end = date.fromisoformat(end_date)
 
     bucket = _event_bucket()
-    if not bucket:
-        return {
-            "dates": 0,
-            "objects": 0,
-            "downloaded": 0,
-            "skipped": 0,
-            "errors": 0,
-            "bucket": "",
-        }
-
-    s3 = boto3.client("s3")
-    paginator = s3.get_paginator("list_objects_v2")
-    base_dir = _event_dir()
-    prefix_root = _event_prefix()
-
     stats = {
-        "dates": 0,
+        "dates": (end - start).days + 1,
         "objects": 0,
         "downloaded": 0,
         "skipped": 0,
         "errors": 0,
         "bucket": bucket,
     }
+    if not bucket:
+        stats["dates"] = 0
+        return stats
 
-    cur = start
-    while cur <= end:
-        day = cur.isoformat()
-        stats["dates"] += 1
-        prefix = f"{prefix_root}/{day}/"
-        try:
-            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                for obj in page.get("Contents", []):
-                    key = obj.get("Key", "")
-                    if not key.endswith(".jsonl"):
-                        continue
-                    stats["objects"] += 1
-                    local_path = base_dir / day / Path(key).name
-                    local_path.parent.mkdir(parents=True, exist_ok=True)
-                    size = int(obj.get("Size") or 0)
-                    if local_path.exists() and local_path.stat().st_size == size:
-                        stats["skipped"] += 1
-                        continue
-                    s3.download_file(bucket, key, str(local_path))
-                    stats["downloaded"] += 1
-        except Exception:
-            stats["errors"] += 1
-        cur = cur.fromordinal(cur.toordinal() + 1)
+    from sim.data.s3_transfer import sync_down
+
+    base_dir = _event_dir()
+    prefix_root = _event_prefix()
 
+    def local_path_for(key: str) -> Path | None:
+        day = key[len(prefix_root) + 1:].split("/", 1)[0]
+        if not key.endswith(".jsonl") or len(day) != 10:
+            return None
+        return base_dir / day / Path(key).name
+
+    # One listing for the whole window; "0" sorts right after "/"
+    try:
+        synced = sync_down(
+            bucket, base_dir,
+            prefix=f"{prefix_root}/",
+            start_after=f"{prefix_root}/{start.isoformat()}",
+            end_before=f"{prefix_root}/{end.isoformat()}0",
+            local_path_for=local_path_for,
+        )
+    except Exception:
+        stats["errors"] += 1
+        return stats
+
+    for key in ("objects", "downloaded", "skipped", "errors"):
+        stats[key] = synced[key]
     return stats
 
 
@@ -388,7 +392,287 @@ def _materialize_post_step(con, ev: dict) -> None:
     )
 
 
-# Dispatch table
+# ---------------------------------------------------------------------------
+# Bulk ingest (set-based)
+# ---------------------------------------------------------------------------
+
+_STAGING_COLUMNS = {
+    "event_id": "VARCHAR",
+    "event_type": "VARCHAR",
+    "ts_utc": "VARCHAR",
+    "strategy": "VARCHAR",
+    "account": "VARCHAR",
+    "trade_group_id": "VARCHAR",
+    "run_id": "VARCHAR",
+    "config_version": "VARCHAR",
+    "payload": "JSON",
+    "idempotency_key": "VARCHAR",
+}
+
+# Set-based materializers, run in this order over the _ingest_new view
+# (new events only, one row per idempotency_key, ordered by seq).
+_BULK_MATERIALIZE_SQL = [
+    # strategy_run → strategy_runs (first event per run_id wins)
+    """INSERT INTO strategy_runs
+       (run_id, strategy, account, trade_date, config_version,
+        signal, config, reason, spot, vix, vix1d, filters,
+        status, started_at)
+       SELECT run_id, strategy, account,
+              (payload->>'$.trade_date')::DATE, config_version,
+              payload->>'$.signal', payload->>'$.config', payload->>'$.reason',
+              COALESCE((payload->>'$.spot')::DOUBLE, 0),
+              COALESCE((payload->>'$.vix')::DOUBLE, 0),
+              COALESCE((payload->>'$.vix1d')::DOUBLE, 0),
+              COALESCE(payload->'$.filters', '{}'),
+              'RUNNING', ts_utc::TIMESTAMP
+       FROM _ingest_new
+       WHERE event_type = 'strategy_run'
+         AND run_id NOT IN (SELECT run_id FROM strategy_runs)
+       QUALIFY row_number() OVER (PARTITION BY run_id ORDER BY seq) = 1""",
+    # trade_intent → intended_trades
+    """INSERT INTO intended_trades
+       (intent_id, run_id, trade_group_id, strategy, account,
+        trade_date, side, direction, legs, target_qty, limit_price)
+       SELECT event_id, run_id, trade_group_id, strategy, account,
+              (payload->>'$.trade_date')::DATE,
+              payload->>'$.side', payload->>'$.direction',
+              COALESCE(payload->'$.legs', '[]'),
+              COALESCE((payload->>'$.target_qty')::INTEGER, 0),
+              COALESCE((payload->>'$.limit_price')::DOUBLE, 0)
+       FROM _ingest_new
+       WHERE event_type = 'trade_intent'
+         AND event_id NOT IN (SELECT intent_id FROM intended_trades)""",
+    # order_submitted / order_update → order_events
+    """INSERT INTO order_events
+       (event_id, trade_group_id, run_id, order_id, ts_utc,
+        event_type, legs, limit_price, order_type, filled_qty, remaining_qty)
+       SELECT event_id, trade_group_id, run_id,
+              COALESCE(payload->>'$.order_id', ''), ts_utc::TIMESTAMP,
+              CASE WHEN event_type = 'order_submitted' THEN 'submitted'
+                   ELSE COALESCE(payload->>'$.status', 'unknown') END,
+              CASE WHEN event_type = 'order_submitted'
+                   THEN COALESCE(payload->'$.legs', '[]') END,
+              CASE WHEN event_type = 'order_submitted'
+                   THEN COALESCE((payload->>'$.limit_price')::DOUBLE, 0) END,
+              CASE WHEN event_type = 'order_submitted'
+                   THEN COALESCE(payload->>'$.order_type', 'LIMIT') ELSE 'LIMIT' END,
+              CASE WHEN event_type = 'order_update'
+                   THEN COALESCE((payload->>'$.filled_qty')::INTEGER, 0) ELSE 0 END,
+              CASE WHEN event_type = 'order_update'
+                   THEN COALESCE((payload->>'$.remaining_qty')::INTEGER, 0) ELSE 0 END
+       FROM _ingest_new
+       WHERE event_type IN ('order_submitted', 'order_update')
+         AND event_id NOT IN (SELECT event_id FROM order_events)""",
+    # fill → fills
+    """INSERT INTO fills
+       (fill_id, trade_group_id, run_id, order_id, ts_utc,
+        fill_qty, fill_price, legs, source)
+       SELECT event_id, trade_group_id, run_id,
+              COALESCE(payload->>'$.order_id', ''), ts_utc::TIMESTAMP,
+              COALESCE((payload->>'$.fill_qty')::INTEGER, 0),
+              COALESCE((payload->>'$.fill_price')::DOUBLE, 0),
+              CASE WHEN json_array_length(payload->'$.legs') > 0
+                   THEN payload->'$.legs' END,
+              'internal'
+       FROM _ingest_new
+       WHERE event_type = 'fill'
+         AND event_id NOT IN (SELECT fill_id FROM fills)""",
+    # fill → intended_trades outcome
+    """UPDATE intended_trades SET outcome = 'FILLED'
+       WHERE outcome = 'PENDING'
+         AND trade_group_id IN (
+             SELECT trade_group_id FROM _ingest_new WHERE event_type = 'fill')""",
+    # skip / error → strategy_runs status (first terminal event per run)
+    """UPDATE strategy_runs
+       SET status = t.status, completed_at = t.ts
+       FROM (
+           SELECT run_id,
+                  CASE WHEN event_type = 'skip' THEN 'SKIPPED' ELSE 'ERROR' END AS status,
+                  ts_utc::TIMESTAMP AS ts
+           FROM _ingest_new
+           WHERE event_type IN ('skip', 'error')
+           QUALIFY row_number() OVER (PARTITION BY run_id ORDER BY seq) = 1
+       ) t
+       WHERE strategy_runs.run_id = t.run_id AND strategy_runs.status = 'RUNNING'""",
+    # post_step_result → merge {step_name: outcome} into post_results
+    """UPDATE strategy_runs
+       SET post_results = json_merge_patch(COALESCE(strategy_runs.post_results, '{}'),
+                                           t.steps),
+           status = 'COMPLETED', completed_at = t.ts
+       FROM (
+           SELECT run_id,
+                  json_group_object(step, outcome) AS steps,
+                  max(ts_utc::TIMESTAMP) AS ts
+           FROM (
+               SELECT run_id, ts_utc,
+                      COALESCE(payload->>'$.step_name', 'unknown') AS step,
+                      COALESCE(payload->>'$.outcome', 'unknown') AS outcome
+               FROM _ingest_new
+               WHERE event_type = 'post_step_result'
+               QUALIFY row_number() OVER (PARTITION BY run_id, step ORDER BY seq DESC) = 1
+           )
+           GROUP BY run_id
+       ) t
+       WHERE strategy_runs.run_id = t.run_id""",
+]
+
+
+def _empty_stats() -> dict:
+    return {"files": 0, "events_read": 0, "inserted": 0,
+            "duplicates": 0, "materialized": 0}
+
+
+def ingest_files(files: list[Path], con, ledger: list[tuple] | None = None) -> dict:
+    """Bulk-ingest JSONL event files in one set-based pass.
+
+    Loads every file into a staging table, keeps events whose
+    idempotency_key is not yet in raw_events (first occurrence within
+    the batch), inserts them, then runs each materializer once over the
+    new events. All inside one transaction, together with the optional
+    ``ledger`` rows (path, size_bytes, byte_offset, tail_hash).
+
+    Returns stats: {files, events_read, inserted, duplicates, materialized}.
+    """
+    stats = _empty_stats()
+    files = sorted(str(f) for f in files)
+    if not files and not ledger:
+        return stats
+    stats["files"] = len(files)
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        if ledger:
+            # One statement for the whole batch (executemany is per-row)
+            con.execute(
+                """INSERT OR REPLACE INTO ingest_ledger
+                   (path, size_bytes, byte_offset, tail_hash, ingested_at)
+                   SELECT unnest(?), unnest(?), unnest(?), unnest(?),
+                          current_timestamp""",
+                [list(col) for col in zip(*ledger)],
+            )
+        if not files:
+            con.execute("COMMIT")
+            return stats
+
+        con.execute(
+            """CREATE OR REPLACE TEMP TABLE _ingest_staging AS
+               SELECT row_number() OVER (ORDER BY filename, ts_utc) AS seq, *
+               FROM read_json(?, format = 'newline_delimited', columns = ?,
+                              ignore_errors = true, filename = true)
+               WHERE event_id IS NOT NULL AND event_type IS NOT NULL""",
+            [files, _STAGING_COLUMNS],
+        )
+        con.execute(
+            """CREATE OR REPLACE TEMP TABLE _ingest_new AS
+               SELECT s.* FROM _ingest_staging s
+               ANTI JOIN raw_events r ON r.idempotency_key = COALESCE(s.idempotency_key, '')
+               QUALIFY row_number() OVER (
+                   PARTITION BY COALESCE(s.idempotency_key, '') ORDER BY s.seq) = 1"""
+        )
+        stats["events_read"] = query_one(
+            "SELECT COUNT(*) FROM _ingest_staging", con=con)[0]
+        stats["inserted"] = query_one(
+            "SELECT COUNT(*) FROM _ingest_new", con=con)[0]
+        stats["duplicates"] = stats["events_read"] - stats["inserted"]
+        stats["materialized"] = query_one(
+            "SELECT COUNT(*) FROM _ingest_new WHERE event_type IN ("
+            + ", ".join("?" * len(_MATERIALIZERS)) + ")",
+            list(_MATERIALIZERS), con=con,
+        )[0]
+
+        execute(
+            """INSERT INTO raw_events
+               (event_id, event_type, ts_utc, strategy, account,
+                trade_group_id, run_id, config_version, payload,
+                idempotency_key)
+               SELECT event_id, event_type, ts_utc::TIMESTAMP, strategy, account,
+                      trade_group_id, run_id, config_version, payload,
+                      COALESCE(idempotency_key, '')
+               FROM _ingest_new ORDER BY seq""",
+            con=con,
+        )
+        for sql in _BULK_MATERIALIZE_SQL:
+            execute(sql, con=con)
+
+        con.execute("DROP TABLE _ingest_new")
+        con.execute("DROP TABLE _ingest_staging")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Ingest ledger (incremental file reads)
+# ---------------------------------------------------------------------------
+
+_LEDGER_TAIL_BYTES = 4096
+
+
+def _tail_hash(f, offset: int) -> str:
+    start = max(0, offset - _LEDGER_TAIL_BYTES)
+    f.seek(start)
+    return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def _read_new_bytes(path: Path, entry: tuple | None) -> tuple[bytes, tuple] | None:
+    """New complete lines in ``path`` since its ledger entry.
+
+    Returns (data, ledger_row), or None when the file is unchanged. A file
+    that shrank or whose bytes before the recorded offset changed is read
+    from the start again (raw_events dedups the replayed events). A
+    trailing partial line is left for the next run.
+    """
+    size = path.stat().st_size
+    if entry is not None and entry[0] == size:
+        return None
+
+    with open(path, "rb") as f:
+        start = 0
+        if entry is not None:
+            _, offset, tail = entry
+            if offset <= size and _tail_hash(f, offset) == tail:
+                start = offset
+        f.seek(start)
+        data = f.read(size - start)
+        data = data[:data.rfind(b"\n") + 1]
+        end = start + len(data)
+        return data, (str(path), size, end, _tail_hash(f, end))
+
+
+def _ingest_with_ledger(files: list[Path], con) -> dict:
+    """Ingest only the bytes appended to ``files`` since the last run."""
+    entries = {
+        row[0]: row[1:] for row in con.execute(
+            "SELECT path, size_bytes, byte_offset, tail_hash FROM ingest_ledger"
+        ).fetchall()
+    }
+
+    ledger, chunks, skipped = [], [], 0
+    for path in sorted(files):
+        new = _read_new_bytes(path, entries.get(str(path)))
+        if new is None:
+            skipped += 1
+            continue
+        data, row = new
+        ledger.append(row)
+        if data:
+            chunks.append(data)
+
+    # Staged as numbered files so read_json keeps the original file order
+    with tempfile.TemporaryDirectory(prefix="gamma_ingest_") as tmp:
+        staged = []
+        for i, data in enumerate(chunks):
+            chunk_path = Path(tmp) / f"{i:06d}.jsonl"
+            chunk_path.write_bytes(data)
+            staged.append(chunk_path)
+        stats = ingest_files(staged, con, ledger=ledger)
+    stats["skipped_files"] = skipped
+    return stats
+
+
+# Dispatch table (per-event path; see ingest_files for the bulk path)
 _MATERIALIZERS = {
     "strategy_run": _materialize_strategy_run,
     "trade_intent": _materialize_trade_intent,
@@ -423,40 +707,45 @@ def ingest_events(
     sync_events_from_s3(trade_date)
     event_path = _event_dir() / trade_date
     if not event_path.exists():
-        return {"files": 0, "events_read": 0, "inserted": 0,
-                "duplicates": 0, "materialized": 0}
+        return _empty_stats()
 
-    stats = {"files": 0, "events_read": 0, "inserted": 0,
-             "duplicates": 0, "materialized": 0}
+    # Explicit per-date ingest re-reads every file (raw_events dedups) and
+    # records the files as fully ingested for ingest_all_pending.
+    files = sorted(event_path.glob("*.jsonl"))
+    ledger = []
+    for path in files:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            ledger.append((str(path), size, size, _tail_hash(f, size)))
+    return ingest_files(files, con, ledger=ledger)
 
-    for jsonl_file in sorted(event_path.glob("*.jsonl")):
-        stats["files"] += 1
-        events = _read_jsonl(jsonl_file)
 
-        for ev in events:
-            stats["events_read"] += 1
+def event_files_watermark() -> tuple[int, int, float]:
+    """(files, total bytes, latest mtime) of the local event JSONL files.
 
-            # 1. Insert raw event (deduplicated)
-            inserted = _ingest_raw_event(con, ev)
-            if inserted:
-                stats["inserted"] += 1
-            else:
-                stats["duplicates"] += 1
-                continue  # Skip materialization for duplicates
-
-            # 2. Materialize into normalized tables
-            materializer = _MATERIALIZERS.get(ev.get("event_type"))
-            if materializer:
-                materializer(con, ev)
-                stats["materialized"] += 1
-
-    return stats
+    Changes whenever ingest_all_pending would find new bytes; run_pipeline
+    uses it to skip ingestion when nothing arrived.
+    """
+    files = sizes = 0
+    latest = 0.0
+    event_base = _event_dir()
+    if event_base.exists():
+        for path in event_base.glob("*/*.jsonl"):
+            st = path.stat()
+            files += 1
+            sizes += st.st_size
+            latest = max(latest, st.st_mtime)
+    return files, sizes, latest
 
 
 def ingest_all_pending(con=None) -> dict:
-    """Ingest all event files across all dates in the event directory.
+    """Ingest new events from every date directory in the event directory.
+
+    Unchanged files are skipped and appended files are read from their
+    last ingested offset (ingest_ledger). S3 is not synced here; callers
+    sync the window they need once (see run_pipeline).
 
-    Returns aggregate stats.
+    Returns aggregate stats (plus ``skipped_files``).
     """
     if con is None:
         con = get_connection()
@@ -464,12 +753,9 @@ def ingest_all_pending(con=None) -> dict:
 
     event_base = _event_dir()
     if not event_base.exists():
-        return {"dates": 0, "files": 0, "events_read": 0,
-                "inserted": 0, "duplicates": 0, "materialized": 0}
-
-    totals = {"dates": 0, "files": 0, "events_read": 0,
-              "inserted": 0, "duplicates": 0, "materialized": 0}
+        return {"dates": 0, "skipped_files": 0, **_empty_stats()}
 
+    date_dirs = []
     for date_dir in sorted(event_base.iterdir()):
         if not date_dir.is_dir():
             continue
@@ -478,10 +764,7 @@ def ingest_all_pending(con=None) -> dict:
             datetime.strptime(date_dir.name, "%Y-%m-%d")
         except ValueError:
             continue
+        date_dirs.append(date_dir)
 
-        totals["dates"] += 1
-        stats = ingest_events(date_dir.name, con=con)
-        for k in ("files", "events_read", "inserted", "duplicates", "materialized"):
-            totals[k] += stats[k]
-
-    return totals
+    files = [f for d in date_dirs for f in d.glob("*.jsonl")]
+    return {"dates": len(date_dirs), **_ingest_with_ledger(files, con)}
@@ -0,0 +1,200 @@
+"""Step-level DAG executor for the reporting pipeline.
+
+Each Step declares the tables it reads (``inputs``) and writes
+(``outputs``). A step depends on every earlier step that writes one of
+its inputs (plus the steps named in ``after``), so declaration order is a
+valid topological order; steps with no path between them (S3 sync,
+Schwab sync, TT sync) run concurrently, each on its own DuckDB cursor.
+Concurrent steps may append to the same table as long as they touch
+different rows.
+
+Inputs are fingerprinted before a step runs: per table the row count and
+summed row hash, per named watermark (e.g. the local event files) the
+watermark function's value, plus the step's ``params``. A step whose
+fingerprint equals the one recorded after its last successful run is
+skipped. Steps without inputs (external sources, the report) always run.
+
+Every step's status, timing, fingerprint and stats are written to
+pipeline_runs in one insert at the end of the run.
+
+Usage:
+    from reporting.pipeline_dag import Step, run_steps
+
+    results = run_steps(con, [
+        Step("ingest", ingest, inputs=("event_files",), outputs=("raw_events",)),
+        Step("positions", build, inputs=("fills",), outputs=("positions",)),
+    ], watermarks={"event_files": event_files_watermark})
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    fn: Callable[[Any], dict]         # called with a DuckDB cursor
+    inputs: tuple[str, ...] = ()      # tables or watermark names
+    outputs: tuple[str, ...] = ()     # tables or watermark names written
+    after: tuple[str, ...] = ()       # explicit ordering beyond inputs/outputs
+    params: tuple = ()                # extra fingerprint values (dates, flags)
+    fatal: bool = False               # abort the run when the step fails
+
+
+def _dependencies(steps: list[Step]) -> dict[str, set[str]]:
+    names = {step.name for step in steps}
+    deps: dict[str, set[str]] = {}
+    for i, step in enumerate(steps):
+        # ``after`` may name optional steps left out of this run
+        deps[step.name] = (set(step.after) & names) | {
+            earlier.name for earlier in steps[:i]
+            if set(step.inputs) & set(earlier.outputs)
+        }
+    return deps
+
+
+def _fingerprint(cur, step: Step, watermarks: dict[str, Callable[[Any], object]]) -> str:
+    values = {}
+    for name in step.inputs:
+        if name in watermarks:
+            values[name] = watermarks[name](cur)
+        else:
+            values[name] = cur.execute(
+                f"SELECT count(*), sum(hash(t)) FROM {name} t"
+            ).fetchone()
+    payload = json.dumps([list(step.params), values], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _last_fingerprints(con) -> dict[str, str]:
+    """Fingerprint recorded by each step's latest successful run."""
+    rows = con.execute(
+        """SELECT step, input_fingerprint FROM pipeline_runs
+           WHERE status = 'OK'
+           QUALIFY row_number() OVER (PARTITION BY step ORDER BY started_at DESC) = 1"""
+    ).fetchall()
+    return {step: fp for step, fp in rows}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _run_step(con, step: Step, watermarks: dict, last_fp: str | None) -> tuple[dict, Exception | None]:
+    cur = con.cursor()
+    record = {"step": step.name, "started_at": _utcnow(), "stats": {}, "error_message": None}
+    error = None
+    t0 = time.perf_counter()
+    try:
+        fp = _fingerprint(cur, step, watermarks) if step.inputs else None
+        if fp is not None and fp == last_fp:
+            record["status"] = "SKIPPED"
+        else:
+            try:
+                record["stats"] = step.fn(cur) or {}
+                record["status"] = "OK"
+                # Taken after the run so a step's own writes don't re-trigger it
+                fp = _fingerprint(cur, step, watermarks) if step.inputs else None
+            except Exception as e:
+                record["status"] = "ERROR"
+                record["error_message"] = str(e)
+                error = e
+        record["input_fingerprint"] = fp
+    finally:
+        cur.close()
+    record["finished_at"] = _utcnow()
+    record["duration_s"] = round(time.perf_counter() - t0, 3)
+    return record, error
+
+
+def _record_runs(con, run_id: str, records: list[dict]) -> None:
+    if not records:
+        return
+    keys = ("step", "status", "started_at", "finished_at", "duration_s",
+            "input_fingerprint", "error_message")
+    con.execute(
+        f"""INSERT INTO pipeline_runs
+            (run_id, {", ".join(keys)}, stats)
+            SELECT ?, {", ".join("unnest(?)" for _ in keys)}, unnest(?)::JSON""",
+        [run_id]
+        + [[r[k] for r in records] for k in keys]
+        + [[json.dumps(r["stats"], default=str) for r in records]],
+    )
+
+
+def run_steps(
+    con,
+    steps: list[Step],
+    watermarks: dict[str, Callable[[Any], object]] | None = None,
+    max_workers: int = 4,
+    force: bool = False,
+) -> dict:
+    """Run ``steps`` as a DAG, skipping steps whose inputs are unchanged.
+
+    ``force`` runs every step regardless of fingerprints. Returns
+    {run_id, steps: {name: stats}, status: {name: OK|SKIPPED|ERROR},
+    timings: {name: seconds}}. A failing ``fatal`` step stops scheduling,
+    waits for the steps already running, records the run and re-raises.
+    """
+    watermarks = watermarks or {}
+    deps = _dependencies(steps)
+    last = {} if force else _last_fingerprints(con)
+    run_id = uuid.uuid4().hex[:16]
+
+    records: list[dict] = []
+    pending = list(steps)
+    done: set[str] = set()
+    fatal_error: Exception | None = None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        while pending or running:
+            for step in [s for s in pending if deps[s.name] <= done]:
+                pending.remove(step)
+                running[pool.submit(_run_step, con, step, watermarks, last.get(step.name))] = step
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step = running.pop(future)
+                record, error = future.result()
+                records.append(record)
+                done.add(step.name)
+                _print_step(record)
+                if error is not None and step.fatal and fatal_error is None:
+                    fatal_error = error
+                    pending.clear()
+
+    _record_runs(con, run_id, records)
+    if fatal_error is not None:
+        raise fatal_error
+
+    by_step = {r["step"]: r for r in records}
+    return {
+        "run_id": run_id,
+        "steps": {
+            s.name: (
+                {"error": by_step[s.name]["error_message"]}
+                if by_step[s.name]["status"] == "ERROR"
+                else by_step[s.name]["stats"]
+            )
+            for s in steps
+        },
+        "status": {s.name: by_step[s.name]["status"] for s in steps},
+        "timings": {s.name: by_step[s.name]["duration_s"] for s in steps},
+    }
+
+
+def _print_step(record: dict) -> None:
+    status = record["status"]
+    detail = " (inputs unchanged)" if status == "SKIPPED" else ""
+    if status == "ERROR":
+        detail = f": {record['error_message']}"
+    print(f"[{record['step']}] {status} in {record['duration_s']:.2f}s{detail}")
@@ -17,7 +17,7 @@ from __future__ import annotations
 import json
 from datetime import date
 
-from reporting.db import execute, get_connection, init_schema, query_df, query_one
+from reporting.db import execute, get_connection, init_schema, query_one
 
 
 # ---------------------------------------------------------------------------
@@ -180,6 +180,11 @@ def compute_all_pnl(con=None, as_of_date: date | None = None) -> dict:
     """Compute realized P&L for all terminal positions missing it.
 
     Processes EXPIRED, CLOSED, and ASSIGNED positions where realized_pnl IS NULL.
+    Set-based: settlements and leg summaries are joined to the pending
+    positions once, the payoff rules of ``_compute_vertical_pnl`` and
+    ``_compute_butterfly_pnl`` run as one SQL expression, and all results
+    are written with a single UPDATE.
+
     Returns stats: {processed, computed, skipped_no_settlement, skipped_no_legs}.
     """
     if con is None:
@@ -189,68 +194,114 @@ def compute_all_pnl(con=None, as_of_date: date | None = None) -> dict:
     stats = {"processed": 0, "computed": 0,
              "skipped_no_settlement": 0, "skipped_no_legs": 0}
 
-    # Find terminal positions without P&L
-    df = query_df(
-        """SELECT p.position_id, p.strategy, p.entry_price, p.qty, p.signal,
-                  p.expiry_date, p.lifecycle_state
-           FROM positions p
-           WHERE p.lifecycle_state IN ('EXPIRED', 'CLOSED', 'ASSIGNED')
-             AND p.realized_pnl IS NULL""",
-        con=con,
-    )
-
-    for _, pos in df.iterrows():
-        stats["processed"] += 1
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(_PNL_BATCH_SQL)
+        for outcome, n in con.execute(
+            "SELECT outcome, COUNT(*) FROM _pnl_batch GROUP BY outcome"
+        ).fetchall():
+            stats[outcome] += n
+            stats["processed"] += n
 
-        expiry = pos["expiry_date"]
-        if expiry is None:
-            stats["skipped_no_legs"] += 1
-            continue
-
-        # Get settlement
-        settlement = get_settlement(con, expiry)
-        if settlement is None:
-            stats["skipped_no_settlement"] += 1
-            continue
-
-        # Get legs
-        legs_df = query_df(
-            "SELECT option_type, strike, action, qty FROM position_legs WHERE position_id = ?",
-            [pos["position_id"]],
-            con=con,
-        )
-        if legs_df.empty:
-            stats["skipped_no_legs"] += 1
-            continue
-
-        legs = legs_df.to_dict("records")
-        entry_price = float(pos["entry_price"] or 0)
-        qty = int(pos["qty"] or 0)
-        signal = pos["signal"] or "LONG"
-
-        # Determine spread type from leg count
-        unique_strikes = len(set(leg["strike"] for leg in legs))
-
-        if unique_strikes == 3:
-            realized_pnl, exit_price = _compute_butterfly_pnl(
-                entry_price, settlement, legs, signal, qty,
-            )
-        elif unique_strikes == 2:
-            realized_pnl, exit_price = _compute_vertical_pnl(
-                entry_price, settlement, legs, signal, qty,
-            )
-        else:
-            stats["skipped_no_legs"] += 1
-            continue
-
-        # Write P&L back
         execute(
             """UPDATE positions
-               SET realized_pnl = ?, exit_price = ?, updated_at = current_timestamp
-               WHERE position_id = ?""",
-            [realized_pnl, exit_price, pos["position_id"]],
+               SET realized_pnl = b.realized_pnl, exit_price = b.exit_price,
+                   updated_at = current_timestamp
+               FROM _pnl_batch b
+               WHERE b.position_id = positions.position_id
+                 AND b.outcome = 'computed'""",
             con=con,
         )
-        stats["computed"] += 1
+        con.execute("DROP TABLE _pnl_batch")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
 
     return stats
+
+
+# Settlement chain as in get_settlement (forward by expiry_date, then by
+# trade_date; zero counts as missing). "First leg" is insertion order.
+_PNL_BATCH_SQL = """
+CREATE OR REPLACE TEMP TABLE _pnl_batch AS
+WITH pending AS (
+    SELECT position_id, expiry_date,
+           COALESCE(entry_price, 0) AS entry_price,
+           COALESCE(qty, 0) AS qty,
+           COALESCE(NULLIF(signal, ''), 'LONG') AS signal
+    FROM positions
+    WHERE lifecycle_state IN ('EXPIRED', 'CLOSED', 'ASSIGNED')
+      AND realized_pnl IS NULL
+),
+by_expiry AS (
+    SELECT expiry_date AS day, arg_max(forward, trade_date) AS forward
+    FROM strategy_signal_rows
+    WHERE forward IS NOT NULL AND expiry_date IS NOT NULL
+    GROUP BY expiry_date
+),
+by_trade_date AS (
+    SELECT trade_date AS day, any_value(forward) AS forward
+    FROM strategy_signal_rows
+    WHERE forward IS NOT NULL
+    GROUP BY trade_date
+),
+leg_summary AS (
+    SELECT position_id,
+           COUNT(*) AS n_legs,
+           list_sort(list(DISTINCT strike)) AS strikes,
+           arg_min(option_type, rowid) AS option_type
+    FROM position_legs
+    WHERE position_id IN (SELECT position_id FROM pending)
+    GROUP BY position_id
+),
+priced AS (
+    SELECT p.*, l.n_legs, l.strikes, l.option_type,
+           COALESCE(NULLIF(e.forward, 0), NULLIF(t.forward, 0)) AS settlement
+    FROM pending p
+    LEFT JOIN by_expiry e ON e.day = p.expiry_date
+    LEFT JOIN by_trade_date t ON t.day = p.expiry_date
+    LEFT JOIN leg_summary l ON l.position_id = p.position_id
+),
+payoff AS (
+    SELECT *,
+        CASE
+            WHEN expiry_date IS NULL THEN 'skipped_no_legs'
+            WHEN settlement IS NULL THEN 'skipped_no_settlement'
+            WHEN len(strikes) IN (2, 3) THEN 'computed'
+            ELSE 'skipped_no_legs'
+        END AS outcome,
+        CASE
+            -- Butterfly: long low, short 2x mid, long high; floored at zero
+            WHEN len(strikes) = 3 AND option_type = 'CALL' THEN greatest(0.0,
+                greatest(0.0, settlement - strikes[1])
+                - 2 * greatest(0.0, settlement - strikes[2])
+                + greatest(0.0, settlement - strikes[3]))
+            WHEN len(strikes) = 3 THEN greatest(0.0,
+                greatest(0.0, strikes[1] - settlement)
+                - 2 * greatest(0.0, strikes[2] - settlement)
+                + greatest(0.0, strikes[3] - settlement))
+            -- Vertical: exactly two legs, else no payoff
+            WHEN n_legs <> 2 THEN NULL
+            WHEN option_type = 'PUT' THEN
+                greatest(0.0, strikes[2] - settlement)
+                - greatest(0.0, strikes[1] - settlement)
+            ELSE
+                greatest(0.0, settlement - strikes[1])
+                - greatest(0.0, settlement - strikes[2])
+        END AS intrinsic,
+        CASE
+            WHEN len(strikes) = 3 OR option_type = 'PUT' THEN signal = 'SHORT'
+            ELSE signal <> 'LONG'
+        END AS is_credit
+    FROM priced
+)
+SELECT position_id, outcome,
+       COALESCE(intrinsic, 0.0) AS exit_price,
+       CASE
+           WHEN intrinsic IS NULL THEN 0.0
+           WHEN is_credit THEN (entry_price - intrinsic) * qty * 100
+           ELSE (intrinsic - entry_price) * qty * 100
+       END AS realized_pnl
+FROM payoff
+"""
@@ -0,0 +1,426 @@
+"""Daily realized P&L mart: running equity, peak, drawdown and streak rows.
+
+One row per (source, book, account, settle_date) with trades settled that
+day, carrying running columns so every window statistic the reports show
+is a row lookup instead of a scan over position history:
+
+  trades / wins / pnl               the day itself
+  cum_trades / cum_wins / equity    since inception (window = two lookups)
+  peak / drawdown / max_drawdown    on the cumulative equity curve
+  mtd_* / ytd_*                     same curve restarted each month / year
+  streak                            +n = n straight wins, -n = n losses
+
+A book is a strategy or a named rollup of strategies (e.g. "portfolio").
+Sources:
+  broker_pnl   positions from reporting.broker_pnl (daily P&L email)
+  positions    terminal rows of the canonical positions table (daily report)
+
+Refreshes are incremental: rows before ``since`` are kept and seed the
+running columns of the recomputed tail.
+
+A source can be mirrored to one S3 object (s3://{SIM_CACHE_BUCKET}/_index/
+pnl_mart_{source}.json) so an ephemeral store (the Lambda's /tmp) starts
+from the same history in every container.
+
+Usage:
+    from reporting.pnl_mart import PnlMart, refresh_pnl_mart
+    refresh_pnl_mart(con, "broker_pnl", records, books, since=date(2026, 3, 1))
+    mart = PnlMart.load(con, "broker_pnl", date(2026, 1, 1), date(2026, 3, 19))
+    mart.window("portfolio", "schwab", date(2026, 3, 1), date(2026, 3, 19))
+    load_mart_mirror(con, "broker_pnl")   # replace local rows with the S3 copy
+    save_mart_mirror(con, "broker_pnl")
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from reporting.db import get_connection, query_one
+
+SOURCE_BROKER = "broker_pnl"
+SOURCE_POSITIONS = "positions"
+PORTFOLIO = "portfolio"
+
+# Running columns persisted per row (order matches pnl_daily_mart)
+_COLUMNS = (
+    "trades", "wins", "pnl",
+    "cum_trades", "cum_wins", "equity", "peak", "drawdown", "max_drawdown",
+    "mtd_equity", "mtd_peak", "mtd_max_drawdown",
+    "ytd_equity", "ytd_peak", "ytd_max_drawdown",
+    "streak",
+)
+
+_S3_MIRROR_DATE = "_index"          # s3://{bucket}/_index/pnl_mart_{source}.json
+_MIRROR_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+def _settle_date(position: dict) -> date | None:
+    if position["exit_method"] == "CLOSED_EARLY" and position.get("close_date"):
+        return date.fromisoformat(position["close_date"])
+    if position["exit_method"] == "EXPIRED" and position.get("expiry"):
+        return date.fromisoformat(position["expiry"])
+    return None
+
+
+def broker_position_records(positions: list[dict], account: str) -> list[dict]:
+    """Settled reporting.broker_pnl positions as mart records.
+
+    Records are ordered by (settle date, fill date, strategy), the order
+    streaks are counted in.
+    """
+    records = []
+    for p in positions:
+        if p["exit_method"] not in ("EXPIRED", "CLOSED_EARLY"):
+            continue
+        settled = _settle_date(p)
+        if settled is None:
+            continue
+        records.append({
+            "settle_date": settled,
+            "strategy": p["strategy"],
+            "account": account,
+            "pnl": float(p["pnl"] or 0),
+            "order": (p.get("fill_date") or "", p.get("strategy") or ""),
+        })
+    records.sort(key=lambda r: (r["settle_date"], r["order"]))
+    return records
+
+
+def position_table_records(con, since: date | None = None) -> list[dict]:
+    """Terminal positions with realized P&L from the positions table."""
+    rows = con.execute(
+        """SELECT strategy, account, CAST(closed_at AS DATE), realized_pnl
+           FROM positions
+           WHERE lifecycle_state IN ('CLOSED', 'EXPIRED', 'ASSIGNED')
+             AND closed_at IS NOT NULL
+             AND realized_pnl IS NOT NULL
+             AND CAST(closed_at AS DATE) >= ?
+           ORDER BY closed_at, position_id""",
+        [since or date.min],
+    ).fetchall()
+    return [
+        {"settle_date": d, "strategy": s, "account": a, "pnl": float(pnl)}
+        for s, a, d, pnl in rows
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Row computation
+# ---------------------------------------------------------------------------
+
+def _next_row(prev: dict | None, book: str, account: str, day: date,
+              pnls: list[float]) -> dict:
+    """Roll the running columns of ``prev`` forward by one settlement day."""
+    pnl = 0.0
+    wins = 0
+    streak = prev["streak"] if prev else 0
+    for p in pnls:
+        pnl += p
+        if p > 0:
+            wins += 1
+            streak = streak + 1 if streak > 0 else 1
+        elif p < 0:
+            streak = streak - 1 if streak < 0 else -1
+
+    equity = (prev["equity"] if prev else 0.0) + pnl
+    peak = max(prev["peak"] if prev else 0.0, equity)
+    drawdown = max(peak - equity, 0.0)
+
+    row = {
+        "book": book,
+        "account": account,
+        "settle_date": day,
+        "trades": len(pnls),
+        "wins": wins,
+        "pnl": pnl,
+        "cum_trades": (prev["cum_trades"] if prev else 0) + len(pnls),
+        "cum_wins": (prev["cum_wins"] if prev else 0) + wins,
+        "equity": equity,
+        "peak": peak,
+        "drawdown": drawdown,
+        "max_drawdown": max(prev["max_drawdown"] if prev else 0.0, drawdown),
+        "streak": streak,
+    }
+    for period, same in (
+        ("mtd", prev is not None and prev["settle_date"].replace(day=1) == day.replace(day=1)),
+        ("ytd", prev is not None and prev["settle_date"].year == day.year),
+    ):
+        p_equity = prev[f"{period}_equity"] if same else 0.0
+        p_peak = prev[f"{period}_peak"] if same else 0.0
+        p_max_dd = prev[f"{period}_max_drawdown"] if same else 0.0
+        row[f"{period}_equity"] = p_equity + pnl
+        row[f"{period}_peak"] = max(p_peak, row[f"{period}_equity"])
+        row[f"{period}_max_drawdown"] = max(
+            p_max_dd, row[f"{period}_peak"] - row[f"{period}_equity"])
+    return row
+
+
+def build_rows(
+    records: Iterable[dict],
+    books: dict[str, tuple[str, ...] | None],
+    prior: dict[tuple[str, str], dict] | None = None,
+) -> list[dict]:
+    """Compute mart rows from ordered records.
+
+    ``books`` maps each book to its member strategies (None = every
+    record). ``prior`` holds the last stored row per (book, account) that
+    the new rows continue from.
+    """
+    days: dict[tuple[str, str], dict[date, list[float]]] = defaultdict(dict)
+    for r in records:
+        for book, members in books.items():
+            if members is None or r["strategy"] in members:
+                days[(book, r["account"])].setdefault(r["settle_date"], []).append(r["pnl"])
+
+    rows = []
+    for (book, account), by_day in days.items():
+        prev = (prior or {}).get((book, account))
+        for day in sorted(by_day):
+            prev = _next_row(prev, book, account, day, by_day[day])
+            rows.append(prev)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Persistence
+# ---------------------------------------------------------------------------
+
+def _fetch_rows(con, sql: str, params: list) -> list[dict]:
+    cur = con.execute(sql, params)
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def _resume_date(con, source: str, since: date | None) -> date | None:
+    """``since`` if stored rows before it can seed the tail, else None."""
+    if since is None:
+        return None
+    stored = query_one(
+        "SELECT count(*) FROM pnl_daily_mart WHERE source = ? AND settle_date < ?",
+        [source, since], con=con,
+    )[0]
+    return since if stored else None
+
+
+def refresh_pnl_mart(
+    con,
+    source: str,
+    records: list[dict],
+    books: dict[str, tuple[str, ...] | None],
+    since: date | None = None,
+) -> int:
+    """Recompute the mart rows of ``source`` from ``since`` on.
+
+    Rows before ``since`` are kept and seed the running columns; records
+    settled before it are ignored. Without stored rows before ``since``
+    (or without ``since``) the source is rebuilt from ``records``.
+    Returns rows written.
+    """
+    if con is None:
+        con = get_connection()
+
+    since = _resume_date(con, source, since)
+    prior: dict[tuple[str, str], dict] = {}
+    if since is not None:
+        for row in _fetch_rows(
+            con,
+            """SELECT * FROM pnl_daily_mart
+               WHERE source = ? AND settle_date < ?
+               QUALIFY row_number() OVER (
+                   PARTITION BY book, account ORDER BY settle_date DESC) = 1""",
+            [source, since],
+        ):
+            prior[(row["book"], row["account"])] = row
+        records = [r for r in records if r["settle_date"] >= since]
+
+    rows = build_rows(records, books, prior)
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(
+            "DELETE FROM pnl_daily_mart WHERE source = ? AND settle_date >= ?",
+            [source, since or date.min],
+        )
+        if rows:
+            keys = ("book", "account", "settle_date") + _COLUMNS
+            con.execute(
+                f"""INSERT INTO pnl_daily_mart
+                    (source, {", ".join(keys)})
+                    SELECT ?, {", ".join("unnest(?)" for _ in keys)}""",
+                [source] + [[row[k] for row in rows] for k in keys],
+            )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return len(rows)
+
+
+def refresh_positions_mart(con, since: date | None = None) -> int:
+    """Refresh the positions-table mart: one book per strategy plus portfolio."""
+    since = _resume_date(con, SOURCE_POSITIONS, since)
+    records = position_table_records(con, since)
+    books: dict[str, tuple[str, ...] | None] = {
+        s: (s,) for s in sorted({r["strategy"] for r in records})
+    }
+    books[PORTFOLIO] = None
+    return refresh_pnl_mart(con, SOURCE_POSITIONS, records, books, since=since)
+
+
+def mart_as_of(con, source: str) -> date | None:
+    """Day ``source`` was last refreshed (None if it has no rows)."""
+    last = query_one(
+        "SELECT max(updated_at) FROM pnl_daily_mart WHERE source = ?",
+        [source], con=con,
+    )[0]
+    return last.date() if last else None
+
+
+def _mirror_file(source: str) -> str:
+    return f"pnl_mart_{source}.json"
+
+
+def save_mart_mirror(con, source: str, bucket: str = "") -> bool:
+    """Write every row of ``source`` to its S3 mirror. Returns True if written."""
+    keys = ("book", "account", "settle_date") + _COLUMNS + ("updated_at",)
+    rows = con.execute(
+        f"""SELECT {", ".join(keys)} FROM pnl_daily_mart
+            WHERE source = ? ORDER BY book, account, settle_date""",
+        [source],
+    ).fetchall()
+    payload = {
+        "v": _MIRROR_VERSION,
+        "columns": list(keys),
+        "rows": [
+            [v.isoformat() if isinstance(v, (date, datetime)) else v for v in row]
+            for row in rows
+        ],
+    }
+    try:
+        from sim.data.s3_cache import s3_put_json
+        s3_put_json(_S3_MIRROR_DATE, _mirror_file(source), payload, bucket=bucket)
+    except Exception as e:
+        print(f"  [warn] P&L mart S3 mirror not saved: {e}")
+        return False
+    return True
+
+
+def load_mart_mirror(con, source: str, bucket: str = "") -> int:
+    """Replace the local rows of ``source`` with its S3 mirror.
+
+    The mirror is the shared history; local rows are kept only when it is
+    missing or unreadable. Returns rows loaded (0 = local rows kept).
+    """
+    try:
+        from sim.data.s3_cache import s3_get_json
+        payload = s3_get_json(_S3_MIRROR_DATE, _mirror_file(source), bucket=bucket)
+    except Exception as e:
+        print(f"  [warn] P&L mart S3 mirror not loaded: {e}")
+        return 0
+    if not payload or payload.get("v") != _MIRROR_VERSION or not payload.get("rows"):
+        return 0
+
+    keys = payload["columns"]
+    casts = {"settle_date": "DATE", "updated_at": "TIMESTAMP"}
+    select = ", ".join(
+        f"CAST(unnest(?) AS {casts[k]})" if k in casts else "unnest(?)" for k in keys
+    )
+    columns = list(zip(*payload["rows"]))
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute("DELETE FROM pnl_daily_mart WHERE source = ?", [source])
+        con.execute(
+            f"INSERT INTO pnl_daily_mart (source, {', '.join(keys)}) SELECT ?, {select}",
+            [source] + [list(c) for c in columns],
+        )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return len(payload["rows"])
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+
+class PnlMart:
+    """Mart rows in memory, indexed per (book, account) for date lookups."""
+
+    def __init__(self, rows: Iterable[dict]):
+        self._rows: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        for row in sorted(rows, key=lambda r: r["settle_date"]):
+            self._rows[(row["book"], row["account"])].append(row)
+        self._dates = {
+            key: [r["settle_date"] for r in rows] for key, rows in self._rows.items()
+        }
+
+    @classmethod
+    def from_records(cls, records: list[dict],
+                     books: dict[str, tuple[str, ...] | None]) -> PnlMart:
+        return cls(build_rows(records, books))
+
+    @classmethod
+    def load(cls, con, source: str, start: date, end: date) -> PnlMart:
+        """Rows settled in [start, end] plus the last row before ``start``."""
+        return cls(_fetch_rows(
+            con,
+            """SELECT * FROM pnl_daily_mart
+               WHERE source = ? AND settle_date BETWEEN ? AND ?
+               UNION ALL
+               (SELECT * FROM pnl_daily_mart
+                WHERE source = ? AND settle_date < ?
+                QUALIFY row_number() OVER (
+                    PARTITION BY book, account ORDER BY settle_date DESC) = 1)""",
+            [source, start, end, source, start],
+        ))
+
+    def _at(self, book: str, account: str, d: date) -> dict | None:
+        """Last row on or before ``d``."""
+        dates = self._dates.get((book, account))
+        if not dates:
+            return None
+        i = bisect.bisect_right(dates, d)
+        return self._rows[(book, account)][i - 1] if i else None
+
+    def day(self, book: str, account: str, d: date) -> float:
+        """Realized P&L settled on ``d``."""
+        row = self._at(book, account, d)
+        return row["pnl"] if row and row["settle_date"] == d else 0.0
+
+    def window(self, book: str, account: str, start: date, end: date) -> dict:
+        """{trades, wins, pnl} settled in [start, end]."""
+        hi = self._at(book, account, end)
+        lo = self._at(book, account, start - timedelta(days=1))
+        if hi is None:
+            return {"trades": 0, "wins": 0, "pnl": 0.0}
+        if lo is None:
+            return {"trades": hi["cum_trades"], "wins": hi["cum_wins"], "pnl": hi["equity"]}
+        return {
+            "trades": hi["cum_trades"] - lo["cum_trades"],
+            "wins": hi["cum_wins"] - lo["cum_wins"],
+            "pnl": hi["equity"] - lo["equity"],
+        }
+
+    def drawdown(self, book: str, account: str, period: str, d: date) -> tuple[float, float]:
+        """(current, max) drawdown of the month-to-date or year-to-date curve."""
+        row = self._at(book, account, d)
+        start = d.replace(day=1) if period == "mtd" else d.replace(month=1, day=1)
+        if row is None or row["settle_date"] < start:
+            return 0.0, 0.0
+        current = max(row[f"{period}_peak"] - row[f"{period}_equity"], 0.0)
+        return current, row[f"{period}_max_drawdown"]
+
+    def streak(self, book: str, account: str, d: date) -> str:
+        """Current win/loss streak as of ``d`` ("W3", "L1", "—")."""
+        row = self._at(book, account, d)
+        if row is None or row["streak"] == 0:
+            return "—"
+        return f"W{row['streak']}" if row["streak"] > 0 else f"L{-row['streak']}"
@@ -331,64 +331,118 @@ def materialize_positions(con=None) -> int:
 
     Aggregates multiple fills by trade_group_id so partial fills produce a
     single position with the correct total qty and weighted-average price.
+    Set-based: one join of the aggregated fills against intents and
+    strategy_runs, one INSERT for positions and one for their legs, all in a
+    single transaction. Same rules as ``create_position_from_fill``.
 
     Returns count of new positions created.
     """
     if con is None:
         con = get_connection()
 
-    # Find trade_group_ids with fills but no position, aggregating fills
-    df = query_df(
-        """SELECT f.trade_group_id,
-                  MAX(f.run_id) AS run_id,
-                  SUM(f.fill_qty) AS total_qty,
-                  SUM(f.fill_qty * f.fill_price) / NULLIF(SUM(f.fill_qty), 0) AS avg_price,
-                  MAX(f.legs) AS legs
-           FROM fills f
-           LEFT JOIN positions p ON f.trade_group_id = p.position_id
-           WHERE p.position_id IS NULL
-           GROUP BY f.trade_group_id""",
-        con=con,
-    )
-
-    count = 0
-    for _, row in df.iterrows():
-        # Check for an intent
-        intent = query_one(
-            """SELECT intent_id, legs, side, direction, target_qty, limit_price
-               FROM intended_trades WHERE trade_group_id = ?""",
-            [row["trade_group_id"]], con=con,
+    now = datetime.now(timezone.utc).isoformat()
+    con.execute("BEGIN TRANSACTION")
+    try:
+        # Trade groups with fills but no position, joined to their intent
+        # (first by intent_id) and strategy run
+        con.execute(
+            """CREATE OR REPLACE TEMP TABLE _new_positions AS
+               WITH groups AS (
+                   SELECT f.trade_group_id,
+                          MAX(f.run_id) AS run_id,
+                          SUM(f.fill_qty) AS total_qty,
+                          SUM(f.fill_qty * f.fill_price) / NULLIF(SUM(f.fill_qty), 0) AS avg_price,
+                          MAX(f.legs) AS legs
+                   FROM fills f
+                   LEFT JOIN positions p ON f.trade_group_id = p.position_id
+                   WHERE p.position_id IS NULL
+                   GROUP BY f.trade_group_id
+               ),
+               intents AS (
+                   SELECT trade_group_id, legs, target_qty
+                   FROM intended_trades
+                   QUALIFY row_number() OVER (
+                       PARTITION BY trade_group_id ORDER BY intent_id) = 1
+               )
+               SELECT g.trade_group_id AS position_id,
+                      COALESCE(r.strategy, 'unknown') AS strategy,
+                      COALESCE(r.account, 'unknown') AS account,
+                      COALESCE(r.trade_date, ?::DATE) AS trade_date,
+                      CASE WHEN i.target_qty <> 0 AND COALESCE(g.total_qty, 0) < i.target_qty
+                           THEN 'PARTIALLY_OPEN' ELSE 'OPEN' END AS lifecycle_state,
+                      COALESCE(g.avg_price, 0) AS entry_price,
+                      COALESCE(g.total_qty, 0) AS qty,
+                      r.signal, r.config,
+                      -- Fill legs win; the intent's legs fill in when the fill has none
+                      CASE WHEN json_array_length(g.legs) > 0 THEN g.legs
+                           ELSE i.legs END AS legs
+               FROM groups g
+               LEFT JOIN intents i ON i.trade_group_id = g.trade_group_id
+               LEFT JOIN strategy_runs r ON r.run_id = g.run_id""",
+            [date.today().isoformat()],
+        )
+        con.execute(
+            """CREATE OR REPLACE TEMP TABLE _new_legs AS
+               SELECT position_id,
+                      generate_subscripts(legs -> '$[*]', 1) AS leg_no,
+                      unnest(legs -> '$[*]') AS leg
+               FROM _new_positions"""
+        )
+        # Expiry from the first leg whose OSI carries a valid YYMMDD[CP]
+        con.execute(
+            """CREATE OR REPLACE TEMP TABLE _new_expiries AS
+               SELECT position_id, arg_min(expiry_date, leg_no) AS expiry_date
+               FROM (
+                   SELECT position_id, leg_no,
+                          try_strptime('20' || regexp_extract(osi, '([0-9]{6})[CP]', 1),
+                                       '%Y%m%d')::DATE AS expiry_date
+                   FROM (SELECT position_id, leg_no,
+                                replace(COALESCE(leg ->> 'osi', ''), ' ', '') AS osi
+                         FROM _new_legs)
+                   WHERE length(osi) >= 15
+               )
+               WHERE expiry_date IS NOT NULL
+               GROUP BY position_id"""
         )
 
-        intent_dict = None
-        target_qty = None
-        if intent:
-            intent_dict = {
-                "legs": intent[1],
-                "side": intent[2],
-                "direction": intent[3],
-            }
-            target_qty = intent[4]
-
-        total_qty = int(row["total_qty"] or 0)
-        avg_price = float(row["avg_price"] or 0)
-
-        # Determine lifecycle state based on fill completeness
-        if target_qty and total_qty < target_qty:
-            initial_state = "PARTIALLY_OPEN"
-        else:
-            initial_state = "OPEN"
-
-        fill_dict = {
-            "trade_group_id": row["trade_group_id"],
-            "run_id": row["run_id"],
-            "fill_qty": total_qty,
-            "fill_price": avg_price,
-            "legs": row["legs"],
-            "_initial_state": initial_state,
-        }
-
-        create_position_from_fill(con, fill_dict, intent_dict)
-        count += 1
+        execute(
+            """INSERT INTO positions
+               (position_id, strategy, account, trade_date, expiry_date,
+                lifecycle_state, provenance, entry_price, qty,
+                signal, config, opened_at, updated_at)
+               SELECT n.position_id, n.strategy, n.account, n.trade_date,
+                      e.expiry_date, n.lifecycle_state, 'STRATEGY',
+                      n.entry_price, n.qty, n.signal, n.config,
+                      ?::TIMESTAMP, ?::TIMESTAMP
+               FROM _new_positions n
+               LEFT JOIN _new_expiries e USING (position_id)""",
+            [now, now],
+            con=con,
+        )
+        execute(
+            """INSERT INTO position_legs
+               (leg_id, position_id, osi, option_type, strike, expiry_date,
+                action, qty, fill_price)
+               SELECT substr(replace(uuid()::VARCHAR, '-', ''), 1, 16),
+                      l.position_id,
+                      COALESCE(l.leg ->> 'osi', ''),
+                      COALESCE(l.leg ->> 'option_type', 'UNKNOWN'),
+                      COALESCE((l.leg ->> 'strike')::DOUBLE, 0),
+                      e.expiry_date,
+                      COALESCE(l.leg ->> 'action', 'UNKNOWN'),
+                      COALESCE((l.leg ->> 'qty')::DOUBLE, 0)::INTEGER,
+                      (l.leg ->> 'fill_price')::DOUBLE
+               FROM _new_legs l
+               LEFT JOIN _new_expiries e USING (position_id)
+               ORDER BY l.position_id, l.leg_no""",
+            con=con,
+        )
 
+        count = query_one("SELECT COUNT(*) FROM _new_positions", con=con)[0]
+        for table in ("_new_expiries", "_new_legs", "_new_positions"):
+            con.execute(f"DROP TABLE {table}")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
     return count
@@ -9,23 +9,28 @@ Checks implemented:
   3. cash_match    — account_snapshots vs broker_raw_cash
   4. freshness     — source_freshness SLA enforcement
 
+Each check is a set-based DuckDB query (full outer joins / anti-joins
+between internal and broker tables, JSON payloads unpacked in SQL); only
+the mismatching rows come back to Python to be worded as issues. A run
+writes all of its issues with one bulk INSERT and auto-resolves the
+previous run's items with one UPDATE, so it is cheap enough to run after
+every broker sync. Fill and cash checks accept a date range.
+
 Results are written to reconciliation_runs + reconciliation_items.
 
 Usage:
     from reporting.reconciliation import run_reconciliation
 
     stats = run_reconciliation(con=con, report_date=date.today())
+    stats = run_reconciliation(con=con, report_date="2026-03-01", end_date="2026-03-31")
 """
 
 from __future__ import annotations
 
-import json
 import uuid
 from datetime import date, datetime, timedelta, timezone
 
-import pandas as pd
-
-from reporting.db import execute, get_connection, query_df, query_one
+from reporting.db import execute, get_connection, query_one
 from reporting.position_engine import transition_state
 
 
@@ -52,641 +57,481 @@ def _broker_fetch_window(report_date: str) -> tuple[str, str]:
     return start.isoformat(), end.isoformat()
 
 
+# SQL form of _broker_fetch_window: the trading date a fetched_at belongs to,
+# and whether it falls inside that date's window (14:00 UTC + 22h).
+_FETCH_DATE_SQL = "CAST(fetched_at - INTERVAL 14 HOUR AS DATE)"
+_IN_FETCH_WINDOW_SQL = "hour(fetched_at - INTERVAL 14 HOUR) < 22"
+
+
+def _fetch_range(report_date: str, end_date: str) -> tuple[str, str]:
+    """(start, end) UTC bounds covering the fetch windows of a date range."""
+    return _broker_fetch_window(report_date)[0], _broker_fetch_window(end_date)[1]
+
+
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _record_issue(
-    con,
-    recon_run_id: str,
-    check_type: str,
-    entity_type: str,
-    severity: str,
-    message: str,
-    entity_id: str | None = None,
-    internal_value: str | None = None,
-    broker_value: str | None = None,
-    classification: str | None = None,
-    classification_reason: str | None = None,
-) -> None:
-    """Insert a single reconciliation_item."""
+_ISSUE_FIELDS = (
+    "check_type", "entity_type", "entity_id", "severity", "message",
+    "internal_value", "broker_value", "classification", "classification_reason",
+)
+
+
+def _record_issues(con, recon_run_id: str, issues: list[dict]) -> int:
+    """Insert reconciliation_items in one statement. Returns rows written.
+
+    Each issue is a dict keyed by _ISSUE_FIELDS (missing keys are NULL).
+    """
+    if not issues:
+        return 0
+    cols = {f: [issue.get(f) for issue in issues] for f in _ISSUE_FIELDS}
     execute(
         """INSERT INTO reconciliation_items
            (id, recon_run_id, check_type, entity_type, entity_id,
             severity, status, message, internal_value, broker_value,
             opened_at, classification, classification_reason)
-           VALUES (?, ?, ?, ?, ?, ?, 'UNRESOLVED', ?, ?, ?, ?, ?, ?)""",
+           SELECT substr(replace(uuid()::VARCHAR, '-', ''), 1, 16), ?,
+                  unnest(?), unnest(?), unnest(?), unnest(?), 'UNRESOLVED',
+                  unnest(?), unnest(?), unnest(?), ?, unnest(?), unnest(?)""",
         [
-            _uuid(),
             recon_run_id,
-            check_type,
-            entity_type,
-            entity_id,
-            severity,
-            message,
-            internal_value,
-            broker_value,
+            cols["check_type"],
+            cols["entity_type"],
+            cols["entity_id"],
+            cols["severity"],
+            cols["message"],
+            cols["internal_value"],
+            cols["broker_value"],
             _now(),
-            classification,
-            classification_reason,
+            cols["classification"],
+            cols["classification_reason"],
         ],
         con=con,
     )
+    return len(issues)
+
+
+def _emit(con, recon_run_id: str, found: list[dict], issues: list | None) -> None:
+    """Write a check's issues now, or hand them to the caller's batch."""
+    if issues is None:
+        _record_issues(con, recon_run_id, found)
+    else:
+        issues.extend(found)
 
 
 # ---------------------------------------------------------------------------
 # Check 1: Fill match
 # ---------------------------------------------------------------------------
 
-def _check_fill_match(con, recon_run_id: str, report_date: str) -> dict:
-    """Compare internal fills against broker_raw_fills.
-
-    For each broker fill, verify a matching internal fill exists (by order_id).
-    For each internal fill, verify a matching broker fill exists.
-    Flag quantity or price mismatches.
-    """
-    stats = {"checks": 0, "issues": 0}
-
-    # Broker fills fetched in the window around this trading date
-    fetch_start, fetch_end = _broker_fetch_window(report_date)
-    broker_df = query_df(
-        """SELECT order_id, fill_id, raw_payload
-           FROM broker_raw_fills
-           WHERE fetched_at >= ? AND fetched_at < ?""",
-        [fetch_start, fetch_end], con=con,
-    )
-
-    # Internal fills from today's runs
-    internal_df = query_df(
-        """SELECT f.fill_id, f.order_id, f.fill_qty, f.fill_price
-           FROM fills f
-           JOIN strategy_runs sr ON f.run_id = sr.run_id
-           WHERE sr.trade_date = ?""",
-        [report_date], con=con,
-    )
+# Broker raw fills are stored per execution-leg (one row per leg per fill),
+# while internal fills are per combo order (one row with total qty).  The
+# broker side sums leg quantities ("qty" as stored by
+# broker_sync_schwab._extract_fills_from_order) and divides by the number of
+# distinct legs (fill_id stores the broker leg_id) to get the combo quantity.
+_FILL_MATCH_SQL = f"""
+WITH broker AS (
+    SELECT {_FETCH_DATE_SQL} AS report_date,
+           order_id,
+           count(*) AS n_fills,
+           coalesce(sum(trunc(TRY_CAST(raw_payload->>'qty' AS DOUBLE))), 0)::BIGINT AS leg_qty,
+           greatest(count(DISTINCT coalesce(fill_id, '')), 1) AS legs
+    FROM broker_raw_fills
+    WHERE fetched_at >= ? AND fetched_at < ? AND {_IN_FETCH_WINDOW_SQL}
+    GROUP BY ALL
+),
+internal AS (
+    SELECT sr.trade_date AS report_date,
+           f.order_id,
+           count(*) AS n_fills,
+           sum(f.fill_qty)::BIGINT AS qty
+    FROM fills f
+    JOIN strategy_runs sr ON f.run_id = sr.run_id
+    WHERE sr.trade_date BETWEEN ? AND ?
+    GROUP BY ALL
+)
+SELECT coalesce(b.order_id, i.order_id) AS order_id,
+       b.n_fills AS broker_fills, b.leg_qty, b.legs,
+       i.n_fills AS internal_fills, i.qty AS internal_qty
+FROM broker b
+FULL OUTER JOIN internal i
+  ON i.report_date = b.report_date AND i.order_id = b.order_id
+ORDER BY 1
+"""
 
-    stats["checks"] += 1
 
-    if broker_df.empty and internal_df.empty:
-        return stats
+def _check_fill_match(con, recon_run_id: str, report_date: str,
+                      end_date: str | None = None, issues: list | None = None) -> dict:
+    """Compare internal fills against broker_raw_fills.
 
-    # Build lookup: order_id -> list of internal fills
-    internal_by_order: dict[str, list] = {}
-    for _, row in internal_df.iterrows():
-        oid = str(row["order_id"])
-        internal_by_order.setdefault(oid, []).append(row)
-
-    # Build lookup: order_id -> list of broker fills
-    broker_by_order: dict[str, list] = {}
-    for _, row in broker_df.iterrows():
-        oid = str(row["order_id"])
-        broker_by_order.setdefault(oid, []).append(row)
-
-    # Check: broker fills without internal match
-    for oid, broker_rows in broker_by_order.items():
-        stats["checks"] += 1
-        if oid not in internal_by_order:
-            _record_issue(
-                con, recon_run_id,
-                check_type="fill_match",
-                entity_type="fill",
-                severity="ERROR",
-                message=f"Broker fill for order {oid} has no internal fill record",
-                entity_id=oid,
-                broker_value=f"{len(broker_rows)} broker fill(s)",
-                internal_value="0 internal fills",
-            )
-            stats["issues"] += 1
-
-    # Check: internal fills without broker match
-    for oid, int_rows in internal_by_order.items():
-        stats["checks"] += 1
-        if oid not in broker_by_order:
-            _record_issue(
-                con, recon_run_id,
-                check_type="fill_match",
-                entity_type="fill",
-                severity="WARNING",
-                message=f"Internal fill for order {oid} has no broker fill record (broker sync may be pending)",
-                entity_id=oid,
-                internal_value=f"{len(int_rows)} internal fill(s)",
-                broker_value="0 broker fills",
-            )
-            stats["issues"] += 1
-
-    # Check: quantity/price mismatch for matched orders
-    #
-    # Broker raw fills are stored per execution-leg (one row per leg per fill),
-    # while internal fills are per combo order (one row with total qty).
-    # To compare: sum broker leg quantities per order, then divide by the
-    # number of legs to get combo-equivalent quantity.
-    for oid in set(internal_by_order) & set(broker_by_order):
-        stats["checks"] += 1
-        int_total_qty = sum(int(r["fill_qty"]) for r in internal_by_order[oid])
-
-        # Parse broker qty from raw_payload — field is "qty" as stored by
-        # broker_sync_schwab._extract_fills_from_order
-        broker_leg_qty = 0
-        broker_leg_count = 0
-        for br in broker_by_order[oid]:
-            try:
-                payload = json.loads(br["raw_payload"]) if isinstance(br["raw_payload"], str) else br["raw_payload"]
-                broker_leg_qty += int(payload.get("qty", 0))
-                broker_leg_count += 1
-            except (json.JSONDecodeError, TypeError, ValueError):
-                pass
-
-        # Schwab stores one row per leg; a 2-leg spread filled 1x produces
-        # 2 rows each with qty=1.  Determine legs-per-fill from the data:
-        # count distinct leg_ids for this order.
-        distinct_legs = len({
-            str(br.get("fill_id", ""))  # fill_id column stores leg_id from broker
-            for br in broker_by_order[oid]
-        })
-        legs_per_combo = max(distinct_legs, 1)
-        broker_combo_qty = broker_leg_qty // legs_per_combo if legs_per_combo else broker_leg_qty
-
-        if int_total_qty != broker_combo_qty and broker_combo_qty > 0:
-            _record_issue(
-                con, recon_run_id,
-                check_type="fill_match",
-                entity_type="fill",
-                severity="ERROR",
-                message=f"Fill quantity mismatch for order {oid}",
-                entity_id=oid,
-                internal_value=str(int_total_qty),
-                broker_value=f"{broker_combo_qty} (from {broker_leg_qty} leg fills / {legs_per_combo} legs)",
-            )
-            stats["issues"] += 1
+    For each broker order, verify a matching internal fill exists (by order_id).
+    For each internal order, verify a matching broker fill exists.
+    Flag quantity mismatches.  Covers report_date..end_date (default one day).
+    """
+    stats = {"checks": 1, "issues": 0}
+    end_date = end_date or report_date
+    rows = con.execute(
+        _FILL_MATCH_SQL,
+        [*_fetch_range(report_date, end_date), report_date, end_date],
+    ).fetchall()
+
+    found = []
+    for oid, broker_fills, leg_qty, legs, internal_fills, internal_qty in rows:
+        if broker_fills is None:
+            stats["checks"] += 1
+            found.append({
+                "check_type": "fill_match",
+                "entity_type": "fill",
+                "severity": "WARNING",
+                "message": f"Internal fill for order {oid} has no broker fill record (broker sync may be pending)",
+                "entity_id": oid,
+                "internal_value": f"{internal_fills} internal fill(s)",
+                "broker_value": "0 broker fills",
+            })
+            continue
+        if internal_fills is None:
+            stats["checks"] += 1
+            found.append({
+                "check_type": "fill_match",
+                "entity_type": "fill",
+                "severity": "ERROR",
+                "message": f"Broker fill for order {oid} has no internal fill record",
+                "entity_id": oid,
+                "broker_value": f"{broker_fills} broker fill(s)",
+                "internal_value": "0 internal fills",
+            })
+            continue
 
+        # Matched: one check per side plus the quantity comparison
+        stats["checks"] += 3
+        combo_qty = leg_qty // legs
+        if internal_qty != combo_qty and combo_qty > 0:
+            found.append({
+                "check_type": "fill_match",
+                "entity_type": "fill",
+                "severity": "ERROR",
+                "message": f"Fill quantity mismatch for order {oid}",
+                "entity_id": oid,
+                "internal_value": str(internal_qty),
+                "broker_value": f"{combo_qty} (from {leg_qty} leg fills / {legs} legs)",
+            })
+
+    stats["issues"] = len(found)
+    _emit(con, recon_run_id, found, issues)
     return stats
 
 
 # ---------------------------------------------------------------------------
-# Position classification
+# Check 2: Position match
 # ---------------------------------------------------------------------------
 
 # The single API automation tag used by our Lambda pipeline.
 # Orders with this tag were placed by our code; anything else is manual/legacy.
 API_TAG = "TA_1michaelbelaygmailcom1755679459"
 
+_OPEN_STATES = "('OPEN', 'PARTIALLY_OPEN', 'PARTIALLY_CLOSED')"
+
+# Latest broker snapshot per account, exploded to one row per option symbol
+# (Schwab payload is a list of positions, or {"positions": [...]}).
+_BROKER_POSITIONS_SQL = """
+CREATE OR REPLACE TEMP TABLE _recon_broker_positions AS
+WITH latest AS (
+    SELECT account,
+           CASE WHEN json_type(raw_payload) = 'ARRAY' THEN raw_payload
+                ELSE raw_payload->'positions' END AS positions
+    FROM broker_raw_positions
+    WHERE fetched_at >= ? AND fetched_at < ?
+    QUALIFY row_number() OVER (PARTITION BY account ORDER BY fetched_at DESC) = 1
+),
+symbols AS (
+    SELECT account,
+           replace(unnest(json_extract_string(positions, '$[*].instrument.symbol')), ' ', '') AS symbol
+    FROM latest
+)
+SELECT DISTINCT account, symbol FROM symbols WHERE symbol <> ''
+"""
 
-def _is_within_trigger_window(con, account: str, ts_utc: datetime) -> tuple[bool, str]:
-    """Check if a UTC timestamp falls within any trigger window for this account.
-
-    Returns (is_within, reason).  Used as a secondary heuristic when no
-    Schwab order tag is available.
-    """
-    try:
-        import zoneinfo
-        et_tz = zoneinfo.ZoneInfo("America/New_York")
-    except ImportError:
-        et_tz = timezone(timedelta(hours=-5))
-
-    if isinstance(ts_utc, str):
-        ts_utc = datetime.fromisoformat(ts_utc.replace("Z", "+00:00"))
-    if ts_utc.tzinfo is None:
-        ts_utc = ts_utc.replace(tzinfo=timezone.utc)
-
-    ts_et = ts_utc.astimezone(et_tz)
-    weekday = ts_et.weekday()
-    time_str = ts_et.strftime("%H:%M")
-
-    windows_df = query_df(
-        """SELECT strategy, start_et, end_et, rule_name
-           FROM strategy_trigger_windows
-           WHERE account = ? AND weekday = ?""",
-        [account, weekday],
-        con=con,
-    )
-
-    if windows_df.empty:
-        return False, "no_trigger_windows_defined"
-
-    for _, w in windows_df.iterrows():
-        if w["start_et"] <= time_str <= w["end_et"]:
-            return True, f"within_{w['rule_name']}"
-
-    return False, f"OUTSIDE_TRIGGER_WINDOW(time={time_str}ET,weekday={weekday})"
-
-
-def _classify_untracked_positions(
-    con,
-    account: str,
-    untracked_symbols: set[str],
-    report_date: str,
-) -> dict[str, tuple[str, str]]:
-    """Classify untracked broker positions by source.
-
-    Returns a dict mapping symbol → (classification, reason) where
-    classification is one of:
-      - "api_unmatched"  — API-tagged order with no internal match (real gap)
-      - "non_api"        — no API tag → manual/discretionary/legacy
-      - "unknown_source" — no order found in lookback window
-
-    Classification order:
-      1. Schwab order tag (hard provenance — definitive)
-      2. Trigger window heuristic (fallback for orders without tag data)
-    """
-    fetch_start, fetch_end = _broker_fetch_window(report_date)
-    orders_df = query_df(
-        """SELECT order_id, raw_payload
-           FROM broker_raw_orders
-           WHERE account = ?
-             AND fetched_at >= ? AND fetched_at < ?""",
-        [account, fetch_start, fetch_end],
-        con=con,
-    )
-
-    # Map symbol → (tag, first_fill_ts) from broker orders
-    symbol_info: dict[str, dict] = {}  # sym → {"tag": str|None, "fill_ts": datetime|None}
-
-    for _, row in orders_df.iterrows():
-        try:
-            payload = json.loads(row["raw_payload"]) if isinstance(row["raw_payload"], str) else row["raw_payload"]
-            tag = payload.get("tag")
-
-            order_syms = set()
-            for leg in payload.get("orderLegCollection", []):
-                sym = (leg.get("instrument", {}).get("symbol", "") or "").replace(" ", "")
-                if sym:
-                    order_syms.add(sym)
-
-            if not order_syms & untracked_symbols:
-                continue
-
-            # Get the earliest fill time for trigger-window fallback
-            earliest_fill: datetime | None = None
-            for activity in payload.get("orderActivityCollection", []):
-                if str(activity.get("activityType", "")).upper() != "EXECUTION":
-                    continue
-                for exec_leg in activity.get("executionLegs", []):
-                    fill_time_str = exec_leg.get("time", "")
-                    if not fill_time_str:
-                        continue
-                    try:
-                        fill_ts = datetime.fromisoformat(fill_time_str.replace("Z", "+00:00"))
-                        if earliest_fill is None or fill_ts < earliest_fill:
-                            earliest_fill = fill_ts
-                    except (ValueError, TypeError):
-                        pass
-
-            for sym in order_syms & untracked_symbols:
-                existing = symbol_info.get(sym)
-                # Keep the earliest fill; prefer tagged orders
-                if existing is None:
-                    symbol_info[sym] = {"tag": tag, "fill_ts": earliest_fill}
-                elif tag and not existing.get("tag"):
-                    symbol_info[sym] = {"tag": tag, "fill_ts": earliest_fill or existing.get("fill_ts")}
-                elif earliest_fill and (existing.get("fill_ts") is None or earliest_fill < existing["fill_ts"]):
-                    symbol_info[sym]["fill_ts"] = earliest_fill
-                    if tag:
-                        symbol_info[sym]["tag"] = tag
-
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    result: dict[str, tuple[str, str]] = {}
-
-    for sym in untracked_symbols:
-        info = symbol_info.get(sym)
-
-        if info is None:
-            # No order found — old position from before lookback window
-            result[sym] = ("unknown_source", "no_order_in_lookback_window")
-            continue
-
-        tag = info.get("tag")
-
-        # --- Primary signal: Schwab order tag ---
-        if tag == API_TAG:
-            result[sym] = ("api_unmatched", f"tag={tag}")
-        elif tag:
-            result[sym] = ("non_api", f"tag={tag}")
-        else:
-            # No tag — fall back to trigger window heuristic
-            fill_ts = info.get("fill_ts")
-            if fill_ts:
-                within, reason = _is_within_trigger_window(con, account, fill_ts)
-                if within:
-                    result[sym] = ("api_unmatched", f"no_tag,{reason}")
-                else:
-                    result[sym] = ("non_api", f"no_tag,{reason}")
-            else:
-                result[sym] = ("unknown_source", "no_tag,no_fill_time")
-
-    return result
+_INTERNAL_LEGS_SQL = f"""
+CREATE OR REPLACE TEMP TABLE _recon_internal_legs AS
+SELECT DISTINCT p.position_id, p.account, replace(l.osi, ' ', '') AS osi
+FROM positions p
+JOIN position_legs l ON l.position_id = p.position_id
+WHERE p.lifecycle_state IN {_OPEN_STATES}
+  AND replace(l.osi, ' ', '') <> ''
+"""
 
+# Open positions with at least one leg missing at the broker (anti-join).
+_MISSING_AT_BROKER_SQL = """
+SELECT i.account, i.position_id,
+       bool_and(b.symbol IS NULL) AS all_gone,
+       list(i.osi ORDER BY i.osi) FILTER (WHERE b.symbol IS NULL) AS missing
+FROM _recon_internal_legs i
+LEFT JOIN _recon_broker_positions b
+  ON b.account = i.account AND b.symbol = i.osi
+GROUP BY ALL
+HAVING count(*) FILTER (WHERE b.symbol IS NULL) > 0
+ORDER BY i.account, i.position_id
+"""
 
-# ---------------------------------------------------------------------------
-# Check 2: Position match
-# ---------------------------------------------------------------------------
+# Broker symbols with no open internal leg, classified by source:
+#   api_unmatched  — API-tagged order with no internal match (real gap)
+#   non_api        — no API tag → manual/discretionary/legacy
+#   unknown_source — no order found in lookback window
+# The Schwab order tag is definitive; untagged orders fall back to the
+# strategy trigger windows (fill time in ET vs the account's windows for
+# that weekday).  When several orders traded a symbol, tagged orders win,
+# then the earliest fill.
+_UNTRACKED_SQL = """
+WITH untracked AS (
+    SELECT b.account, b.symbol
+    FROM _recon_broker_positions b
+    ANTI JOIN _recon_internal_legs i ON i.account = b.account AND i.osi = b.symbol
+),
+orders AS (
+    SELECT account,
+           NULLIF(raw_payload->>'tag', '') AS tag,
+           json_extract_string(raw_payload, '$.orderLegCollection[*].instrument.symbol') AS symbols,
+           list_min(list_transform(
+               flatten(list_transform(
+                   list_filter(json_extract(raw_payload, '$.orderActivityCollection[*]'),
+                               a -> upper(coalesce(a->>'activityType', '')) = 'EXECUTION'),
+                   a -> json_extract_string(a, '$.executionLegs[*].time'))),
+               t -> TRY_CAST(t AS TIMESTAMPTZ))) AS fill_ts
+    FROM broker_raw_orders
+    WHERE fetched_at >= ? AND fetched_at < ?
+      AND account IN (SELECT account FROM untracked)
+),
+order_symbols AS (
+    SELECT account, tag, fill_ts, replace(unnest(symbols), ' ', '') AS symbol
+    FROM orders
+),
+info AS (
+    SELECT u.account, u.symbol,
+           count(o.symbol) AS n_orders,
+           coalesce(arg_min(o.tag, o.fill_ts) FILTER (WHERE o.tag IS NOT NULL),
+                    min(o.tag)) AS tag,
+           min(o.fill_ts) AS fill_ts
+    FROM untracked u
+    LEFT JOIN order_symbols o ON o.account = u.account AND o.symbol = u.symbol
+    GROUP BY ALL
+),
+local AS (
+    SELECT *,
+           timezone('America/New_York', fill_ts) AS ts_et,
+           strftime(timezone('America/New_York', fill_ts), '%H:%M') AS time_et,
+           isodow(timezone('America/New_York', fill_ts)) - 1 AS weekday
+    FROM info
+),
+windows AS (
+    SELECT l.account, l.symbol,
+           min(w.rule_name) FILTER (WHERE w.start_et <= l.time_et AND l.time_et <= w.end_et) AS rule_name
+    FROM local l
+    JOIN strategy_trigger_windows w ON w.account = l.account AND w.weekday = l.weekday
+    WHERE l.n_orders > 0 AND l.tag IS NULL AND l.fill_ts IS NOT NULL
+    GROUP BY ALL
+),
+classified AS (
+    SELECT l.account, l.symbol,
+           CASE WHEN l.n_orders = 0 THEN 'unknown_source'
+                WHEN l.tag = ? THEN 'api_unmatched'
+                WHEN l.tag IS NOT NULL THEN 'non_api'
+                WHEN l.fill_ts IS NULL THEN 'unknown_source'
+                WHEN w.rule_name IS NOT NULL THEN 'api_unmatched'
+                ELSE 'non_api' END AS classification,
+           CASE WHEN l.n_orders = 0 THEN 'no_order_in_lookback_window'
+                WHEN l.tag IS NOT NULL THEN 'tag=' || l.tag
+                WHEN l.fill_ts IS NULL THEN 'no_tag,no_fill_time'
+                WHEN w.rule_name IS NOT NULL THEN 'no_tag,within_' || w.rule_name
+                WHEN w.account IS NULL THEN 'no_tag,no_trigger_windows_defined'
+                ELSE 'no_tag,OUTSIDE_TRIGGER_WINDOW(time=' || l.time_et
+                     || 'ET,weekday=' || l.weekday || ')' END AS reason
+    FROM local l
+    LEFT JOIN windows w ON w.account = l.account AND w.symbol = l.symbol
+)
+SELECT account, classification,
+       count(*) AS n,
+       list(symbol ORDER BY symbol)[1:5] AS symbols,
+       list(DISTINCT reason ORDER BY reason) AS reasons
+FROM classified
+GROUP BY ALL
+ORDER BY account, classification
+"""
 
-def _check_position_match(con, recon_run_id: str, report_date: str) -> dict:
+_UNTRACKED_ISSUES = {
+    "api_unmatched": (
+        "WARNING", "not found",
+        "Account {acct}: {n} API-tagged position(s) at broker but not tracked internally",
+    ),
+    "non_api": (
+        "INFO", "non_api",
+        "Account {acct}: {n} non-API broker position(s) (manual/discretionary/legacy)",
+    ),
+    "unknown_source": (
+        "INFO", "unknown_source",
+        "Account {acct}: {n} broker position(s) with no order in lookback window (likely legacy)",
+    ),
+}
+
+
+def _check_position_match(con, recon_run_id: str, report_date: str,
+                          issues: list | None = None) -> dict:
     """Compare internal open positions against latest broker position snapshot.
 
     Flags:
-    - Positions open internally but missing from broker
-    - Positions at broker but missing internally
+    - Positions open internally but missing from broker (auto-closed when
+      every leg is gone)
+    - Positions at broker but missing internally, classified by source
     """
-    stats = {"checks": 0, "issues": 0}
-
-    # Internal open positions
-    internal_df = query_df(
-        """SELECT position_id, strategy, account, qty
-           FROM positions
-           WHERE lifecycle_state IN ('OPEN', 'PARTIALLY_OPEN', 'PARTIALLY_CLOSED')""",
-        con=con,
-    )
+    stats = {"checks": 1, "issues": 0}
 
-    # Latest broker position snapshots (most recent per account)
     fetch_start, fetch_end = _broker_fetch_window(report_date)
-    broker_df = query_df(
-        """SELECT account, raw_payload, fetched_at
-           FROM broker_raw_positions
-           WHERE fetched_at >= ? AND fetched_at < ?
-           ORDER BY fetched_at DESC""",
-        [fetch_start, fetch_end], con=con,
-    )
-
-    stats["checks"] += 1
+    broker_accounts = {r[0] for r in con.execute(
+        """SELECT DISTINCT account FROM broker_raw_positions
+           WHERE fetched_at >= ? AND fetched_at < ?""",
+        [fetch_start, fetch_end],
+    ).fetchall()}
 
-    if broker_df.empty:
+    if not broker_accounts:
         # No broker data to compare — skip rather than false-flag
         return stats
 
-    # Parse broker positions: collect all option symbols from broker
-    broker_accounts: dict[str, set] = {}
-    for _, row in broker_df.iterrows():
-        acct = row["account"]
-        if acct in broker_accounts:
-            continue  # already processed latest snapshot for this account
-        try:
-            payload = json.loads(row["raw_payload"]) if isinstance(row["raw_payload"], str) else row["raw_payload"]
-            symbols = set()
-            # Schwab positions payload is a list of position objects
-            positions_list = payload if isinstance(payload, list) else payload.get("positions", [])
-            for pos in positions_list:
-                instrument = pos.get("instrument", {})
-                sym = instrument.get("symbol", "")
-                if sym:
-                    symbols.add(sym.replace(" ", ""))
-            broker_accounts[acct] = symbols
-        except (json.JSONDecodeError, TypeError):
-            broker_accounts[acct] = set()
-
-    # Build internal position OSIs per account, tracking position_id → legs
-    internal_by_account: dict[str, set] = {}
-    position_legs_map: dict[str, dict] = {}  # position_id → {"account": str, "osis": set[str]}
-    for _, row in internal_df.iterrows():
-        acct = row["account"]
-        pid = row["position_id"]
-        legs_df = query_df(
-            "SELECT osi FROM position_legs WHERE position_id = ?",
-            [pid], con=con,
-        )
-        osis = set()
-        for _, leg in legs_df.iterrows():
-            osi = leg["osi"].replace(" ", "")
-            if osi:
-                osis.add(osi)
-        internal_by_account.setdefault(acct, set()).update(osis)
-        position_legs_map[pid] = {"account": acct, "osis": osis}
-
-    # Compare per account
-    for acct in set(internal_by_account) | set(broker_accounts):
-        stats["checks"] += 1
-        int_syms = internal_by_account.get(acct, set())
-        brk_syms = broker_accounts.get(acct, set())
-
-        # Internal but not at broker — auto-close positions whose legs are all gone
-        missing_at_broker = int_syms - brk_syms
-        if missing_at_broker:
-            closed_pids: list[str] = []
-            remaining_syms: set[str] = set()
-
-            for pid, info in position_legs_map.items():
-                if info["account"] != acct:
-                    continue
-                if not info["osis"]:
-                    continue
-                # All legs of this position are gone from broker → close it
-                if info["osis"] <= missing_at_broker:
-                    ok = transition_state(
-                        con, pid, "CLOSED", closure_reason="MANUAL",
-                    )
-                    if ok:
-                        closed_pids.append(pid)
-                    else:
-                        remaining_syms.update(info["osis"] & missing_at_broker)
-                else:
-                    # Partial — some legs still at broker, some not
-                    remaining_syms.update(info["osis"] & missing_at_broker)
-
-            if closed_pids:
-                _record_issue(
-                    con, recon_run_id,
-                    check_type="position_match",
-                    entity_type="position",
-                    severity="INFO",
-                    message=(
-                        f"Account {acct}: auto-closed {len(closed_pids)} position(s) "
-                        f"no longer at broker (manual/expiry close)"
-                    ),
-                    entity_id=acct,
-                    internal_value=",".join(closed_pids[:5]),
-                    broker_value="not found",
-                    classification="broker_closed",
-                    classification_reason="all_legs_gone_from_broker",
-                )
-                stats["issues"] += 1
-                stats.setdefault("auto_closed", 0)
-                stats["auto_closed"] += len(closed_pids)
-
-            if remaining_syms:
-                _record_issue(
-                    con, recon_run_id,
-                    check_type="position_match",
-                    entity_type="position",
-                    severity="ERROR",
-                    message=f"Account {acct}: {len(remaining_syms)} position leg(s) open internally but not at broker",
-                    entity_id=acct,
-                    internal_value=",".join(sorted(remaining_syms)[:5]),
-                    broker_value="not found",
-                )
-                stats["issues"] += 1
-
-        # At broker but not internal — classify by source
-        missing_internally = brk_syms - int_syms
-        if missing_internally:
-            classified = _classify_untracked_positions(
-                con, acct, missing_internally, report_date,
-            )
-
-            # Group symbols by classification
-            buckets: dict[str, list[tuple[str, str]]] = {}
-            for sym, (cls, reason) in classified.items():
-                buckets.setdefault(cls, []).append((sym, reason))
-
-            # api_unmatched: API-tagged but no internal match → real tracking gap
-            api_syms = buckets.get("api_unmatched", [])
-            if api_syms:
-                syms = [s for s, _ in api_syms]
-                reasons = sorted({r for _, r in api_syms})
-                _record_issue(
-                    con, recon_run_id,
-                    check_type="position_match",
-                    entity_type="position",
-                    severity="WARNING",
-                    message=f"Account {acct}: {len(api_syms)} API-tagged position(s) at broker but not tracked internally",
-                    entity_id=acct,
-                    internal_value="not found",
-                    broker_value=",".join(sorted(syms)[:5]),
-                    classification="api_unmatched",
-                    classification_reason="; ".join(reasons),
-                )
-                stats["issues"] += 1
-
-            # non_api: non-API tag or outside trigger windows → discretionary/manual
-            non_api_syms = buckets.get("non_api", [])
-            if non_api_syms:
-                syms = [s for s, _ in non_api_syms]
-                reasons = sorted({r for _, r in non_api_syms})
-                _record_issue(
-                    con, recon_run_id,
-                    check_type="position_match",
-                    entity_type="position",
-                    severity="INFO",
-                    message=(
-                        f"Account {acct}: {len(non_api_syms)} non-API broker position(s) "
-                        f"(manual/discretionary/legacy)"
-                    ),
-                    entity_id=acct,
-                    internal_value="non_api",
-                    broker_value=",".join(sorted(syms)[:5]),
-                    classification="non_api",
-                    classification_reason="; ".join(reasons),
-                )
-                stats["issues"] += 1
-
-            # unknown_source: no order found in lookback window
-            unknown_syms = buckets.get("unknown_source", [])
-            if unknown_syms:
-                syms = [s for s, _ in unknown_syms]
-                reasons = sorted({r for _, r in unknown_syms})
-                _record_issue(
-                    con, recon_run_id,
-                    check_type="position_match",
-                    entity_type="position",
-                    severity="INFO",
-                    message=(
-                        f"Account {acct}: {len(unknown_syms)} broker position(s) "
-                        f"with no order in lookback window (likely legacy)"
-                    ),
-                    entity_id=acct,
-                    internal_value="unknown_source",
-                    broker_value=",".join(sorted(syms)[:5]),
-                    classification="unknown_source",
-                    classification_reason="; ".join(reasons),
-                )
-                stats["issues"] += 1
+    internal_accounts = {r[0] for r in con.execute(
+        f"SELECT DISTINCT account FROM positions WHERE lifecycle_state IN {_OPEN_STATES}"
+    ).fetchall()}
+    stats["checks"] += len(broker_accounts | internal_accounts)
 
-    return stats
+    con.execute(_BROKER_POSITIONS_SQL, [fetch_start, fetch_end])
+    con.execute(_INTERNAL_LEGS_SQL)
 
+    found = []
 
-# ---------------------------------------------------------------------------
-# Check 3: Cash match
-# ---------------------------------------------------------------------------
+    # Internal but not at broker — auto-close positions whose legs are all gone
+    closed: dict[str, list[str]] = {}
+    remaining: dict[str, set[str]] = {}
+    for acct, pid, all_gone, missing in con.execute(_MISSING_AT_BROKER_SQL).fetchall():
+        if all_gone and transition_state(con, pid, "CLOSED", closure_reason="MANUAL"):
+            closed.setdefault(acct, []).append(pid)
+        else:
+            remaining.setdefault(acct, set()).update(missing)
+
+    for acct, pids in closed.items():
+        found.append({
+            "check_type": "position_match",
+            "entity_type": "position",
+            "severity": "INFO",
+            "message": (
+                f"Account {acct}: auto-closed {len(pids)} position(s) "
+                f"no longer at broker (manual/expiry close)"
+            ),
+            "entity_id": acct,
+            "internal_value": ",".join(pids[:5]),
+            "broker_value": "not found",
+            "classification": "broker_closed",
+            "classification_reason": "all_legs_gone_from_broker",
+        })
+        stats["auto_closed"] = stats.get("auto_closed", 0) + len(pids)
+
+    for acct, syms in remaining.items():
+        found.append({
+            "check_type": "position_match",
+            "entity_type": "position",
+            "severity": "ERROR",
+            "message": f"Account {acct}: {len(syms)} position leg(s) open internally but not at broker",
+            "entity_id": acct,
+            "internal_value": ",".join(sorted(syms)[:5]),
+            "broker_value": "not found",
+        })
 
-def _check_cash_match(con, recon_run_id: str, report_date: str) -> dict:
-    """Compare account_snapshots against broker_raw_cash for the day.
+    # At broker but not internal — one grouped issue per classification
+    untracked = con.execute(
+        _UNTRACKED_SQL, [fetch_start, fetch_end, API_TAG],
+    ).fetchall()
+    for acct, cls, n, syms, reasons in untracked:
+        severity, internal_value, template = _UNTRACKED_ISSUES[cls]
+        found.append({
+            "check_type": "position_match",
+            "entity_type": "position",
+            "severity": severity,
+            "message": template.format(acct=acct, n=n),
+            "entity_id": acct,
+            "internal_value": internal_value,
+            "broker_value": ",".join(syms),
+            "classification": cls,
+            "classification_reason": "; ".join(reasons),
+        })
 
-    Flags material differences (> $50) in cash or net_liq.
-    """
-    stats = {"checks": 0, "issues": 0}
-    CASH_TOLERANCE = 50.0
-
-    snapshots_df = query_df(
-        """SELECT account, cash, net_liq
-           FROM account_snapshots
-           WHERE snapshot_date = ?""",
-        [report_date], con=con,
-    )
+    stats["issues"] = len(found)
+    _emit(con, recon_run_id, found, issues)
+    return stats
 
-    fetch_start, fetch_end = _broker_fetch_window(report_date)
-    broker_cash_df = query_df(
-        """SELECT account, raw_payload
-           FROM broker_raw_cash
-           WHERE fetched_at >= ? AND fetched_at < ?
-           ORDER BY fetched_at DESC""",
-        [fetch_start, fetch_end], con=con,
-    )
 
-    stats["checks"] += 1
+# ---------------------------------------------------------------------------
+# Check 3: Cash match
+# ---------------------------------------------------------------------------
 
-    if snapshots_df.empty or broker_cash_df.empty:
-        return stats
+CASH_TOLERANCE = 50.0
+
+# broker_raw_cash.raw_payload is stored by broker_sync_schwab as:
+#   {"currentBalances": {...}, "initialBalances": {...}, "projectedBalances": {...}}
+# The actual cash/net_liq values live inside currentBalances.
+_CASH_MATCH_SQL = f"""
+WITH latest AS (
+    SELECT account, {_FETCH_DATE_SQL} AS report_date,
+           raw_payload->'currentBalances' AS cur
+    FROM broker_raw_cash
+    WHERE fetched_at >= ? AND fetched_at < ? AND {_IN_FETCH_WINDOW_SQL}
+    QUALIFY row_number() OVER (PARTITION BY account, report_date ORDER BY fetched_at DESC) = 1
+),
+broker AS (
+    SELECT account, report_date,
+           coalesce(TRY_CAST(CASE WHEN json_exists(cur, '$.cashBalance') THEN cur->>'cashBalance'
+                                  ELSE cur->>'cashAvailableForTrading' END AS DOUBLE), 0) AS cash,
+           coalesce(TRY_CAST(cur->>'liquidationValue' AS DOUBLE), 0) AS net_liq
+    FROM latest
+)
+SELECT s.snapshot_date, s.account,
+       coalesce(s.cash, 0) AS int_cash, b.cash AS brk_cash,
+       coalesce(s.net_liq, 0) AS int_nl, b.net_liq AS brk_nl
+FROM account_snapshots s
+JOIN broker b ON b.account = s.account AND b.report_date = s.snapshot_date
+WHERE s.snapshot_date BETWEEN ? AND ?
+ORDER BY s.snapshot_date, s.account
+"""
 
-    # Build broker cash lookup (latest per account)
-    # broker_raw_cash.raw_payload is stored by broker_sync_schwab as:
-    #   {"currentBalances": {...}, "initialBalances": {...}, "projectedBalances": {...}}
-    # The actual cash/net_liq values live inside currentBalances.
-    broker_cash: dict[str, dict] = {}
-    for _, row in broker_cash_df.iterrows():
-        acct = row["account"]
-        if acct in broker_cash:
-            continue
-        try:
-            payload = json.loads(row["raw_payload"]) if isinstance(row["raw_payload"], str) else row["raw_payload"]
-            current = payload.get("currentBalances", {})
-            broker_cash[acct] = {
-                "cash": float(current.get("cashBalance", current.get("cashAvailableForTrading", 0)) or 0),
-                "net_liq": float(current.get("liquidationValue", 0) or 0),
-            }
-        except (json.JSONDecodeError, TypeError, ValueError):
-            pass
-
-    # Compare
-    for _, snap in snapshots_df.iterrows():
-        acct = snap["account"]
-        if acct not in broker_cash:
-            continue
 
-        stats["checks"] += 1
-        brk = broker_cash[acct]
-
-        # Cash comparison
-        int_cash = float(snap["cash"] or 0)
-        brk_cash = brk["cash"]
-        if abs(int_cash - brk_cash) > CASH_TOLERANCE:
-            _record_issue(
-                con, recon_run_id,
-                check_type="cash_match",
-                entity_type="account",
-                severity="WARNING",
-                message=f"Account {acct}: cash differs by ${abs(int_cash - brk_cash):,.2f}",
-                entity_id=acct,
-                internal_value=f"${int_cash:,.2f}",
-                broker_value=f"${brk_cash:,.2f}",
-            )
-            stats["issues"] += 1
-
-        # Net liq comparison
-        int_nl = float(snap["net_liq"] or 0)
-        brk_nl = brk["net_liq"]
-        if abs(int_nl - brk_nl) > CASH_TOLERANCE:
-            _record_issue(
-                con, recon_run_id,
-                check_type="cash_match",
-                entity_type="account",
-                severity="WARNING",
-                message=f"Account {acct}: net_liq differs by ${abs(int_nl - brk_nl):,.2f}",
-                entity_id=acct,
-                internal_value=f"${int_nl:,.2f}",
-                broker_value=f"${brk_nl:,.2f}",
-            )
-            stats["issues"] += 1
+def _check_cash_match(con, recon_run_id: str, report_date: str,
+                      end_date: str | None = None, issues: list | None = None) -> dict:
+    """Compare account_snapshots against broker_raw_cash for each day.
 
+    Flags material differences (> $50) in cash or net_liq.  Covers
+    report_date..end_date (default one day); multi-day messages name the date.
+    """
+    stats = {"checks": 1, "issues": 0}
+    end_date = end_date or report_date
+    rows = con.execute(
+        _CASH_MATCH_SQL,
+        [*_fetch_range(report_date, end_date), report_date, end_date],
+    ).fetchall()
+    stats["checks"] += len(rows)
+
+    found = []
+    on_date = end_date != report_date
+    for snap_date, acct, int_cash, brk_cash, int_nl, brk_nl in rows:
+        suffix = f" on {snap_date}" if on_date else ""
+        for label, int_val, brk_val in (("cash", int_cash, brk_cash), ("net_liq", int_nl, brk_nl)):
+            if abs(int_val - brk_val) > CASH_TOLERANCE:
+                found.append({
+                    "check_type": "cash_match",
+                    "entity_type": "account",
+                    "severity": "WARNING",
+                    "message": f"Account {acct}: {label} differs by ${abs(int_val - brk_val):,.2f}{suffix}",
+                    "entity_id": acct,
+                    "internal_value": f"${int_val:,.2f}",
+                    "broker_value": f"${brk_val:,.2f}",
+                })
+
+    stats["issues"] = len(found)
+    _emit(con, recon_run_id, found, issues)
     return stats
 
 
@@ -694,86 +539,47 @@ def _check_cash_match(con, recon_run_id: str, report_date: str) -> dict:
 # Check 4: Source freshness
 # ---------------------------------------------------------------------------
 
-def _check_freshness(con, recon_run_id: str) -> dict:
+def _check_freshness(con, recon_run_id: str, issues: list | None = None) -> dict:
     """Enforce SLA on all registered sources in source_freshness table.
 
-    Marks sources as stale if last_success_at + sla_minutes < now.
+    Marks sources as stale if last_success_at + sla_minutes < now (one
+    UPDATE for every source; sources that never succeeded are stale).
     """
-    stats = {"checks": 0, "issues": 0}
-
-    df = query_df(
-        "SELECT source_name, last_success_at, sla_minutes, is_stale, error_message FROM source_freshness",
-        con=con,
-    )
-
-    if df.empty:
-        return stats
-
-    now = datetime.now(timezone.utc)
-
-    for _, row in df.iterrows():
-        stats["checks"] += 1
-        source = row["source_name"]
-        sla_min = int(row["sla_minutes"] or 60)
-
-        if row["last_success_at"] is None or pd.isna(row["last_success_at"]):
-            # Never succeeded — flag as stale
-            execute(
-                "UPDATE source_freshness SET is_stale = true WHERE source_name = ?",
-                [source], con=con,
-            )
-            _record_issue(
-                con, recon_run_id,
-                check_type="freshness",
-                entity_type="source",
-                severity="ERROR",
-                message=f"Source '{source}' has never reported success",
-                entity_id=source,
-            )
-            stats["issues"] += 1
-            continue
-
-        # Parse last_success_at
-        last_success = row["last_success_at"]
-        if isinstance(last_success, str):
-            # Handle ISO format with or without timezone
-            try:
-                last_success = datetime.fromisoformat(last_success.replace("Z", "+00:00"))
-            except ValueError:
-                continue
-        # If it's already a datetime from DuckDB
-        if not hasattr(last_success, "tzinfo") or last_success.tzinfo is None:
-            last_success = last_success.replace(tzinfo=timezone.utc)
-
-        age_minutes = (now - last_success).total_seconds() / 60
-        is_stale = age_minutes > sla_min
-
-        # Update staleness flag
-        execute(
-            "UPDATE source_freshness SET is_stale = ? WHERE source_name = ?",
-            [is_stale, source], con=con,
-        )
-
-        if is_stale:
-            _record_issue(
-                con, recon_run_id,
-                check_type="freshness",
-                entity_type="source",
-                severity="WARNING" if age_minutes < sla_min * 2 else "ERROR",
-                message=f"Source '{source}' is stale: last success {age_minutes:.0f}m ago (SLA: {sla_min}m)",
-                entity_id=source,
-                internal_value=f"{age_minutes:.0f} minutes ago",
-                broker_value=f"SLA: {sla_min} minutes",
-            )
-            stats["issues"] += 1
-        else:
-            # Clear staleness
-            execute(
-                "UPDATE source_freshness SET is_stale = false WHERE source_name = ?",
-                [source], con=con,
-            )
-
-    return stats
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = con.execute(
+        """UPDATE source_freshness
+           SET is_stale = last_success_at IS NULL
+                          OR epoch(?::TIMESTAMP - last_success_at) / 60
+                             > coalesce(NULLIF(sla_minutes, 0), 60)
+           RETURNING source_name, last_success_at,
+                     coalesce(NULLIF(sla_minutes, 0), 60), is_stale""",
+        [now],
+    ).fetchall()
+
+    found = []
+    for source, last_success, sla_min, is_stale in sorted(rows):
+        if last_success is None:
+            found.append({
+                "check_type": "freshness",
+                "entity_type": "source",
+                "severity": "ERROR",
+                "message": f"Source '{source}' has never reported success",
+                "entity_id": source,
+            })
+        elif is_stale:
+            age_minutes = (now - last_success).total_seconds() / 60
+            found.append({
+                "check_type": "freshness",
+                "entity_type": "source",
+                "severity": "WARNING" if age_minutes < sla_min * 2 else "ERROR",
+                "message": f"Source '{source}' is stale: last success {age_minutes:.0f}m ago (SLA: {sla_min}m)",
+                "entity_id": source,
+                "internal_value": f"{age_minutes:.0f} minutes ago",
+                "broker_value": f"SLA: {sla_min} minutes",
+            })
+
+    _emit(con, recon_run_id, found, issues)
+    return {"checks": len(rows), "issues": len(found)}
 
 
 # ---------------------------------------------------------------------------
@@ -791,24 +597,15 @@ def _auto_resolve_prior_items(con) -> int:
     Returns count of items resolved.
     """
     row = query_one(
-        "SELECT COUNT(*) FROM reconciliation_items WHERE status = 'UNRESOLVED'",
+        """UPDATE reconciliation_items
+           SET status = 'AUTO_RESOLVED',
+               resolved_at = ?,
+               resolution_type = 'auto_match'
+           WHERE status = 'UNRESOLVED'""",
+        [_now()],
         con=con,
     )
-    count = row[0] if row else 0
-
-    if count > 0:
-        now = _now()
-        execute(
-            """UPDATE reconciliation_items
-               SET status = 'AUTO_RESOLVED',
-                   resolved_at = ?,
-                   resolution_type = 'auto_match'
-               WHERE status = 'UNRESOLVED'""",
-            [now],
-            con=con,
-        )
-
-    return count
+    return row[0] if row else 0
 
 
 # ---------------------------------------------------------------------------
@@ -818,11 +615,15 @@ def _auto_resolve_prior_items(con) -> int:
 def run_reconciliation(
     con=None,
     report_date: date | str | None = None,
+    end_date: date | str | None = None,
 ) -> dict:
-    """Run all reconciliation checks for a given date.
+    """Run all reconciliation checks for a given date (or date range).
 
-    Creates a reconciliation_run record, executes all checks, and returns
-    a stats dict with counts.
+    Creates a reconciliation_run record, executes all checks, writes every
+    issue in one insert, and returns a stats dict with counts.  With
+    ``end_date`` the fill and cash checks cover report_date..end_date;
+    positions are current state, so they are checked against the broker
+    snapshot of end_date only.
 
     Returns:
         {"run_id": str, "checks_run": int, "issues_found": int, "auto_resolved": int, "status": str}
@@ -834,8 +635,11 @@ def run_reconciliation(
         report_date = date.today()
     if isinstance(report_date, str):
         report_date = date.fromisoformat(report_date)
+    if isinstance(end_date, str):
+        end_date = date.fromisoformat(end_date)
 
     date_str = report_date.isoformat()
+    end_str = (end_date or report_date).isoformat()
 
     # Auto-resolve prior UNRESOLVED items from earlier runs.
     # Each check re-creates issues that still exist, so any old issue not
@@ -850,37 +654,36 @@ def run_reconciliation(
         """INSERT INTO reconciliation_runs
            (id, run_date, started_at, status)
            VALUES (?, ?, ?, 'RUNNING')""",
-        [run_id, date_str, started_at],
+        [run_id, end_str, started_at],
         con=con,
     )
 
     total_checks = 0
-    total_issues = 0
+    issues: list[dict] = []
 
     # Run all checks
     checks = [
-        ("fill_match", _check_fill_match, (con, run_id, date_str)),
-        ("position_match", _check_position_match, (con, run_id, date_str)),
-        ("cash_match", _check_cash_match, (con, run_id, date_str)),
+        ("fill_match", _check_fill_match, (con, run_id, date_str, end_str)),
+        ("position_match", _check_position_match, (con, run_id, end_str)),
+        ("cash_match", _check_cash_match, (con, run_id, date_str, end_str)),
         ("freshness", _check_freshness, (con, run_id)),
     ]
 
     for name, fn, args in checks:
         try:
-            result = fn(*args)
+            result = fn(*args, issues=issues)
             total_checks += result.get("checks", 0)
-            total_issues += result.get("issues", 0)
         except Exception as e:
             # Record the check failure itself as an issue
-            _record_issue(
-                con, run_id,
-                check_type=name,
-                entity_type="system",
-                severity="ERROR",
-                message=f"Check '{name}' failed: {e}",
-            )
+            issues.append({
+                "check_type": name,
+                "entity_type": "system",
+                "severity": "ERROR",
+                "message": f"Check '{name}' failed: {e}",
+            })
             total_checks += 1
-            total_issues += 1
+
+    total_issues = _record_issues(con, run_id, issues)
 
     # Finalize the run
     execute(
@@ -1,7 +1,11 @@
 """End-to-end reporting pipeline.
 
-Runs the full chain: S3 sync → ingest → broker sync → position engine →
-P&L calculation → strategy summaries → daily report.
+Runs the chain S3 sync → ingest → broker sync → position engine →
+P&L calculation → strategy summaries → daily report as a DAG
+(reporting.pipeline_dag): S3 sync and the Schwab / TastyTrade syncs run
+concurrently, and a step is skipped when the tables it reads are
+unchanged since its last successful run, so intraday reruns only redo
+what new data touches. Per-step timings are recorded in pipeline_runs.
 
 Usage:
     python -m reporting.run_pipeline                        # today
@@ -9,6 +13,7 @@ Usage:
     python -m reporting.run_pipeline --since 2026-03-01     # backfill range
     python -m reporting.run_pipeline --no-broker-sync       # skip Schwab API
     python -m reporting.run_pipeline --save-report          # write markdown to disk
+    python -m reporting.run_pipeline --force                # rerun every step
 """
 
 from __future__ import annotations
@@ -24,10 +29,17 @@ def run_pipeline(
     since_date: date | None = None,
     broker_sync: bool = True,
     save_report: bool = False,
+    force: bool = False,
 ) -> dict:
-    """Run the full reporting pipeline. Returns aggregate stats."""
+    """Run the reporting pipeline as a DAG. Returns per-step stats.
+
+    Steps whose inputs are unchanged since their last successful run are
+    skipped (``force`` reruns everything); timings land in pipeline_runs.
+    """
 
     from reporting.db import get_connection, init_schema
+    from reporting.ingest import event_files_watermark
+    from reporting.pipeline_dag import run_steps
 
     if report_date is None:
         report_date = date.today()
@@ -37,105 +49,144 @@ def run_pipeline(
     con = get_connection()
     init_schema(con)
 
-    results = {}
     t0 = time.time()
-
-    # ── 1. Sync events from S3 ──────────────────────────────────────────
-    _step("S3 event sync")
-    try:
-        from reporting.ingest import sync_events_from_s3
-        s3_stats = sync_events_from_s3(since_date, report_date)
-        results["s3_sync"] = s3_stats
-        print(f"  downloaded {s3_stats.get('files_downloaded', 0)} files")
-    except Exception as e:
-        print(f"  WARN: S3 sync failed ({e}), continuing with local data")
-        results["s3_sync"] = {"error": str(e)}
-
-    # ── 2. Ingest events ────────────────────────────────────────────────
-    _step("Event ingestion")
-    try:
-        from reporting.ingest import ingest_all_pending
-        ingest_stats = ingest_all_pending(con)
-        results["ingest"] = ingest_stats
-        print(f"  {ingest_stats.get('inserted', 0)} new events, "
-              f"{ingest_stats.get('duplicates', 0)} duplicates")
-    except Exception as e:
-        print(f"  WARN: Ingestion failed ({e})")
-        results["ingest"] = {"error": str(e)}
-
-    # ── 3. Broker sync (optional) ───────────────────────────────────────
-    if broker_sync:
-        _step("Schwab broker sync")
-        try:
-            from reporting.broker_sync_schwab import sync_schwab
-            broker_stats = sync_schwab(con, as_of_date=report_date)
-            results["broker_sync"] = broker_stats
-            print(f"  orders: {broker_stats.get('orders', 0)}, "
-                  f"fills: {broker_stats.get('fills', 0)}, "
-                  f"positions: {broker_stats.get('positions', 0)}")
-        except Exception as e:
-            print(f"  WARN: Broker sync failed ({e})")
-            results["broker_sync"] = {"error": str(e)}
-    else:
+    steps = _pipeline_steps(report_date, since_date, broker_sync, save_report)
+    if not broker_sync:
         print("[skip] Broker sync disabled")
+    run = run_steps(
+        con, steps,
+        watermarks={"event_files": lambda _cur: event_files_watermark()},
+        force=force,
+    )
+
+    results = dict(run["steps"])
+    results["run_id"] = run["run_id"]
+    results["status"] = run["status"]
+    results["timings"] = run["timings"]
 
-    # ── 4. Position engine ──────────────────────────────────────────────
-    _step("Position engine")
-    from reporting.position_engine import materialize_positions, process_expiries
+    # ── Summary ─────────────────────────────────────────────────────────
+    elapsed = time.time() - t0
+    results["elapsed_seconds"] = round(elapsed, 1)
+    skipped = sum(1 for status in run["status"].values() if status == "SKIPPED")
+    print(f"\n{'='*50}")
+    print(f"Pipeline complete in {elapsed:.1f}s ({skipped}/{len(steps)} steps skipped)")
+    print(f"{'='*50}")
 
-    new_positions = materialize_positions(con)
-    expired = process_expiries(con, as_of_date=report_date)
-    results["positions"] = {"new": new_positions, "expired": expired}
-    print(f"  {new_positions} new positions, {expired} expired")
+    return results
 
-    # ── 5. P&L calculation ──────────────────────────────────────────────
-    _step("P&L calculation")
-    from reporting.pnl import compute_all_pnl
 
-    pnl_stats = compute_all_pnl(con, as_of_date=report_date)
-    results["pnl"] = pnl_stats
-    print(f"  {pnl_stats['computed']} computed, "
-          f"{pnl_stats['skipped_no_settlement']} missing settlement")
+def _pipeline_steps(
+    report_date: date,
+    since_date: date,
+    broker_sync: bool,
+    save_report: bool,
+) -> list:
+    """S3 sync → ingest, Schwab / TT sync → broker_orders, then positions →
+    P&L → summaries → report. Each step runs on its own DuckDB cursor."""
 
-    # ── 6. Strategy summaries ───────────────────────────────────────────
-    _step("Strategy summaries")
-    from reporting.strategy_summary import materialize_all
+    from reporting.pipeline_dag import Step
 
-    summary_stats = materialize_all(con, since_date=since_date)
-    results["summaries"] = summary_stats
-    print(f"  {summary_stats['strategy_daily_rows']} strategy rows, "
-          f"{summary_stats['portfolio_daily_rows']} portfolio rows")
+    # ── Sync events from S3 ─────────────────────────────────────────────
+    def s3_sync(con):
+        from reporting.ingest import sync_events_from_s3
+        s3_stats = sync_events_from_s3(since_date, report_date)
+        print(f"  S3: downloaded {s3_stats.get('downloaded', 0)} files")
+        return s3_stats
 
-    # ── 7. Daily report ─────────────────────────────────────────────────
-    _step("Daily report")
-    try:
+    # ── Ingest events ───────────────────────────────────────────────────
+    def ingest(con):
+        from reporting.ingest import ingest_all_pending
+        ingest_stats = ingest_all_pending(con)
+        print(f"  ingest: {ingest_stats.get('inserted', 0)} new events, "
+              f"{ingest_stats.get('duplicates', 0)} duplicates")
+        return ingest_stats
+
+    # ── Broker sync (optional) ──────────────────────────────────────────
+    def schwab_sync(con):
+        from reporting.broker_sync_schwab import sync_schwab
+        broker_stats = sync_schwab(con, as_of_date=report_date, normalize=False)
+        print(f"  schwab: orders: {broker_stats.get('orders', 0)}, "
+              f"positions: {broker_stats.get('positions', 0)}")
+        return broker_stats
+
+    def tt_sync(con):
+        from reporting.broker_sync_tt import sync_tt
+        tt_stats = sync_tt(con, as_of_date=report_date, normalize=False)
+        print(f"  tastytrade: {len(tt_stats)} account(s)")
+        return tt_stats
+
+    def broker_orders(con):
+        from reporting.broker_orders import normalize_broker_orders
+        return normalize_broker_orders(con)
+
+    # ── Position engine ─────────────────────────────────────────────────
+    def positions(con):
+        from reporting.position_engine import materialize_positions, process_expiries
+        new_positions = materialize_positions(con)
+        expired = process_expiries(con, as_of_date=report_date)
+        print(f"  positions: {new_positions} new, {expired} expired")
+        return {"new": new_positions, "expired": expired}
+
+    # ── P&L calculation ─────────────────────────────────────────────────
+    def pnl(con):
+        from reporting.pnl import compute_all_pnl
+        pnl_stats = compute_all_pnl(con, as_of_date=report_date)
+        print(f"  P&L: {pnl_stats['computed']} computed, "
+              f"{pnl_stats['skipped_no_settlement']} missing settlement")
+        return pnl_stats
+
+    # ── Strategy summaries ──────────────────────────────────────────────
+    def summaries(con):
+        from reporting.strategy_summary import materialize_all
+        summary_stats = materialize_all(con, since_date=since_date)
+        print(f"  summaries: {summary_stats['strategy_daily_rows']} strategy rows, "
+              f"{summary_stats['portfolio_daily_rows']} portfolio rows")
+        return summary_stats
+
+    # ── Daily report ────────────────────────────────────────────────────
+    def report(con):
         from reporting.daily_report import generate_report
         report_md = generate_report(report_date, con)
-        results["report"] = {"generated": True, "length": len(report_md)}
-        print(f"  generated ({len(report_md)} chars)")
-
+        print(f"  report: generated ({len(report_md)} chars)")
         if save_report:
             out_dir = Path(__file__).parent / "data" / "reports"
             out_dir.mkdir(parents=True, exist_ok=True)
             out_path = out_dir / f"daily_{report_date.isoformat()}.md"
             out_path.write_text(report_md)
             print(f"  saved to {out_path}")
-    except Exception as e:
-        print(f"  WARN: Report generation failed ({e})")
-        results["report"] = {"error": str(e)}
-
-    # ── Summary ─────────────────────────────────────────────────────────
-    elapsed = time.time() - t0
-    results["elapsed_seconds"] = round(elapsed, 1)
-    print(f"\n{'='*50}")
-    print(f"Pipeline complete in {elapsed:.1f}s")
-    print(f"{'='*50}")
-
-    return results
-
-
-def _step(name: str):
-    print(f"\n[{name}]")
+        return {"generated": True, "length": len(report_md)}
+
+    broker_raw = ("broker_raw_orders", "broker_raw_fills", "broker_raw_positions",
+                  "broker_raw_cash", "account_snapshots", "source_freshness")
+    steps = [
+        Step("s3_sync", s3_sync, outputs=("event_files",)),
+        Step("ingest", ingest, inputs=("event_files",),
+             outputs=("raw_events", "ingest_ledger", "strategy_runs",
+                      "intended_trades", "order_events", "fills")),
+    ]
+    if broker_sync:
+        steps += [
+            Step("schwab_sync", schwab_sync, outputs=broker_raw),
+            Step("tt_sync", tt_sync, outputs=broker_raw),
+        ]
+    steps += [
+        Step("broker_orders", broker_orders, inputs=("broker_raw_orders",),
+             outputs=("broker_orders", "broker_order_legs"),
+             after=("schwab_sync", "tt_sync")),
+        Step("positions", positions,
+             inputs=("strategy_runs", "intended_trades", "fills", "positions"),
+             outputs=("positions", "position_legs", "position_relationships"),
+             params=(report_date,), fatal=True),
+        Step("pnl", pnl,
+             inputs=("positions", "position_legs", "strategy_signal_rows"),
+             outputs=("positions",), params=(report_date,), fatal=True),
+        Step("summaries", summaries, inputs=("positions", "strategy_runs"),
+             outputs=("strategy_daily", "portfolio_daily", "pnl_daily_mart"),
+             params=(since_date, date.today()), fatal=True),
+        Step("report", report,
+             after=("broker_orders", "positions", "pnl", "summaries")),
+    ]
+    return steps
 
 
 # ---------------------------------------------------------------------------
@@ -151,9 +202,11 @@ def main():
     parser.add_argument("--since", type=str, default=None,
                         help="Start date for backfill (YYYY-MM-DD)")
     parser.add_argument("--no-broker-sync", action="store_true",
-                        help="Skip Schwab API sync")
+                        help="Skip Schwab / TastyTrade API sync")
     parser.add_argument("--save-report", action="store_true",
                         help="Save markdown report to disk")
+    parser.add_argument("--force", action="store_true",
+                        help="Rerun every step even if its inputs are unchanged")
     args = parser.parse_args()
 
     report_date = date.fromisoformat(args.date) if args.date else None
@@ -164,6 +217,7 @@ def main():
         since_date=since_date,
         broker_sync=not args.no_broker_sync,
         save_report=args.save_report,
+        force=args.force,
     )
 
 
@@ -23,6 +23,18 @@ CREATE TABLE IF NOT EXISTS raw_events (
 CREATE UNIQUE INDEX IF NOT EXISTS idx_raw_events_idem
     ON raw_events (idempotency_key);
 
+-- Ingest ledger: how far each event file has been ingested. Event files are
+-- append-only, so a file whose size matches is skipped and a grown file is
+-- read from byte_offset. tail_hash covers the last bytes before byte_offset
+-- and detects files rewritten in place (re-read from 0; raw_events dedups).
+CREATE TABLE IF NOT EXISTS ingest_ledger (
+    path              VARCHAR PRIMARY KEY,
+    size_bytes        BIGINT NOT NULL,
+    byte_offset       BIGINT NOT NULL,       -- end of the last complete line ingested
+    tail_hash         VARCHAR NOT NULL,      -- sha256 of bytes [offset - 4096, offset)
+    ingested_at       TIMESTAMP DEFAULT current_timestamp
+);
+
 -- =========================================================================
 -- STRATEGY RUNS (Phase 2 — materialized from raw_events)
 -- =========================================================================
@@ -232,6 +244,62 @@ CREATE TABLE IF NOT EXISTS broker_raw_cash (
     raw_payload       JSON NOT NULL
 );
 
+-- =========================================================================
+-- BROKER ORDERS (typed, exploded from broker_raw_orders at sync time)
+-- =========================================================================
+
+-- Latest fetched version of each order (reporting/broker_orders.py)
+CREATE TABLE IF NOT EXISTS broker_orders (
+    account           VARCHAR NOT NULL,
+    order_id          VARCHAR NOT NULL,
+    broker            VARCHAR NOT NULL,      -- schwab, tastytrade
+    raw_id            VARCHAR NOT NULL,      -- broker_raw_orders.id of this version
+    fetched_at        TIMESTAMP NOT NULL,
+    account_number    VARCHAR,
+    status            VARCHAR,               -- upper-cased broker status: FILLED, CANCELED, ...
+    tag               VARCHAR,
+    order_type        VARCHAR,               -- NET_DEBIT, NET_CREDIT, LIMIT, ...
+    strategy_type     VARCHAR,               -- Schwab complexOrderStrategyType
+    price_effect      VARCHAR,               -- DEBIT, CREDIT
+    price             DOUBLE,
+    quantity          DOUBLE,
+    filled_qty        DOUBLE,
+    n_legs            INTEGER,
+    entered_at        TIMESTAMP,             -- UTC
+    closed_at         TIMESTAMP,             -- UTC
+    first_fill_at     TIMESTAMP,             -- UTC, earliest execution
+    trade_date        DATE,                  -- ET date of entered_at
+    PRIMARY KEY (account, order_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_broker_orders_date
+    ON broker_orders (account, trade_date);
+
+CREATE TABLE IF NOT EXISTS broker_order_legs (
+    account           VARCHAR NOT NULL,
+    order_id          VARCHAR NOT NULL,
+    leg_index         INTEGER NOT NULL,      -- 0-based position in the order
+    trade_date        DATE,
+    symbol            VARCHAR,               -- as sent by the broker
+    osi               VARCHAR,               -- symbol with spaces removed
+    underlying        VARCHAR,               -- OSI root: SPX, SPXW, ...
+    expiry            DATE,
+    option_type       VARCHAR,               -- PUT, CALL
+    strike            DOUBLE,
+    instruction       VARCHAR,               -- BUY_TO_OPEN, SELL_TO_CLOSE, ...
+    qty               DOUBLE,
+    filled_qty        DOUBLE,
+    fill_price        DOUBLE,                -- quantity-weighted execution price
+    last_fill_at      TIMESTAMP,             -- UTC
+    PRIMARY KEY (account, order_id, leg_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_broker_order_legs_date
+    ON broker_order_legs (account, trade_date);
+
+CREATE INDEX IF NOT EXISTS idx_broker_order_legs_osi
+    ON broker_order_legs (osi);
+
 -- =========================================================================
 -- ACCOUNT SNAPSHOTS (Phase 4)
 -- =========================================================================
@@ -428,6 +496,15 @@ CREATE TABLE IF NOT EXISTS strategy_signal_rows (
 CREATE UNIQUE INDEX IF NOT EXISTS idx_strategy_signal_rows_key
     ON strategy_signal_rows (strategy, source, trade_date, expiry_date);
 
+-- SPX settlement index (mirror of reporting/settlement_index.py)
+CREATE TABLE IF NOT EXISTS settlement_index (
+    settle_date       DATE NOT NULL,
+    source            VARCHAR NOT NULL,      -- local_features, local_close5, s3_features, s3_close5, leo_forward, schwab_close
+    price             DOUBLE NOT NULL,
+    recorded_at       TIMESTAMP DEFAULT current_timestamp,
+    PRIMARY KEY (settle_date, source)
+);
+
 -- Portfolio daily rollup
 CREATE TABLE IF NOT EXISTS portfolio_daily (
     id                VARCHAR PRIMARY KEY,
@@ -449,6 +526,32 @@ CREATE TABLE IF NOT EXISTS portfolio_daily (
 CREATE UNIQUE INDEX IF NOT EXISTS idx_portfolio_daily_date
     ON portfolio_daily (report_date);
 
+-- Daily realized P&L mart with running window columns (reporting/pnl_mart.py)
+CREATE TABLE IF NOT EXISTS pnl_daily_mart (
+    source            VARCHAR NOT NULL,      -- broker_pnl (daily email), positions (daily report)
+    book              VARCHAR NOT NULL,      -- strategy or rollup (portfolio)
+    account           VARCHAR NOT NULL,
+    settle_date       DATE NOT NULL,
+    trades            INTEGER NOT NULL,
+    wins              INTEGER NOT NULL,
+    pnl               DOUBLE NOT NULL,
+    cum_trades        INTEGER NOT NULL,
+    cum_wins          INTEGER NOT NULL,
+    equity            DOUBLE NOT NULL,       -- cumulative realized P&L
+    peak              DOUBLE NOT NULL,
+    drawdown          DOUBLE NOT NULL,
+    max_drawdown      DOUBLE NOT NULL,
+    mtd_equity        DOUBLE NOT NULL,       -- equity curve restarted each month
+    mtd_peak          DOUBLE NOT NULL,
+    mtd_max_drawdown  DOUBLE NOT NULL,
+    ytd_equity        DOUBLE NOT NULL,       -- equity curve restarted each year
+    ytd_peak          DOUBLE NOT NULL,
+    ytd_max_drawdown  DOUBLE NOT NULL,
+    streak            INTEGER NOT NULL,      -- +n = n straight wins, -n = n straight losses
+    updated_at        TIMESTAMP DEFAULT current_timestamp,
+    PRIMARY KEY (source, book, account, settle_date)
+);
+
 -- Daily diary
 CREATE TABLE IF NOT EXISTS daily_diary (
     id                VARCHAR PRIMARY KEY,
@@ -493,3 +596,20 @@ CREATE TABLE IF NOT EXISTS daily_report_outputs (
     generated_at      TIMESTAMP DEFAULT current_timestamp,
     trust_banner      VARCHAR               -- GREEN, YELLOW, RED
 );
+
+-- Pipeline step runs (reporting.pipeline_dag): timings + input fingerprints
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    run_id            VARCHAR NOT NULL,
+    step              VARCHAR NOT NULL,
+    status            VARCHAR NOT NULL,      -- OK, SKIPPED, ERROR
+    started_at        TIMESTAMP NOT NULL,
+    finished_at       TIMESTAMP,
+    duration_s        DOUBLE,
+    input_fingerprint VARCHAR,               -- inputs after the step ran; equal next time = skip
+    stats             JSON,
+    error_message     VARCHAR,
+    PRIMARY KEY (run_id, step)
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_step
+    ON pipeline_runs (step, started_at);
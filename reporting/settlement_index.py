@@ -0,0 +1,369 @@
+"""Persistent SPX settlement index shared by the P&L reports.
+
+One place that knows the SPX settlement/close for every date we have seen,
+filled incrementally from each source and kept with its provenance:
+
+  local_features   sim/cache/{date}/close5_features.json  (spot)
+  local_close5     sim/cache/{date}/close5.json           (chain._underlying_price)
+  s3_features      s3://gamma-sim-cache/{date}/features_close5.json
+  s3_close5        s3://gamma-sim-cache/{date}/close5.json
+  leo_forward      DuckDB strategy_signal_rows.forward (by expiry_date)
+  schwab_close     Schwab $SPX daily candles (past dates only)
+
+The index lives in a compact JSON file (reporting/data/settlement_index.json,
+override with SETTLEMENT_INDEX_PATH), mirrored to one S3 object so a cold
+Lambda needs a single GET, and optionally to the DuckDB settlement_index
+table for SQL range queries. A refresh only reads files / S3 objects for
+dates that are not indexed yet; past dates that had nothing are remembered
+as misses so they are not fetched again. Local dates (misses included) are
+re-read when one of their close5 files is newer than the last refresh, so
+a late sync fills a miss and a later features file overrides close5.
+
+Usage:
+    from reporting.settlement_index import SettlementIndex
+    idx = SettlementIndex.load()
+    idx.refresh(con)                      # incremental, then idx.save()
+    idx.settlements()                     # {date: price}, settlement priority
+    idx.between("2026-03-01", "2026-03-31")
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Settlement lookup chain (first source with a price wins)
+SETTLEMENT_SOURCES = (
+    "local_features", "local_close5", "s3_features", "s3_close5", "leo_forward",
+)
+SCHWAB_SOURCE = "schwab_close"
+
+_LOCAL_SOURCES = ("local_features", "local_close5")
+_LOCAL_FILES = ("close5_features.json", "close5.json")
+_CACHE_SOURCES = _LOCAL_SOURCES + ("s3_features", "s3_close5")
+
+_DEFAULT_PATH = Path(__file__).parent / "data" / "settlement_index.json"
+_DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "sim" / "cache"
+_S3_INDEX_DATE = "_index"          # s3://{bucket}/_index/settlements.json
+_S3_INDEX_FILE = "settlements.json"
+_FORMAT_VERSION = 1
+_SCHWAB_LOOKBACK_DAYS = 92        # cold start: the old three-month history pull
+
+
+def _index_path() -> Path:
+    return Path(os.environ.get("SETTLEMENT_INDEX_PATH") or _DEFAULT_PATH)
+
+
+def _spot_from_features(data: dict) -> float | None:
+    """Extract SPX spot price from a close5_features.json payload."""
+    spot = data.get("spot")
+    if spot:
+        return float(spot)
+    return None
+
+
+def _spot_from_close5(data: dict) -> float | None:
+    """Extract SPX spot price from a close5.json payload."""
+    chain = data.get("chain", {})
+    for key in ("_underlying_price", "underlyingPrice"):
+        val = chain.get(key)
+        if isinstance(val, (int, float)) and val > 0:
+            return float(val)
+    return None
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class SettlementIndex:
+    """In-memory settlement index: {date: {source: price}} plus known misses."""
+
+    def __init__(self, prices: dict | None = None, misses: dict | None = None,
+                 path: str | Path | None = None, refreshed_at: float = 0.0):
+        self.path = Path(path) if path else _index_path()
+        self.prices: dict[str, dict[str, float]] = prices or {}
+        self.misses: dict[str, set[str]] = {
+            k: set(v) for k, v in (misses or {}).items()
+        }
+        self.refreshed_at = float(refreshed_at)  # epoch of the last local scan
+        self.dirty = False
+        self._dates: list[str] | None = None
+
+    # -- persistence --------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: str | Path | None = None, s3: bool = False) -> SettlementIndex:
+        """Load the index file; if absent and ``s3`` is set, the S3 mirror."""
+        path = Path(path) if path else _index_path()
+        data = _read_json(path) if path.exists() else None
+        if data is None and s3:
+            try:
+                from sim.data.s3_cache import s3_get_json
+                data = s3_get_json(_S3_INDEX_DATE, _S3_INDEX_FILE)
+            except Exception:
+                data = None
+        if not data or data.get("v") != _FORMAT_VERSION:
+            return cls(path=path)
+        return cls(data.get("prices"), data.get("misses"), path=path,
+                   refreshed_at=data.get("refreshed_at", 0.0))
+
+    def to_json(self) -> dict:
+        return {
+            "v": _FORMAT_VERSION,
+            "prices": self.prices,
+            "misses": {k: sorted(v) for k, v in self.misses.items()},
+            "refreshed_at": self.refreshed_at,
+        }
+
+    def save(self, s3: bool = False) -> bool:
+        """Write the index file (atomically) if anything changed.
+
+        With ``s3`` the same payload is mirrored to the cache bucket.
+        Returns True if written.
+        """
+        if not self.dirty:
+            return False
+        payload = self.to_json()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(payload, f, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"  [warn] settlement index not saved: {e}")
+        if s3:
+            try:
+                from sim.data.s3_cache import s3_put_json
+                s3_put_json(_S3_INDEX_DATE, _S3_INDEX_FILE, payload)
+            except Exception as e:
+                print(f"  [warn] settlement index S3 mirror failed: {e}")
+        self.dirty = False
+        return True
+
+    # -- writes -------------------------------------------------------------
+
+    def record(self, source: str, prices: dict[str, float]) -> int:
+        """Record {date: price} for one source. Returns count of new/changed."""
+        changed = 0
+        for d, price in prices.items():
+            if not price:
+                continue
+            by_source = self.prices.setdefault(d, {})
+            if by_source.get(source) != float(price):
+                by_source[source] = float(price)
+                changed += 1
+        if changed:
+            self.dirty = True
+            self._dates = None
+        return changed
+
+    def _miss(self, group: str, d: str, today: str) -> None:
+        # Today's files may still arrive; only settled past dates are final
+        if d < today:
+            self.misses.setdefault(group, set()).add(d)
+            self.dirty = True
+
+    def _local_stale(self, date_dir: Path) -> bool:
+        """A close5 file in ``date_dir`` changed since the last refresh."""
+        for name in _LOCAL_FILES:
+            try:
+                if (date_dir / name).stat().st_mtime > self.refreshed_at:
+                    return True
+            except OSError:
+                continue
+        return False
+
+    def _has(self, d: str, sources: tuple[str, ...]) -> bool:
+        by_source = self.prices.get(d)
+        return bool(by_source) and any(s in by_source for s in sources)
+
+    # -- reads --------------------------------------------------------------
+
+    def price(self, d: str | date, sources: tuple[str, ...] = SETTLEMENT_SOURCES) -> float | None:
+        """Best price for one date by source priority, or None."""
+        by_source = self.prices.get(d.isoformat() if isinstance(d, date) else d)
+        if by_source:
+            for s in sources:
+                if s in by_source:
+                    return by_source[s]
+        return None
+
+    def between(self, start: str | date | None = None, end: str | date | None = None,
+                sources: tuple[str, ...] = SETTLEMENT_SOURCES) -> dict[str, float]:
+        """{date: price} for start <= date <= end (ISO strings or dates)."""
+        if self._dates is None:
+            self._dates = sorted(self.prices)
+        lo = 0 if start is None else bisect.bisect_left(self._dates, str(start))
+        hi = len(self._dates) if end is None else bisect.bisect_right(self._dates, str(end))
+        out = {}
+        for d in self._dates[lo:hi]:
+            p = self.price(d, sources)
+            if p is not None:
+                out[d] = p
+        return out
+
+    def settlements(self, sources: tuple[str, ...] = SETTLEMENT_SOURCES) -> dict[str, float]:
+        """Full {date: price} map by source priority."""
+        return self.between(sources=sources)
+
+    # -- refresh ------------------------------------------------------------
+
+    def refresh(self, con=None, cache_dir: str | Path | None = None,
+                use_s3: bool = True, full: bool = False) -> dict:
+        """Fill the index from every settlement source, incrementally.
+
+        Local cache files and S3 objects are only read for dates without a
+        cache-sourced price (and not already known to be empty); local
+        dates are also re-read when a close5 file changed since the last
+        refresh. ``full`` ignores the remembered misses. Leo forwards come from ``con`` when
+        given (one query). Returns stats:
+        {local_read, s3_listed, s3_get, leo_rows, added}.
+        """
+        stats = {"local_read": 0, "s3_listed": 0, "s3_get": 0, "leo_rows": 0, "added": 0}
+        today = date.today().isoformat()
+        if full:
+            self.misses.clear()
+        local_misses = self.misses.setdefault("local", set())
+        s3_misses = self.misses.setdefault("s3", set())
+
+        # 1. Local sim cache
+        cache_dir = Path(cache_dir) if cache_dir else _DEFAULT_CACHE_DIR
+        if cache_dir.is_dir():
+            scanned_at = time.time()
+            for date_dir in sorted(cache_dir.iterdir()):
+                d = date_dir.name
+                if not date_dir.is_dir():
+                    continue
+                if ((d in local_misses or self._has(d, _LOCAL_SOURCES))
+                        and not self._local_stale(date_dir)):
+                    continue
+                stats["local_read"] += 1
+                spot = _spot_from_features(_read_json(date_dir / _LOCAL_FILES[0]) or {})
+                source = "local_features"
+                if not spot:
+                    spot = _spot_from_close5(_read_json(date_dir / _LOCAL_FILES[1]) or {})
+                    source = "local_close5"
+                if spot:
+                    stats["added"] += self.record(source, {d: spot})
+                    if d in local_misses:
+                        local_misses.discard(d)
+                        self.dirty = True
+                else:
+                    self._miss("local", d, today)
+            self.refreshed_at = scanned_at
+
+        # 2. S3 cache, only for dates with no cache-sourced price yet
+        if use_s3:
+            try:
+                from sim.data.s3_cache import s3_get_json, s3_list_dates
+
+                s3_dates = s3_list_dates()
+                stats["s3_listed"] = len(s3_dates)
+                for d in s3_dates:
+                    if d in s3_misses or self._has(d, _CACHE_SOURCES):
+                        continue
+                    stats["s3_get"] += 1
+                    spot = _spot_from_features(s3_get_json(d, "features_close5.json") or {})
+                    if spot:
+                        stats["added"] += self.record("s3_features", {d: spot})
+                        continue
+                    stats["s3_get"] += 1
+                    spot = _spot_from_close5(s3_get_json(d, "close5.json") or {})
+                    if spot:
+                        stats["added"] += self.record("s3_close5", {d: spot})
+                    else:
+                        self._miss("s3", d, today)
+            except Exception:
+                pass  # S3 not available (local dev without AWS creds)
+
+        # 3. Leo forwards (latest signal row per expiry)
+        if con is not None:
+            try:
+                rows = con.execute(
+                    """SELECT CAST(expiry_date AS VARCHAR), arg_max(forward, trade_date)
+                       FROM strategy_signal_rows
+                       WHERE forward IS NOT NULL AND forward <> 0
+                         AND expiry_date IS NOT NULL
+                       GROUP BY expiry_date"""
+                ).fetchall()
+                stats["leo_rows"] = len(rows)
+                stats["added"] += self.record("leo_forward", dict(rows))
+            except Exception:
+                pass
+
+        return stats
+
+    # -- Schwab closes ------------------------------------------------------
+
+    def schwab_fetch_start(self, today: date | None = None) -> date | None:
+        """First date Schwab closes must be fetched from, or None.
+
+        Indexed closes are final, so only weekdays after the last indexed
+        Schwab close (skipping known holiday misses) are fetched, plus today
+        on a weekday, whose close is never indexed.
+        """
+        today = today or date.today()
+        closes = self.between(sources=(SCHWAB_SOURCE,))
+        if closes:
+            d = date.fromisoformat(max(closes)) + timedelta(days=1)
+        else:
+            d = today - timedelta(days=_SCHWAB_LOOKBACK_DAYS)
+        missed = self.misses.get("schwab", set())
+        while d < today and (d.weekday() >= 5 or d.isoformat() in missed):
+            d += timedelta(days=1)
+        if d < today or (d == today and today.weekday() < 5):
+            return d
+        return None
+
+    def record_schwab_closes(self, closes: dict[str, float], start: date,
+                             today: date | None = None) -> int:
+        """Record Schwab closes fetched from ``start``; returns count added.
+
+        Today's candle may still be intraday and is not recorded. Weekdays
+        before the last returned candle that have none (market holidays)
+        are remembered as misses so they are not fetched again.
+        """
+        today_str = (today or date.today()).isoformat()
+        added = self.record(SCHWAB_SOURCE,
+                            {d: p for d, p in closes.items() if d < today_str})
+        last = max(closes, default="")
+        d = start
+        while d.isoformat() < last:
+            if d.weekday() < 5 and d.isoformat() not in closes:
+                self._miss("schwab", d.isoformat(), today_str)
+            d += timedelta(days=1)
+        return added
+
+    # -- DuckDB mirror ------------------------------------------------------
+
+    def sync_table(self, con) -> int:
+        """Mirror the index into the DuckDB settlement_index table (one INSERT)."""
+        rows = [(d, s, p) for d, by_source in self.prices.items()
+                for s, p in by_source.items()]
+        if not rows:
+            return 0
+        con.execute(
+            """INSERT OR REPLACE INTO settlement_index
+               (settle_date, source, price, recorded_at)
+               SELECT unnest(?)::DATE, unnest(?), unnest(?), current_timestamp""",
+            [list(col) for col in zip(*rows)],
+        )
+        return len(rows)
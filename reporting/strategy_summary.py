@@ -13,103 +13,157 @@ from __future__ import annotations
 import uuid
 from datetime import date, timedelta
 
-from reporting.db import execute, get_connection, init_schema, query_df, query_one
+from reporting.db import execute, get_connection, init_schema, query_one
+from reporting.pnl_mart import refresh_positions_mart
 
 
 # ---------------------------------------------------------------------------
 # Strategy daily
 # ---------------------------------------------------------------------------
 
-def materialize_strategy_daily(con, report_date: date) -> int:
-    """Populate strategy_daily for a single date. Returns rows upserted."""
-    if con is None:
-        con = get_connection()
-
-    dt = report_date.isoformat()
-    count = 0
-
-    # Get all (strategy, account) combos that had activity on this date
-    combos = query_df(
-        """SELECT DISTINCT strategy, account FROM (
-             SELECT strategy, account FROM positions WHERE trade_date = ?
-             UNION
-             SELECT strategy, account FROM positions
-               WHERE closed_at IS NOT NULL AND CAST(closed_at AS DATE) = ?
-             UNION
-             SELECT strategy, account FROM strategy_runs WHERE trade_date = ?
-           )""",
-        [dt, dt, dt],
-        con=con,
+# One row per (strategy, account, report_date) with any activity in the
+# range. Counts and P&L are grouped aggregates; the 20-trade win rate is a
+# window over each combo's terminal trades (closed_at order, undated trades
+# first), picked up as of each report date with an ASOF join.
+_STRATEGY_DAILY_SQL = """
+CREATE OR REPLACE TEMP TABLE _strategy_daily_new AS
+WITH terminal AS (
+    SELECT position_id, strategy, account, closed_at,
+           CAST(closed_at AS DATE) AS closed_date, realized_pnl
+    FROM positions
+    WHERE lifecycle_state IN ('CLOSED', 'EXPIRED', 'ASSIGNED')
+),
+combos AS (
+    SELECT * FROM (
+        SELECT strategy, account, trade_date AS report_date FROM positions
+        UNION
+        SELECT strategy, account, CAST(closed_at AS DATE) FROM positions
+        WHERE closed_at IS NOT NULL
+        UNION
+        SELECT strategy, account, trade_date FROM strategy_runs
     )
+    WHERE report_date BETWEEN ? AND ?
+),
+opened AS (
+    SELECT strategy, account, trade_date AS report_date, count(*) AS n
+    FROM positions
+    GROUP BY ALL
+),
+closed AS (
+    SELECT strategy, account, closed_date AS report_date, count(*) AS n,
+           coalesce(sum(realized_pnl), 0) AS pnl
+    FROM terminal
+    WHERE closed_date IS NOT NULL
+    GROUP BY ALL
+),
+skipped AS (
+    SELECT strategy, account, trade_date AS report_date, count(*) AS n
+    FROM strategy_runs
+    WHERE status = 'SKIPPED'
+    GROUP BY ALL
+),
+rolling AS (
+    SELECT strategy, account,
+           coalesce(closed_date, '-infinity'::DATE) AS as_of, wins, n
+    FROM (
+        SELECT *,
+               sum(CAST(realized_pnl > 0 AS INTEGER)) OVER last_20 AS wins,
+               count(*) OVER last_20 AS n
+        FROM terminal
+        WHERE realized_pnl IS NOT NULL
+        WINDOW last_20 AS (
+            PARTITION BY strategy, account
+            ORDER BY closed_at NULLS FIRST, position_id
+            ROWS BETWEEN 19 PRECEDING AND CURRENT ROW)
+    )
+    QUALIFY row_number() OVER (
+        PARTITION BY strategy, account, closed_date
+        ORDER BY closed_at DESC, position_id DESC) = 1
+)
+SELECT substr(replace(uuid()::VARCHAR, '-', ''), 1, 16) AS id,
+       c.strategy, c.account, c.report_date,
+       coalesce(o.n, 0) AS trades_opened,
+       coalesce(cl.n, 0) AS trades_closed,
+       coalesce(s.n, 0) AS trades_skipped,
+       coalesce(cl.pnl, 0.0) AS realized_pnl,
+       round(r.wins / r.n, 4) AS win_rate_20d
+FROM combos c
+ASOF LEFT JOIN rolling r
+    ON r.strategy = c.strategy AND r.account = c.account
+   AND c.report_date >= r.as_of
+LEFT JOIN opened o
+    ON o.strategy = c.strategy AND o.account = c.account
+   AND o.report_date = c.report_date
+LEFT JOIN closed cl
+    ON cl.strategy = c.strategy AND cl.account = c.account
+   AND cl.report_date = c.report_date
+LEFT JOIN skipped s
+    ON s.strategy = c.strategy AND s.account = c.account
+   AND s.report_date = c.report_date
+"""
 
-    for _, combo in combos.iterrows():
-        strat = combo["strategy"]
-        acct = combo["account"]
-
-        # Trades opened
-        opened = query_one(
-            "SELECT count(*) FROM positions WHERE strategy=? AND account=? AND trade_date=?",
-            [strat, acct, dt], con=con,
-        )
-        trades_opened = opened[0] if opened else 0
-
-        # Trades closed (terminal on this date)
-        closed = query_one(
-            """SELECT count(*) FROM positions
-               WHERE strategy=? AND account=? AND CAST(closed_at AS DATE)=?
-                 AND lifecycle_state IN ('CLOSED','EXPIRED','ASSIGNED')""",
-            [strat, acct, dt], con=con,
-        )
-        trades_closed = closed[0] if closed else 0
 
-        # Trades skipped
-        skipped = query_one(
-            "SELECT count(*) FROM strategy_runs WHERE strategy=? AND account=? AND trade_date=? AND status='SKIPPED'",
-            [strat, acct, dt], con=con,
-        )
-        trades_skipped = skipped[0] if skipped else 0
-
-        # Realized P&L (from positions closed on this date)
-        pnl = query_one(
-            """SELECT coalesce(sum(realized_pnl), 0) FROM positions
-               WHERE strategy=? AND account=? AND CAST(closed_at AS DATE)=?
-                 AND lifecycle_state IN ('CLOSED','EXPIRED','ASSIGNED')
-                 AND realized_pnl IS NOT NULL""",
-            [strat, acct, dt], con=con,
-        )
-        realized_pnl = float(pnl[0]) if pnl else 0.0
-
-        # Win rate (last 20 closed trades for this strategy)
-        recent = query_df(
-            """SELECT realized_pnl FROM positions
-               WHERE strategy=? AND account=? AND realized_pnl IS NOT NULL
-                 AND lifecycle_state IN ('CLOSED','EXPIRED','ASSIGNED')
-               ORDER BY closed_at DESC LIMIT 20""",
-            [strat, acct], con=con,
-        )
-        win_rate = None
-        if not recent.empty:
-            wins = (recent["realized_pnl"] > 0).sum()
-            win_rate = round(wins / len(recent), 4)
+def _materialize_range(con, start: date, end: date, portfolio: bool = True) -> tuple[int, int]:
+    """Rebuild strategy_daily (and portfolio_daily) for [start, end] in one swap.
 
-        # Upsert (delete + insert for DuckDB)
-        execute(
-            "DELETE FROM strategy_daily WHERE strategy=? AND account=? AND report_date=?",
-            [strat, acct, dt], con=con,
-        )
-        row_id = uuid.uuid4().hex[:16]
+    Rows for the range are computed by one statement, then the old rows are
+    deleted and the new ones inserted inside a single transaction.
+    Returns (strategy_daily_rows, portfolio_daily_rows).
+    """
+    bounds = [start.isoformat(), end.isoformat()]
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(_STRATEGY_DAILY_SQL, bounds)
+        execute("DELETE FROM strategy_daily WHERE report_date BETWEEN ? AND ?",
+                bounds, con=con)
         execute(
             """INSERT INTO strategy_daily
                (id, strategy, account, report_date, trades_opened, trades_closed,
                 trades_skipped, realized_pnl, win_rate_20d)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            [row_id, strat, acct, dt, trades_opened, trades_closed,
-             trades_skipped, realized_pnl, win_rate],
+               SELECT id, strategy, account, report_date, trades_opened,
+                      trades_closed, trades_skipped, realized_pnl, win_rate_20d
+               FROM _strategy_daily_new""",
             con=con,
         )
-        count += 1
+        strategy_rows = query_one("SELECT count(*) FROM _strategy_daily_new", con=con)[0]
+        con.execute("DROP TABLE _strategy_daily_new")
+
+        portfolio_rows = 0
+        if portfolio:
+            execute("DELETE FROM portfolio_daily WHERE report_date BETWEEN ? AND ?",
+                    bounds, con=con)
+            # Dates with at least one open or close; open count is a snapshot
+            execute(
+                """INSERT INTO portfolio_daily
+                   (id, report_date, total_open_positions, realized_pnl_day)
+                   SELECT substr(replace(uuid()::VARCHAR, '-', ''), 1, 16),
+                          report_date,
+                          (SELECT count(*) FROM positions
+                           WHERE lifecycle_state IN ('OPEN', 'PARTIALLY_OPEN')),
+                          coalesce(sum(realized_pnl), 0)
+                   FROM strategy_daily
+                   WHERE report_date BETWEEN ? AND ?
+                   GROUP BY report_date
+                   HAVING sum(trades_opened) > 0 OR sum(trades_closed) > 0""",
+                bounds, con=con,
+            )
+            portfolio_rows = query_one(
+                "SELECT count(*) FROM portfolio_daily WHERE report_date BETWEEN ? AND ?",
+                bounds, con=con,
+            )[0]
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return strategy_rows, portfolio_rows
 
-    return count
+
+def materialize_strategy_daily(con, report_date: date) -> int:
+    """Populate strategy_daily for a single date. Returns rows upserted."""
+    if con is None:
+        con = get_connection()
+
+    return _materialize_range(con, report_date, report_date, portfolio=False)[0]
 
 
 # ---------------------------------------------------------------------------
@@ -159,7 +213,9 @@ def materialize_portfolio_daily(con, report_date: date) -> int:
 def materialize_all(con=None, since_date: date | None = None) -> dict:
     """Materialize strategy_daily + portfolio_daily for a date range.
 
-    Defaults to last 30 days if since_date not provided.
+    Defaults to last 30 days if since_date not provided. The whole range is
+    computed in one pass and swapped in one transaction. The positions P&L
+    mart (reporting.pnl_mart) is refreshed from the same date.
     """
     if con is None:
         con = get_connection()
@@ -169,13 +225,13 @@ def materialize_all(con=None, since_date: date | None = None) -> dict:
         since_date = date.today() - timedelta(days=30)
 
     stats = {"strategy_daily_rows": 0, "portfolio_daily_rows": 0, "dates_processed": 0}
-    d = since_date
     today = date.today()
+    if since_date > today:
+        return stats
 
-    while d <= today:
-        stats["dates_processed"] += 1
-        stats["strategy_daily_rows"] += materialize_strategy_daily(con, d)
-        stats["portfolio_daily_rows"] += materialize_portfolio_daily(con, d)
-        d += timedelta(days=1)
-
+    stats["dates_processed"] = (today - since_date).days + 1
+    stats["strategy_daily_rows"], stats["portfolio_daily_rows"] = _materialize_range(
+        con, since_date, today,
+    )
+    stats["pnl_mart_rows"] = refresh_positions_mart(con, since_date)
     return stats
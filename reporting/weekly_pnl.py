@@ -54,28 +54,42 @@ def _fmt(val: float) -> str:
 # ---------------------------------------------------------------------------
 
 def _load_spx_closes() -> dict[str, float]:
-    """Pull SPX daily close prices from Schwab price history."""
-    try:
-        from schwab.client import Client
-        c = schwab_client()
-        resp = c.get_price_history(
-            "$SPX",
-            period_type=Client.PriceHistory.PeriodType.MONTH,
-            period=Client.PriceHistory.Period.THREE_MONTHS,
-            frequency_type=Client.PriceHistory.FrequencyType.DAILY,
-            frequency=Client.PriceHistory.Frequency.DAILY,
-        )
-        resp.raise_for_status()
-        closes = {}
-        from datetime import datetime
-        for candle in resp.json().get("candles", []):
-            ts = candle.get("datetime", 0)
-            dt = datetime.fromtimestamp(ts / 1000)
-            closes[dt.strftime("%Y-%m-%d")] = candle["close"]
-        return closes
-    except Exception as e:
-        print(f"  [warn] Could not fetch SPX from Schwab: {e}")
-        return {}
+    """SPX daily closes: settlement index first, Schwab only for the gap.
+
+    Past closes come from the settlement index. Schwab price history is
+    asked only for dates after the last indexed close (and today, whose
+    close is never indexed); the new past closes are recorded for the next
+    run. If Schwab is unreachable the indexed closes are returned alone.
+    """
+    from datetime import datetime, time
+
+    from reporting.settlement_index import SCHWAB_SOURCE, SettlementIndex
+
+    idx = SettlementIndex.load()
+    today = date.today()
+    start = idx.schwab_fetch_start(today)
+    fetched = {}
+    if start is not None:
+        try:
+            c = schwab_client()
+            resp = c.get_price_history_every_day(
+                "$SPX",
+                start_datetime=datetime.combine(start, time()),
+                end_datetime=datetime.now(),
+                need_extended_hours_data=False,
+            )
+            resp.raise_for_status()
+            for candle in resp.json().get("candles", []):
+                dt = datetime.fromtimestamp(candle.get("datetime", 0) / 1000)
+                fetched[dt.strftime("%Y-%m-%d")] = candle["close"]
+            idx.record_schwab_closes(fetched, start, today)
+            idx.save()
+        except Exception as e:
+            print(f"  [warn] Could not fetch SPX from Schwab: {e}")
+
+    closes = idx.settlements(sources=(SCHWAB_SOURCE,))
+    closes.update(fetched)
+    return closes
 
 
 def _load_open_positions_schwab() -> list[dict]:
@@ -226,13 +240,13 @@ def run(week_start: str | None = None, week_end: str | None = None):
     raw = load_orders_from_schwab(lookback_days=45)
     print(f"[source] Schwab API: {len(raw)} orders (45-day lookback)")
 
-    # SPX settlement: prefer Schwab price history, fall back to Leo signals
+    # SPX settlement: indexed Schwab closes, fall back to Leo signals
     settlements = _load_spx_closes()
     if not settlements:
         print("  [fallback] Using Leo signal forward prices")
         settlements = load_settlements()
     else:
-        print(f"  [settlement] SPX closes from Schwab ({len(settlements)} dates)")
+        print(f"  [settlement] SPX closes from index/Schwab ({len(settlements)} dates)")
 
     # --- Expired P&L via net position method ---
     expired = _compute_expired_pnl(raw, settlements, week_start, week_end)
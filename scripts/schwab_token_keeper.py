@@ -1,22 +1,38 @@
 #!/usr/bin/env python3
 """
 Schwab token keeper with single-writer locking and refresh-token overwrite.
+
+schwab_client() builds one client per (token path, app key, seeded token)
+and hands the same one back for the rest of the process: its httpx session
+keeps connections alive and its OAuth session refreshes the token in
+memory. Every call on it goes through the shared "schwab" rate budget in
+http_pool (429 pause, optional SCHWAB_RATE_LIMIT pacing).
 """
 
 import base64
+import hashlib
 import inspect
 import json
 import os
+import threading
 import time
 from contextlib import contextmanager
 
 from schwab.auth import client_from_token_file
 
+try:
+    import http_pool
+except ImportError:  # loaded as a package module (scripts.schwab_token_keeper)
+    from . import http_pool
+
 try:
     import fcntl
 except Exception:  # pragma: no cover - non-posix
     fcntl = None
 
+_clients = {}                     # (token path, app key, seed hash) -> client
+_clients_lock = threading.Lock()
+
 
 def _decode_token_env(raw: str) -> str:
     raw = (raw or "").strip()
@@ -89,6 +105,19 @@ def ensure_token_file(token_path: str) -> str:
     return token_path
 
 
+def _track_rate(c):
+    """Route the client's httpx calls through the shared "schwab" budget."""
+    session = getattr(c, "session", None)
+    hooks = getattr(session, "event_hooks", None)
+    if not isinstance(hooks, dict) or inspect.iscoroutinefunction(getattr(session, "send", None)):
+        return  # async client: hooks would have to be coroutines
+    b = http_pool.budget("schwab")
+    hooks.setdefault("request", []).append(lambda request: b.acquire())
+    hooks.setdefault("response", []).append(
+        lambda response: b.record(response.status_code, response.headers.get("Retry-After")))
+    session.event_hooks = hooks
+
+
 def schwab_client():
     app_key = os.environ["SCHWAB_APP_KEY"]
     app_secret = os.environ["SCHWAB_APP_SECRET"]
@@ -97,6 +126,13 @@ def schwab_client():
         default_path = os.path.join("Token", "schwab_token.json")
         token_path = default_path if os.path.exists("Token") else "schwab_token.json"
 
+    seed = os.environ.get("SCHWAB_TOKEN_JSON", "") or ""
+    key = (os.path.abspath(token_path), app_key, hashlib.sha256(seed.encode()).hexdigest())
+    with _clients_lock:
+        cached = _clients.get(key)
+    if cached is not None:
+        return cached
+
     token_path = ensure_token_file(token_path)
 
     def token_write_func(token, *args, **kwargs):
@@ -117,4 +153,7 @@ def schwab_client():
     elif sig and "write_func" in sig.parameters:
         kwargs["write_func"] = token_write_func
 
-    return client_from_token_file(**kwargs)
+    c = client_from_token_file(**kwargs)
+    _track_rate(c)
+    with _clients_lock:
+        return _clients.setdefault(key, c)
@@ -323,7 +323,25 @@ def _sanitize_token(t: str) -> str:
     return t.split(None, 1)[1] if t.lower().startswith("bearer ") else t
 
 
+def _read_shared_signal(path: str):
+    """GW payload fetched once for all accounts by the multi-account Lambda run."""
+    deadline = time.time() + float(os.environ.get("GW_SIGNAL_WAIT_SECS", "90"))
+    while not os.path.exists(path):
+        if time.time() >= deadline:
+            raise RuntimeError(f"GW_SIGNAL_FILE_TIMEOUT: {path}")
+        time.sleep(0.1)
+    with open(path, "r") as f:
+        j = json.load(f)
+    if isinstance(j, dict) and j.get("_error"):
+        raise RuntimeError(j["_error"])
+    print("CS_VERT_RUN SIGNAL_SOURCE: SHARED (GW_SIGNAL_FILE)")
+    return j
+
+
 def gw_fetch():
+    shared = (os.environ.get("GW_SIGNAL_FILE") or "").strip()
+    if shared:
+        return _read_shared_signal(shared)
     base = GW_BASE
     endpoint = GW_ENDPOINT
     tok = _sanitize_token(os.environ.get("GW_TOKEN", "") or "")
@@ -630,6 +648,15 @@ def _wait_for_gw_ready():
 
 # ---------- main ----------
 
+def _run_placer(script: str, env: Dict[str, str]) -> int:
+    """Run the placer in this process when the Lambda runs us in-process
+    (lambda/script_runner.py), otherwise as a child interpreter."""
+    runner = sys.modules.get("script_runner")
+    if runner is not None and runner.active():
+        return runner.run_nested(script, env)
+    return subprocess.call([sys.executable, script], env=env)
+
+
 def main():
     today = date.today()
     ew = _init_events(today)
@@ -992,7 +1019,7 @@ def main():
                 "VERT2_GW_PRICE":   "" if gw_put_price is None else str(gw_put_price),
             })
 
-            rc = subprocess.call([sys.executable, "scripts/trade/ConstantStable/place.py"], env=env)
+            rc = _run_placer("scripts/trade/ConstantStable/place.py", env)
             if rc != 0:
                 _emit("error", message=f"placer rc={rc}", stage=f"placement_{mode}")
                 print(f"CS_VERT_RUN PAIR_ALT: placer rc={rc}")
@@ -1038,7 +1065,7 @@ def main():
         )
         _rows_before = _csv_row_count()
         env = env_for_vertical(v)
-        rc = subprocess.call([sys.executable, "scripts/trade/ConstantStable/place.py"], env=env)
+        rc = _run_placer("scripts/trade/ConstantStable/place.py", env)
         if rc != 0:
             _emit("error", message=f"placer rc={rc}", stage=f"placement_{v['name']}")
             print(f"CS_VERT_RUN {v['name']}: placer rc={rc}")
@@ -619,6 +619,15 @@ def would_close_guard(v, pos):
 # Main
 # ═══════════════════════════════════════════════════════════════
 
+def _run_placer(script: str, env: Dict[str, str]) -> int:
+    """Run the placer in this process when the Lambda runs us in-process
+    (lambda/script_runner.py), otherwise as a child interpreter."""
+    runner = sys.modules.get("script_runner")
+    if runner is not None and runner.active():
+        return runner.run_nested(script, env)
+    return subprocess.call([sys.executable, script], env=env)
+
+
 def main():
     print(f"DS_RUN v{__version__} DRY_RUN={DS_DRY_RUN}")
 
@@ -993,7 +1002,7 @@ def main():
             f"short={v['short_osi']} long={v['long_osi']} qty={v['send_qty']}"
         )
         env = env_for_vertical(v)
-        rc = subprocess.call([sys.executable, PLACER_SCRIPT], env=env)
+        rc = _run_placer(PLACER_SCRIPT, env)
         if rc != 0:
             _emit("error", message=f"placer rc={rc}", stage=f"placement_{v['name']}")
             print(f"DS_RUN {v['name']}: placer rc={rc}")
@@ -1,8 +1,17 @@
 """AI trading agents (v14 — Claude + OpenAI)."""
 
 from sim.agents.base_agent import BaseAgent
-from sim.agents.claude_agent import ClaudeAgent
-from sim.agents.openai_agent import OpenAIAgent
 from sim.agents.agent_registry import get_agent_configs, get_agent_ids
 
 __all__ = ["BaseAgent", "ClaudeAgent", "OpenAIAgent", "get_agent_configs", "get_agent_ids"]
+
+
+def __getattr__(name):
+    # Provider agents pull in their SDKs; import them only when asked for
+    if name == "ClaudeAgent":
+        from sim.agents.claude_agent import ClaudeAgent
+        return ClaudeAgent
+    if name == "OpenAIAgent":
+        from sim.agents.openai_agent import OpenAIAgent
+        return OpenAIAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,10 +13,13 @@ from sim.engine.order import Order
 class BaseAgent(ABC):
     """Base class for all AI trading agents (Claude and GPT)."""
 
-    def __init__(self, agent_id: str, model: str, trained: bool = False):
+    def __init__(self, agent_id: str, model: str, trained: bool = False,
+                 response_cache=None):
         self.agent_id = agent_id
         self.model = model
         self.trained = trained
+        # Optional sim.persistence.response_cache.ResponseCache
+        self.response_cache = response_cache
 
     @abstractmethod
     def decide(self, chain: ChainSnapshot, account: Account,
@@ -40,8 +40,9 @@ class ClaudeAgent(BaseAgent):
     """AI trading agent powered by Claude via the Anthropic SDK."""
 
     def __init__(self, agent_id: str, model: str, trained: bool = False,
-                 client: Optional[anthropic.Anthropic] = None):
-        super().__init__(agent_id, model, trained)
+                 client: Optional[anthropic.Anthropic] = None,
+                 response_cache=None):
+        super().__init__(agent_id, model, trained, response_cache=response_cache)
         self.client = client or anthropic.Anthropic()
 
     def decide(self, chain: ChainSnapshot, account: Account,
@@ -57,6 +58,19 @@ class ClaudeAgent(BaseAgent):
 
         user_message = self._build_user_message(chain, account)
 
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(
+                self.model, system_prompt, user_message, memory,
+                max_tokens=AGENT_MAX_TOKENS,
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                decision = self._decision_from_text(cached, chain)
+                if decision is not None:
+                    logger.info("[%s] response cache hit", self.agent_id)
+                    return decision
+
         raw_text = ""
         for attempt in range(1, MAX_RETRIES + 1):
             try:
@@ -70,19 +84,15 @@ class ClaudeAgent(BaseAgent):
                 logger.info("[%s] attempt %d raw: %s", self.agent_id, attempt,
                             raw_text[:200])
 
-                parsed = self._parse_response(raw_text)
-                if parsed is None:
-                    logger.warning("[%s] parse failed attempt %d", self.agent_id, attempt)
+                decision = self._decision_from_text(raw_text, chain)
+                if decision is None:
+                    logger.warning("[%s] unusable response attempt %d",
+                                   self.agent_id, attempt)
                     continue
 
-                if parsed["action"] == "hold":
-                    return None, raw_text
-
-                order = self._build_order(parsed, chain)
-                if order is not None:
-                    return order, raw_text
-
-                logger.warning("[%s] order build failed attempt %d", self.agent_id, attempt)
+                if cache_key is not None:
+                    self.response_cache.put(cache_key, raw_text)
+                return decision
 
             except anthropic.APIError as e:
                 logger.error("[%s] API error attempt %d: %s", self.agent_id, attempt, e)
@@ -92,6 +102,19 @@ class ClaudeAgent(BaseAgent):
         logger.warning("[%s] all retries exhausted, falling back to hold", self.agent_id)
         return None, raw_text or "FALLBACK_HOLD"
 
+    def _decision_from_text(self, raw_text: str, chain: ChainSnapshot
+                            ) -> Optional[tuple[Optional[Order], str]]:
+        """(order or None for hold, raw_text), or None if the text is unusable."""
+        parsed = self._parse_response(raw_text)
+        if parsed is None:
+            return None
+        if parsed["action"] == "hold":
+            return None, raw_text
+        order = self._build_order(parsed, chain)
+        if order is None:
+            return None
+        return order, raw_text
+
     def _build_user_message(self, chain: ChainSnapshot, account: Account) -> str:
         parts = [
             "## Current Market Data",
@@ -2,12 +2,14 @@
 
 Usage:
     python -m sim.cli run-all --max-sessions 200
+    python -m sim.cli sweep --spec sweep.json --out-dir sim/data/sweeps/slip --workers 8
     python -m sim.cli leaderboard
     python -m sim.cli report --session 5
     python -m sim.cli collect-chain --phase close5
     python -m sim.cli export-sheets
     python -m sim.cli status
     python -m sim.cli sync-cache
+    python -m sim.cli convert-cache
 """
 
 from __future__ import annotations
@@ -62,11 +64,18 @@ def cmd_run_all(args) -> None:
 
     db_path = Path(args.db) if args.db else DB_PATH
 
+    response_cache = None
+    if not args.no_response_cache and (anthropic_client or openai_client):
+        from sim.persistence.response_cache import ResponseCache
+        response_cache = ResponseCache()
+
     scheduler = Scheduler(
         anthropic_client=anthropic_client,
         openai_client=openai_client,
         db_path=db_path,
         max_sessions=args.max_sessions,
+        response_cache=response_cache,
+        fast_writes=args.fast_writes,
     )
 
     dates = None
@@ -76,6 +85,38 @@ def cmd_run_all(args) -> None:
     result = scheduler.run(trading_dates=dates)
     print(f"\nCompleted {result.get('sessions_completed', 0)} sessions "
           f"({result.get('total_completed', 0)} total)")
+    if response_cache is not None:
+        stats = response_cache.stats()
+        print(f"Response cache: {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['entries']} entries)")
+        response_cache.close()
+
+
+def cmd_sweep(args) -> None:
+    """Run (or resume) a parallel baseline parameter sweep."""
+    import json
+
+    from sim.data.cache import find_contiguous_windows
+    from sim.orchestrator.sweep import SweepConfig, run_sweep, split_windows
+    from sim.reporting.leaderboard import sweep_leaderboard
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+
+    configs = [SweepConfig(**c) for c in spec["configs"]]
+    windows = spec.get("windows") or find_contiguous_windows(
+        min_length=args.min_window, backtest=True)
+    windows = split_windows(windows, args.window_size)
+    if not windows:
+        print("No date windows found in cache")
+        return
+
+    out_dir = Path(args.out_dir)
+    result = run_sweep(configs, windows, out_dir=out_dir, workers=args.workers)
+    print(f"\nSweep: {result['done']}/{result['cells']} cells done "
+          f"({result['failed']} failed, {result['ran']} run this time)")
+    print(sweep_leaderboard(result, top=args.top))
+    print(f"\nLeaderboard: {result['leaderboard']}")
 
 
 def cmd_leaderboard(args) -> None:
@@ -111,7 +152,7 @@ def cmd_collect_chain(args) -> None:
 def cmd_sync_cache(args) -> None:
     """Sync chain data from S3 to local cache."""
     from sim.config import CACHE_DIR
-    from sim.data.s3_cache import sync_s3_to_local, s3_list_dates, S3_BUCKET
+    from sim.data.s3_cache import sync_s3_to_local, S3_BUCKET
 
     bucket = args.bucket or S3_BUCKET
     dates = None
@@ -121,14 +162,27 @@ def cmd_sync_cache(args) -> None:
     print(f"Syncing from s3://{bucket}/ to {CACHE_DIR}/")
 
     if dates is None:
-        all_dates = s3_list_dates(bucket)
-        print(f"Found {len(all_dates)} dates in S3")
+        print("Syncing all dates in S3")
     else:
-        all_dates = dates
-        print(f"Syncing {len(all_dates)} specified dates")
+        print(f"Syncing {len(dates)} specified dates")
+
+    downloaded = sync_s3_to_local(CACHE_DIR, bucket=bucket, dates=dates)
+    print(f"Downloaded {downloaded} new or changed files")
 
-    downloaded = sync_s3_to_local(CACHE_DIR, bucket=bucket, dates=all_dates)
-    print(f"Downloaded {downloaded} new files")
+
+def cmd_convert_cache(args) -> None:
+    """Convert the JSON chain cache into the Parquet chain store."""
+    from sim.config import CACHE_DIR, CHAIN_STORE_DIR
+    from sim.data.chain_store import ChainStore, convert_cache_tree
+
+    store = ChainStore(Path(args.store_dir) if args.store_dir else CHAIN_STORE_DIR)
+    print(f"Converting {CACHE_DIR}/ -> {store.root}/")
+    written = convert_cache_tree(
+        CACHE_DIR, store=store,
+        start=args.start, end=args.end,
+        overwrite=args.overwrite,
+    )
+    print(f"Wrote {written} snapshots")
 
 
 def cmd_export_sheets(args) -> None:
@@ -286,6 +340,25 @@ def main() -> None:
     p_run = sub.add_parser("run-all", help="Run all sessions")
     p_run.add_argument("--max-sessions", type=int, default=200)
     p_run.add_argument("--dates", help="Comma-separated trading dates")
+    p_run.add_argument("--no-response-cache", action="store_true",
+                       help="Always call the model APIs (skip the agent response cache)")
+    p_run.add_argument("--fast-writes", action="store_true",
+                       help="SQLite synchronous=NORMAL (faster backtests, less durable)")
+
+    # sweep
+    p_sweep = sub.add_parser("sweep", help="Parallel parameter sweep over baselines")
+    p_sweep.add_argument("--spec", required=True,
+                         help='JSON: {"configs": [{"name", "overrides", "baseline_params"}], '
+                              '"windows": [[dates...]] (optional)}')
+    p_sweep.add_argument("--out-dir", required=True,
+                         help="Sweep directory (manifest, DB shards, leaderboard)")
+    p_sweep.add_argument("--workers", type=int, default=None,
+                         help="Worker processes (default: CPU count)")
+    p_sweep.add_argument("--min-window", type=int, default=20,
+                         help="Minimum contiguous window length when discovering dates")
+    p_sweep.add_argument("--window-size", type=int, default=0,
+                         help="Split windows into chunks of N sessions (0 = whole windows)")
+    p_sweep.add_argument("--top", type=int, default=30, help="Leaderboard rows to print")
 
     # leaderboard
     sub.add_parser("leaderboard", help="Show leaderboard")
@@ -303,6 +376,14 @@ def main() -> None:
     p_sync.add_argument("--bucket", help="S3 bucket name (default: gamma-sim-cache)")
     p_sync.add_argument("--dates", help="Comma-separated dates to sync (default: all)")
 
+    # convert-cache
+    p_conv = sub.add_parser("convert-cache", help="Convert JSON chain cache to Parquet chain store")
+    p_conv.add_argument("--store-dir", help="Chain store directory (default: sim/chain_store)")
+    p_conv.add_argument("--start", help="Earliest cache date to convert (YYYY-MM-DD)")
+    p_conv.add_argument("--end", help="Latest cache date to convert (YYYY-MM-DD)")
+    p_conv.add_argument("--overwrite", action="store_true",
+                        help="Rewrite every snapshot, not just new or changed ones")
+
     # export-sheets
     p_exp = sub.add_parser("export-sheets", help="Export results to Google Sheets")
     p_exp.add_argument("--sheet-id", dest="sheet_id",
@@ -372,10 +453,12 @@ def main() -> None:
 
     commands = {
         "run-all": cmd_run_all,
+        "sweep": cmd_sweep,
         "leaderboard": cmd_leaderboard,
         "report": cmd_report,
         "collect-chain": cmd_collect_chain,
         "sync-cache": cmd_sync_cache,
+        "convert-cache": cmd_convert_cache,
         "export-sheets": cmd_export_sheets,
         "regime-labels": cmd_regime_labels,
         "volatility-study": cmd_volatility_study,
@@ -7,6 +7,7 @@ from pathlib import Path
 SIM_ROOT = Path(__file__).resolve().parent
 REPO_ROOT = SIM_ROOT.parent
 CACHE_DIR = SIM_ROOT / "cache"
+CHAIN_STORE_DIR = SIM_ROOT / "chain_store"   # Parquet store (sim/data/chain_store.py)
 DB_PATH = SIM_ROOT / "data" / "simulation_v14.db"
 
 # --- Agent definitions (v14: 2 Opus + 2 GPT-5.2, cold/trained) ---
@@ -19,6 +20,9 @@ AGENTS = {
 
 AGENT_MAX_TOKENS = 1024       # output cap for all agents
 AGENT_INPUT_TOKEN_CAP = 4000  # approximate input budget
+AGENT_DECISION_TIMEOUT_S = 180.0  # per-agent wall clock for one decision (then hold)
+AGENT_RESPONSE_CACHE_PATH = SIM_ROOT / "data" / "agent_response_cache.db"
+AGENT_RESPONSE_CACHE_MAX_ENTRIES = 50_000  # LRU cap (sim/persistence/response_cache.py)
 
 # --- Risk limits ---
 MAX_CONCURRENT_SPREADS = 3       # max open positions per agent
@@ -75,7 +75,14 @@ def load_from_cache(trading_date: Union[str, date],
     path = cache_path(trading_date, phase)
     if not path.exists():
         return None
+    return load_cache_file(path)
 
+
+def load_cache_file(path: Path) -> dict:
+    """Load one cache wrapper file and return its raw chain dict.
+
+    VIX/VIX1D from the wrapper are injected as ``_vix``/``_vix1d``.
+    """
     with open(path) as f:
         wrapper = json.load(f)
 
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from typing import Dict, List, Optional
@@ -53,30 +54,90 @@ class ChainSnapshot:
     spx_low: float = 0.0
     spx_prev_close: float = 0.0
 
+    def __post_init__(self) -> None:
+        self.reindex()
+
+    # -- indexes ---------------------------------------------------------------
+    #
+    # Built once per snapshot so lookups don't scan ``contracts``:
+    #   _by_key         (strike, put_call, expiration) -> first contract
+    #   _by_strike_side (strike, put_call)             -> first contract
+    #   _by_side        put_call                       -> contracts, insertion order
+    #   _by_side_exp    (put_call, expiration)         -> contracts, insertion order
+    #   _strikes_sorted sorted copy of ``strikes`` for bisect ATM search
+    #   _delta_sorted   (put_call, expiration) -> delta-sorted arrays, built lazily
+    # "First" / insertion order mirror the original linear scans so results
+    # (including tie-breaks) are unchanged.
+
+    def reindex(self) -> None:
+        """Rebuild lookup indexes. Call after mutating contracts/strikes in place."""
+        by_key: Dict[tuple, OptionContract] = {}
+        by_strike_side: Dict[tuple, OptionContract] = {}
+        by_side: Dict[str, List[OptionContract]] = {}
+        by_side_exp: Dict[tuple, List[OptionContract]] = {}
+        for c in self.contracts.values():
+            by_key.setdefault((c.strike, c.put_call, c.expiration), c)
+            by_strike_side.setdefault((c.strike, c.put_call), c)
+            by_side.setdefault(c.put_call, []).append(c)
+            by_side_exp.setdefault((c.put_call, c.expiration), []).append(c)
+        self._by_key = by_key
+        self._by_strike_side = by_strike_side
+        self._by_side = by_side
+        self._by_side_exp = by_side_exp
+        self._strikes_sorted = sorted(self.strikes)
+        self._strikes_have_nan = any(s != s for s in self.strikes)
+        self._delta_sorted: Dict[tuple, Optional[tuple]] = {}
+        self._indexed_contracts = self.contracts
+        self._indexed_sizes = (len(self.contracts), len(self.strikes))
+
+    def _ensure_index(self) -> None:
+        if (self._indexed_contracts is not self.contracts
+                or self._indexed_sizes != (len(self.contracts), len(self.strikes))):
+            self.reindex()
+
+    def _side_contracts(self, put_call: str,
+                        expiration: Optional[date]) -> List[OptionContract]:
+        self._ensure_index()
+        if expiration is None:
+            return self._by_side.get(put_call, [])
+        return self._by_side_exp.get((put_call, expiration), [])
+
+    # -- lookups ---------------------------------------------------------------
+
     def calls(self, expiration: Optional[date] = None) -> List[OptionContract]:
         """All call contracts, optionally filtered by expiration."""
-        return [c for c in self.contracts.values()
-                if c.put_call == "C" and (expiration is None or c.expiration == expiration)]
+        return list(self._side_contracts("C", expiration))
 
     def puts(self, expiration: Optional[date] = None) -> List[OptionContract]:
         """All put contracts, optionally filtered by expiration."""
-        return [c for c in self.contracts.values()
-                if c.put_call == "P" and (expiration is None or c.expiration == expiration)]
+        return list(self._side_contracts("P", expiration))
 
     def get_contract(self, strike: float, put_call: str,
                      expiration: Optional[date] = None) -> Optional[OptionContract]:
         """Find a specific contract by strike and type."""
-        for c in self.contracts.values():
-            if (c.strike == strike and c.put_call == put_call
-                    and (expiration is None or c.expiration == expiration)):
-                return c
-        return None
+        self._ensure_index()
+        if expiration is None:
+            return self._by_strike_side.get((strike, put_call))
+        return self._by_key.get((strike, put_call, expiration))
 
     def atm_strike(self) -> float:
         """Nearest strike to the underlying price. Ties go to the lower strike."""
         if not self.strikes:
             raise ValueError("No strikes available")
-        return min(self.strikes, key=lambda s: (abs(s - self.underlying_price), s))
+        self._ensure_index()
+        spot = self.underlying_price
+        key = lambda s: (abs(s - spot), s)
+        if self._strikes_have_nan or spot != spot:
+            return min(self.strikes, key=key)
+
+        strikes = self._strikes_sorted
+        i = bisect_left(strikes, spot)
+        j = min(range(max(0, i - 1), min(i + 1, len(strikes))),
+                key=lambda k: key(strikes[k]))
+        # A lower strike at the same (rounded) distance wins the tie-break.
+        while j > 0 and abs(strikes[j - 1] - spot) == abs(strikes[j] - spot):
+            j -= 1
+        return strikes[j]
 
     def nearest_delta_strike(self, target_delta: float, put_call: str,
                              expiration: Optional[date] = None) -> Optional[float]:
@@ -85,11 +146,40 @@ class ChainSnapshot:
         For puts, target_delta should be negative (e.g., -0.10).
         For calls, target_delta should be positive (e.g., 0.10).
         """
-        contracts = self.calls(expiration) if put_call == "C" else self.puts(expiration)
+        contracts = self._side_contracts(put_call, expiration)
         if not contracts:
             return None
-        best = min(contracts, key=lambda c: abs(c.delta - target_delta))
-        return best.strike
+
+        group = (put_call, expiration)
+        if group not in self._delta_sorted:
+            if any(c.delta != c.delta for c in contracts):
+                self._delta_sorted[group] = None
+            else:
+                order = sorted(range(len(contracts)),
+                               key=lambda k: (contracts[k].delta, k))
+                self._delta_sorted[group] = (
+                    [contracts[k].delta for k in order], order)
+        arrays = self._delta_sorted[group]
+        if arrays is None or target_delta != target_delta:
+            best = min(contracts, key=lambda c: abs(c.delta - target_delta))
+            return best.strike
+
+        deltas, order = arrays
+        i = bisect_left(deltas, target_delta)
+        candidates = []  # (distance, insertion position)
+        for start, step in ((i - 1, -1), (i, 1)):
+            if not 0 <= start < len(deltas):
+                continue
+            dist = abs(deltas[start] - target_delta)
+            pos = order[start]
+            j = start + step
+            # Equal distances on one side: first-inserted contract wins,
+            # matching min() over the original insertion-ordered scan.
+            while 0 <= j < len(deltas) and abs(deltas[j] - target_delta) == dist:
+                pos = min(pos, order[j])
+                j += step
+            candidates.append((dist, pos))
+        return contracts[min(candidates)[1]].strike
 
     def expected_move(self, expiration: Optional[date] = None) -> float:
         """Expected move (±1σ) from the ATM straddle price."""
@@ -413,3 +503,22 @@ def parse_tt_chain(raw: dict) -> ChainSnapshot:
         spx_low=_safe_float(raw.get("spx_low", 0.0)),
         spx_prev_close=_safe_float(raw.get("spx_prev_close", 0.0)),
     )
+
+
+def parse_cached_chain(raw: dict, phase: str) -> ChainSnapshot:
+    """Parse a cached raw chain, dispatching on its ``_source`` field.
+
+    Args:
+        raw: Raw chain dict as returned by ``cache.load_from_cache``.
+        phase: Snapshot phase (used by the Schwab parser only).
+
+    Returns:
+        ChainSnapshot from the matching parser.
+    """
+    source = raw.get("_source", "")
+    if source == "tastytrade":
+        return parse_tt_chain(raw)
+    elif source in ("cboe", "thetadata"):
+        return parse_cboe_chain(raw)
+    vix = raw.get("_vix", 0.0)
+    return parse_schwab_chain(raw, phase, vix=vix)
@@ -0,0 +1,417 @@
+"""Columnar Parquet store for chain snapshots.
+
+The JSON cache (sim/data/cache.py) keeps one nested document per snapshot,
+so every consumer pays a full ``json.load`` just to read a few fields.
+The chain store keeps the same data flattened to one row per contract,
+hive-partitioned by date and phase:
+
+  sim/chain_store/trading_date=YYYY-MM-DD/phase=close5/contracts.parquet
+  sim/chain_store/trading_date=YYYY-MM-DD/phase=close5/snapshot.parquet
+
+``contracts.parquet`` holds the OptionContract fields; ``snapshot.parquet``
+is a single row with the snapshot-level fields (spot, VIX, OHLC, source,
+expirations, strikes).  ``source.json`` records the size and mtime of the
+JSON cache file a partition was converted from, so a re-synced cache file
+(e.g. a re-collected close5) marks its partition stale.  Reads go through DuckDB, so multi-year scans get
+column projection and partition pruning on the date predicate for free.
+
+Usage:
+    from sim.data.chain_store import ChainStore, convert_cache_tree
+
+    convert_cache_tree()                          # one-off backfill from JSON
+    store = ChainStore()
+    df = store.contracts(start="2025-01-01", end="2025-12-31",
+                         phases=["close5"], columns=["strike", "delta", "gamma"])
+    chain = store.load_snapshot("2025-06-13", "close5")
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from sim.config import CACHE_DIR, CHAIN_STORE_DIR
+from sim.data.cache import _to_date, _to_date_str, load_cache_file
+from sim.data.chain_snapshot import ChainSnapshot, OptionContract, parse_cached_chain
+
+logger = logging.getLogger(__name__)
+
+CONTRACTS_FILE = "contracts.parquet"
+SNAPSHOT_FILE = "snapshot.parquet"
+SOURCE_FILE = "source.json"
+
+# Column name -> DuckDB type, in OptionContract field order.
+CONTRACT_COLUMNS: Dict[str, str] = {
+    "symbol": "VARCHAR",
+    "strike": "DOUBLE",
+    "expiration": "DATE",
+    "put_call": "VARCHAR",
+    "bid": "DOUBLE",
+    "ask": "DOUBLE",
+    "last": "DOUBLE",
+    "mark": "DOUBLE",
+    "volume": "BIGINT",
+    "open_interest": "BIGINT",
+    "implied_vol": "DOUBLE",
+    "delta": "DOUBLE",
+    "gamma": "DOUBLE",
+    "theta": "DOUBLE",
+    "vega": "DOUBLE",
+    "rho": "DOUBLE",
+    "days_to_exp": "BIGINT",
+    "in_the_money": "BOOLEAN",
+}
+
+SNAPSHOT_COLUMNS: Dict[str, str] = {
+    "source": "VARCHAR",
+    "timestamp": "TIMESTAMP",
+    "underlying_price": "DOUBLE",
+    "underlying_symbol": "VARCHAR",
+    "vix": "DOUBLE",
+    "vix1d": "DOUBLE",
+    "spx_open": "DOUBLE",
+    "spx_high": "DOUBLE",
+    "spx_low": "DOUBLE",
+    "spx_prev_close": "DOUBLE",
+    "expirations": "DATE[]",
+    "strikes": "DOUBLE[]",
+}
+
+PARTITION_COLUMNS = ("trading_date", "phase")
+
+_PHASE_RE = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+def _check_phase(phase: str) -> str:
+    if not _PHASE_RE.match(phase):
+        raise ValueError(f"Invalid phase name: {phase!r}")
+    return phase
+
+
+def _source_signature(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _source_of(raw: dict) -> str:
+    """Normalize the raw ``_source`` tag ("" means Schwab)."""
+    return raw.get("_source", "") or "schwab"
+
+
+class ChainStore:
+    """Read/write access to the partitioned Parquet chain store."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else CHAIN_STORE_DIR
+        self._con = None
+
+    # -- paths ---------------------------------------------------------------
+
+    def partition_dir(self, trading_date: Union[str, date], phase: str) -> Path:
+        """Directory holding one (date, phase) snapshot."""
+        return (self.root / f"trading_date={_to_date_str(trading_date)}"
+                / f"phase={_check_phase(phase)}")
+
+    def has_snapshot(self, trading_date: Union[str, date], phase: str) -> bool:
+        part = self.partition_dir(trading_date, phase)
+        return (part / SNAPSHOT_FILE).exists() and (part / CONTRACTS_FILE).exists()
+
+    def is_current(self, trading_date: Union[str, date], phase: str,
+                   source_path: Path) -> bool:
+        """True if the partition exists and was converted from ``source_path`` as it is now.
+
+        A partition without a recorded source, or whose JSON source changed
+        size or mtime since conversion, is stale. If the JSON file is gone
+        the partition is all there is, so it counts as current.
+        """
+        if not self.has_snapshot(trading_date, phase):
+            return False
+        if not source_path.exists():
+            return True
+        try:
+            recorded = json.loads(
+                (self.partition_dir(trading_date, phase) / SOURCE_FILE).read_text())
+        except (OSError, ValueError):
+            return False
+        return recorded == _source_signature(source_path)
+
+    def exists(self) -> bool:
+        """True if the store has at least one partition."""
+        return self.root.exists() and any(self.root.glob("trading_date=*"))
+
+    def dates(self, phase: Optional[str] = None) -> List[date]:
+        """Dates with a stored snapshot (optionally for one phase), ascending."""
+        if not self.root.exists():
+            return []
+        out = []
+        for entry in sorted(self.root.glob("trading_date=*")):
+            try:
+                d = date.fromisoformat(entry.name.split("=", 1)[1])
+            except ValueError:
+                continue
+            if phase is not None and not self.has_snapshot(d, phase):
+                continue
+            out.append(d)
+        return out
+
+    # -- connection ----------------------------------------------------------
+
+    def _connection(self):
+        if self._con is None:
+            import duckdb
+            self._con = duckdb.connect(":memory:")
+        return self._con
+
+    def close(self) -> None:
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+    # -- write ---------------------------------------------------------------
+
+    def write_snapshot(self, trading_date: Union[str, date], phase: str,
+                       chain: ChainSnapshot, source: str = "",
+                       source_path: Optional[Path] = None) -> Path:
+        """Write one parsed snapshot, replacing any existing partition.
+
+        ``source_path`` is the JSON cache file the snapshot came from; its
+        signature is recorded for ``is_current``.
+
+        Returns:
+            The partition directory written.
+        """
+        import pandas as pd
+
+        con = self._connection()
+        part = self.partition_dir(trading_date, phase)
+        part.mkdir(parents=True, exist_ok=True)
+
+        rows = {name: [] for name in CONTRACT_COLUMNS}
+        for c in chain.contracts.values():
+            for name in CONTRACT_COLUMNS:
+                rows[name].append(getattr(c, name))
+        contracts_df = pd.DataFrame(rows, columns=list(CONTRACT_COLUMNS))
+        if not contracts_df.empty:
+            contracts_df["expiration"] = contracts_df["expiration"].map(date.isoformat)
+
+        con.execute("DROP TABLE IF EXISTS _chain_contracts")
+        con.execute("CREATE TEMP TABLE _chain_contracts ("
+                    + ", ".join(f"{n} {t}" for n, t in CONTRACT_COLUMNS.items()) + ")")
+        con.register("_chain_contracts_df", contracts_df)
+        try:
+            con.execute("INSERT INTO _chain_contracts SELECT "
+                        + ", ".join(f"CAST({n} AS {t})" for n, t in CONTRACT_COLUMNS.items())
+                        + " FROM _chain_contracts_df")
+        finally:
+            con.unregister("_chain_contracts_df")
+
+        con.execute("DROP TABLE IF EXISTS _chain_snapshot")
+        con.execute("CREATE TEMP TABLE _chain_snapshot ("
+                    + ", ".join(f"{n} {t}" for n, t in SNAPSHOT_COLUMNS.items()) + ")")
+        con.execute(
+            "INSERT INTO _chain_snapshot VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [source or "schwab", chain.timestamp, chain.underlying_price,
+             chain.underlying_symbol, chain.vix, chain.vix1d,
+             chain.spx_open, chain.spx_high, chain.spx_low, chain.spx_prev_close,
+             list(chain.expirations), list(chain.strikes)],
+        )
+
+        for table, filename in (("_chain_contracts", CONTRACTS_FILE),
+                                ("_chain_snapshot", SNAPSHOT_FILE)):
+            final = part / filename
+            tmp = part / f".{filename}.tmp"
+            con.execute(f"COPY {table} TO '{tmp}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+            os.replace(tmp, final)
+            con.execute(f"DROP TABLE {table}")
+
+        marker = part / SOURCE_FILE
+        if source_path is not None:
+            marker.write_text(json.dumps(_source_signature(source_path)))
+        elif marker.exists():
+            marker.unlink()
+
+        return part
+
+    # -- read ----------------------------------------------------------------
+
+    def load_snapshot(self, trading_date: Union[str, date],
+                      phase: str) -> Optional[ChainSnapshot]:
+        """Rebuild a ChainSnapshot from the store, or None if not stored."""
+        if not self.has_snapshot(trading_date, phase):
+            return None
+        con = self._connection()
+        part = self.partition_dir(trading_date, phase)
+
+        snap = con.execute(
+            "SELECT " + ", ".join(SNAPSHOT_COLUMNS)
+            + f" FROM read_parquet('{part / SNAPSHOT_FILE}')"
+        ).fetchone()
+        if snap is None:
+            return None
+        meta = dict(zip(SNAPSHOT_COLUMNS, snap))
+
+        contracts: Dict[str, OptionContract] = {}
+        for row in con.execute(
+            "SELECT " + ", ".join(CONTRACT_COLUMNS)
+            + f" FROM read_parquet('{part / CONTRACTS_FILE}')"
+        ).fetchall():
+            oc = OptionContract(*row)
+            contracts[oc.symbol] = oc
+
+        return ChainSnapshot(
+            timestamp=meta["timestamp"],
+            phase=phase,
+            underlying_price=meta["underlying_price"],
+            underlying_symbol=meta["underlying_symbol"],
+            vix=meta["vix"],
+            contracts=contracts,
+            expirations=list(meta["expirations"] or []),
+            strikes=list(meta["strikes"] or []),
+            vix1d=meta["vix1d"],
+            spx_open=meta["spx_open"],
+            spx_high=meta["spx_high"],
+            spx_low=meta["spx_low"],
+            spx_prev_close=meta["spx_prev_close"],
+        )
+
+    def contracts(self, start: Optional[Union[str, date]] = None,
+                  end: Optional[Union[str, date]] = None,
+                  phases: Optional[Iterable[str]] = None,
+                  columns: Optional[Sequence[str]] = None,
+                  where: Optional[str] = None):
+        """Scan contract rows across partitions as a DataFrame.
+
+        Args:
+            start: Inclusive first trading date.
+            end: Inclusive last trading date.
+            phases: Restrict to these phases (e.g. ["close5"]).
+            columns: Contract columns to project (default: all).
+                     ``trading_date`` and ``phase`` are always included.
+            where: Optional extra SQL predicate over contract columns,
+                   e.g. ``"put_call = 'P' AND abs(delta) < 0.3"``.
+        """
+        return self._scan(CONTRACTS_FILE, CONTRACT_COLUMNS,
+                          start, end, phases, columns, where)
+
+    def snapshots(self, start: Optional[Union[str, date]] = None,
+                  end: Optional[Union[str, date]] = None,
+                  phases: Optional[Iterable[str]] = None,
+                  columns: Optional[Sequence[str]] = None,
+                  where: Optional[str] = None):
+        """Scan snapshot-level rows (one per date/phase) as a DataFrame."""
+        return self._scan(SNAPSHOT_FILE, SNAPSHOT_COLUMNS,
+                          start, end, phases, columns, where)
+
+    def _scan(self, filename: str, schema: Dict[str, str],
+              start, end, phases, columns, where):
+        import pandas as pd
+
+        cols = list(columns) if columns else list(schema)
+        unknown = [c for c in cols if c not in schema and c not in PARTITION_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+        select = list(PARTITION_COLUMNS) + [c for c in cols if c not in PARTITION_COLUMNS]
+
+        if not self.root.exists() or not any(self.root.glob(f"*/*/{filename}")):
+            return pd.DataFrame(columns=select)
+
+        preds = []
+        if start is not None:
+            preds.append(f"trading_date >= DATE '{_to_date(start).isoformat()}'")
+        if end is not None:
+            preds.append(f"trading_date <= DATE '{_to_date(end).isoformat()}'")
+        if phases is not None:
+            phase_list = ", ".join(f"'{_check_phase(p)}'" for p in phases)
+            if not phase_list:
+                return pd.DataFrame(columns=select)
+            preds.append(f"phase IN ({phase_list})")
+        if where:
+            preds.append(f"({where})")
+
+        sql = (
+            "SELECT " + ", ".join(select)
+            + f" FROM read_parquet('{self.root}/*/*/{filename}',"
+            " hive_partitioning = true,"
+            " hive_types = {'trading_date': DATE, 'phase': VARCHAR})"
+        )
+        if preds:
+            sql += " WHERE " + " AND ".join(preds)
+        sql += " ORDER BY trading_date, phase"
+        return self._connection().execute(sql).df()
+
+
+# ---------------------------------------------------------------------------
+# JSON cache -> chain store converter
+# ---------------------------------------------------------------------------
+
+def _is_chain_file(path: Path) -> bool:
+    """Chain snapshots are the per-phase JSON files (not GW / feature files)."""
+    name = path.stem
+    return (path.suffix == ".json" and "features" not in name
+            and "gw" not in name)
+
+
+def convert_cache_tree(cache_dir: Optional[Path] = None,
+                       store: Optional[ChainStore] = None,
+                       start: Optional[Union[str, date]] = None,
+                       end: Optional[Union[str, date]] = None,
+                       overwrite: bool = False) -> int:
+    """Convert the JSON cache tree into the chain store.
+
+    Each ``{cache_dir}/YYYY-MM-DD/{phase}.json`` chain file is parsed with the
+    same dispatch the scheduler uses and written as one partition.  Partitions
+    still current with their JSON file are skipped unless ``overwrite`` is
+    set; files changed since conversion (size or mtime) are rewritten, so
+    the converter can be re-run after every sync.
+
+    Returns:
+        Number of snapshots written.
+    """
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    store = store or ChainStore()
+    if not cache_dir.exists():
+        return 0
+
+    lo = _to_date(start) if start is not None else None
+    hi = _to_date(end) if end is not None else None
+
+    written = 0
+    for day_dir in sorted(cache_dir.iterdir()):
+        if not day_dir.is_dir():
+            continue
+        try:
+            d = date.fromisoformat(day_dir.name)
+        except ValueError:
+            continue
+        if (lo and d < lo) or (hi and d > hi):
+            continue
+
+        for path in sorted(day_dir.iterdir()):
+            if not _is_chain_file(path):
+                continue
+            phase = path.stem
+            if not _PHASE_RE.match(phase):
+                continue
+            if not overwrite and store.is_current(d, phase, path):
+                continue
+            try:
+                raw = load_cache_file(path)
+                if not raw or "_vix" not in raw:
+                    continue
+                chain = parse_cached_chain(raw, phase)
+            except Exception as e:
+                logger.warning("Skipping %s: %s", path, e)
+                continue
+            store.write_snapshot(d, phase, chain, source=_source_of(raw),
+                                 source_path=path)
+            written += 1
+
+        logger.debug("Converted %s", d)
+
+    logger.info("Chain store conversion complete: %d snapshots written", written)
+    return written
@@ -11,6 +11,7 @@ Usage:
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import asdict, dataclass, field
 from datetime import date
 from pathlib import Path
@@ -493,8 +494,11 @@ def save_feature_pack(trading_date: date, phase: str, fp: FeaturePack) -> Path:
     d = trading_date.isoformat() if isinstance(trading_date, date) else trading_date
     path = CACHE_DIR / d / f"{phase}_features.json"
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
+    # Write-then-rename: parallel sweep workers may save the same day at once
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
         json.dump(fp.to_dict(), f)
+    os.replace(tmp, path)
     return path
 
 
@@ -21,14 +21,15 @@ from datetime import date
 from pathlib import Path
 from typing import Optional, Union
 
+from sim.data import s3_transfer
+
 logger = logging.getLogger(__name__)
 
 S3_BUCKET = os.environ.get("SIM_CACHE_BUCKET", "gamma-sim-cache")
 
 
 def _s3_client():
-    import boto3
-    return boto3.client("s3")
+    return s3_transfer.get_client()
 
 
 def _s3_key(trading_date: Union[str, date], filename: str) -> str:
@@ -56,10 +57,11 @@ def s3_get_json(trading_date: Union[str, date], filename: str,
     """Read a JSON object from S3 cache. Returns None if not found."""
     bucket = bucket or S3_BUCKET
     key = _s3_key(trading_date, filename)
+    s3 = _s3_client()
     try:
-        resp = _s3_client().get_object(Bucket=bucket, Key=key)
+        resp = s3.get_object(Bucket=bucket, Key=key)
         return json.loads(resp["Body"].read())
-    except _s3_client().exceptions.NoSuchKey:
+    except s3.exceptions.NoSuchKey:
         return None
     except Exception as e:
         logger.warning("S3 GET failed for %s: %s", key, e)
@@ -83,7 +85,11 @@ def s3_list_dates(bucket: str = "") -> list[str]:
 
 def sync_s3_to_local(local_cache_dir: Path, bucket: str = "",
                      dates: Optional[list[str]] = None) -> int:
-    """Download all chain data from S3 to local cache directory.
+    """Download new or changed chain data from S3 to local cache directory.
+
+    One listing covers the whole date range and files are fetched in
+    parallel; an ETag/size manifest in the cache directory skips objects
+    that are already mirrored (see sim.data.s3_transfer).
 
     Args:
         local_cache_dir: Local sim/cache/ directory.
@@ -94,30 +100,26 @@ def sync_s3_to_local(local_cache_dir: Path, bucket: str = "",
         Number of files downloaded.
     """
     bucket = bucket or S3_BUCKET
-    s3 = _s3_client()
-
-    if dates is None:
-        dates = s3_list_dates(bucket)
-
-    downloaded = 0
-    for d in dates:
-        prefix = f"{d}/"
-        paginator = s3.get_paginator("list_objects_v2")
-        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-            for obj in page.get("Contents", []):
-                key = obj["Key"]
-                filename = key.split("/", 1)[1] if "/" in key else key
-                local_path = local_cache_dir / d / filename
-
-                if local_path.exists():
-                    continue
-
-                local_path.parent.mkdir(parents=True, exist_ok=True)
-                s3.download_file(bucket, key, str(local_path))
-                downloaded += 1
-                logger.debug("Downloaded %s -> %s", key, local_path)
-
-        logger.info("Synced %s", d)
-
-    logger.info("S3 sync complete: %d new files from %d dates", downloaded, len(dates))
-    return downloaded
+    local_cache_dir = Path(local_cache_dir)
+    wanted = set(dates) if dates is not None else None
+    if wanted is not None and not wanted:
+        return 0
+
+    def local_path_for(key: str) -> Optional[Path]:
+        d, sep, filename = key.partition("/")
+        if not sep or not filename or len(d) != 10 or d[4] != "-" or d[7] != "-":
+            return None
+        if wanted is not None and d not in wanted:
+            return None
+        return local_cache_dir / d / filename
+
+    # "0" sorts right after "/", so end_before closes the last date's keys
+    stats = s3_transfer.sync_down(
+        bucket, local_cache_dir,
+        start_after=min(wanted) if wanted else "",
+        end_before=max(wanted) + "0" if wanted else None,
+        local_path_for=local_path_for,
+    )
+    logger.info("S3 sync complete: %d new files (%d up to date, %d errors)",
+                stats["downloaded"], stats["skipped"], stats["errors"])
+    return stats["downloaded"]
@@ -0,0 +1,258 @@
+"""Shared S3 transfer layer: one client, parallel transfers, manifest diffing.
+
+Used by the chain cache sync (sim.data.s3_cache) and the reporting event
+sync (reporting.ingest), and by the Lambda event upload.
+
+  - One boto3 client per process (clients are thread-safe), sized so every
+    worker thread gets its own pooled connection.
+  - One paginated listing for a whole key range instead of one per date.
+  - A manifest ({key: [etag, size]}) next to the local tree, so only new or
+    changed objects are downloaded. Files that already exist locally with
+    the listed size are adopted into the manifest without a download.
+  - Downloads / uploads fan out over a thread pool; downloads land in a
+    temp file and are renamed, so an interrupted sync never leaves a
+    truncated file that looks complete.
+
+Usage:
+    from sim.data.s3_transfer import sync_down
+    stats = sync_down("gamma-sim-cache", local_root=Path("sim/cache"),
+                      start_after="2026-01-01", end_before="2026-02-01")
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get("S3_TRANSFER_WORKERS", "16"))
+MANIFEST_NAME = ".s3_manifest.json"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def get_client():
+    """Process-wide S3 client with a connection pool sized for MAX_WORKERS."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3
+                from botocore.config import Config
+
+                _client = boto3.client("s3", config=Config(
+                    max_pool_connections=max(MAX_WORKERS, 10),
+                    retries={"max_attempts": 5, "mode": "standard"},
+                ))
+    return _client
+
+
+def reset_client() -> None:
+    """Drop the cached client (credentials/endpoint changed, tests)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+# ---------------------------------------------------------------------------
+# Listing
+# ---------------------------------------------------------------------------
+
+def list_objects(bucket: str, prefix: str = "", start_after: str = "",
+                 end_before: Optional[str] = None) -> list[dict]:
+    """List objects under ``prefix`` with start_after < key < end_before.
+
+    One paginated listing; S3 returns keys in lexicographic order, so the
+    scan stops at the first key past ``end_before``. Returns dicts with
+    Key, Size and ETag (quotes stripped).
+    """
+    paginator = get_client().get_paginator("list_objects_v2")
+    kwargs = {"Bucket": bucket, "Prefix": prefix}
+    if start_after:
+        kwargs["StartAfter"] = start_after
+    out = []
+    for page in paginator.paginate(**kwargs):
+        for obj in page.get("Contents", []):
+            key = obj.get("Key", "")
+            if end_before is not None and key >= end_before:
+                return out
+            out.append({
+                "Key": key,
+                "Size": int(obj.get("Size") or 0),
+                "ETag": str(obj.get("ETag") or "").strip('"'),
+            })
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------------
+
+class Manifest:
+    """ETag/size record of objects already mirrored into a local tree."""
+
+    def __init__(self, path: Path, bucket: str):
+        self.path = Path(path)
+        self.bucket = bucket
+        self.objects: dict[str, list] = {}
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("bucket") == bucket:
+                self.objects = data.get("objects", {})
+        except (OSError, ValueError):
+            pass
+
+    def is_current(self, obj: dict, local_path: Path) -> bool:
+        """True if ``local_path`` already holds this version of the object."""
+        try:
+            local_size = local_path.stat().st_size
+        except OSError:
+            return False
+        if local_size != obj["Size"]:
+            return False
+        entry = self.objects.get(obj["Key"])
+        if entry is None:
+            # Pre-manifest file of the right size: adopt it
+            self.record(obj)
+            return True
+        return entry == [obj["ETag"], obj["Size"]]
+
+    def record(self, obj: dict) -> None:
+        self.objects[obj["Key"]] = [obj["ETag"], obj["Size"]]
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"bucket": self.bucket, "objects": self.objects}, f,
+                      separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+# ---------------------------------------------------------------------------
+# Parallel transfers
+# ---------------------------------------------------------------------------
+
+def _run_parallel(fn: Callable, jobs: list, max_workers: Optional[int]) -> tuple[list, int]:
+    """Run fn(job) over a thread pool. Returns (succeeded jobs, error count)."""
+    done, errors = [], 0
+    if not jobs:
+        return done, errors
+    workers = min(max_workers or MAX_WORKERS, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fn, job): job for job in jobs}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+                done.append(futures[fut])
+            except Exception as e:
+                errors += 1
+                logger.warning("S3 transfer failed for %s: %s", futures[fut], e)
+    return done, errors
+
+
+def download_many(bucket: str, pairs: Iterable[tuple[str, Path]],
+                  max_workers: Optional[int] = None) -> tuple[list, int]:
+    """Download (key, local_path) pairs in parallel.
+
+    Returns (succeeded pairs, error count).
+    """
+    s3 = get_client()
+
+    def _download(pair):
+        key, local_path = pair
+        local_path = Path(local_path)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = local_path.with_name(f".{local_path.name}.part")
+        s3.download_file(bucket, key, str(tmp))
+        os.replace(tmp, local_path)
+
+    return _run_parallel(_download, list(pairs), max_workers)
+
+
+def upload_many(bucket: str, pairs: Iterable[tuple[Path, str]],
+                max_workers: Optional[int] = None) -> tuple[list, int]:
+    """Upload (local_path, key) pairs in parallel.
+
+    Returns (succeeded pairs, error count).
+    """
+    s3 = get_client()
+
+    def _upload(pair):
+        local_path, key = pair
+        s3.upload_file(str(local_path), bucket, key)
+
+    return _run_parallel(_upload, list(pairs), max_workers)
+
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def sync_down(bucket: str, local_root: Path, prefix: str = "",
+              start_after: str = "", end_before: Optional[str] = None,
+              local_path_for: Optional[Callable[[str], Optional[Path]]] = None,
+              max_workers: Optional[int] = None) -> dict:
+    """Mirror new/changed objects of a key range into ``local_root``.
+
+    Args:
+        bucket: S3 bucket.
+        local_root: Local directory; the manifest lives at its top level.
+        prefix: Key prefix to list.
+        start_after: List keys strictly after this key.
+        end_before: Stop at the first key >= this key.
+        local_path_for: Maps a key to its local path, or None to skip the
+            object. Defaults to the key relative to ``prefix``.
+        max_workers: Thread pool size (default MAX_WORKERS).
+
+    Returns:
+        {objects, downloaded, skipped, errors, keys} where keys lists the
+        downloaded object keys.
+    """
+    local_root = Path(local_root)
+    if local_path_for is None:
+        def local_path_for(key):
+            return local_root / key[len(prefix):].lstrip("/")
+
+    manifest = Manifest(local_root / MANIFEST_NAME, bucket)
+    stats = {"objects": 0, "downloaded": 0, "skipped": 0, "errors": 0, "keys": []}
+
+    wanted, by_key = [], {}
+    for obj in list_objects(bucket, prefix, start_after, end_before):
+        local_path = local_path_for(obj["Key"])
+        if local_path is None:
+            continue
+        stats["objects"] += 1
+        if manifest.is_current(obj, local_path):
+            stats["skipped"] += 1
+            continue
+        wanted.append((obj["Key"], local_path))
+        by_key[obj["Key"]] = obj
+
+    done, stats["errors"] = download_many(bucket, wanted, max_workers)
+    for key, _ in done:
+        manifest.record(by_key[key])
+    manifest.save()
+
+    stats["downloaded"] = len(done)
+    stats["keys"] = sorted(key for key, _ in done)
+    logger.info("S3 sync s3://%s/%s: %d objects, %d downloaded, %d errors",
+                bucket, prefix, stats["objects"], stats["downloaded"], stats["errors"])
+    return stats
@@ -2,7 +2,12 @@
 
 Two-step process:
 1. GET /option-chains/SPX/nested → strike/symbol mapping for all expirations
-2. GET /market-data/by-type?option=<symbol> → greeks/pricing per symbol (batched)
+2. Quotes/greeks for the strike window:
+   a. DXLink stream (TT/Script/tt_dxlink.py): one subscription for every
+      streamer symbol, Quote + Greeks + Summary events, bounded by
+      TT_CHAIN_STREAM_TIMEOUT seconds (default 10)
+   b. GET /market-data/by-type?option=<symbol> for any symbol the stream
+      did not fill (or for all of them with TT_CHAIN_STREAM=0)
 """
 
 from __future__ import annotations
@@ -238,6 +243,101 @@ def _fetch_quotes_batch(symbols: List[str],
     return quotes
 
 
+# Trade carries dayVolume, which feeds the contract volume and GEX weighting.
+STREAM_EVENT_TYPES = ("Quote", "Greeks", "Summary", "Trade")
+# A symbol counts as streamed only once all of these arrived; Summary carries
+# openInterest, which GEX and the OI walls cannot do without.
+STREAM_REQUIRED = ("Quote", "Greeks", "Summary")
+
+
+def _stream_enabled() -> bool:
+    return os.environ.get("TT_CHAIN_STREAM", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _quote_from_events(events: Dict[str, dict]) -> dict:
+    """Flatten DXLink Quote/Greeks/Summary/Trade events into a REST-style quote."""
+    quote = events.get("Quote", {})
+    greeks = events.get("Greeks", {})
+    summary = events.get("Summary", {})
+    trade = events.get("Trade", {})
+    bid = quote.get("bidPrice")
+    ask = quote.get("askPrice")
+    out = {
+        "bid": bid,
+        "ask": ask,
+        "mark": (bid + ask) / 2.0 if bid is not None and ask is not None else None,
+        "last": trade.get("price"),
+        "volatility": greeks.get("volatility"),
+        "delta": greeks.get("delta"),
+        "gamma": greeks.get("gamma"),
+        "theta": greeks.get("theta"),
+        "vega": greeks.get("vega"),
+        "rho": greeks.get("rho"),
+        "openInterest": summary.get("openInterest"),
+        "volume": trade.get("dayVolume"),
+    }
+    return {k: v for k, v in out.items() if v is not None}
+
+
+def _stream_quotes(streamer_symbols: Dict[str, str],
+                   timeout_s: Optional[float] = None,
+                   token: str = "", url: str = "") -> Dict[str, dict]:
+    """Collect quotes for a whole strike window over one DXLink session.
+
+    Args:
+        streamer_symbols: order symbol → streamer symbol ('.SPXW260227C6940').
+        timeout_s: Collection deadline (default TT_CHAIN_STREAM_TIMEOUT or 10s).
+        token, url: Quote token / DXLink URL (fetched when omitted).
+
+    Returns:
+        order symbol → REST-style quote dict, for symbols with a Quote,
+        Greeks and Summary event. Symbols still missing one are left out so
+        the caller REST-fetches them. Stream failures are logged and return
+        what arrived.
+    """
+    from tt_dxlink import collect_events
+
+    if timeout_s is None:
+        timeout_s = float(os.environ.get("TT_CHAIN_STREAM_TIMEOUT", "10"))
+    by_streamer = {s: o for o, s in streamer_symbols.items() if s}
+    if not by_streamer:
+        return {}
+
+    started = time.time()
+    try:
+        events = collect_events(list(by_streamer), timeout_s=timeout_s,
+                                required=STREAM_REQUIRED,
+                                event_types=STREAM_EVENT_TYPES,
+                                token=token, url=url)
+    except Exception as e:
+        logger.warning("DXLink chain stream failed: %s", e)
+        return {}
+
+    quotes = {}
+    for streamer_sym, ev in events.items():
+        if all(t in ev for t in STREAM_REQUIRED):
+            quotes[by_streamer[streamer_sym]] = _quote_from_events(ev)
+    logger.info("Streamed quotes for %d/%d symbols in %.1fs",
+                len(quotes), len(by_streamer), time.time() - started)
+    return quotes
+
+
+def _fetch_quotes(symbols: List[str],
+                  streamer_symbols: Dict[str, str],
+                  symbol_candidates: Optional[Dict[str, List[str]]] = None,
+                  ) -> Dict[str, dict]:
+    """Stream the window first, then REST-fetch only the symbols it missed."""
+    quotes = {}
+    if _stream_enabled():
+        quotes = _stream_quotes({s: streamer_symbols.get(s, "") for s in symbols})
+    missing = [s for s in symbols if s not in quotes]
+    if missing:
+        if quotes:
+            logger.info("REST fallback for %d symbols missing from stream", len(missing))
+        quotes.update(_fetch_quotes_batch(missing, symbol_candidates=symbol_candidates))
+    return quotes
+
+
 # --- Safe value extraction ---
 
 def _sfloat(val, default: float = 0.0) -> float:
@@ -264,8 +364,8 @@ def fetch_tt_spx_chain(phase: str = "open",
                        strike_window: int = 40) -> Optional[dict]:
     """Fetch the SPX 1DTE chain from TastyTrade with greeks.
 
-    Only fetches quotes for strikes within ±strike_window of ATM to
-    avoid excessive API calls (TT requires 1 call per symbol).
+    Only fetches quotes for strikes within ±strike_window of ATM. Quotes
+    are streamed over DXLink; REST (1 call per symbol) only fills gaps.
 
     Args:
         phase: "open", "mid", or "close".
@@ -310,6 +410,7 @@ def fetch_tt_spx_chain(phase: str = "open",
     put_symbols = []
     strike_map = {}  # symbol → (strike, put_call)
     symbol_candidates = {}  # order_symbol → [candidate_symbols_to_try]
+    streamer_symbols = {}  # order_symbol → DXLink streamer symbol
 
     for st in strikes_list:
         strike_price = _sfloat(st.get("strike-price"))
@@ -325,17 +426,20 @@ def fetch_tt_spx_chain(phase: str = "open",
             call_symbols.append(call_sym)
             strike_map[call_sym] = (strike_price, "C")
             symbol_candidates[call_sym] = _symbol_candidates(call_sym, call_streamer)
+            streamer_symbols[call_sym] = call_streamer
         if put_sym:
             put_symbols.append(put_sym)
             strike_map[put_sym] = (strike_price, "P")
             symbol_candidates[put_sym] = _symbol_candidates(put_sym, put_streamer)
+            streamer_symbols[put_sym] = put_streamer
 
     all_symbols = call_symbols + put_symbols
     logger.info("Fetching quotes for %d calls + %d puts = %d symbols",
                 len(call_symbols), len(put_symbols), len(all_symbols))
 
     # Step 3: Fetch quotes/greeks (may be empty after hours)
-    quotes = _fetch_quotes_batch(all_symbols, symbol_candidates=symbol_candidates)
+    quotes = _fetch_quotes(all_symbols, streamer_symbols,
+                           symbol_candidates=symbol_candidates)
 
     # Step 4: Fetch VIX and underlying (already fetched above, refresh)
     vix = _fetch_vix()
@@ -1,6 +1,15 @@
 """Session orchestrator and multi-session scheduler."""
 
-from sim.orchestrator.session import SessionRunner
-from sim.orchestrator.scheduler import Scheduler
-
 __all__ = ["SessionRunner", "Scheduler"]
+
+
+def __getattr__(name):
+    # Resolved on first use so sim.orchestrator.sweep imports without the
+    # session/agent stack
+    if name == "SessionRunner":
+        from sim.orchestrator.session import SessionRunner
+        return SessionRunner
+    if name == "Scheduler":
+        from sim.orchestrator.scheduler import Scheduler
+        return Scheduler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from sim.config import CACHE_DIR
-from sim.data.cache import find_contiguous_windows, load_from_cache
-from sim.data.chain_snapshot import parse_cboe_chain, parse_schwab_chain, parse_tt_chain
+from sim.data.cache import cache_path, find_contiguous_windows, load_from_cache
+from sim.data.chain_snapshot import parse_cached_chain
+from sim.data.chain_store import ChainStore
 from sim.orchestrator.session import SessionRunner
 from sim.persistence.db import init_db
 from sim.persistence.queries import count_sessions
@@ -21,15 +22,22 @@ class Scheduler:
 
     def __init__(self, anthropic_client=None, openai_client=None,
                  db_path: Optional[Path] = None,
-                 max_sessions: int = 200):
+                 max_sessions: int = 200,
+                 baseline_params: Optional[Dict[str, dict]] = None,
+                 response_cache=None, fast_writes: bool = False):
         self.db_path = db_path
         self.max_sessions = max_sessions
 
-        self.conn = init_db(db_path) if db_path else init_db()
+        self.conn = (init_db(db_path, fast=fast_writes) if db_path
+                     else init_db(fast=fast_writes))
+        self.store = ChainStore()
         self.runner = SessionRunner(
             anthropic_client=anthropic_client,
             openai_client=openai_client,
             db_path=db_path,
+            baseline_params=baseline_params,
+            response_cache=response_cache,
+            fast_writes=fast_writes,
         )
 
     def run(self, trading_dates: Optional[List[str]] = None) -> dict:
@@ -129,19 +137,21 @@ class Scheduler:
         return all_dates[:self.max_sessions]
 
     def _load_chain(self, trading_date: str, phase: str) -> Optional:
-        """Load chain snapshot from cache."""
+        """Load chain snapshot from the Parquet store, falling back to JSON cache.
+
+        Partitions whose JSON file changed since conversion are skipped.
+        """
+        if self.store.is_current(trading_date, phase, cache_path(trading_date, phase)):
+            try:
+                return self.store.load_snapshot(trading_date, phase)
+            except Exception as e:
+                logger.warning("Chain store read failed for %s/%s, using JSON: %s",
+                               trading_date, phase, e)
         raw = load_from_cache(trading_date, phase)
         if raw is None:
             return None
         try:
-            source = raw.get("_source", "")
-            if source == "tastytrade":
-                return parse_tt_chain(raw)
-            elif source in ("cboe", "thetadata"):
-                return parse_cboe_chain(raw)
-            else:
-                vix = raw.get("_vix", 0.0)
-                return parse_schwab_chain(raw, phase, vix=vix)
+            return parse_cached_chain(raw, phase)
         except Exception as e:
             logger.error("Failed to parse chain for %s/%s: %s",
                          trading_date, phase, e)
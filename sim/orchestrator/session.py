@@ -4,16 +4,25 @@ Session flow:
   1. SETTLE: settle 1DTE positions from prior session using today's SPX close
   2. FEATURES: enrich chain (close5 phase) with GW data
   3. DECIDE: all 4 AI agents + 6 baselines make decisions
+     (agent LLM calls run concurrently; fills are applied serially in
+     agent order so broker RNG and account state stay reproducible)
   4. RECORD: save accounts, update agent memory, diagnostics
+
+All writes for one session go through a single unit of work
+(sim.persistence.db.unit_of_work): one commit per session, rolled back
+if the session fails.
 """
 
 from __future__ import annotations
 
 import json
 import logging
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
 
 from sim.config import (
+    AGENT_DECISION_TIMEOUT_S,
     RISK_FREE_RATE_ANNUAL,
     RNG_SEED,
 )
@@ -25,41 +34,74 @@ from sim.engine.order import Order
 from sim.engine.paper_broker import FillResult, PaperBroker
 from sim.engine.settlement import settle_prior_positions
 from sim.agents.agent_registry import get_agent_configs
-from sim.agents.claude_agent import ClaudeAgent
-from sim.agents.openai_agent import OpenAIAgent
 from sim.agents.base_agent import BaseAgent
 from sim.agents.memory import build_session_record, update_memory, format_memory
-from sim.baselines import (
-    HoldCash, NarrowIC, WideIC, DirectionalPut, IronFly,
-    DynamicButterfly, DynamicButterflyVix1d,
-)
 from sim.persistence import queries
-from sim.persistence.db import init_db
+from sim.persistence.db import init_db, unit_of_work
 
 logger = logging.getLogger(__name__)
 
 DAILY_RISK_FREE = RISK_FREE_RATE_ANNUAL / 252
 
+# Session baselines by class name in sim.baselines. Provider SDKs and
+# baseline modules are imported on first use, so the session module (and
+# the sweep workers built on it) load without the optional agent stack.
+BASELINE_NAMES = [
+    "NarrowIC",
+    "WideIC",
+    "DirectionalPut",
+    "IronFly",
+    "DynamicButterfly",
+    "DynamicButterflyVix1d",
+    "HoldCash",
+]
+
+
+def default_baselines(params: Optional[Dict[str, dict]] = None) -> list:
+    """Instantiate the session baselines.
+
+    Args:
+        params: Optional constructor kwargs per baseline class name,
+                e.g. {"NarrowIC": {"width": 10}} (parameter sweeps).
+    """
+    params = params or {}
+    unknown = set(params) - set(BASELINE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown baseline(s): {', '.join(sorted(unknown))}")
+    import sim.baselines
+
+    return [getattr(sim.baselines, name)(**params.get(name, {}))
+            for name in BASELINE_NAMES]
+
 
 class SessionRunner:
     """Runs a single 1DTE session for all participants."""
 
     def __init__(self, anthropic_client=None, openai_client=None,
-                 db_path=None):
-        self.conn = init_db(db_path) if db_path else init_db()
+                 db_path=None, baseline_params: Optional[Dict[str, dict]] = None,
+                 decision_timeout: float = AGENT_DECISION_TIMEOUT_S,
+                 response_cache=None, fast_writes: bool = False):
+        self.conn = (init_db(db_path, fast=fast_writes) if db_path
+                     else init_db(fast=fast_writes))
         self.broker = PaperBroker(rng_seed=RNG_SEED)
+        self.decision_timeout = decision_timeout
 
         # Initialize AI agents based on provider (skip if no client provided)
         self.agents: Dict[str, BaseAgent] = {}
         for agent_id, cfg in get_agent_configs().items():
             if cfg["provider"] == "anthropic" and anthropic_client is not None:
+                from sim.agents.claude_agent import ClaudeAgent
+
                 self.agents[agent_id] = ClaudeAgent(
                     agent_id=agent_id,
                     model=cfg["model"],
                     trained=cfg.get("trained", False),
                     client=anthropic_client,
+                    response_cache=response_cache,
                 )
             elif cfg["provider"] == "openai" and openai_client is not None:
+                from sim.agents.openai_agent import OpenAIAgent
+
                 self.agents[agent_id] = OpenAIAgent(
                     agent_id=agent_id,
                     model=cfg["model"],
@@ -71,15 +113,7 @@ class SessionRunner:
             logger.warning("No AI agents initialized (missing API keys). Running baselines only.")
 
         # Initialize baselines
-        self.baselines = [
-            NarrowIC(),
-            WideIC(),
-            DirectionalPut(),
-            IronFly(),
-            DynamicButterfly(),
-            DynamicButterflyVix1d(),
-            HoldCash(),
-        ]
+        self.baselines = default_baselines(baseline_params)
 
         # Account state (loaded/created per session)
         self.accounts: Dict[str, Account] = {}
@@ -97,7 +131,22 @@ class SessionRunner:
 
         Returns:
             Session summary dict.
+
+        All database writes for the session are committed as one
+        transaction; if the session raises, none of them are kept.
         """
+        try:
+            with unit_of_work(self.conn):
+                return self._run_session(session_id, trading_date, chain,
+                                         prior_spx_close)
+        except Exception:
+            logger.error("Session %d (%s) failed; rolled back its writes",
+                         session_id, trading_date)
+            raise
+
+    def _run_session(self, session_id: int, trading_date: str,
+                     chain: ChainSnapshot,
+                     prior_spx_close: Optional[float]) -> dict:
         all_participants = list(self.agents.keys()) + [b.agent_id for b in self.baselines]
         self._ensure_accounts(all_participants)
 
@@ -134,9 +183,11 @@ class SessionRunner:
         # ===================================================================
         # 3. DECIDE: all agents and baselines
         # ===================================================================
+        decisions = self._decide_agents(session_id, chain)
         agent_results = {}
         for agent_id, agent in self.agents.items():
-            result = self._run_agent(agent, session_id, chain)
+            order, raw_response = decisions[agent_id]
+            result = self._run_agent(agent, session_id, chain, order, raw_response)
             agent_results[agent_id] = result
 
         baseline_results = {}
@@ -168,6 +219,9 @@ class SessionRunner:
                 self.accounts[agent_id],
             )
 
+        # Fold this session into the materialized leaderboard metrics
+        queries.refresh_agent_metrics(self.conn)
+
         logger.info("=== Session %d complete ===", session_id)
 
         return {
@@ -226,17 +280,54 @@ class SessionRunner:
     # Agent / baseline execution
     # -------------------------------------------------------------------
 
-    def _run_agent(self, agent: BaseAgent, session_id: int,
-                   chain: ChainSnapshot) -> dict:
-        """Run a single AI agent's decision."""
-        acct = self.accounts[agent.agent_id]
+    def _decide_agents(self, session_id: int, chain: ChainSnapshot
+                       ) -> Dict[str, Tuple[Optional[Order], str]]:
+        """Collect every AI agent's decision concurrently.
 
-        # Load memory
-        memory = queries.load_agent_state(self.conn, agent.agent_id)
+        Memory is loaded up front on this thread (the SQLite connection is
+        not shared with workers). Each agent gets ``decision_timeout``
+        seconds from the start of the phase; a late agent holds for this
+        session. Results are keyed in ``self.agents`` order.
+        """
+        if not self.agents:
+            return {}
 
-        order, raw_response = agent.decide(
-            chain, acct, session_id, memory=memory,
-        )
+        memories = {
+            agent_id: queries.load_agent_state(self.conn, agent_id)
+            for agent_id in self.agents
+        }
+
+        pool = ThreadPoolExecutor(max_workers=len(self.agents),
+                                  thread_name_prefix="agent-decide")
+        try:
+            futures = {
+                agent_id: pool.submit(
+                    agent.decide, chain, self.accounts[agent_id], session_id,
+                    memory=memories[agent_id],
+                )
+                for agent_id, agent in self.agents.items()
+            }
+            deadline = monotonic() + self.decision_timeout
+            decisions = {}
+            for agent_id, future in futures.items():
+                try:
+                    decisions[agent_id] = future.result(
+                        timeout=max(0.0, deadline - monotonic()))
+                except FutureTimeout:
+                    future.cancel()
+                    logger.warning("[%s] decision timed out after %.0fs, holding",
+                                   agent_id, self.decision_timeout)
+                    decisions[agent_id] = (None, "TIMEOUT_HOLD")
+        finally:
+            # Don't block the session on a stuck call; its result is discarded.
+            pool.shutdown(wait=False, cancel_futures=True)
+        return decisions
+
+    def _run_agent(self, agent: BaseAgent, session_id: int,
+                   chain: ChainSnapshot, order: Optional[Order],
+                   raw_response: str) -> dict:
+        """Record an AI agent's decision and fill its order."""
+        acct = self.accounts[agent.agent_id]
 
         result = {
             "agent_id": agent.agent_id,
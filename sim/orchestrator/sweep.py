@@ -0,0 +1,365 @@
+"""Parallel parameter sweeps — (config x date-window) cells on a process pool.
+
+Baselines are deterministic given the chain, so a sweep over slippage bands,
+risk limits or baseline parameters is embarrassingly parallel.  Each cell
+runs a baseline-only Scheduler in a worker process against its own SQLite
+shard (no shared DB, no write contention).  Progress is kept in a JSON
+manifest: re-running the same sweep skips finished cells, and a cell that
+was interrupted resumes from its shard's last completed session.
+merge_shards() folds every shard's hard metrics into one leaderboard.
+
+Layout under out_dir:
+    manifest.json        cell specs + status
+    shards/<cell>.db     one simulation DB per cell
+    leaderboard.json     merged per-config and per-cell metrics
+
+Usage:
+    from sim.orchestrator.sweep import SweepConfig, run_sweep, merge_shards
+    configs = [SweepConfig("base"),
+               SweepConfig("slip2x", overrides={"SLIPPAGE_BASE": 0.10})]
+    run_sweep(configs, windows, out_dir=Path("sim/data/sweeps/slip"), workers=8)
+    board = merge_shards(Path("sim/data/sweeps/slip"))
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import sim.config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+@dataclass
+class SweepConfig:
+    """One point in the parameter grid.
+
+    Attributes:
+        name: Filesystem-safe label (used in cell ids and shard names).
+        overrides: sim.config constants to replace, e.g.
+                   {"SLIPPAGE_BASE": 0.10, "MAX_CONCURRENT_SPREADS": 2}.
+        baseline_params: Constructor kwargs per baseline class name.
+    """
+    name: str
+    overrides: Dict[str, Any] = field(default_factory=dict)
+    baseline_params: Dict[str, dict] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not _NAME_RE.match(self.name):
+            raise ValueError(f"Invalid sweep config name: {self.name!r}")
+        unknown = [k for k in self.overrides if not hasattr(sim.config, k)]
+        if unknown:
+            raise ValueError(f"Unknown sim.config override(s): {', '.join(unknown)}")
+
+
+@dataclass
+class SweepCell:
+    """A config run over one contiguous window of trading dates."""
+    cell_id: str
+    config: SweepConfig
+    dates: List[str]
+
+    def spec(self) -> dict:
+        return {"config": asdict(self.config), "dates": self.dates}
+
+
+def plan_cells(configs: Sequence[SweepConfig],
+               windows: Sequence[Sequence[str]]) -> List[SweepCell]:
+    """Cross product of configs x windows, in a stable order."""
+    names = [c.name for c in configs]
+    if len(set(names)) != len(names):
+        raise ValueError("Sweep config names must be unique")
+    cells = []
+    for config in configs:
+        for window in windows:
+            dates = sorted(window)
+            if not dates:
+                continue
+            cells.append(SweepCell(
+                cell_id=f"{config.name}__{dates[0]}_{dates[-1]}",
+                config=config,
+                dates=dates,
+            ))
+    return cells
+
+
+def split_windows(windows: Sequence[Sequence[str]],
+                  size: int) -> List[List[str]]:
+    """Chop date windows into consecutive chunks of at most ``size`` dates."""
+    if size <= 0:
+        return [list(w) for w in windows]
+    out = []
+    for window in windows:
+        dates = sorted(window)
+        out.extend(dates[i:i + size] for i in range(0, len(dates), size))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Config overrides (applied inside the worker process)
+# ---------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def apply_overrides(overrides: Dict[str, Any]) -> Iterator[None]:
+    """Temporarily replace sim.config constants everywhere they were imported.
+
+    Engine modules use ``from sim.config import NAME``, which copies the
+    binding, so every loaded ``sim.*`` module still bound to the original
+    object is patched too.  Everything is restored on exit, which keeps
+    pool workers clean between cells.
+    """
+    patched = []
+    try:
+        for name, value in overrides.items():
+            original = getattr(sim.config, name)
+            for mod_name, mod in list(sys.modules.items()):
+                if mod is None or not (mod_name == "sim" or mod_name.startswith("sim.")):
+                    continue
+                if getattr(mod, name, None) is original:
+                    patched.append((mod, name, original))
+                    setattr(mod, name, value)
+        yield
+    finally:
+        for mod, name, original in reversed(patched):
+            setattr(mod, name, original)
+
+
+# ---------------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------------
+
+def _manifest_path(out_dir: Path) -> Path:
+    return out_dir / "manifest.json"
+
+
+def load_manifest(out_dir: Path) -> dict:
+    """Read the sweep manifest (empty manifest if none yet)."""
+    path = _manifest_path(out_dir)
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "cells": {}}
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported sweep manifest version in {path}")
+    return manifest
+
+
+def _save_manifest(out_dir: Path, manifest: dict) -> None:
+    path = _manifest_path(out_dir)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _register_cells(manifest: dict, cells: Sequence[SweepCell]) -> None:
+    """Add new cells as pending; refuse to reuse an id with a different spec."""
+    for cell in cells:
+        entry = manifest["cells"].get(cell.cell_id)
+        if entry is None:
+            manifest["cells"][cell.cell_id] = {
+                **cell.spec(),
+                "shard": f"shards/{cell.cell_id}.db",
+                "status": "pending",
+            }
+        elif {"config": entry["config"], "dates": entry["dates"]} != cell.spec():
+            raise ValueError(
+                f"Sweep cell {cell.cell_id} already exists with a different "
+                f"config or window; use a new out_dir")
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def run_cell(spec: dict, shard_path: str) -> dict:
+    """Run one cell (worker entry point — must stay importable/picklable).
+
+    Baselines only: no API clients are created in sweep workers.
+    """
+    from sim.orchestrator.scheduler import Scheduler
+
+    config = spec["config"]
+    dates = spec["dates"]
+    started = time.time()
+    with apply_overrides(config.get("overrides", {})):
+        scheduler = Scheduler(
+            db_path=Path(shard_path),
+            max_sessions=len(dates),
+            baseline_params=config.get("baseline_params") or None,
+            fast_writes=True,  # shards are reproducible; rerun on crash
+        )
+        try:
+            result = scheduler.run(trading_dates=dates)
+        finally:
+            scheduler.conn.close()
+            scheduler.runner.conn.close()
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return {
+        "sessions": result.get("total_completed", 0),
+        "elapsed_s": round(time.time() - started, 2),
+    }
+
+
+def run_sweep(configs: Sequence[SweepConfig],
+              windows: Sequence[Sequence[str]],
+              out_dir: Path,
+              workers: Optional[int] = None,
+              cell_runner: Callable[[dict, str], dict] = run_cell) -> dict:
+    """Run (or resume) a sweep and write the merged leaderboard.
+
+    Args:
+        configs: Parameter grid.
+        windows: Date windows (each run as an independent simulation).
+        out_dir: Sweep directory (manifest, shards, leaderboard).
+        workers: Process count (default: CPU count). 1 runs inline.
+        cell_runner: Function executing one cell; overridable for tests.
+
+    Returns:
+        Summary dict: cells, done, failed, ran, leaderboard path.
+    """
+    out_dir = Path(out_dir)
+    (out_dir / "shards").mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(out_dir)
+    _register_cells(manifest, plan_cells(configs, windows))
+    _save_manifest(out_dir, manifest)
+
+    pending = [cid for cid, e in manifest["cells"].items() if e["status"] != "done"]
+    workers = workers or os.cpu_count() or 1
+    logger.info("Sweep %s: %d cells, %d pending, %d workers",
+                out_dir, len(manifest["cells"]), len(pending), workers)
+
+    def record(cell_id: str, outcome: Optional[dict], error: str = "") -> None:
+        entry = manifest["cells"][cell_id]
+        if error:
+            entry.update(status="failed", error=error)
+            logger.error("Cell %s failed: %s", cell_id, error)
+        else:
+            entry.update(status="done", error="", **outcome)
+            logger.info("Cell %s done (%s sessions, %.1fs)", cell_id,
+                        outcome.get("sessions"), outcome.get("elapsed_s", 0.0))
+        _save_manifest(out_dir, manifest)
+
+    def job(cell_id: str):
+        entry = manifest["cells"][cell_id]
+        spec = {"config": entry["config"], "dates": entry["dates"]}
+        return spec, str(out_dir / entry["shard"])
+
+    if workers == 1 or len(pending) <= 1:
+        for cell_id in pending:
+            try:
+                record(cell_id, cell_runner(*job(cell_id)))
+            except Exception as e:
+                record(cell_id, None, error=f"{type(e).__name__}: {e}")
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = {pool.submit(cell_runner, *job(cid)): cid for cid in pending}
+            for fut in as_completed(futures):
+                cell_id = futures[fut]
+                try:
+                    record(cell_id, fut.result())
+                except Exception as e:
+                    record(cell_id, None, error=f"{type(e).__name__}: {e}")
+
+    board = merge_shards(out_dir, manifest)
+    statuses = [e["status"] for e in manifest["cells"].values()]
+    return {
+        "cells": len(statuses),
+        "done": statuses.count("done"),
+        "failed": statuses.count("failed"),
+        "ran": len(pending),
+        "leaderboard": str(out_dir / "leaderboard.json"),
+        "configs": board["configs"],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+
+def _aggregate(cell_rows: List[dict]) -> List[dict]:
+    """Per (config, agent) totals across windows, ranked by total P&L."""
+    groups: Dict[tuple, List[dict]] = {}
+    for r in cell_rows:
+        groups.setdefault((r["config"], r["agent_id"]), []).append(r)
+
+    out = []
+    for (config, agent_id), rows in groups.items():
+        wins = sum(r["wins"] for r in rows)
+        losses = sum(r["losses"] for r in rows)
+        trades = wins + losses
+        out.append({
+            "config": config,
+            "agent_id": agent_id,
+            "windows": len(rows),
+            "sessions": sum(r["sessions"] for r in rows),
+            "total_pnl": sum(r["total_pnl"] for r in rows),
+            "mean_return_pct": sum(r["return_pct"] for r in rows) / len(rows),
+            "worst_return_pct": min(r["return_pct"] for r in rows),
+            "max_drawdown_pct": max(r["max_drawdown_pct"] for r in rows),
+            "mean_sharpe": sum(r["sharpe"] for r in rows) / len(rows),
+            "total_commissions": sum(r["total_commissions"] for r in rows),
+            "wins": wins,
+            "losses": losses,
+            "trades": trades,
+            "win_rate": wins / trades if trades > 0 else 0.0,
+        })
+    out.sort(key=lambda r: (-r["total_pnl"], r["config"], r["agent_id"]))
+    return out
+
+
+def merge_shards(out_dir: Path, manifest: Optional[dict] = None) -> dict:
+    """Merge finished shards into one leaderboard (also written to leaderboard.json).
+
+    Returns:
+        {"configs": per-(config, agent) aggregates ranked by total P&L,
+         "cells": per-cell hard metrics with config/window columns}
+    """
+    from sim.persistence.db import get_connection
+    from sim.persistence.queries import get_hard_metrics
+
+    out_dir = Path(out_dir)
+    manifest = manifest or load_manifest(out_dir)
+
+    cell_rows = []
+    for cell_id, entry in sorted(manifest["cells"].items()):
+        shard = out_dir / entry["shard"]
+        if entry["status"] != "done" or not shard.exists():
+            continue
+        conn = get_connection(shard)
+        try:
+            metrics = get_hard_metrics(conn)
+        finally:
+            conn.close()
+        for m in metrics:
+            cell_rows.append({
+                "cell_id": cell_id,
+                "config": entry["config"]["name"],
+                "window_start": entry["dates"][0],
+                "window_end": entry["dates"][-1],
+                **m,
+            })
+
+    board = {"configs": _aggregate(cell_rows), "cells": cell_rows}
+    tmp = out_dir / "leaderboard.json.tmp"
+    with open(tmp, "w") as f:
+        json.dump(board, f, indent=2)
+    os.replace(tmp, out_dir / "leaderboard.json")
+    return board
@@ -1,14 +1,53 @@
-"""SQLite database connection and schema management (v14)."""
+"""SQLite database connection and schema management (v14).
+
+Writes from ``sim.persistence.queries`` commit immediately by default.
+Inside ``unit_of_work(conn)`` they are buffered instead: consecutive
+writes of the same statement are flushed together with ``executemany``,
+and the whole block lands in one transaction (one fsync) or, if it
+raises, is rolled back.
+
+Usage:
+    conn = init_db(db_path, fast=True)   # synchronous=NORMAL for backtests
+    with unit_of_work(conn):
+        queries.insert_order(conn, order, session_id)
+        queries.save_account_snapshot(conn, agent_id, session_id, account)
+"""
 
 from __future__ import annotations
 
 import json
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 from sim.config import DB_PATH
 
-SCHEMA_VERSION = 3
+SCHEMA_VERSION = 4
+
+# Running leaderboard state per agent, folded forward by
+# queries.refresh_agent_metrics (accounts through last_session_id, settled
+# positions through settled_through). Return stats use Welford's algorithm.
+AGENT_METRICS_SQL = """
+CREATE TABLE IF NOT EXISTS agent_metrics (
+    agent_id TEXT PRIMARY KEY,
+    last_session_id INTEGER NOT NULL,
+    sessions INTEGER NOT NULL,
+    final_balance REAL NOT NULL,
+    peak_balance REAL NOT NULL,
+    max_drawdown REAL NOT NULL,
+    return_count INTEGER NOT NULL,
+    return_mean REAL NOT NULL,
+    return_m2 REAL NOT NULL,
+    total_commissions REAL NOT NULL,
+    settled_through INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    gross_wins REAL NOT NULL,
+    gross_losses REAL NOT NULL,
+    updated_at TEXT DEFAULT (datetime('now'))
+);
+"""
 
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS schema_version (
@@ -129,22 +168,109 @@ CREATE TABLE IF NOT EXISTS diagnostics (
     PRIMARY KEY (session_id, field),
     FOREIGN KEY (session_id) REFERENCES sessions(session_id)
 );
-"""
+""" + AGENT_METRICS_SQL
+
+
+class SimConnection(sqlite3.Connection):
+    """sqlite3 connection that can defer writes into a unit of work.
+
+    Outside a unit of work ``commit()`` behaves normally.  Inside one,
+    ``write()`` queues statements and ``commit()`` is a no-op; the queue is
+    flushed and committed when the outermost unit of work exits.  Any
+    other ``execute()`` flushes the queue first, so reads always see
+    earlier writes and statement order is preserved.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._uow_depth = 0
+        self._pending: list[tuple[str, tuple]] = []
+
+    @property
+    def in_unit_of_work(self) -> bool:
+        return self._uow_depth > 0
+
+    def write(self, sql: str, params: tuple = ()) -> None:
+        """Execute a write now, or queue it inside a unit of work."""
+        if self._uow_depth:
+            self._pending.append((sql, params))
+        else:
+            super().execute(sql, params)
+
+    def flush(self) -> None:
+        """Send queued writes, batching runs of the same statement."""
+        pending, self._pending = self._pending, []
+        i = 0
+        while i < len(pending):
+            sql = pending[i][0]
+            j = i
+            while j < len(pending) and pending[j][0] == sql:
+                j += 1
+            super().executemany(sql, [params for _, params in pending[i:j]])
+            i = j
+
+    def execute(self, sql: str, params=()):
+        if self._pending:
+            self.flush()
+        return super().execute(sql, params)
+
+    def commit(self) -> None:
+        if self._uow_depth:
+            return
+        if self._pending:
+            self.flush()
+        super().commit()
+
+    def rollback(self) -> None:
+        self._pending = []
+        super().rollback()
+
+
+@contextmanager
+def unit_of_work(conn: SimConnection) -> Iterator[SimConnection]:
+    """Group every write in the block into one transaction.
+
+    Nested blocks join the outer one.  On an exception the queued writes
+    are dropped, the transaction is rolled back and the exception re-raised.
+    """
+    conn._uow_depth += 1
+    try:
+        yield conn
+    except BaseException:
+        conn._uow_depth -= 1
+        if not conn._uow_depth:
+            conn.rollback()
+        raise
+    conn._uow_depth -= 1
+    if not conn._uow_depth:
+        try:
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
 
+def get_connection(db_path: Path = DB_PATH, fast: bool = False) -> SimConnection:
+    """Get a SQLite connection with WAL mode and foreign keys enabled.
 
-def get_connection(db_path: Path = DB_PATH) -> sqlite3.Connection:
-    """Get a SQLite connection with WAL mode and foreign keys enabled."""
+    Args:
+        db_path: Database file.
+        fast: Use ``synchronous=NORMAL`` (WAL stays consistent, but the last
+              commits may be lost on power failure). For backtests/sweeps.
+    """
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), factory=SimConnection)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    if fast:
+        conn.execute("PRAGMA synchronous=NORMAL")
     conn.row_factory = sqlite3.Row
     return conn
 
 
-def init_db(db_path: Path = DB_PATH) -> sqlite3.Connection:
+def init_db(db_path: Path = DB_PATH, fast: bool = False) -> SimConnection:
     """Initialize the database with the schema. Idempotent."""
-    conn = get_connection(db_path)
+    conn = get_connection(db_path, fast=fast)
     conn.executescript(SCHEMA_SQL)
 
     cur = conn.execute("SELECT version FROM schema_version LIMIT 1")
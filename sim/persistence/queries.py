@@ -7,7 +7,16 @@ import math
 import sqlite3
 from typing import Dict, List, Optional
 
-from sim.persistence.db import _serialize_legs
+from sim.persistence.db import SimConnection, _serialize_legs
+
+
+def _write(conn: sqlite3.Connection, sql: str, params: tuple) -> None:
+    """Run one write and commit — or queue it inside ``unit_of_work``."""
+    if isinstance(conn, SimConnection):
+        conn.write(sql, params)
+    else:
+        conn.execute(sql, params)
+    conn.commit()
 
 
 # --- Sessions ---
@@ -15,24 +24,24 @@ from sim.persistence.db import _serialize_legs
 def insert_session(conn: sqlite3.Connection, session_id: int,
                    trading_date: str, spx_open: float = 0,
                    vix_open: float = 0) -> None:
-    conn.execute(
+    _write(
+        conn,
         """INSERT OR REPLACE INTO sessions
            (session_id, trading_date, status, spx_open, vix_open)
            VALUES (?, ?, 'active', ?, ?)""",
         (session_id, trading_date, spx_open, vix_open),
     )
-    conn.commit()
 
 
 def update_session_close(conn: sqlite3.Connection, session_id: int,
                          spx_close: float, vix_close: float,
                          intraday_range: float, status: str = "completed") -> None:
-    conn.execute(
+    _write(
+        conn,
         """UPDATE sessions SET spx_close=?, vix_close=?, intraday_range=?, status=?
            WHERE session_id=?""",
         (spx_close, vix_close, intraday_range, status, session_id),
     )
-    conn.commit()
 
 
 def get_session(conn: sqlite3.Connection, session_id: int) -> Optional[dict]:
@@ -52,7 +61,8 @@ def count_sessions(conn: sqlite3.Connection) -> int:
 
 def insert_order(conn: sqlite3.Connection, order, session_id: int,
                  slippage: float = 0.0) -> None:
-    conn.execute(
+    _write(
+        conn,
         """INSERT INTO orders
            (order_id, agent_id, session_id,
             structure, side, legs, quantity, width, limit_price, status, fill_price,
@@ -67,13 +77,13 @@ def insert_order(conn: sqlite3.Connection, order, session_id: int,
             order.thesis, order.rejection_reason,
         ),
     )
-    conn.commit()
 
 
 # --- Positions ---
 
 def insert_position(conn: sqlite3.Connection, pos) -> None:
-    conn.execute(
+    _write(
+        conn,
         """INSERT INTO positions
            (position_id, agent_id, session_opened,
             structure, legs, quantity, width, entry_price, commission, expiration)
@@ -85,11 +95,11 @@ def insert_position(conn: sqlite3.Connection, pos) -> None:
             pos.expiration,
         ),
     )
-    conn.commit()
 
 
 def update_position_settlement(conn: sqlite3.Connection, pos) -> None:
-    conn.execute(
+    _write(
+        conn,
         """UPDATE positions SET session_settled=?, settlement_price=?,
            settlement_value=?, settlement_source=?, realized_pnl=?
            WHERE position_id=?""",
@@ -97,7 +107,6 @@ def update_position_settlement(conn: sqlite3.Connection, pos) -> None:
          pos.settlement_value, pos.settlement_source,
          pos.realized_pnl, pos.position_id),
     )
-    conn.commit()
 
 
 def get_open_positions(conn: sqlite3.Connection, agent_id: str) -> List[dict]:
@@ -116,7 +125,8 @@ def insert_position_mark(conn: sqlite3.Connection, position_id: str,
                          unrealized_pnl: float, delta: float = 0,
                          gamma: float = 0, theta: float = 0,
                          vega: float = 0) -> None:
-    conn.execute(
+    _write(
+        conn,
         """INSERT OR REPLACE INTO position_marks
            (position_id, session_id, phase, mark_price, unrealized_pnl,
             delta, gamma, theta, vega)
@@ -124,14 +134,14 @@ def insert_position_mark(conn: sqlite3.Connection, position_id: str,
         (position_id, session_id, phase, mark_price, unrealized_pnl,
          delta, gamma, theta, vega),
     )
-    conn.commit()
 
 
 # --- Accounts ---
 
 def save_account_snapshot(conn: sqlite3.Connection, agent_id: str,
                           session_id: int, account) -> None:
-    conn.execute(
+    _write(
+        conn,
         """INSERT OR REPLACE INTO accounts
            (agent_id, session_id, starting_balance, ending_balance,
             realized_pnl, total_commissions, buying_power_used, open_position_count)
@@ -143,7 +153,6 @@ def save_account_snapshot(conn: sqlite3.Connection, agent_id: str,
             account.buying_power_used, account.open_position_count,
         ),
     )
-    conn.commit()
 
 
 # --- Agent State (v14 memory) ---
@@ -163,13 +172,13 @@ def load_agent_state(conn: sqlite3.Connection, agent_id: str) -> Optional[dict]:
 def save_agent_state(conn: sqlite3.Connection, agent_id: str,
                      state: dict) -> None:
     """Save accumulated agent state (memory) to DB."""
-    conn.execute(
+    _write(
+        conn,
         """INSERT OR REPLACE INTO agent_state
            (agent_id, state_json, updated_at)
            VALUES (?, ?, datetime('now'))""",
         (agent_id, json.dumps(state)),
     )
-    conn.commit()
 
 
 # --- Agent Actions ---
@@ -177,13 +186,13 @@ def save_agent_state(conn: sqlite3.Connection, agent_id: str,
 def insert_action(conn: sqlite3.Connection, agent_id: str, session_id: int,
                   action_type: str, details: str = "",
                   reasoning: str = "", failure_reason: str = "") -> None:
-    conn.execute(
+    _write(
+        conn,
         """INSERT INTO agent_actions
            (agent_id, session_id, action_type, details, reasoning, failure_reason)
            VALUES (?, ?, ?, ?, ?, ?)""",
         (agent_id, session_id, action_type, details, reasoning, failure_reason),
     )
-    conn.commit()
 
 
 # --- Session Features ---
@@ -191,13 +200,13 @@ def insert_action(conn: sqlite3.Connection, agent_id: str, session_id: int,
 def save_session_features(conn: sqlite3.Connection, session_id: int,
                           phase: str, expiration: str,
                           features_json: str) -> None:
-    conn.execute(
+    _write(
+        conn,
         """INSERT OR REPLACE INTO session_features
            (session_id, phase, expiration, features_json)
            VALUES (?, ?, ?, ?)""",
         (session_id, phase, expiration, features_json),
     )
-    conn.commit()
 
 
 def get_session_features(conn: sqlite3.Connection, session_id: int,
@@ -216,122 +225,181 @@ def get_session_features(conn: sqlite3.Connection, session_id: int,
 
 # --- Leaderboard / Hard Metrics ---
 
+_METRIC_COLUMNS = (
+    "agent_id", "last_session_id", "sessions", "final_balance", "peak_balance",
+    "max_drawdown", "return_count", "return_mean", "return_m2",
+    "total_commissions", "settled_through", "wins", "losses",
+    "gross_wins", "gross_losses",
+)
+
+
+def _new_metric_state(agent_id: str) -> dict:
+    from sim.config import STARTING_CAPITAL
+
+    return {
+        "agent_id": agent_id, "last_session_id": -1, "sessions": 0,
+        "final_balance": STARTING_CAPITAL, "peak_balance": STARTING_CAPITAL,
+        "max_drawdown": 0.0, "return_count": 0, "return_mean": 0.0,
+        "return_m2": 0.0, "total_commissions": 0.0, "settled_through": -1,
+        "wins": 0, "losses": 0, "gross_wins": 0.0, "gross_losses": 0.0,
+    }
+
+
+def _fold_balance(state: dict, session_id: int, balance: float,
+                  commissions: float) -> None:
+    """Advance one agent's running metrics by one session."""
+    prev = state["final_balance"]
+    if prev > 0:
+        # Welford update of the per-session return mean / sum of squares
+        r = (balance - prev) / prev
+        state["return_count"] += 1
+        delta = r - state["return_mean"]
+        state["return_mean"] += delta / state["return_count"]
+        state["return_m2"] += delta * (r - state["return_mean"])
+    state["peak_balance"] = max(state["peak_balance"], balance)
+    state["max_drawdown"] = max(state["max_drawdown"],
+                                state["peak_balance"] - balance)
+    state["final_balance"] = balance
+    state["total_commissions"] += commissions or 0.0
+    state["sessions"] += 1
+    state["last_session_id"] = session_id
+
+
+def refresh_agent_metrics(conn: sqlite3.Connection, rebuild: bool = False) -> int:
+    """Fold accounts/positions written since the last refresh into agent_metrics.
+
+    Two bulk queries regardless of agent count: account rows past each
+    agent's ``last_session_id``, and settled-position aggregates past its
+    ``settled_through``. Called at the end of every session (inside the
+    session's unit of work), so it normally folds in a single session.
+
+    Args:
+        rebuild: Recompute from scratch (e.g. after rewriting old sessions).
+
+    Returns:
+        Number of agents whose metrics changed.
+    """
+    from sim.persistence.db import AGENT_METRICS_SQL
+
+    conn.execute(AGENT_METRICS_SQL)
+    if rebuild:
+        conn.execute("DELETE FROM agent_metrics")
+
+    states = {r["agent_id"]: dict(r) for r in conn.execute(
+        f"SELECT {', '.join(_METRIC_COLUMNS)} FROM agent_metrics")}
+    changed = set()
+
+    for row in conn.execute(
+        """SELECT a.agent_id, a.session_id, a.ending_balance, a.total_commissions
+           FROM accounts a LEFT JOIN agent_metrics m USING (agent_id)
+           WHERE a.session_id > COALESCE(m.last_session_id, -1)
+           ORDER BY a.agent_id, a.session_id"""
+    ):
+        aid = row["agent_id"]
+        state = states.setdefault(aid, _new_metric_state(aid))
+        _fold_balance(state, row["session_id"], row["ending_balance"],
+                      row["total_commissions"])
+        changed.add(aid)
+
+    for row in conn.execute(
+        """SELECT p.agent_id,
+                  SUM(p.realized_pnl > 0) AS wins,
+                  SUM(p.realized_pnl <= 0) AS losses,
+                  SUM(CASE WHEN p.realized_pnl > 0 THEN p.realized_pnl ELSE 0 END)
+                      AS gross_wins,
+                  SUM(CASE WHEN p.realized_pnl <= 0 THEN p.realized_pnl ELSE 0 END)
+                      AS gross_losses,
+                  MAX(p.session_settled) AS settled_through
+           FROM positions p LEFT JOIN agent_metrics m USING (agent_id)
+           WHERE p.realized_pnl IS NOT NULL
+             AND p.session_settled > COALESCE(m.settled_through, -1)
+           GROUP BY p.agent_id"""
+    ):
+        aid = row["agent_id"]
+        state = states.setdefault(aid, _new_metric_state(aid))
+        state["wins"] += row["wins"]
+        state["losses"] += row["losses"]
+        state["gross_wins"] += row["gross_wins"]
+        state["gross_losses"] += row["gross_losses"]
+        state["settled_through"] = row["settled_through"]
+        changed.add(aid)
+
+    placeholders = ", ".join("?" * len(_METRIC_COLUMNS))
+    for aid in sorted(changed):
+        _write(
+            conn,
+            f"""INSERT OR REPLACE INTO agent_metrics
+                ({', '.join(_METRIC_COLUMNS)}, updated_at)
+                VALUES ({placeholders}, datetime('now'))""",
+            tuple(states[aid][c] for c in _METRIC_COLUMNS),
+        )
+    return len(changed)
+
+
+def _hard_metrics_row(state: dict) -> dict:
+    from sim.config import STARTING_CAPITAL
+
+    max_dd = state["max_drawdown"]
+    max_dd_pct = (max_dd / STARTING_CAPITAL * 100) if STARTING_CAPITAL > 0 else 0.0
+
+    final = state["final_balance"]
+    total_pnl = final - STARTING_CAPITAL
+    return_pct = total_pnl / STARTING_CAPITAL * 100
+
+    # Sharpe ratio (annualized: sqrt(252) * mean/std, sample std)
+    sharpe = 0.0
+    n = state["return_count"]
+    if n >= 2:
+        var_r = state["return_m2"] / (n - 1)
+        std_r = math.sqrt(var_r) if var_r > 0 else 0.0
+        if std_r > 0:
+            sharpe = round(state["return_mean"] / std_r * math.sqrt(252), 2)
+
+    wins, losses = state["wins"], state["losses"]
+    trades = wins + losses
+    win_rate = wins / trades if trades > 0 else 0.0
+
+    gross_losses = abs(state["gross_losses"])
+    profit_factor = (state["gross_wins"] / gross_losses) if gross_losses > 0 else float("inf")
+
+    # MAR ratio: return / max drawdown (higher = better risk-adjusted)
+    mar = (return_pct / max_dd_pct) if max_dd_pct > 0 else float("inf")
+
+    return {
+        "agent_id": state["agent_id"],
+        "final_balance": final,
+        "total_pnl": total_pnl,
+        "total_commissions": state["total_commissions"],
+        "sessions": state["sessions"],
+        "max_drawdown": max_dd,
+        "max_drawdown_pct": max_dd_pct,
+        "win_rate": win_rate,
+        "wins": wins,
+        "losses": losses,
+        "trades": trades,
+        "return_pct": return_pct,
+        "mar_ratio": mar,
+        "sharpe": sharpe,
+        "profit_factor": profit_factor,
+    }
+
+
 def get_hard_metrics(conn: sqlite3.Connection) -> List[dict]:
     """Compute hard financial metrics per agent for deterministic ranking.
 
+    Reads the materialized ``agent_metrics`` table after folding in any
+    sessions written since its last refresh (a no-op when the session
+    runner already refreshed it).
+
     Returns list of dicts sorted by final_balance DESC, each containing:
         agent_id, final_balance, total_pnl, total_commissions, sessions,
         max_drawdown, max_drawdown_pct, win_rate, wins, losses, trades,
         return_pct, mar_ratio, sharpe, profit_factor
     """
-    from sim.config import STARTING_CAPITAL
-
-    agents = conn.execute(
-        "SELECT DISTINCT agent_id FROM accounts"
-    ).fetchall()
-
-    results = []
-    for row in agents:
-        aid = row["agent_id"]
-
-        # Equity curve: ending_balance per session in order
-        balances = conn.execute(
-            """SELECT ending_balance FROM accounts
-               WHERE agent_id=?
-               ORDER BY session_id""",
-            (aid,),
-        ).fetchall()
-        curve = [STARTING_CAPITAL] + [r["ending_balance"] for r in balances]
-
-        # Max drawdown from equity curve
-        peak = curve[0]
-        max_dd = 0.0
-        for bal in curve:
-            if bal > peak:
-                peak = bal
-            dd = peak - bal
-            if dd > max_dd:
-                max_dd = dd
-        max_dd_pct = (max_dd / STARTING_CAPITAL * 100) if STARTING_CAPITAL > 0 else 0.0
-
-        # Final balance and return
-        final = curve[-1] if curve else STARTING_CAPITAL
-        total_pnl = final - STARTING_CAPITAL
-        return_pct = total_pnl / STARTING_CAPITAL * 100
-
-        # Per-session returns for Sharpe ratio
-        session_returns = []
-        for i in range(1, len(curve)):
-            prev = curve[i - 1]
-            if prev > 0:
-                session_returns.append((curve[i] - prev) / prev)
-
-        # Sharpe ratio (annualized: sqrt(252) * mean/std)
-        sharpe = 0.0
-        if len(session_returns) >= 2:
-            mean_r = sum(session_returns) / len(session_returns)
-            var_r = sum((r - mean_r) ** 2 for r in session_returns) / (len(session_returns) - 1)
-            std_r = math.sqrt(var_r) if var_r > 0 else 0.0
-            if std_r > 0:
-                sharpe = round(mean_r / std_r * math.sqrt(252), 2)
-
-        # Win rate from settled positions
-        wins = conn.execute(
-            """SELECT COUNT(*) FROM positions
-               WHERE agent_id=? AND realized_pnl IS NOT NULL
-               AND realized_pnl > 0""",
-            (aid,),
-        ).fetchone()[0]
-        losses = conn.execute(
-            """SELECT COUNT(*) FROM positions
-               WHERE agent_id=? AND realized_pnl IS NOT NULL
-               AND realized_pnl <= 0""",
-            (aid,),
-        ).fetchone()[0]
-        trades = wins + losses
-        win_rate = wins / trades if trades > 0 else 0.0
-
-        # Profit factor: sum(wins) / abs(sum(losses))
-        gross_wins = conn.execute(
-            """SELECT COALESCE(SUM(realized_pnl), 0) FROM positions
-               WHERE agent_id=? AND realized_pnl IS NOT NULL AND realized_pnl > 0""",
-            (aid,),
-        ).fetchone()[0]
-        gross_losses = abs(conn.execute(
-            """SELECT COALESCE(SUM(realized_pnl), 0) FROM positions
-               WHERE agent_id=? AND realized_pnl IS NOT NULL AND realized_pnl <= 0""",
-            (aid,),
-        ).fetchone()[0])
-        profit_factor = (gross_wins / gross_losses) if gross_losses > 0 else float("inf")
-
-        # Commissions
-        comms = conn.execute(
-            "SELECT SUM(total_commissions) FROM accounts WHERE agent_id=?",
-            (aid,),
-        ).fetchone()[0] or 0.0
-
-        # MAR ratio: return / max drawdown (higher = better risk-adjusted)
-        mar = (return_pct / max_dd_pct) if max_dd_pct > 0 else float("inf")
-
-        sessions = len(balances)
-
-        results.append({
-            "agent_id": aid,
-            "final_balance": final,
-            "total_pnl": total_pnl,
-            "total_commissions": comms,
-            "sessions": sessions,
-            "max_drawdown": max_dd,
-            "max_drawdown_pct": max_dd_pct,
-            "win_rate": win_rate,
-            "wins": wins,
-            "losses": losses,
-            "trades": trades,
-            "return_pct": return_pct,
-            "mar_ratio": mar,
-            "sharpe": sharpe,
-            "profit_factor": profit_factor,
-        })
-
+    refresh_agent_metrics(conn)
+    results = [
+        _hard_metrics_row(dict(r)) for r in conn.execute(
+            f"SELECT {', '.join(_METRIC_COLUMNS)} FROM agent_metrics WHERE sessions > 0")
+    ]
     results.sort(key=lambda r: r["final_balance"], reverse=True)
     return results
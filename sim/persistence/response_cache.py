@@ -0,0 +1,167 @@
+"""Content-addressed cache of raw agent LLM responses (SQLite).
+
+A decision is keyed by (model, prompt hash, memory-state hash).  The prompt
+hash covers the full system prompt and user message — the rendered
+FeaturePack, chain table and account state are all inside the user message
+— plus generation parameters, so any input change is a miss.  Replaying a
+session on identical inputs (crash/resume, baseline-only parameter change,
+regression runs) returns the stored raw response without an API call.
+
+Eviction is LRU by last use, capped at ``max_entries`` rows.  The cache is
+shared by concurrent agent decision threads, so every operation is
+serialized behind a lock on one connection.
+
+Usage:
+    cache = ResponseCache()
+    key = cache.make_key(model, system_prompt, user_message, memory,
+                         max_tokens=1024)
+    raw = cache.get(key)            # None on miss
+    cache.put(key, raw_text)
+    cache.stats()                   # {"hits", "misses", "entries", ...}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from sim.config import AGENT_RESPONSE_CACHE_MAX_ENTRIES, AGENT_RESPONSE_CACHE_PATH
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS responses (
+    model TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    memory_hash TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now')),
+    last_used REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (model, prompt_hash, memory_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+"""
+
+
+class CacheKey(NamedTuple):
+    model: str
+    prompt_hash: str
+    memory_hash: str
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LRU cache of raw agent responses."""
+
+    def __init__(self, path: Path = AGENT_RESPONSE_CACHE_PATH,
+                 max_entries: int = AGENT_RESPONSE_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._tick = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA_SQL)
+        self.conn.commit()
+        row = self.conn.execute("SELECT MAX(last_used) FROM responses").fetchone()
+        self._tick = row[0] or 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_message: str,
+                 memory: Optional[dict] = None, **params) -> CacheKey:
+        """Build the cache key for one model call.
+
+        Args:
+            model: Model id.
+            system_prompt: Full system prompt.
+            user_message: Full user message.
+            memory: Agent memory state the prompt was built from.
+            **params: Generation parameters (max_tokens, temperature, ...).
+        """
+        prompt = json.dumps([system_prompt, user_message, params], sort_keys=True)
+        memory_blob = json.dumps(memory, sort_keys=True, default=str)
+        return CacheKey(model, _sha256(prompt), _sha256(memory_blob))
+
+    def _next_tick(self) -> float:
+        # Monotonic use counter: deterministic LRU order, no clock ties.
+        self._tick += 1
+        return self._tick
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Stored raw response for ``key``, or None (counts a hit/miss)."""
+        with self._lock:
+            row = self.conn.execute(
+                """SELECT response FROM responses
+                   WHERE model=? AND prompt_hash=? AND memory_hash=?""",
+                key,
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute(
+                """UPDATE responses SET last_used=?, hit_count=hit_count+1
+                   WHERE model=? AND prompt_hash=? AND memory_hash=?""",
+                (self._next_tick(), *key),
+            )
+            self.conn.commit()
+            return row[0]
+
+    def put(self, key: CacheKey, response: str) -> None:
+        """Store a raw response, then evict least-recently-used overflow."""
+        with self._lock:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO responses
+                   (model, prompt_hash, memory_hash, response, last_used)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (*key, response, self._next_tick()),
+            )
+            self._evict_locked()
+            self.conn.commit()
+
+    def _evict_locked(self) -> int:
+        count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return 0
+        self.conn.execute(
+            """DELETE FROM responses WHERE rowid IN (
+                   SELECT rowid FROM responses ORDER BY last_used LIMIT ?)""",
+            (overflow,),
+        )
+        return overflow
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus stored totals."""
+        with self._lock:
+            entries, total_hits = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "lifetime_hits": total_hits,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
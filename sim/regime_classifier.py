@@ -40,10 +40,12 @@ Synthesis — Binary Signal (Nystrup et al.)
 Data: reads from Gamma/sim/cache/{date}/ infrastructure.
 """
 
+import functools
 import json
 import os
 import glob
 import math
+import pickle
 import warnings
 from io import StringIO
 from datetime import datetime, date, timedelta
@@ -60,6 +62,14 @@ warnings.filterwarnings("ignore")
 CACHE_DIR = "/Users/mgebremichael/Documents/Gamma/sim/cache"
 VOL_DECOUPLE_PATH = "/Users/mgebremichael/Documents/Gamma/sim/data/vol_decouple_daily.csv"
 PANEL_PATH = "/Users/mgebremichael/Documents/Gamma/sim/data/leo_ic_long_pattern_panel.csv"
+# Incremental panel cache (per-day parsed sources + derived layers).
+# Set to None to force a full rebuild from the raw cache.
+PANEL_CACHE_DIR = "/Users/mgebremichael/Documents/Gamma/sim/data/daily_panel_cache"
+PANEL_CACHE_VERSION = 1
+# Parquet chain store (sim/data/chain_store.py).  close5 chains converted
+# there are read with column-projected scans instead of json.load.
+# Set to None to always parse close5.json.
+CHAIN_STORE_DIR = "/Users/mgebremichael/Documents/Gamma/sim/chain_store"
 SPX_MULTIPLIER = 100
 
 # Lookback
@@ -402,72 +412,334 @@ def _load_optional_cboe_history(name: str) -> Optional[pd.DataFrame]:
 
 
 # ════════════════════════════════════════════════════════════════════════
-# DATA ASSEMBLY
+# PANEL CACHE
 # ════════════════════════════════════════════════════════════════════════
+#
+# Past cache days never change, so each date directory is parsed once and
+# its extracted values are kept in PANEL_CACHE_DIR/days.json, keyed by date
+# and fingerprinted by (name, mtime_ns, size) of its source files.  A run
+# only re-opens days that are new or whose files changed.
+#
+# Derived rolling layers (VRP, BH decomposition, GEX regime) are cached in
+# layers.pkl together with their inputs; on the next run only rows from the
+# first changed input onward are recomputed, using a LOOKBACK_PCTILE-row
+# warm-up so trailing windows see the same history.
+#
+# Days whose close5 chain is current in the Parquet chain store skip the
+# close5.json parse entirely: VIX/spot and the GEX inputs come from two
+# projected scans over all such days at once (_store_close5_days).
 
-def build_daily_panel() -> pd.DataFrame:
+DAY_SOURCE_FILES = ("close5.json", "close5_features.json",
+                    "features_close5.json", "gw_close5.json")
+
+
+def _source_fingerprint(date_dir: str) -> List[List[Any]]:
+    """[name, mtime_ns, size] for each source file present in a date dir."""
+    out = []
+    for name in DAY_SOURCE_FILES:
+        try:
+            st = os.stat(os.path.join(date_dir, name))
+        except OSError:
+            continue
+        out.append([name, st.st_mtime_ns, st.st_size])
+    return out
+
+
+GEX_STORE_COLUMNS = ["strike", "put_call", "gamma", "volume", "open_interest"]
+
+
+def _store_close5_days(date_strs: List[str],
+                       cache_dir: Optional[str] = None
+                       ) -> Dict[str, Dict[str, Any]]:
     """
-    Assemble daily panel from all cache sources.
-    Priority: GW > features > vol_decouple > SPX-derived.
+    close5 chains for ``date_strs`` from the chain store, in two scans.
+
+    Only days whose close5 partition is current with close5.json are
+    returned, as {"vix", "spot", "contracts"}; the caller parses the JSON
+    for the rest.  Returns {} when the store is disabled or unreadable.
     """
-    print("=" * 80)
-    print("Building Daily Panel")
-    print("=" * 80)
+    if not CHAIN_STORE_DIR or not date_strs or not os.path.isdir(CHAIN_STORE_DIR):
+        return {}
+    cache_dir = cache_dir or CACHE_DIR
+    try:
+        from pathlib import Path
+        from sim.data.chain_store import ChainStore
+        store = ChainStore(Path(CHAIN_STORE_DIR))
+    except ImportError:
+        return {}
 
-    date_dirs = sorted(glob.glob(os.path.join(CACHE_DIR, "????-??-??")))
-    print(f"  Found {len(date_dirs)} date directories in cache")
+    try:
+        current = [d for d in date_strs if store.is_current(
+            d, "close5", Path(cache_dir, d, "close5.json"))]
+        if not current:
+            return {}
+        in_days = "trading_date IN (" + ", ".join(
+            f"DATE '{d}'" for d in current) + ")"
+        snaps = store.snapshots(phases=["close5"], where=in_days,
+                                columns=["vix", "underlying_price"])
+        rows = store.contracts(phases=["close5"], where=in_days,
+                               columns=GEX_STORE_COLUMNS)
+    except Exception as exc:
+        print(f"    Warning: chain store unreadable, parsing JSON: {exc}")
+        return {}
+    finally:
+        store.close()
+
+    rows = rows.rename(columns={"put_call": "option_type"})
+    num_cols = ["strike", "gamma", "volume", "open_interest"]
+    rows[num_cols] = rows[num_cols].fillna(0)
+    rows["trading_date"] = pd.to_datetime(rows["trading_date"]).dt.strftime("%Y-%m-%d")
+    by_day = {d: g[["option_type"] + num_cols].to_dict("records")
+              for d, g in rows.groupby("trading_date")}
+
+    out = {}
+    for snap in snaps.itertuples(index=False):
+        d = pd.Timestamp(snap.trading_date).strftime("%Y-%m-%d")
+        out[d] = {"vix": _safe_float(snap.vix),
+                  "spot": _safe_float(snap.underlying_price),
+                  "contracts": by_day.get(d, [])}
+    return out
 
-    rows = []
-    for date_dir in date_dirs:
-        date_str = os.path.basename(date_dir)
-        row = {"date": date_str}
 
-        # ── Source 1: close5.json (VIX, spot) ──
-        c5_path = os.path.join(date_dir, "close5.json")
-        if os.path.exists(c5_path):
-            try:
-                with open(c5_path) as f:
-                    d = json.load(f)
-                if d.get("vix") is not None:
-                    row["vix"] = float(d["vix"])
-                chain = d.get("chain", {})
-                if chain.get("_underlying_price"):
-                    row["spot"] = float(chain["_underlying_price"])
-            except Exception:
-                pass
+def _read_day_sources(date_dir: str,
+                      close5: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Parse one cache day: panel fields from close5 / features / gw files plus
+    the close5 GEX proxy.  close5.json is opened once for both, or not at
+    all when ``close5`` already carries the day from the chain store.
 
-        # ── Source 2: features file (IV surface, RV, VIX1D) ──
-        for feat_name in ["close5_features.json", "features_close5.json"]:
-            feat_path = os.path.join(date_dir, feat_name)
-            if os.path.exists(feat_path):
-                try:
-                    with open(feat_path) as f:
-                        d = json.load(f)
-                    for key in ["spot", "vix_1d", "rv", "rv5", "rv10", "rv20",
-                                "risk_reversal_25d", "put_skew_slope", "iv_atm",
-                                "gex_total"]:
-                        val = d.get(key)
-                        if val is not None:
-                            row[f"feat_{key}"] = float(val)
-                except Exception:
-                    pass
-                break
+    Returns {"row": {...}, "gex": {...} | None, "gex_needs_spot": bool}.
+    """
+    date_str = os.path.basename(date_dir)
+    row = {"date": date_str}
+    gex = None
+    gex_needs_spot = False
+
+    # ── Source 1: close5 chain (VIX, spot, GEX proxy) ──
+    chain = None
+    c5_path = os.path.join(date_dir, "close5.json")
+    if close5 is not None:
+        if close5.get("vix"):
+            row["vix"] = close5["vix"]
+        chain = {"_underlying_price": close5.get("spot") or 0,
+                 "contracts": close5["contracts"]}
+    elif os.path.exists(c5_path):
+        try:
+            with open(c5_path) as f:
+                d = json.load(f)
+            if d.get("vix") is not None:
+                row["vix"] = float(d["vix"])
+            chain = d.get("chain", {})
+        except Exception:
+            pass
+    if chain is not None:
+        try:
+            if chain.get("_underlying_price"):
+                row["spot"] = float(chain["_underlying_price"])
+            spot = chain.get("_underlying_price", 0) or 0
+            if spot > 0:
+                gex = _compute_gex_for_chain(chain, spot) or None
+            else:
+                # Needs the resolved panel spot — compute_gex_daily re-reads
+                gex_needs_spot = True
+        except Exception:
+            pass
 
-        # ── Source 3: gw_close5.json (RV data) ──
-        gw_path = os.path.join(date_dir, "gw_close5.json")
-        if os.path.exists(gw_path):
+    # ── Source 2: features file (IV surface, RV, VIX1D) ──
+    for feat_name in ["close5_features.json", "features_close5.json"]:
+        feat_path = os.path.join(date_dir, feat_name)
+        if os.path.exists(feat_path):
             try:
-                with open(gw_path) as f:
+                with open(feat_path) as f:
                     d = json.load(f)
-                for key in ["vix", "vix_1d", "rv", "rv5", "rv10", "rv20"]:
+                for key in ["spot", "vix_1d", "rv", "rv5", "rv10", "rv20",
+                            "risk_reversal_25d", "put_skew_slope", "iv_atm",
+                            "gex_total"]:
                     val = d.get(key)
                     if val is not None:
-                        row[f"gw_{key}"] = float(val)
+                        row[f"feat_{key}"] = float(val)
             except Exception:
                 pass
+            break
+
+    # ── Source 3: gw_close5.json (RV data) ──
+    gw_path = os.path.join(date_dir, "gw_close5.json")
+    if os.path.exists(gw_path):
+        try:
+            with open(gw_path) as f:
+                d = json.load(f)
+            for key in ["vix", "vix_1d", "rv", "rv5", "rv10", "rv20"]:
+                val = d.get(key)
+                if val is not None:
+                    row[f"gw_{key}"] = float(val)
+        except Exception:
+            pass
+
+    return {"row": row, "gex": gex, "gex_needs_spot": gex_needs_spot}
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_day_records(cache_dir: Optional[str] = None,
+                     panel_cache_dir: Optional[str] = None
+                     ) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-day parsed records for every ????-??-?? dir in the cache.
+
+    Only new or changed days are parsed; the rest come from days.json.
+    Days that disappeared from the cache are dropped.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    panel_cache_dir = panel_cache_dir if panel_cache_dir is not None else PANEL_CACHE_DIR
+    days_path = os.path.join(panel_cache_dir, "days.json") if panel_cache_dir else ""
+
+    cached: Dict[str, Any] = {}
+    if days_path and os.path.exists(days_path):
+        try:
+            with open(days_path) as f:
+                blob = json.load(f)
+            if blob.get("version") == PANEL_CACHE_VERSION:
+                cached = blob.get("days", {})
+        except Exception as exc:
+            print(f"    Warning: ignoring unreadable panel cache: {exc}")
+
+    records: Dict[str, Dict[str, Any]] = {}
+    stale: Dict[str, Tuple[str, List[List[Any]]]] = {}
+    for date_dir in sorted(glob.glob(os.path.join(cache_dir, "????-??-??"))):
+        date_str = os.path.basename(date_dir)
+        fingerprint = _source_fingerprint(date_dir)
+        hit = cached.get(date_str)
+        if hit is not None and hit.get("sources") == fingerprint:
+            records[date_str] = hit
+        else:
+            stale[date_str] = (date_dir, fingerprint)
+
+    from_store = _store_close5_days(list(stale), cache_dir)
+    for date_str, (date_dir, fingerprint) in stale.items():
+        close5 = from_store.get(date_str)
+        if close5 is not None:
+            rec = _read_day_sources(date_dir, close5=close5)
+        else:
+            rec = _read_day_sources(date_dir)
+        rec["sources"] = fingerprint
+        records[date_str] = rec
+    records = dict(sorted(records.items()))
+
+    parsed = len(stale)
+    print(f"  Panel cache: {len(records) - parsed} days cached, {parsed} parsed"
+          + (f" ({len(from_store)} from chain store)" if from_store else ""))
+    if days_path and (parsed or len(records) != len(cached)):
+        _atomic_write(days_path, json.dumps(
+            {"version": PANEL_CACHE_VERSION, "days": records}).encode())
+    return records
+
 
-        rows.append(row)
+def _layer_cache_path() -> str:
+    return os.path.join(PANEL_CACHE_DIR, "layers.pkl") if PANEL_CACHE_DIR else ""
 
+
+def _load_layer_cache() -> Dict[str, pd.DataFrame]:
+    path = _layer_cache_path()
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "rb") as f:
+            blob = pickle.load(f)
+    except Exception as exc:
+        print(f"    Warning: ignoring unreadable layer cache: {exc}")
+        return {}
+    if blob.get("version") != PANEL_CACHE_VERSION:
+        return {}
+    return blob.get("layers", {})
+
+
+def _save_layer(layer: str, frame: pd.DataFrame):
+    path = _layer_cache_path()
+    if not path:
+        return
+    layers = _load_layer_cache()
+    layers[layer] = frame
+    _atomic_write(path, pickle.dumps(
+        {"version": PANEL_CACHE_VERSION, "layers": layers}))
+
+
+def _first_changed_row(current: pd.DataFrame, previous: pd.DataFrame) -> int:
+    """Index of the first row whose key columns differ (NaN == NaN)."""
+    if list(previous.columns[:len(current.columns)]) != list(current.columns):
+        return 0
+    n = min(len(current), len(previous))
+    a = current.iloc[:n].reset_index(drop=True)
+    b = previous.iloc[:n, :len(current.columns)].reset_index(drop=True)
+    same = ((a == b) | (a.isna() & b.isna())).all(axis=1).to_numpy()
+    changed = np.flatnonzero(~same)
+    return int(changed[0]) if len(changed) else n
+
+
+def _tail_cached(layer: str, inputs: List[str], lookback: int = LOOKBACK_PCTILE):
+    """
+    Cache a derived layer and recompute it from the first changed row.
+
+    The wrapped function must only add columns and read ``inputs`` (plus
+    "date") with trailing windows of at most ``lookback`` rows.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(daily: pd.DataFrame) -> pd.DataFrame:
+            if not PANEL_CACHE_DIR:
+                return fn(daily)
+
+            keys = ["date"] + [c for c in inputs if c in daily.columns]
+            current = daily[keys]
+            previous = _load_layer_cache().get(layer)
+            start = 0 if previous is None else _first_changed_row(current, previous)
+
+            before = set(daily.columns)
+            if start == 0:
+                daily = fn(daily)
+                outputs = [c for c in daily.columns if c not in before]
+            else:
+                outputs = [c for c in previous.columns if c not in keys]
+                parts = [previous[outputs].iloc[:start]]
+                if start < len(daily):
+                    lo = max(0, start - lookback + 1)
+                    parts.append(fn(daily.iloc[lo:].copy())[outputs].iloc[start - lo:])
+                merged = pd.concat(parts, ignore_index=True)
+                for col in outputs:
+                    daily[col] = merged[col].to_numpy()
+
+            if start < len(daily) or previous is None or len(previous) != len(daily):
+                _save_layer(layer, daily[keys + outputs].copy())
+            return daily
+        return wrapper
+    return decorator
+
+
+# ════════════════════════════════════════════════════════════════════════
+# DATA ASSEMBLY
+# ════════════════════════════════════════════════════════════════════════
+
+def build_daily_panel() -> pd.DataFrame:
+    """
+    Assemble daily panel from all cache sources.
+    Priority: GW > features > vol_decouple > SPX-derived.
+
+    Per-day source files are parsed through the incremental panel cache
+    (load_day_records), so only new or changed days are re-read.
+    """
+    print("=" * 80)
+    print("Building Daily Panel")
+    print("=" * 80)
+
+    records = load_day_records()
+    print(f"  Found {len(records)} date directories in cache")
+
+    rows = [rec["row"] for rec in records.values()]
     daily = pd.DataFrame(rows)
     daily["date"] = pd.to_datetime(daily["date"])
     daily = daily.sort_values("date").reset_index(drop=True)
@@ -579,6 +851,7 @@ def build_daily_panel() -> pd.DataFrame:
 # LAYER 1: VARIANCE RISK PREMIUM
 # ════════════════════════════════════════════════════════════════════════
 
+@_tail_cached("vrp", ["vix", "rv20_daily", "rv10_daily"])
 def compute_vrp(daily: pd.DataFrame) -> pd.DataFrame:
     """
     VRP = VIX² − RV² (Bollerslev, Tauchen, Zhou 2009).
@@ -625,6 +898,7 @@ def compute_vrp(daily: pd.DataFrame) -> pd.DataFrame:
 # LAYER 2: BEKAERT-HOEROVA DECOMPOSITION
 # ════════════════════════════════════════════════════════════════════════
 
+@_tail_cached("bh", ["vix_var", "rv20_var", "rv_daily", "rv5_daily"])
 def compute_bh_decomposition(daily: pd.DataFrame) -> pd.DataFrame:
     """
     Bekaert-Hoerova (2014) decomposition of VIX² into:
@@ -803,32 +1077,28 @@ def compute_gex_daily(daily: pd.DataFrame) -> pd.DataFrame:
     """
     print("  Computing volume-weighted dealer gamma proxy...")
 
-    date_dirs = sorted(glob.glob(os.path.join(CACHE_DIR, "????-??-??")))
-
     gex_rows = {}
     processed = 0
-    for date_dir in date_dirs:
-        date_str = os.path.basename(date_dir)
-        c5_path = os.path.join(date_dir, "close5.json")
-        if not os.path.exists(c5_path):
-            continue
-
-        try:
-            with open(c5_path) as f:
-                data = json.load(f)
-            chain = data.get("chain", {})
-        except Exception:
-            continue
-
-        spot = chain.get("_underlying_price", 0) or 0
-        if spot <= 0:
+    records = load_day_records()
+    from_store = _store_close5_days(
+        [d for d, rec in records.items() if rec.get("gex_needs_spot")])
+    for date_str, rec in records.items():
+        result = rec.get("gex")
+        if rec.get("gex_needs_spot"):
+            # close5 chain without its own spot — use the resolved panel spot
             match = daily[daily["date"] == pd.Timestamp(date_str)]
-            if len(match) > 0 and pd.notna(match.iloc[0].get("spot")):
-                spot = match.iloc[0]["spot"]
-            else:
+            if len(match) == 0 or pd.isna(match.iloc[0].get("spot")):
                 continue
+            if date_str in from_store:
+                chain = {"contracts": from_store[date_str]["contracts"]}
+            else:
+                try:
+                    with open(os.path.join(CACHE_DIR, date_str, "close5.json")) as f:
+                        chain = json.load(f).get("chain", {})
+                except Exception:
+                    continue
+            result = _compute_gex_for_chain(chain, match.iloc[0]["spot"])
 
-        result = _compute_gex_for_chain(chain, spot)
         if result:
             gex_rows[date_str] = result
             processed += 1
@@ -846,6 +1116,21 @@ def compute_gex_daily(daily: pd.DataFrame) -> pd.DataFrame:
                      "pc_vol_ratio", "gex_oi_signed"]:
             daily[col] = np.nan
 
+    daily = _compute_gex_regime(daily)
+
+    n_comp = (daily["gex_regime"] == "compression").sum()
+    n_amp = (daily["gex_regime"] == "amplification").sum()
+    n_neut = (daily["gex_regime"] == "neutral").sum()
+    print(f"    Regimes: compression={n_comp}, amplification={n_amp}, "
+          f"neutral={n_neut}")
+
+    return daily
+
+
+@_tail_cached("gex_regime", ["spot", "vix", "vix1d", "gex_vol_asym",
+                             "pc_vol_ratio", "total_call_vol", "total_put_vol"])
+def _compute_gex_regime(daily: pd.DataFrame) -> pd.DataFrame:
+    """Normalized asymmetry, rolling percentiles and composite GEX regime."""
     # ── Normalize volume asymmetry for cross-date comparison ──
     # Divide by (spot² × total volume) to remove market-cap and activity scaling
     total_vol = (daily.get("total_call_vol", 0).fillna(0) +
@@ -893,12 +1178,6 @@ def compute_gex_daily(daily: pd.DataFrame) -> pd.DataFrame:
     # Where we have no chain data at all, mark empty
     daily.loc[daily["gex_vol_asym"].isna(), "gex_regime"] = ""
 
-    n_comp = (daily["gex_regime"] == "compression").sum()
-    n_amp = (daily["gex_regime"] == "amplification").sum()
-    n_neut = (daily["gex_regime"] == "neutral").sum()
-    print(f"    Regimes: compression={n_comp}, amplification={n_amp}, "
-          f"neutral={n_neut}")
-
     return daily
 
 
@@ -44,3 +44,40 @@ def hard_metrics_leaderboard(conn: sqlite3.Connection) -> str:
         )
 
     return "\n".join(lines)
+
+
+def sweep_leaderboard(board: dict, top: int = 0) -> str:
+    """Merged sweep leaderboard (see sim.orchestrator.sweep.merge_shards).
+
+    One row per (config, agent), ranked by total P&L across windows.
+    """
+    rows = board.get("configs", [])
+    if top:
+        rows = rows[:top]
+    if not rows:
+        return "No finished sweep cells yet."
+
+    lines = [
+        "=== Sweep Leaderboard ===",
+        f"{'Rank':>4}  {'Config':<20} {'Agent':<16} {'Win':>4} {'Sess':>5} "
+        f"{'P&L':>11} {'AvgRet':>8} {'WorstRet':>9} {'Max DD':>8} "
+        f"{'Sharpe':>7} {'Win%':>6} {'Trades':>6}",
+        f"{'─'*4}  {'─'*20} {'─'*16} {'─'*4} {'─'*5} "
+        f"{'─'*11} {'─'*8} {'─'*9} {'─'*8} "
+        f"{'─'*7} {'─'*6} {'─'*6}",
+    ]
+
+    for i, r in enumerate(rows, 1):
+        lines.append(
+            f"{i:>4}  {r['config']:<20} {r['agent_id']:<16} "
+            f"{r['windows']:>4} {r['sessions']:>5} "
+            f"${r['total_pnl']:>+10,.2f} "
+            f"{r['mean_return_pct']:>+7.2f}% "
+            f"{r['worst_return_pct']:>+8.2f}% "
+            f"{r['max_drawdown_pct']:>7.2f}% "
+            f"{r['mean_sharpe']:>7.2f} "
+            f"{r['win_rate']:>5.0%} "
+            f"{r['trades']:>6}"
+        )
+
+    return "\n".join(lines)
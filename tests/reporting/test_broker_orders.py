@@ -0,0 +1,180 @@
+"""Tests for reporting.broker_orders — typed order/leg tables from raw payloads."""
+
+import json
+from datetime import date, datetime
+
+import duckdb
+import pytest
+
+from reporting.broker_orders import normalize_broker_orders
+from reporting.broker_pnl import API_TAG, load_trades_from_db
+from reporting.db import init_schema
+
+
+SCHWAB_ORDER = {
+    "orderId": 1001,
+    "status": "FILLED",
+    "tag": API_TAG,
+    "orderType": "NET_CREDIT",
+    "complexOrderStrategyType": "VERTICAL",
+    "price": 2.45,
+    "quantity": 2.0,
+    "filledQuantity": 2.0,
+    "enteredTime": "2026-03-12T20:13:00+0000",
+    "closeTime": "2026-03-12T20:13:05+0000",
+    "accountNumber": "123",
+    "orderLegCollection": [
+        {"legId": 1, "instruction": "SELL_TO_OPEN", "quantity": 2.0,
+         "instrument": {"symbol": "SPXW  260319P06520000", "putCall": "PUT"}},
+        {"legId": 2, "instruction": "BUY_TO_OPEN", "quantity": 2.0,
+         "instrument": {"symbol": "SPXW  260319P06510000", "putCall": "PUT"}},
+    ],
+    "orderActivityCollection": [{"activityType": "EXECUTION", "executionLegs": [
+        {"legId": 1, "quantity": 1.0, "price": 10.0, "time": "2026-03-12T20:13:05+0000"},
+        {"legId": 1, "quantity": 1.0, "price": 11.0, "time": "2026-03-12T20:13:04+0000"},
+        {"legId": 2, "quantity": 2.0, "price": 7.0, "time": "2026-03-12T20:13:05+0000"},
+    ]}],
+}
+
+TT_ORDER = {
+    "id": 555,
+    "status": "Filled",
+    "received-at": "2026-03-12T20:10:00.5Z",
+    "terminal-at": "2026-03-12T20:10:02Z",
+    "size": 1,
+    "price": "1.15",
+    "price-effect": "Debit",
+    "order-type": "Limit",
+    "account-number": "5WT09219",
+    "legs": [
+        {"symbol": "SPXW  260312C05900000", "action": "Buy to Open", "quantity": 1,
+         "fills": [{"fill-price": "3.1", "quantity": "1", "filled-at": "2026-03-12T20:10:01Z"}]},
+        {"symbol": "SPXW  260312C05905000", "action": "Sell to Open", "quantity": 1, "fills": []},
+    ],
+}
+
+
+@pytest.fixture
+def db():
+    con = duckdb.connect(":memory:")
+    init_schema(con)
+    yield con
+    con.close()
+
+
+def _insert_raw(con, raw_id, broker, account, order_id, fetched_at, payload):
+    con.execute(
+        """INSERT INTO broker_raw_orders
+           (id, broker, account, order_id, fetched_at, raw_payload, idempotency_key)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        [raw_id, broker, account, order_id, fetched_at, json.dumps(payload), raw_id],
+    )
+
+
+def _order(con, order_id):
+    cur = con.execute("SELECT * FROM broker_orders WHERE order_id = ?", [order_id])
+    cols = [d[0] for d in cur.description]
+    return dict(zip(cols, cur.fetchone()))
+
+
+def _legs(con, order_id):
+    cur = con.execute(
+        "SELECT * FROM broker_order_legs WHERE order_id = ? ORDER BY leg_index", [order_id]
+    )
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+class TestNormalize:
+    def test_schwab_order_and_legs(self, db):
+        _insert_raw(db, "r1", "schwab", "schwab", "1001", "2026-03-12 22:00", SCHWAB_ORDER)
+        assert normalize_broker_orders(db) == {"orders": 1, "legs": 2}
+
+        o = _order(db, "1001")
+        assert o["status"] == "FILLED"
+        assert o["tag"] == API_TAG
+        assert o["price_effect"] == "CREDIT"
+        assert o["filled_qty"] == 2.0
+        assert o["n_legs"] == 2
+        assert o["entered_at"] == datetime(2026, 3, 12, 20, 13)
+        assert o["first_fill_at"] == datetime(2026, 3, 12, 20, 13, 4)
+        assert o["trade_date"] == date(2026, 3, 12)
+
+        short, long_ = _legs(db, "1001")
+        assert short["osi"] == "SPXW260319P06520000"
+        assert short["underlying"] == "SPXW"
+        assert short["expiry"] == date(2026, 3, 19)
+        assert short["option_type"] == "PUT"
+        assert short["strike"] == 6520.0
+        assert short["instruction"] == "SELL_TO_OPEN"
+        assert short["filled_qty"] == 2.0
+        assert short["fill_price"] == pytest.approx(10.5)
+        assert long_["fill_price"] == pytest.approx(7.0)
+
+    def test_tastytrade_order_and_legs(self, db):
+        _insert_raw(db, "r1", "tastytrade", "tt-individual", "555", "2026-03-12 22:00", TT_ORDER)
+        normalize_broker_orders(db)
+
+        o = _order(db, "555")
+        assert o["status"] == "FILLED"
+        assert o["account_number"] == "5WT09219"
+        assert o["price_effect"] == "DEBIT"
+        assert o["filled_qty"] == 1.0
+        assert o["closed_at"] == datetime(2026, 3, 12, 20, 10, 2)
+
+        buy, sell = _legs(db, "555")
+        assert buy["instruction"] == "BUY_TO_OPEN"
+        assert buy["fill_price"] == pytest.approx(3.1)
+        assert buy["last_fill_at"] == datetime(2026, 3, 12, 20, 10, 1)
+        assert sell["strike"] == 5905.0
+        assert sell["filled_qty"] is None
+
+    def test_incremental_keeps_latest_version(self, db):
+        working = dict(SCHWAB_ORDER, status="WORKING", filledQuantity=0.0,
+                       orderActivityCollection=[])
+        _insert_raw(db, "r1", "schwab", "schwab", "1001", "2026-03-12 21:00", working)
+        normalize_broker_orders(db)
+        assert _order(db, "1001")["status"] == "WORKING"
+
+        _insert_raw(db, "r2", "schwab", "schwab", "1001", "2026-03-12 22:00", SCHWAB_ORDER)
+        assert normalize_broker_orders(db) == {"orders": 1, "legs": 2}
+        assert _order(db, "1001")["status"] == "FILLED"
+        assert normalize_broker_orders(db) == {"orders": 0, "legs": 0}
+
+        # An older version fetched late does not overwrite the newer one
+        _insert_raw(db, "r0", "schwab", "schwab", "1001", "2026-03-12 20:00", working)
+        assert normalize_broker_orders(db) == {"orders": 0, "legs": 0}
+        assert _order(db, "1001")["status"] == "FILLED"
+
+        assert normalize_broker_orders(db, full=True) == {"orders": 1, "legs": 2}
+        assert db.execute("SELECT count(*) FROM broker_order_legs").fetchone()[0] == 2
+
+
+class TestLoadTradesFromDb:
+    def test_trade_records_from_typed_tables(self, db):
+        _insert_raw(db, "r1", "schwab", "schwab", "1001", "2026-03-12 22:00", SCHWAB_ORDER)
+        _insert_raw(db, "r2", "tastytrade", "tt-individual", "555", "2026-03-12 22:00", TT_ORDER)
+        assert load_trades_from_db(db) == []  # read-only: not normalized yet
+        normalize_broker_orders(db)
+
+        trades = load_trades_from_db(db)
+
+        assert len(trades) == 1
+        t = trades[0]
+        assert t["order_id"] == "1001"
+        assert t["account"] == "123"
+        assert t["fill_date"] == "2026-03-12"
+        assert t["fill_time"] == "16:13"
+        assert t["strategy"] == "dualside"
+        assert t["strikes"] == [6510.0, 6520.0]
+        assert t["expiries"] == ["2026-03-19"]
+        assert t["width"] == 10
+        assert t["qty"] == 2
+        assert t["signal"] == "SHORT"
+        assert t["is_opening"] and not t["is_closing"]
+
+    def test_missing_tables_are_reported_not_hidden(self, capsys):
+        con = duckdb.connect(":memory:")
+        assert load_trades_from_db(con) == []
+        assert "broker_orders unreadable" in capsys.readouterr().out
+        con.close()
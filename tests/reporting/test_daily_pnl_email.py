@@ -10,6 +10,7 @@ import pytest
 from reporting.db import close_all, get_connection, query_one
 from reporting.daily_pnl_email import (
     _build_email,
+    _order_lookback,
     _build_today_trades_section,
     _classify_signal,
     _fill_status_str,
@@ -223,6 +224,25 @@ def test_run_daily_pnl_email_honors_report_date_override(isolated_db, monkeypatc
     assert "[Gamma] Health:" in sends[0]["subject"] and "2026-03-19" in sends[0]["subject"]
 
 
+def test_order_lookback_shrinks_once_mart_is_populated(isolated_db):
+    from reporting.db import init_schema
+    from reporting.pnl_mart import SOURCE_BROKER
+
+    con = get_connection()
+    init_schema(con)
+    assert _order_lookback(con, date(2026, 3, 19), 120) == 120  # empty mart: full rebuild
+
+    con.execute(
+        """INSERT INTO pnl_daily_mart
+           SELECT ?, 'portfolio', 'schwab', DATE '2026-03-02', 1, 1, 10, 1, 1, 10, 10, 0, 0,
+                  10, 10, 0, 10, 10, 0, 1, TIMESTAMP '2026-03-02 21:00'""",
+        [SOURCE_BROKER],
+    )
+    assert _order_lookback(con, date(2026, 3, 3), 120) == 30
+    assert _order_lookback(con, date(2026, 3, 19), 120) == 32  # 17-day gap + hold + 1
+    assert _order_lookback(con, date(2026, 9, 1), 120) == 120
+
+
 # ---------------------------------------------------------------------------
 # Trade Summary Tests
 # ---------------------------------------------------------------------------
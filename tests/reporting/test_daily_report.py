@@ -7,6 +7,7 @@ import pytest
 
 from reporting.daily_report import generate_report
 from reporting.db import execute, init_schema
+from reporting.pnl_mart import refresh_positions_mart
 
 
 @pytest.fixture
@@ -70,5 +71,25 @@ def test_generate_report_suppresses_broker_sections_when_sources_stale(db):
     assert "## Open Positions" not in report
     assert "## Account Summary" not in report
     assert "## Strategy Scorecard" not in report
+    assert "## Realized P&L" not in report
     assert "## Strategy Runs" in report
     assert "## Reconciliation" in report
+
+
+def test_generate_report_realized_pnl_from_mart(db):
+    execute(
+        """INSERT INTO positions
+           (position_id, strategy, account, trade_date, expiry_date,
+            lifecycle_state, realized_pnl, closed_at)
+           VALUES ('p1', 'constantstable', 'schwab', '2026-03-18', '2026-03-18',
+                   'EXPIRED', 150, '2026-03-18 21:00:00'),
+                  ('p2', 'constantstable', 'schwab', '2026-03-19', '2026-03-19',
+                   'CLOSED', -60, '2026-03-19 19:30:00')""",
+        con=db,
+    )
+    refresh_positions_mart(db)
+
+    report = generate_report("2026-03-19", con=db)
+
+    assert "## Realized P&L" in report
+    assert "| constantstable | schwab | $-60 | $+90 | $+90 | $+90 | $-60 | $-60 | L1 |" in report
@@ -8,11 +8,14 @@ from reporting.ingest import sync_events_from_s3
 
 
 class _FakePaginator:
-    def paginate(self, Bucket, Prefix):
+    def paginate(self, Bucket, Prefix, StartAfter=""):
         yield {
             "Contents": [
-                {"Key": f"{Prefix}constantstable_schwab_run1.jsonl", "Size": 13},
-                {"Key": f"{Prefix}ignore.txt", "Size": 4},
+                {"Key": f"{Prefix}2026-03-13/constantstable_schwab_run1.jsonl", "Size": 13,
+                 "ETag": '"abc"'},
+                {"Key": f"{Prefix}2026-03-13/ignore.txt", "Size": 4, "ETag": '"def"'},
+                {"Key": f"{Prefix}2026-03-14/constantstable_schwab_run2.jsonl", "Size": 13,
+                 "ETag": '"ghi"'},
             ]
         }
 
@@ -30,7 +33,7 @@ def test_sync_events_from_s3_downloads_jsonl(monkeypatch, tmp_path):
     monkeypatch.setenv("GAMMA_EVENT_BUCKET", "unit-test-bucket")
     monkeypatch.setenv("GAMMA_EVENT_PREFIX", "reporting/events")
     monkeypatch.setenv("GAMMA_EVENT_DIR", str(tmp_path))
-    monkeypatch.setattr("reporting.ingest.boto3.client", lambda service: _FakeS3())
+    monkeypatch.setattr("sim.data.s3_transfer.get_client", lambda: _FakeS3())
 
     stats = sync_events_from_s3("2026-03-13")
 
@@ -53,7 +56,7 @@ def test_sync_events_from_s3_skips_same_size_file(monkeypatch, tmp_path):
     monkeypatch.setenv("GAMMA_EVENT_BUCKET", "unit-test-bucket")
     monkeypatch.setenv("GAMMA_EVENT_PREFIX", "reporting/events")
     monkeypatch.setenv("GAMMA_EVENT_DIR", str(tmp_path))
-    monkeypatch.setattr("reporting.ingest.boto3.client", lambda service: _FakeS3())
+    monkeypatch.setattr("sim.data.s3_transfer.get_client", lambda: _FakeS3())
 
     stats = sync_events_from_s3("2026-03-13")
 
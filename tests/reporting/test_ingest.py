@@ -139,3 +139,125 @@ class TestIngestEvents:
         assert stats["inserted"] == 2
 
         assert query_one("SELECT COUNT(*) FROM strategy_runs", con=con)[0] == 2
+
+
+class TestBulkIngest:
+    def test_post_steps_merge_and_order_updates(self, fresh_db):
+        con, event_dir = fresh_db
+        td = date(2026, 3, 12)
+
+        with EventWriter("butterfly", "schwab", trade_date=td) as ew:
+            ew.strategy_run(signal="BUY", config="4DTE", reason="ok")
+            ew.order_submitted(order_id="7", legs=[{"osi": "X"}], limit_price=2.5)
+            ew.order_update(order_id="7", status="canceled", remaining_qty=1)
+            ew.post_step_result("sheets", "fail")
+            ew.post_step_result("email", "ok")
+            ew.post_step_result("sheets", "ok")
+
+        stats = ingest_events(td, con=con)
+        assert stats["inserted"] == 6
+
+        status, post = query_one("SELECT status, post_results FROM strategy_runs", con=con)
+        assert status == "COMPLETED"
+        assert json.loads(post) == {"sheets": "ok", "email": "ok"}
+        rows = query_df("SELECT event_type, limit_price, remaining_qty FROM order_events "
+                        "ORDER BY ts_utc", con=con)
+        assert rows["event_type"].tolist() == ["submitted", "canceled"]
+        assert rows["remaining_qty"].tolist() == [0, 1]
+
+    def test_duplicate_files_and_malformed_lines(self, fresh_db):
+        con, event_dir = fresh_db
+        td = date(2026, 3, 12)
+
+        with EventWriter("butterfly", "schwab", trade_date=td) as ew:
+            ew.strategy_run(signal="BUY", config="4DTE", reason="ok")
+            ew.skip(reason="veto")
+        path = ew.close()
+        (path.parent / "copy.jsonl").write_text(path.read_text() + "not json\n\n")
+
+        stats = ingest_events(td, con=con)
+        assert stats == {"files": 2, "events_read": 4, "inserted": 2,
+                         "duplicates": 2, "materialized": 2}
+        assert query_one("SELECT status FROM strategy_runs", con=con)[0] == "SKIPPED"
+
+    def test_ingest_all_pending_spans_dates(self, fresh_db):
+        from reporting.ingest import ingest_all_pending
+
+        con, event_dir = fresh_db
+        for day in (10, 11, 12):
+            with EventWriter("butterfly", "schwab", trade_date=date(2026, 3, day)) as ew:
+                ew.strategy_run(signal="BUY", config="4DTE", reason="ok")
+        (event_dir / "not-a-date").mkdir()
+
+        totals = ingest_all_pending(con)
+        assert (totals["dates"], totals["files"], totals["inserted"]) == (3, 3, 3)
+        assert ingest_all_pending(con)["inserted"] == 0
+        assert query_one("SELECT COUNT(*) FROM strategy_runs", con=con)[0] == 3
+
+
+class TestIngestLedger:
+    def test_unchanged_files_skipped_and_appends_read_from_offset(self, fresh_db):
+        from reporting.ingest import ingest_all_pending
+
+        con, event_dir = fresh_db
+        td = date(2026, 3, 12)
+        ew = EventWriter("butterfly", "schwab", trade_date=td)
+        ew.strategy_run(signal="BUY", config="4DTE", reason="ok")
+        ew.flush()
+        (path,) = event_dir.glob("*/*.jsonl")
+
+        first = ingest_all_pending(con)
+        assert (first["files"], first["inserted"]) == (1, 1)
+
+        second = ingest_all_pending(con)
+        assert (second["skipped_files"], second["events_read"]) == (1, 0)
+
+        # Appended events are read from the recorded offset only
+        ew.skip(reason="veto")
+        ew.close()
+        third = ingest_all_pending(con)
+        assert (third["events_read"], third["inserted"], third["duplicates"]) == (1, 1, 0)
+        assert query_one("SELECT status FROM strategy_runs", con=con)[0] == "SKIPPED"
+
+        size, offset = query_one(
+            "SELECT size_bytes, byte_offset FROM ingest_ledger WHERE path = ?",
+            [str(path)], con=con)
+        assert size == offset == path.stat().st_size
+
+    def test_partial_trailing_line_waits_for_next_run(self, fresh_db):
+        from reporting.ingest import ingest_all_pending
+
+        con, event_dir = fresh_db
+        td = date(2026, 3, 12)
+        with EventWriter("butterfly", "schwab", trade_date=td) as ew:
+            ew.strategy_run(signal="BUY", config="4DTE", reason="ok")
+            ew.skip(reason="veto")
+        path = ew.close()
+        first_line, second_line = path.read_text().splitlines(keepends=True)
+        path.write_text(first_line + second_line[:20])
+
+        assert ingest_all_pending(con)["inserted"] == 1
+        path.write_text(first_line + second_line)
+        stats = ingest_all_pending(con)
+        assert (stats["events_read"], stats["inserted"]) == (1, 1)
+
+    def test_rewritten_file_is_reread_from_start(self, fresh_db):
+        from reporting.ingest import ingest_all_pending
+
+        con, event_dir = fresh_db
+        td = date(2026, 3, 12)
+        with EventWriter("butterfly", "schwab", trade_date=td) as ew:
+            ew.strategy_run(signal="BUY", config="4DTE", reason="ok")
+        path = ew.close()
+        ingest_all_pending(con)
+
+        with EventWriter("constantstable", "tt-ira", trade_date=td) as other:
+            other.strategy_run(signal="PUT_CREDIT", config="standard", reason="ok")
+        other_path = other.close()
+        # Rewrite the file in place with new content ahead of the old
+        path.write_text(other_path.read_text() + path.read_text())
+        other_path.unlink()
+
+        stats = ingest_all_pending(con)
+        assert (stats["events_read"], stats["inserted"], stats["duplicates"]) == (2, 1, 1)
+        assert query_one("SELECT COUNT(*) FROM strategy_runs", con=con)[0] == 2
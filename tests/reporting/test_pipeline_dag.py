@@ -0,0 +1,123 @@
+"""Tests for reporting.pipeline_dag — dependency order, skipping, timings."""
+
+import threading
+
+import duckdb
+import pytest
+
+from reporting.db import init_schema
+from reporting.pipeline_dag import Step, run_steps
+
+
+@pytest.fixture
+def db():
+    con = duckdb.connect(":memory:")
+    init_schema(con)
+    con.execute("CREATE TABLE src (x INTEGER)")
+    con.execute("CREATE TABLE dst (total INTEGER)")
+    yield con
+    con.close()
+
+
+def _rollup(calls):
+    def fn(con):
+        calls.append("rollup")
+        con.execute("DELETE FROM dst")
+        con.execute("INSERT INTO dst SELECT coalesce(sum(x), 0) FROM src")
+        return {"rows": 1}
+    return fn
+
+
+def _steps(calls, params=()):
+    def load(con):
+        calls.append("load")
+        return {}
+    return [
+        Step("load", load, outputs=("src",)),
+        Step("rollup", _rollup(calls), inputs=("src",), outputs=("dst",), params=params),
+    ]
+
+
+def _runs(con):
+    return con.execute(
+        "SELECT step, status FROM pipeline_runs ORDER BY started_at, step"
+    ).fetchall()
+
+
+class TestSkipping:
+    def test_unchanged_inputs_skip_step(self, db):
+        calls = []
+        first = run_steps(db, _steps(calls))
+        second = run_steps(db, _steps(calls))
+
+        assert first["status"] == {"load": "OK", "rollup": "OK"}
+        assert second["status"] == {"load": "OK", "rollup": "SKIPPED"}
+        assert calls == ["load", "rollup", "load"]
+        assert db.execute("SELECT count(*) FROM pipeline_runs").fetchone()[0] == 4
+
+    def test_changed_input_or_param_reruns(self, db):
+        calls = []
+        run_steps(db, _steps(calls))
+
+        db.execute("INSERT INTO src VALUES (5)")
+        assert run_steps(db, _steps(calls))["status"]["rollup"] == "OK"
+        assert db.execute("SELECT total FROM dst").fetchone()[0] == 5
+
+        assert run_steps(db, _steps(calls))["status"]["rollup"] == "SKIPPED"
+        assert run_steps(db, _steps(calls, params=("2026-03-20",)))["status"]["rollup"] == "OK"
+        assert run_steps(db, _steps(calls), force=True)["status"]["rollup"] == "OK"
+
+    def test_watermark_input(self, db):
+        mark = {"files": 1}
+        calls = []
+        steps = [Step("ingest", lambda con: calls.append(1) or {}, inputs=("event_files",))]
+        watermarks = {"event_files": lambda con: mark["files"]}
+
+        run_steps(db, steps, watermarks=watermarks)
+        run_steps(db, steps, watermarks=watermarks)
+        mark["files"] = 2
+        run_steps(db, steps, watermarks=watermarks)
+
+        assert calls == [1, 1]
+
+
+class TestScheduling:
+    def test_independent_steps_run_concurrently(self, db):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def sync(con):
+            barrier.wait()
+            return {}
+
+        result = run_steps(db, [Step("schwab", sync), Step("tt", sync)])
+        assert result["status"] == {"schwab": "OK", "tt": "OK"}
+
+    def test_dependents_wait_for_producers(self, db):
+        order = []
+
+        def step(name):
+            def fn(con):
+                order.append(name)
+                return {}
+            return fn
+
+        run_steps(db, [
+            Step("a", step("a"), outputs=("src",)),
+            Step("b", step("b"), inputs=("src",), outputs=("dst",)),
+            Step("report", step("report"), after=("b", "missing")),
+        ])
+        assert order == ["a", "b", "report"]
+
+    def test_errors_recorded_and_fatal_reraises(self, db):
+        def boom(con):
+            raise RuntimeError("broker down")
+
+        result = run_steps(db, [Step("sync", boom), Step("after", lambda con: {}, after=("sync",))])
+        assert result["steps"]["sync"] == {"error": "broker down"}
+        assert result["status"]["after"] == "OK"
+
+        with pytest.raises(RuntimeError):
+            run_steps(db, [Step("engine", boom, fatal=True),
+                           Step("report", lambda con: {}, after=("engine",))])
+        assert ("engine", "ERROR") in _runs(db)
+        assert "report" not in {step for step, _ in _runs(db)}
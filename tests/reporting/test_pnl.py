@@ -0,0 +1,103 @@
+"""Tests for reporting.pnl — settlement-based P&L for verticals and butterflies."""
+
+import duckdb
+import pytest
+
+from reporting.db import execute, init_schema, query_one
+from reporting.pnl import (
+    _compute_butterfly_pnl,
+    _compute_vertical_pnl,
+    compute_all_pnl,
+)
+
+
+@pytest.fixture
+def db():
+    con = duckdb.connect(":memory:")
+    init_schema(con)
+    yield con
+    con.close()
+
+
+def _insert_settlement(con, expiry_date, forward, trade_date="2026-03-12"):
+    execute(
+        """INSERT INTO strategy_signal_rows
+           (signal_id, strategy, source, trade_date, expiry_date, forward)
+           VALUES (?, 'butterfly', 'leo_csv', ?, ?, ?)""",
+        [f"s-{expiry_date}-{trade_date}", trade_date, expiry_date, forward],
+        con=con,
+    )
+
+
+def _insert_position(con, position_id, legs, entry_price, qty=1, signal="SHORT",
+                     expiry_date="2026-03-16", state="EXPIRED"):
+    execute(
+        """INSERT INTO positions
+           (position_id, strategy, account, trade_date, expiry_date,
+            lifecycle_state, entry_price, qty, signal)
+           VALUES (?, 'butterfly', 'schwab', '2026-03-12', ?, ?, ?, ?, ?)""",
+        [position_id, expiry_date, state, entry_price, qty, signal],
+        con=con,
+    )
+    for i, (option_type, strike) in enumerate(legs):
+        execute(
+            """INSERT INTO position_legs
+               (leg_id, position_id, osi, option_type, strike, action, qty)
+               VALUES (?, ?, '', ?, ?, 'BUY_TO_OPEN', 1)""",
+            [f"{position_id}-{i}", position_id, option_type, strike],
+            con=con,
+        )
+
+
+CASES = [
+    # (legs, signal, entry, qty)
+    ([("PUT", 5900), ("PUT", 5890)], "SHORT", 2.0, 2),
+    ([("PUT", 5990), ("PUT", 5980)], "LONG", 3.1, 1),
+    ([("CALL", 5940), ("CALL", 5960)], "LONG", 4.5, 3),
+    ([("CALL", 5950), ("CALL", 5960)], "SHORT", 1.25, 1),
+    ([("CALL", 5930), ("CALL", 5950), ("CALL", 5950), ("CALL", 5970)], "LONG", 5.0, 1),
+    ([("PUT", 5930), ("PUT", 5950), ("PUT", 5970)], "SHORT", 6.0, 2),
+]
+
+
+def test_batch_matches_per_position_payoff(db):
+    settlement = 5952.5
+    _insert_settlement(db, "2026-03-16", settlement)
+    for i, (legs, signal, entry, qty) in enumerate(CASES):
+        _insert_position(db, f"p{i}", legs, entry, qty, signal)
+
+    stats = compute_all_pnl(db)
+    assert stats == {"processed": len(CASES), "computed": len(CASES),
+                     "skipped_no_settlement": 0, "skipped_no_legs": 0}
+
+    for i, (legs, signal, entry, qty) in enumerate(CASES):
+        leg_dicts = [{"option_type": t, "strike": k} for t, k in legs]
+        compute = _compute_butterfly_pnl if len({k for _, k in legs}) == 3 else _compute_vertical_pnl
+        expected = compute(entry, settlement, leg_dicts, signal, qty)
+        got = query_one(
+            "SELECT realized_pnl, exit_price FROM positions WHERE position_id = ?",
+            [f"p{i}"], con=db)
+        assert got == pytest.approx(expected)
+
+
+def test_skips_and_settlement_fallback(db):
+    # Keyed on trade_date only (no expiry_date match)
+    _insert_settlement(db, None, 5905.0, trade_date="2026-03-17")
+    _insert_position(db, "fallback", [("PUT", 5900), ("PUT", 5890)], 2.0,
+                     expiry_date="2026-03-17")
+    _insert_position(db, "no_settle", [("PUT", 5900), ("PUT", 5890)], 2.0,
+                     expiry_date="2026-03-18")
+    _insert_position(db, "no_legs", [], 2.0, expiry_date="2026-03-17")
+    _insert_position(db, "one_strike", [("PUT", 5900)], 2.0, expiry_date="2026-03-17")
+    _insert_position(db, "still_open", [("PUT", 5900), ("PUT", 5890)], 2.0,
+                     expiry_date="2026-03-17", state="OPEN")
+
+    stats = compute_all_pnl(db)
+    assert stats == {"processed": 4, "computed": 1,
+                     "skipped_no_settlement": 1, "skipped_no_legs": 2}
+    assert query_one("SELECT realized_pnl FROM positions WHERE position_id = 'fallback'",
+                     con=db)[0] == pytest.approx(200.0)
+    assert query_one("SELECT COUNT(*) FROM positions WHERE realized_pnl IS NOT NULL",
+                     con=db)[0] == 1
+    # Computed positions are not reprocessed
+    assert compute_all_pnl(db)["processed"] == 3
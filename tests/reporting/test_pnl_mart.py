@@ -0,0 +1,194 @@
+"""Tests for reporting.pnl_mart — running P&L rows and lookups."""
+
+import json
+from datetime import date
+
+import duckdb
+import pytest
+
+from reporting.db import init_schema
+from reporting.pnl_mart import (
+    PORTFOLIO,
+    PnlMart,
+    broker_position_records,
+    build_rows,
+    load_mart_mirror,
+    mart_as_of,
+    refresh_pnl_mart,
+    refresh_positions_mart,
+    save_mart_mirror,
+)
+
+
+BOOKS = {"ic": ("ic",), "spread": ("spread",), PORTFOLIO: None}
+
+
+def _rec(d, strategy, pnl, account="schwab"):
+    return {"settle_date": d, "strategy": strategy, "account": account, "pnl": pnl}
+
+
+RECORDS = [
+    _rec(date(2026, 2, 26), "ic", 100.0),
+    _rec(date(2026, 2, 27), "ic", -300.0),
+    _rec(date(2026, 3, 2), "ic", 200.0),
+    _rec(date(2026, 3, 2), "spread", 50.0),
+    _rec(date(2026, 3, 3), "ic", -80.0),
+    _rec(date(2026, 3, 4), "spread", -20.0),
+    _rec(date(2026, 3, 5), "ic", 60.0),
+]
+
+
+@pytest.fixture
+def db():
+    con = duckdb.connect(":memory:")
+    init_schema(con)
+    yield con
+    con.close()
+
+
+def _stored(con, source):
+    cur = con.execute(
+        "SELECT * EXCLUDE (updated_at) FROM pnl_daily_mart WHERE source = ? "
+        "ORDER BY book, account, settle_date",
+        [source],
+    )
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+class TestBuildRows:
+    def test_running_columns(self):
+        rows = [r for r in build_rows(RECORDS, BOOKS) if r["book"] == "ic"]
+
+        assert [r["equity"] for r in rows] == [100.0, -200.0, 0.0, -80.0, -20.0]
+        assert [r["peak"] for r in rows] == [100.0, 100.0, 100.0, 100.0, 100.0]
+        assert [r["drawdown"] for r in rows] == [0.0, 300.0, 100.0, 180.0, 120.0]
+        assert rows[-1]["max_drawdown"] == 300.0
+        assert [r["streak"] for r in rows] == [1, -1, 1, -1, 1]
+
+    def test_month_and_year_curves_restart(self):
+        rows = [r for r in build_rows(RECORDS, BOOKS) if r["book"] == "ic"]
+        march = rows[2:]
+
+        assert [r["mtd_equity"] for r in march] == [200.0, 120.0, 180.0]
+        assert [r["mtd_max_drawdown"] for r in march] == [0.0, 80.0, 80.0]
+        assert rows[-1]["ytd_equity"] == -20.0
+        assert rows[-1]["ytd_max_drawdown"] == 300.0
+
+    def test_rollup_book_counts_every_trade(self):
+        rows = [r for r in build_rows(RECORDS, BOOKS) if r["book"] == PORTFOLIO]
+        march_2 = rows[2]
+
+        assert march_2["trades"] == 2
+        assert march_2["wins"] == 2
+        assert march_2["pnl"] == 250.0
+        assert march_2["streak"] == 2
+        assert rows[-1]["cum_trades"] == len(RECORDS)
+
+
+class TestRefresh:
+    def test_incremental_matches_full_rebuild(self, db):
+        refresh_pnl_mart(db, "full", RECORDS, BOOKS)
+
+        refresh_pnl_mart(db, "incr", RECORDS[:4], BOOKS)
+        written = refresh_pnl_mart(db, "incr", RECORDS, BOOKS, since=date(2026, 3, 3))
+
+        assert written == 6  # ic 3/3, 3/5 · spread 3/4 · portfolio 3/3-3/5
+        full = [dict(r, source=None) for r in _stored(db, "full")]
+        incr = [dict(r, source=None) for r in _stored(db, "incr")]
+        assert incr == full
+
+    def test_since_without_history_rebuilds(self, db):
+        refresh_pnl_mart(db, "s", RECORDS, BOOKS, since=date(2026, 3, 3))
+
+        ic = [r for r in _stored(db, "s") if r["book"] == "ic"]
+        assert ic[0]["settle_date"] == date(2026, 2, 26)
+        assert ic[-1]["equity"] == -20.0
+
+    def test_positions_source(self, db):
+        db.execute(
+            """INSERT INTO positions
+               (position_id, strategy, account, trade_date, expiry_date,
+                lifecycle_state, realized_pnl, closed_at)
+               VALUES ('p1', 'ic', 'schwab', '2026-03-02', '2026-03-02', 'EXPIRED', 120, '2026-03-02 21:00'),
+                      ('p2', 'ic', 'schwab', '2026-03-03', '2026-03-03', 'CLOSED', -40, '2026-03-03 19:00'),
+                      ('p3', 'ic', 'schwab', '2026-03-04', '2026-03-04', 'OPEN', NULL, NULL)"""
+        )
+
+        assert refresh_positions_mart(db) == 4
+
+        rows = _stored(db, "positions")
+        assert {r["book"] for r in rows} == {"ic", PORTFOLIO}
+        last = rows[1]
+        assert (last["settle_date"], last["equity"], last["drawdown"], last["streak"]) == (
+            date(2026, 3, 3), 80.0, 40.0, -1)
+
+
+class TestMirror:
+    @pytest.fixture
+    def fake_s3(self, monkeypatch):
+        store = {}
+        monkeypatch.setattr("sim.data.s3_cache.s3_put_json",
+                            lambda d, f, data, bucket="": store.__setitem__(f"{d}/{f}", json.loads(json.dumps(data))))
+        monkeypatch.setattr("sim.data.s3_cache.s3_get_json",
+                            lambda d, f, bucket="": store.get(f"{d}/{f}"))
+        return store
+
+    def test_round_trip_replaces_local_rows(self, db, fake_s3):
+        refresh_pnl_mart(db, "m", RECORDS, BOOKS)
+        assert save_mart_mirror(db, "m")
+        assert list(fake_s3) == ["_index/pnl_mart_m.json"]
+
+        other = duckdb.connect(":memory:")
+        init_schema(other)
+        refresh_pnl_mart(other, "m", RECORDS[:2], BOOKS)  # stale container history
+
+        assert load_mart_mirror(other, "m") == len(_stored(db, "m"))
+        assert _stored(other, "m") == _stored(db, "m")
+        assert mart_as_of(other, "m") == mart_as_of(db, "m")
+        other.close()
+
+    def test_missing_mirror_keeps_local_rows(self, db, fake_s3):
+        refresh_pnl_mart(db, "m", RECORDS, BOOKS)
+        before = _stored(db, "m")
+
+        assert load_mart_mirror(db, "m") == 0
+        assert _stored(db, "m") == before
+        assert mart_as_of(db, "none") is None
+
+
+class TestLookups:
+    def test_window_drawdown_streak(self, db):
+        refresh_pnl_mart(db, "m", RECORDS, BOOKS)
+        loaded = PnlMart.load(db, "m", date(2026, 3, 3), date(2026, 3, 5))
+        in_memory = PnlMart.from_records(RECORDS, BOOKS)
+
+        for mart in (loaded, in_memory):
+            assert mart.day("ic", "schwab", date(2026, 3, 3)) == -80.0
+            assert mart.day("ic", "schwab", date(2026, 3, 4)) == 0.0
+            assert mart.window(PORTFOLIO, "schwab", date(2026, 3, 3), date(2026, 3, 5)) == {
+                "trades": 3, "wins": 1, "pnl": -40.0}
+            assert mart.drawdown("ic", "schwab", "mtd", date(2026, 3, 5)) == (20.0, 80.0)
+            assert mart.streak(PORTFOLIO, "schwab", date(2026, 3, 4)) == "L2"
+            assert mart.streak("spread", "schwab", date(2026, 2, 27)) == "—"
+
+    def test_drawdown_outside_period_is_zero(self):
+        mart = PnlMart.from_records(RECORDS, BOOKS)
+        assert mart.drawdown("ic", "schwab", "mtd", date(2026, 4, 1)) == (0.0, 0.0)
+        assert mart.window("ic", "other", date(2026, 1, 1), date(2026, 12, 31)) == {
+            "trades": 0, "wins": 0, "pnl": 0.0}
+
+
+def test_broker_position_records_skip_open():
+    positions = [
+        {"exit_method": "EXPIRED", "expiry": "2026-03-20", "strategy": "ic",
+         "pnl": 55.0, "fill_date": "2026-03-19"},
+        {"exit_method": "CLOSED_EARLY", "close_date": "2026-03-18", "strategy": "ic",
+         "pnl": None, "fill_date": "2026-03-17"},
+        {"exit_method": "OPEN", "strategy": "ic", "pnl": None, "fill_date": "2026-03-19"},
+    ]
+
+    records = broker_position_records(positions, "schwab")
+
+    assert [(r["settle_date"], r["pnl"]) for r in records] == [
+        (date(2026, 3, 18), 0.0), (date(2026, 3, 20), 55.0)]
@@ -10,6 +10,7 @@ from reporting.position_engine import (
     VALID_TRANSITIONS,
     create_position_from_fill,
     get_open_positions,
+    materialize_positions,
     process_expiries,
     record_roll,
     transition_state,
@@ -184,3 +185,77 @@ class TestGetOpenPositions:
         df = get_open_positions(con=db, strategy="butterfly")
         assert len(df) == 1
         assert df.iloc[0]["strategy"] == "butterfly"
+
+
+def _insert_fill(con, fill_id, trade_group_id, qty, price, legs="[]", run_id="r1"):
+    execute(
+        """INSERT INTO fills
+           (fill_id, trade_group_id, run_id, order_id, ts_utc, fill_qty, fill_price, legs)
+           VALUES (?, ?, ?, 'o1', current_timestamp, ?, ?, ?)""",
+        [fill_id, trade_group_id, run_id, qty, price, legs],
+        con=con,
+    )
+
+
+def _insert_intent(con, trade_group_id, legs, target_qty, run_id="r1"):
+    execute(
+        """INSERT INTO intended_trades
+           (intent_id, run_id, trade_group_id, strategy, account, trade_date,
+            side, direction, legs, target_qty)
+           VALUES (?, ?, ?, 'butterfly', 'schwab', '2026-03-12', 'DEBIT', 'LONG', ?, ?)""",
+        [f"i-{trade_group_id}", run_id, trade_group_id, legs, target_qty],
+        con=con,
+    )
+
+
+FLY_LEGS = (
+    '[{"osi": "SPXW  260316C06000000", "option_type": "CALL", "strike": 6000, "action": "BUY_TO_OPEN", "qty": 1},'
+    ' {"osi": "SPXW  260316C06010000", "option_type": "CALL", "strike": 6010, "action": "SELL_TO_OPEN", "qty": 2},'
+    ' {"osi": "SPXW  260316C06020000", "option_type": "CALL", "strike": 6020, "action": "BUY_TO_OPEN", "qty": 1}]'
+)
+
+
+class TestMaterializePositions:
+    def test_aggregates_partial_fills_and_uses_intent_legs(self, db):
+        _insert_run(db, "r1")
+        _insert_intent(db, "tg1", FLY_LEGS, target_qty=3)
+        _insert_fill(db, "f1", "tg1", 1, 2.0)
+        _insert_fill(db, "f2", "tg1", 1, 3.0)
+
+        assert materialize_positions(db) == 1
+
+        row = query_one(
+            """SELECT strategy, account, trade_date, expiry_date, lifecycle_state,
+                      entry_price, qty FROM positions WHERE position_id = 'tg1'""",
+            con=db,
+        )
+        assert row == ("butterfly", "schwab", date(2026, 3, 12), date(2026, 3, 16),
+                       "PARTIALLY_OPEN", 2.5, 2)
+        legs = db.execute(
+            "SELECT strike, action, qty, expiry_date FROM position_legs "
+            "WHERE position_id = 'tg1' ORDER BY strike"
+        ).fetchall()
+        assert [(s, a, q) for s, a, q, _ in legs] == [
+            (6000, "BUY_TO_OPEN", 1), (6010, "SELL_TO_OPEN", 2), (6020, "BUY_TO_OPEN", 1)]
+        assert {e for *_, e in legs} == {date(2026, 3, 16)}
+
+    def test_fill_legs_win_and_existing_positions_are_skipped(self, db):
+        _insert_run(db, "r1")
+        _insert_intent(db, "tg1", FLY_LEGS, target_qty=1)
+        fill_legs = ('[{"osi": "SPXW260317P05900000", "option_type": "PUT", '
+                     '"strike": 5900, "action": "SELL_TO_OPEN", "qty": 1}]')
+        _insert_fill(db, "f1", "tg1", 1, 1.1, legs=fill_legs)
+        _insert_fill(db, "f2", "tg2", 1, 0.5, run_id="missing")
+
+        assert materialize_positions(db) == 2
+        assert materialize_positions(db) == 0
+
+        assert query_one(
+            "SELECT lifecycle_state, expiry_date FROM positions WHERE position_id = 'tg1'",
+            con=db) == ("OPEN", date(2026, 3, 17))
+        assert query_one("SELECT COUNT(*) FROM position_legs WHERE position_id = 'tg1'",
+                         con=db)[0] == 1
+        # No run and no legs: defaults, no expiry
+        assert query_one(
+            "SELECT strategy, account, expiry_date FROM positions WHERE position_id = 'tg2'",
+            con=db) == ("unknown", "unknown", None)
@@ -694,3 +694,27 @@ class TestRunReconciliation:
             con=db,
         )
         assert unresolved_after[0] == 0
+
+    def test_date_range_run_checks_each_day(self, db):
+        """One run over a date range matches fills and cash per trading date."""
+        _insert_run(db, "r1", trade_date="2026-03-11")
+        _insert_fill(db, order_id="ORD_A", run_id="r1", fill_qty=1)
+        _insert_broker_raw_fill(db, order_id="ORD_A", leg_id="0",
+                                fetched_date="2026-03-11 21:00:00")
+        _insert_run(db, "r2", trade_date=REPORT_DATE)
+        _insert_fill(db, order_id="ORD_B", run_id="r2", fill_qty=1)
+        _insert_account_snapshot(db, cash=1000.0, snapshot_date="2026-03-11")
+        _insert_broker_raw_cash(db, cash_balance=1300.0, fetched_date="2026-03-11 21:00:00")
+        _insert_account_snapshot(db, cash=1000.0)
+        _insert_broker_raw_cash(db, cash_balance=1000.0)
+
+        result = run_reconciliation(con=db, report_date="2026-03-11", end_date=REPORT_DATE)
+
+        assert result["issues_found"] == 2
+        rows = query_df(
+            "SELECT check_type, entity_id, message FROM reconciliation_items ORDER BY check_type",
+            con=db,
+        )
+        assert rows["check_type"].tolist() == ["cash_match", "fill_match"]
+        assert rows["message"].iloc[0].endswith("on 2026-03-11")
+        assert rows["entity_id"].iloc[1] == "ORD_B"
@@ -0,0 +1,150 @@
+"""Tests for reporting.settlement_index — incremental, persisted settlement lookup."""
+
+import json
+import os
+from datetime import date, timedelta
+
+import duckdb
+import pytest
+
+from reporting.db import init_schema
+from reporting.settlement_index import SCHWAB_SOURCE, SettlementIndex
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    root = tmp_path / "cache"
+    for d, name, payload in [
+        ("2026-03-16", "close5_features.json", {"spot": 5952.5}),
+        ("2026-03-16", "close5.json", {"chain": {"_underlying_price": 5950.0}}),
+        ("2026-03-17", "close5.json", {"chain": {"underlyingPrice": 5901.25}}),
+        ("2026-03-18", "open.json", {}),
+    ]:
+        (root / d).mkdir(parents=True, exist_ok=True)
+        (root / d / name).write_text(json.dumps(payload))
+    return root
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    objects = {
+        ("2026-03-17", "features_close5.json"): {"spot": 1.0},   # local wins
+        ("2026-03-19", "features_close5.json"): {"spot": 5880.0},
+        ("2026-03-20", "close5.json"): {"chain": {"_underlying_price": 5870.0}},
+    }
+    gets = []
+
+    def s3_get_json(d, filename, bucket=""):
+        gets.append((d, filename))
+        return objects.get((d, filename))
+
+    monkeypatch.setattr("sim.data.s3_cache.s3_list_dates",
+                        lambda bucket="": ["2026-03-17", "2026-03-19", "2026-03-20", "2026-03-23"])
+    monkeypatch.setattr("sim.data.s3_cache.s3_get_json", s3_get_json)
+    return gets
+
+
+def test_refresh_priority_and_incremental(tmp_path, cache_dir, fake_s3):
+    con = duckdb.connect(":memory:")
+    init_schema(con)
+    con.execute("""INSERT INTO strategy_signal_rows
+                   (signal_id, strategy, source, trade_date, expiry_date, forward)
+                   VALUES ('a', 'bf', 'leo_csv', '2026-03-12', '2026-03-16', 5999.0),
+                          ('b', 'bf', 'leo_csv', '2026-03-20', '2026-03-24', 5860.0)""")
+
+    idx = SettlementIndex(path=tmp_path / "idx.json")
+    stats = idx.refresh(con, cache_dir=cache_dir)
+    assert idx.settlements() == {
+        "2026-03-16": 5952.5,      # local features beat close5 and Leo
+        "2026-03-17": 5901.25,
+        "2026-03-19": 5880.0,
+        "2026-03-20": 5870.0,
+        "2026-03-24": 5860.0,
+    }
+    assert idx.prices["2026-03-16"]["leo_forward"] == 5999.0
+    assert stats["local_read"] == 3
+    # 03-17 already local; 03-23 had nothing and is remembered as a miss
+    assert ("2026-03-17", "features_close5.json") not in fake_s3
+    assert idx.misses["s3"] == {"2026-03-23"}
+
+    idx.save()
+    fake_s3.clear()
+    again = SettlementIndex.load(tmp_path / "idx.json")
+    stats = again.refresh(con, cache_dir=cache_dir)
+    assert (stats["local_read"], stats["s3_get"], stats["added"]) == (0, 0, 0)
+    assert fake_s3 == []
+    assert again.settlements() == idx.settlements()
+
+    assert again.sync_table(con) == 6
+    assert con.execute("""SELECT price FROM settlement_index
+                          WHERE settle_date = '2026-03-16' AND source = 'local_features'"""
+                       ).fetchone()[0] == 5952.5
+
+
+def test_range_lookup_and_sources(tmp_path):
+    idx = SettlementIndex(path=tmp_path / "idx.json")
+    start = date(2026, 1, 1)
+    idx.record("leo_forward", {(start + timedelta(days=i)).isoformat(): 5000.0 + i
+                               for i in range(100)})
+    idx.record(SCHWAB_SOURCE, {"2026-01-05": 4999.0})
+
+    window = idx.between("2026-01-03", date(2026, 1, 6))
+    assert window == {"2026-01-03": 5002.0, "2026-01-04": 5003.0,
+                      "2026-01-05": 5004.0, "2026-01-06": 5005.0}
+    assert idx.price("2026-01-05", sources=(SCHWAB_SOURCE,)) == 4999.0
+    assert idx.price(date(2026, 1, 2), sources=(SCHWAB_SOURCE,)) is None
+
+
+def test_today_is_not_remembered_as_a_miss(tmp_path):
+    root = tmp_path / "cache"
+    (root / date.today().isoformat()).mkdir(parents=True)
+    idx = SettlementIndex(path=tmp_path / "idx.json")
+    idx.refresh(cache_dir=root, use_s3=False)
+    assert idx.misses["local"] == set()
+    assert idx.save() is False
+
+
+def test_late_local_files_fill_misses_and_override_close5(tmp_path, cache_dir):
+    idx = SettlementIndex(path=tmp_path / "idx.json")
+    idx.refresh(cache_dir=cache_dir, use_s3=False)
+    assert idx.misses["local"] == {"2026-03-18"}
+    assert idx.price("2026-03-17") == 5901.25
+    idx.save()
+
+    # A later sync brings close5 for the miss and features for 03-17
+    (cache_dir / "2026-03-18" / "close5.json").write_text(
+        json.dumps({"chain": {"_underlying_price": 5890.0}}))
+    (cache_dir / "2026-03-17" / "close5_features.json").write_text(json.dumps({"spot": 5903.0}))
+    later = idx.refreshed_at + 1  # robust to coarse filesystem mtimes
+    for f in ("2026-03-18/close5.json", "2026-03-17/close5_features.json"):
+        os.utime(cache_dir / f, (later, later))
+
+    again = SettlementIndex.load(tmp_path / "idx.json")
+    stats = again.refresh(cache_dir=cache_dir, use_s3=False)
+    assert stats["local_read"] == 2  # 03-16 is unchanged and not re-read
+    assert again.price("2026-03-18") == 5890.0
+    assert again.price("2026-03-17") == 5903.0
+    assert again.misses["local"] == set()
+
+
+def test_schwab_fetch_only_covers_the_gap_after_indexed_closes(tmp_path):
+    idx = SettlementIndex(path=tmp_path / "idx.json")
+    wed = date(2026, 3, 18)
+    start = idx.schwab_fetch_start(wed)
+    assert start == wed - timedelta(days=92)
+
+    # Fri 03-13 .. Tue 03-17 returned; Mon 03-16 as a holiday; Wed is intraday
+    closes = {"2026-03-13": 5800.0, "2026-03-17": 5830.0, "2026-03-18": 5841.0}
+    idx.record_schwab_closes(closes, date(2026, 3, 13), wed)
+    assert idx.price("2026-03-18", sources=(SCHWAB_SOURCE,)) is None
+    assert idx.misses["schwab"] == {"2026-03-16"}
+
+    assert idx.schwab_fetch_start(wed) == wed                  # today only
+    assert idx.schwab_fetch_start(date(2026, 3, 20)) == date(2026, 3, 18)
+    assert idx.schwab_fetch_start(date(2026, 3, 21)) == date(2026, 3, 18)
+
+    # Weekend run after Friday's close is indexed: nothing to fetch
+    idx.record_schwab_closes({"2026-03-18": 5841.0, "2026-03-19": 5850.0,
+                              "2026-03-20": 5860.0}, date(2026, 3, 18), date(2026, 3, 21))
+    assert idx.schwab_fetch_start(date(2026, 3, 21)) is None
+    assert idx.schwab_fetch_start(date(2026, 3, 22)) is None
@@ -0,0 +1,90 @@
+"""Tests for reporting.strategy_summary — strategy_daily / portfolio_daily rollups."""
+
+from datetime import date, datetime, timedelta
+
+import duckdb
+import pytest
+
+from reporting.db import execute, init_schema, query_one
+from reporting.strategy_summary import materialize_all, materialize_strategy_daily
+
+
+@pytest.fixture
+def db():
+    con = duckdb.connect(":memory:")
+    init_schema(con)
+    yield con
+    con.close()
+
+
+def _insert_position(con, position_id, trade_date, closed_on=None, pnl=None,
+                     state="EXPIRED", strategy="butterfly", account="schwab"):
+    closed_at = datetime.combine(closed_on, datetime.min.time()) + timedelta(hours=20) \
+        if closed_on else None
+    execute(
+        """INSERT INTO positions
+           (position_id, strategy, account, trade_date, lifecycle_state,
+            closed_at, realized_pnl)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        [position_id, strategy, account, trade_date, state, closed_at, pnl],
+        con=con,
+    )
+
+
+def _insert_run(con, run_id, trade_date, status="COMPLETED", strategy="butterfly"):
+    execute(
+        """INSERT INTO strategy_runs
+           (run_id, strategy, account, trade_date, config_version, status)
+           VALUES (?, ?, 'schwab', ?, 'test', ?)""",
+        [run_id, strategy, trade_date, status],
+        con=con,
+    )
+
+
+def test_counts_pnl_and_rolling_win_rate(db):
+    start = date.today() - timedelta(days=40)
+    # 25 one-day trades, a win every third day
+    for i in range(25):
+        day = start + timedelta(days=i)
+        _insert_position(db, f"p{i:02d}", day, closed_on=day,
+                         pnl=100.0 if i % 3 == 0 else -50.0)
+    _insert_position(db, "open", start, state="OPEN")
+    _insert_run(db, "skip", start + timedelta(days=30), status="SKIPPED", strategy="dualside")
+
+    stats = materialize_all(db, since_date=start)
+    assert stats == {"strategy_daily_rows": 26, "portfolio_daily_rows": 25,
+                     "dates_processed": 41, "pnl_mart_rows": 50}
+
+    first = query_one(
+        """SELECT trades_opened, trades_closed, realized_pnl, win_rate_20d
+           FROM strategy_daily WHERE strategy = 'butterfly' AND report_date = ?""",
+        [start], con=db)
+    assert first == (2, 1, 100.0, 1.0)
+
+    # Window covers the last 20 trades as of each date, not the whole history
+    for i in (9, 24):
+        expected = sum(j % 3 == 0 for j in range(max(0, i - 19), i + 1)) / min(i + 1, 20)
+        got = query_one(
+            "SELECT win_rate_20d FROM strategy_daily WHERE strategy = 'butterfly' "
+            "AND report_date = ?", [start + timedelta(days=i)], con=db)[0]
+        assert got == pytest.approx(round(expected, 4))
+
+    skipped = query_one(
+        "SELECT trades_skipped, win_rate_20d FROM strategy_daily WHERE strategy = 'dualside'",
+        con=db)
+    assert skipped == (1, None)
+    assert query_one("SELECT realized_pnl_day, total_open_positions FROM portfolio_daily "
+                     "WHERE report_date = ?", [start], con=db) == (100.0, 1)
+
+
+def test_rerun_replaces_rows_for_the_range(db):
+    day = date.today() - timedelta(days=2)
+    _insert_position(db, "p1", day, closed_on=day, pnl=10.0)
+    materialize_all(db, since_date=day)
+    execute("UPDATE positions SET realized_pnl = 25.0", con=db)
+
+    assert materialize_strategy_daily(db, day) == 1
+    materialize_all(db, since_date=day)
+    assert query_one("SELECT count(*), sum(realized_pnl) FROM strategy_daily",
+                     con=db) == (1, 25.0)
+    assert query_one("SELECT count(*) FROM portfolio_daily", con=db)[0] == 1
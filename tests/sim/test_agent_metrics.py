@@ -0,0 +1,103 @@
+"""Tests for the materialized agent_metrics table behind get_hard_metrics."""
+
+import math
+import random
+
+import pytest
+
+from sim.config import STARTING_CAPITAL
+from sim.persistence import queries
+from sim.persistence.db import init_db, unit_of_work
+
+
+@pytest.fixture
+def conn(tmp_path):
+    c = init_db(tmp_path / "sim.db")
+    yield c
+    c.close()
+
+
+def _reference_metrics(conn, agent_id):
+    """Per-agent brute force over the raw tables (the pre-materialized logic)."""
+    balances = [r[0] for r in conn.execute(
+        "SELECT ending_balance FROM accounts WHERE agent_id=? ORDER BY session_id",
+        (agent_id,))]
+    curve = [STARTING_CAPITAL] + balances
+    peak, max_dd = curve[0], 0.0
+    for bal in curve:
+        peak = max(peak, bal)
+        max_dd = max(max_dd, peak - bal)
+    rets = [(curve[i] - curve[i - 1]) / curve[i - 1] for i in range(1, len(curve))]
+    mean = sum(rets) / len(rets)
+    std = math.sqrt(sum((r - mean) ** 2 for r in rets) / (len(rets) - 1))
+    pnls = [r[0] for r in conn.execute(
+        "SELECT realized_pnl FROM positions WHERE agent_id=? AND realized_pnl IS NOT NULL",
+        (agent_id,))]
+    return {
+        "final_balance": curve[-1],
+        "max_drawdown": max_dd,
+        "sharpe": round(mean / std * math.sqrt(252), 2),
+        "wins": sum(p > 0 for p in pnls),
+        "losses": sum(p <= 0 for p in pnls),
+        "gross_wins": sum(p for p in pnls if p > 0),
+        "sessions": len(balances),
+    }
+
+
+def _write_session(conn, session_id, rng, agents):
+    queries.insert_session(conn, session_id, f"2026-01-{session_id:02d}")
+    for aid in agents:
+        prev = conn.execute(
+            "SELECT ending_balance FROM accounts WHERE agent_id=? ORDER BY session_id DESC",
+            (aid,)).fetchone()
+        balance = (prev[0] if prev else STARTING_CAPITAL) + rng.uniform(-400, 300)
+        conn.execute(
+            "INSERT INTO accounts (agent_id, session_id, starting_balance, ending_balance, "
+            "total_commissions) VALUES (?, ?, ?, ?, 2.6)",
+            (aid, session_id, balance, balance))
+        if session_id > 1:
+            conn.execute(
+                "INSERT INTO positions (position_id, agent_id, session_opened, "
+                "session_settled, structure, legs, quantity, width, entry_price, "
+                "commission, realized_pnl) VALUES (?, ?, ?, ?, 'ic', '[]', 1, 5, 1, 2.6, ?)",
+                (f"{aid}-{session_id}", aid, session_id - 1, session_id,
+                 rng.choice([-150.0, 0.0, 85.0, 120.0])))
+    queries.refresh_agent_metrics(conn)
+
+
+def test_incremental_metrics_match_brute_force(conn):
+    rng = random.Random(7)
+    agents = ["narrow-ic", "wide-ic", "iron-fly"]
+    for sid in range(1, 31):
+        with unit_of_work(conn):
+            _write_session(conn, sid, rng, agents)
+
+    rows = {r["agent_id"]: r for r in queries.get_hard_metrics(conn)}
+    assert set(rows) == set(agents)
+    for aid in agents:
+        ref = _reference_metrics(conn, aid)
+        got = rows[aid]
+        assert got["sessions"] == ref["sessions"] == 30
+        assert got["final_balance"] == pytest.approx(ref["final_balance"])
+        assert got["max_drawdown"] == pytest.approx(ref["max_drawdown"])
+        assert got["sharpe"] == pytest.approx(ref["sharpe"])
+        assert (got["wins"], got["losses"]) == (ref["wins"], ref["losses"])
+        assert got["total_commissions"] == pytest.approx(2.6 * 30)
+
+    # Rebuilding from scratch gives the same answer
+    before = queries.get_hard_metrics(conn)
+    queries.refresh_agent_metrics(conn, rebuild=True)
+    assert queries.get_hard_metrics(conn) == before
+
+
+def test_get_hard_metrics_refreshes_unmaterialized_sessions(conn):
+    conn.execute("INSERT INTO sessions (session_id, trading_date) VALUES (1, '2026-01-05')")
+    conn.execute("INSERT INTO accounts (agent_id, session_id, starting_balance, "
+                 "ending_balance) VALUES ('hold-cash', 1, 30000, 30004)")
+    conn.commit()
+
+    (row,) = queries.get_hard_metrics(conn)
+    assert row["agent_id"] == "hold-cash"
+    assert row["total_pnl"] == pytest.approx(4.0)
+    assert row["trades"] == 0 and row["profit_factor"] == float("inf")
+    assert queries.refresh_agent_metrics(conn) == 0
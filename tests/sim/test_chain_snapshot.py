@@ -0,0 +1,84 @@
+"""Tests for sim.data.chain_snapshot — indexed lookups match linear scans."""
+
+import random
+from datetime import date
+
+from sim.data.chain_snapshot import ChainSnapshot, OptionContract
+
+EXPS = [date(2026, 3, 13), date(2026, 3, 16)]
+
+
+def _contract(sym, strike, pc, exp, delta):
+    return OptionContract(
+        symbol=sym, strike=strike, expiration=exp, put_call=pc,
+        bid=1.0, ask=1.2, last=1.1, mark=1.1, volume=10, open_interest=100,
+        implied_vol=0.15, delta=delta, gamma=0.002, theta=-1.0, vega=0.5,
+        rho=0.0, days_to_exp=1, in_the_money=False,
+    )
+
+
+def _random_chain(rng):
+    contracts = {}
+    for k in range(rng.randint(1, 40)):
+        strike = float(rng.randrange(5800, 6000, 5))
+        delta = rng.choice([0.0, 0.1, -0.1, 0.25, -0.25, round(rng.uniform(-1, 1), 2)])
+        contracts[f"s{k}"] = _contract(f"s{k}", strike, rng.choice("CP"),
+                                       rng.choice(EXPS), delta)
+    strikes = sorted({c.strike for c in contracts.values()})
+    spot = rng.choice([5900.0, 5902.5, rng.uniform(5750, 6050)])
+    return ChainSnapshot(timestamp=None, phase="close5", underlying_price=spot,
+                         underlying_symbol="$SPX", vix=15.0, contracts=contracts,
+                         expirations=EXPS, strikes=strikes)
+
+
+def _scan_get(chain, strike, pc, exp):
+    for c in chain.contracts.values():
+        if c.strike == strike and c.put_call == pc and (exp is None or c.expiration == exp):
+            return c
+    return None
+
+
+def _scan_nearest_delta(chain, target, pc, exp):
+    cs = [c for c in chain.contracts.values()
+          if c.put_call == pc and (exp is None or c.expiration == exp)]
+    return min(cs, key=lambda c: abs(c.delta - target)).strike if cs else None
+
+
+def test_lookups_match_linear_scan():
+    rng = random.Random(7)
+    for _ in range(500):
+        chain = _random_chain(rng)
+        assert chain.atm_strike() == min(
+            chain.strikes, key=lambda s: (abs(s - chain.underlying_price), s))
+        for _ in range(5):
+            strike = float(rng.randrange(5800, 6000, 5))
+            pc = rng.choice("CP")
+            exp = rng.choice(EXPS + [None])
+            target = rng.choice([0.1, -0.1, 0.25, -0.25, 0.175, rng.uniform(-1, 1)])
+            assert chain.get_contract(strike, pc, exp) is _scan_get(chain, strike, pc, exp)
+            assert (chain.nearest_delta_strike(target, pc, exp)
+                    == _scan_nearest_delta(chain, target, pc, exp))
+            assert chain.puts(exp) == [
+                c for c in chain.contracts.values()
+                if c.put_call == "P" and (exp is None or c.expiration == exp)]
+
+
+def test_atm_tie_goes_to_lower_strike():
+    contracts = {
+        "c1": _contract("c1", 5895.0, "C", EXPS[0], 0.55),
+        "c2": _contract("c2", 5900.0, "C", EXPS[0], 0.45),
+    }
+    chain = ChainSnapshot(timestamp=None, phase="close5", underlying_price=5897.5,
+                          underlying_symbol="$SPX", vix=15.0, contracts=contracts,
+                          expirations=[EXPS[0]], strikes=[5895.0, 5900.0])
+    assert chain.atm_strike() == 5895.0
+
+
+def test_index_follows_in_place_mutation():
+    chain = ChainSnapshot(timestamp=None, phase="close5", underlying_price=5900.0,
+                          underlying_symbol="$SPX", vix=15.0)
+    assert chain.get_contract(5900.0, "P") is None
+    chain.contracts["p"] = _contract("p", 5900.0, "P", EXPS[0], -0.5)
+    chain.strikes.append(5900.0)
+    assert chain.get_contract(5900.0, "P", EXPS[0]).symbol == "p"
+    assert chain.atm_strike() == 5900.0
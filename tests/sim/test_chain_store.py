@@ -0,0 +1,118 @@
+"""Tests for sim.data.chain_store — Parquet chain store round trips."""
+
+import json
+from datetime import date
+
+import pytest
+
+from sim.data.cache import load_cache_file
+from sim.data.chain_snapshot import parse_cached_chain
+from sim.data.chain_store import ChainStore, convert_cache_tree
+
+
+def _tt_raw(exp="2026-03-13", spot=5900.0):
+    contracts = {}
+    for i, strike in enumerate(range(5850, 5955, 5)):
+        for pc in ("C", "P"):
+            sym = f".SPXW260313{pc}{strike}"
+            contracts[sym] = {
+                "strike": float(strike), "put_call": pc,
+                "bid": 1.0 + i * 0.1, "ask": 1.2 + i * 0.1,
+                "volume": 100 + i, "open_interest": 1000 + 10 * i,
+                "implied_vol": 0.15 + 0.001 * i,
+                "delta": (0.9 - 0.04 * i) if pc == "C" else (-0.1 - 0.04 * i),
+                "gamma": 0.002, "theta": -1.5, "vega": 0.8,
+                "days_to_exp": 1, "in_the_money": False,
+            }
+    return {
+        "_source": "tastytrade", "_phase": "close5",
+        "_timestamp": "2026-03-12T16:05:00",
+        "underlying_price": spot, "expiration": exp,
+        "spx_open": 5880.0, "spx_high": 5910.0, "spx_low": 5870.0,
+        "spx_prev_close": 5875.0, "contracts": contracts,
+    }
+
+
+def _write_cache_day(cache_dir, day, phase, raw, vix=17.5):
+    path = cache_dir / day / f"{phase}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"trading_date": day, "phase": phase,
+                                "vix": vix, "chain": raw}))
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ChainStore(tmp_path / "store")
+    yield s
+    s.close()
+
+
+def test_snapshot_round_trip(store, tmp_path):
+    path = _write_cache_day(tmp_path / "cache", "2026-03-12", "close5", _tt_raw())
+    chain = parse_cached_chain(load_cache_file(path), "close5")
+
+    store.write_snapshot("2026-03-12", "close5", chain, source="tastytrade")
+    loaded = store.load_snapshot("2026-03-12", "close5")
+
+    assert loaded == chain
+    assert store.dates() == [date(2026, 3, 12)]
+    assert store.load_snapshot("2026-03-13", "close5") is None
+
+
+def test_convert_cache_tree_skips_non_chain_files(store, tmp_path):
+    cache = tmp_path / "cache"
+    _write_cache_day(cache, "2026-03-11", "close5", _tt_raw(exp="2026-03-12"))
+    _write_cache_day(cache, "2026-03-12", "close5", _tt_raw())
+    (cache / "2026-03-12" / "gw_close5.json").write_text(json.dumps({"rv": 0.01}))
+    (cache / "2026-03-12" / "close5_features.json").write_text(json.dumps({"spot": 1}))
+
+    assert convert_cache_tree(cache, store=store) == 2
+    # Existing partitions are skipped on re-run
+    assert convert_cache_tree(cache, store=store) == 0
+    assert convert_cache_tree(cache, store=store, overwrite=True) == 2
+
+
+def test_convert_cache_tree_rewrites_resynced_files(store, tmp_path):
+    cache = tmp_path / "cache"
+    _write_cache_day(cache, "2026-03-11", "close5", _tt_raw(exp="2026-03-12"))
+    _write_cache_day(cache, "2026-03-12", "close5", _tt_raw())
+    convert_cache_tree(cache, store=store)
+    path = cache / "2026-03-12" / "close5.json"
+    assert store.is_current("2026-03-12", "close5", path)
+
+    # A re-collected close5 lands with a new spot
+    _write_cache_day(cache, "2026-03-12", "close5", _tt_raw(spot=5912.25))
+    assert not store.is_current("2026-03-12", "close5", path)
+
+    assert convert_cache_tree(cache, store=store) == 1
+    assert store.load_snapshot("2026-03-12", "close5").underlying_price == 5912.25
+    assert store.is_current("2026-03-12", "close5", path)
+
+
+def test_scan_projection_and_date_range(store, tmp_path):
+    cache = tmp_path / "cache"
+    for day in ("2026-03-10", "2026-03-11", "2026-03-12"):
+        _write_cache_day(cache, day, "close5", _tt_raw())
+    _write_cache_day(cache, "2026-03-12", "open", _tt_raw())
+    convert_cache_tree(cache, store=store)
+
+    df = store.contracts(start="2026-03-11", end="2026-03-12",
+                         phases=["close5"], columns=["strike", "delta"],
+                         where="put_call = 'P'")
+    assert list(df.columns) == ["trading_date", "phase", "strike", "delta"]
+    assert set(df["phase"]) == {"close5"}
+    assert len(df) == 2 * 21
+    assert (df["delta"] < 0).all()
+
+    snaps = store.snapshots(columns=["vix", "underlying_price"])
+    assert len(snaps) == 4
+    assert snaps["vix"].tolist() == [17.5] * 4
+
+
+def test_scan_empty_store(store):
+    df = store.contracts(columns=["strike"])
+    assert df.empty
+    assert list(df.columns) == ["trading_date", "phase", "strike"]
+    with pytest.raises(ValueError):
+        store.contracts(columns=["nope"])
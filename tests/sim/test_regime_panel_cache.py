@@ -0,0 +1,118 @@
+"""Tests for sim.regime_classifier panel cache — incremental runs match full rebuilds."""
+
+import json
+import os
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from sim import regime_classifier as rc
+from sim.data.chain_store import ChainStore, convert_cache_tree
+
+LAYER_PIPELINE = (rc.compute_vrp, rc.compute_bh_decomposition, rc.compute_gex_daily)
+
+
+def _write_day(cache_dir, day, rng, spot=None):
+    d = os.path.join(cache_dir, day.isoformat())
+    os.makedirs(d, exist_ok=True)
+    spot = spot if spot is not None else rng.uniform(5000, 6000)
+    contracts = [
+        {"strike": round(spot) + k * 5, "option_type": pc, "gamma": rng.uniform(0, 0.01),
+         "open_interest": rng.randint(0, 500), "volume": rng.randint(0, 900),
+         "expiration": (day + timedelta(days=1)).isoformat()}
+        for k in range(-5, 6) for pc in "CP"
+    ]
+    with open(os.path.join(d, "close5.json"), "w") as f:
+        json.dump({"vix": rng.uniform(12, 30),
+                   "chain": {"_source": "cboe", "_quote_date": day.isoformat(),
+                             "_underlying_price": spot, "contracts": contracts}}, f)
+    with open(os.path.join(d, "gw_close5.json"), "w") as f:
+        json.dump({"vix_1d": rng.uniform(0.1, 0.3), "rv": rng.uniform(0.003, 0.02),
+                   "rv5": rng.uniform(0.003, 0.02), "rv20": rng.uniform(0.003, 0.02)}, f)
+
+
+def _run(monkeypatch, panel_cache_dir):
+    monkeypatch.setattr(rc, "PANEL_CACHE_DIR", panel_cache_dir)
+    daily = rc.build_daily_panel()
+    for step in LAYER_PIPELINE:
+        daily = step(daily)
+    return daily
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(rc, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(rc, "CHAIN_STORE_DIR", None)
+    monkeypatch.setattr(rc, "VOL_DECOUPLE_PATH", str(tmp_path / "missing.csv"))
+    monkeypatch.setattr(rc, "_load_optional_cboe_history", lambda name: None)
+    rng = random.Random(11)
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(330)]
+    for day in days:
+        _write_day(cache_dir, day, rng)
+    return cache_dir, days, rng, str(tmp_path / "panel_cache")
+
+
+def test_incremental_runs_match_full_rebuild(cache, monkeypatch):
+    cache_dir, days, rng, panel_cache = cache
+
+    first = _run(monkeypatch, panel_cache)
+    pd.testing.assert_frame_equal(first, _run(monkeypatch, None))
+
+    # Unchanged cache: nothing is re-parsed
+    opened = []
+    real_read = rc._read_day_sources
+    monkeypatch.setattr(rc, "_read_day_sources",
+                        lambda d: opened.append(d) or real_read(d))
+    pd.testing.assert_frame_equal(_run(monkeypatch, panel_cache), first)
+    assert opened == []
+
+    # Append one day and rewrite one mid-history day
+    _write_day(cache_dir, days[-1] + timedelta(days=1), rng)
+    _write_day(cache_dir, days[200], rng, spot=4321.0)
+    os.utime(os.path.join(cache_dir, days[200].isoformat(), "close5.json"), ns=(1, 1))
+    incremental = _run(monkeypatch, panel_cache)
+    assert sorted(os.path.basename(d) for d in opened) == sorted(
+        [days[200].isoformat(), (days[-1] + timedelta(days=1)).isoformat()])
+
+    pd.testing.assert_frame_equal(incremental, _run(monkeypatch, None),
+                                  check_exact=False, rtol=1e-12)
+    assert incremental.loc[200, "spot"] == 4321.0
+
+
+def test_chain_store_days_skip_close5_json(cache, monkeypatch, tmp_path):
+    cache_dir, days, rng, _ = cache
+    from_json = _run(monkeypatch, None)
+
+    store_dir = tmp_path / "store"
+    store = ChainStore(store_dir)
+    convert_cache_tree(Path(cache_dir), store=store)
+    store.close()
+    # A day re-synced after conversion is stale in the store: read from JSON
+    _write_day(cache_dir, days[100], rng, spot=4321.0)
+    monkeypatch.setattr(rc, "CHAIN_STORE_DIR", str(store_dir))
+
+    opened = []
+    real_open = open
+
+    def tracking_open(path, *args, **kwargs):
+        if str(path).endswith(os.sep + "close5.json"):
+            opened.append(os.path.basename(os.path.dirname(path)))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(rc, "open", tracking_open, raising=False)
+    from_store = _run(monkeypatch, None)
+
+    # build_daily_panel and compute_gex_daily each load the day records
+    assert set(opened) == {days[100].isoformat()}
+    assert from_store.loc[100, "spot"] == 4321.0
+    expected = from_json.drop(index=100).reset_index(drop=True)
+    got = from_store.drop(index=100).reset_index(drop=True)
+    # Rolling layers look back past the re-synced day; compare raw per-day inputs
+    cols = ["date", "vix", "spot", "gex_vol_asym", "call_gamma_vol",
+            "put_gamma_vol", "total_call_vol", "total_put_vol", "gex_oi_signed"]
+    pd.testing.assert_frame_equal(got[cols], expected[cols],
+                                  check_exact=False, rtol=1e-12)
@@ -0,0 +1,60 @@
+"""Tests for sim.persistence.response_cache — keying, LRU eviction, persistence."""
+
+import pytest
+
+from sim.persistence.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ResponseCache(tmp_path / "cache.db", max_entries=3)
+    yield c
+    c.close()
+
+
+def _key(cache, prompt="p", memory=None, model="m", **params):
+    return cache.make_key(model, "system", prompt, memory, **params)
+
+
+def test_miss_then_hit(cache):
+    key = _key(cache)
+    assert cache.get(key) is None
+    cache.put(key, '{"action": "hold"}')
+    assert cache.get(key) == '{"action": "hold"}'
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_key_covers_model_prompt_memory_and_params(cache):
+    base = _key(cache, memory={"trades": 1})
+    assert base == _key(cache, memory={"trades": 1})
+    assert base != _key(cache, memory={"trades": 2})
+    assert base != _key(cache, prompt="other", memory={"trades": 1})
+    assert base != _key(cache, model="m2", memory={"trades": 1})
+    assert base != _key(cache, memory={"trades": 1}, max_tokens=10)
+
+
+def test_lru_eviction_keeps_recently_used(cache):
+    keys = [_key(cache, prompt=str(i)) for i in range(4)]
+    for k in keys[:3]:
+        cache.put(k, "r")
+    cache.get(keys[0])          # refresh 0; 1 is now least recently used
+    cache.put(keys[3], "r")
+
+    assert cache.stats()["entries"] == 3
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "r"
+
+
+def test_persists_across_reopen(tmp_path):
+    path = tmp_path / "cache.db"
+    first = ResponseCache(path)
+    key = first.make_key("m", "s", "u", {})
+    first.put(key, "raw")
+    first.close()
+
+    second = ResponseCache(path)
+    assert second.get(key) == "raw"
+    second.close()
@@ -0,0 +1,141 @@
+"""Tests for sim.data.s3_transfer — range listing, manifest diffing, parallel sync."""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from sim.data import s3_cache, s3_transfer
+
+
+class FakeS3:
+    """In-memory S3 client: paginated listing (2 keys/page), down/upload."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})   # key -> bytes
+        self.list_calls = 0
+        self.downloads = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def put(self, key, body):
+        self.objects[key] = body.encode() if isinstance(body, str) else body
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix="", StartAfter=""):
+        self.list_calls += 1
+        keys = sorted(k for k in self.objects if k.startswith(Prefix) and k > StartAfter)
+        for i in range(0, len(keys), 2):
+            yield {"Contents": [
+                {"Key": k, "Size": len(self.objects[k]),
+                 "ETag": '"%s"' % hashlib.md5(self.objects[k]).hexdigest()}
+                for k in keys[i:i + 2]]}
+
+    def download_file(self, bucket, key, dest):
+        with self._lock:
+            self.downloads.append(key)
+            self.threads.add(threading.get_ident())
+        Path(dest).write_bytes(self.objects[key])
+
+    def upload_file(self, src, bucket, key):
+        with self._lock:
+            self.objects[key] = Path(src).read_bytes()
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey(Key)
+        body = self.objects[Key]
+        return {"Body": type("B", (), {"read": lambda self: body})()}
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setattr(s3_transfer, "get_client", lambda: s3)
+    return s3
+
+
+def _chain_bucket(s3, days):
+    for d in days:
+        for phase in ("open", "close5"):
+            s3.put(f"{d}/{phase}.json", json.dumps({"date": d, "phase": phase}))
+    s3.put("_index/settlements.json", "{}")
+
+
+def test_chain_sync_single_listing_and_range(fake_s3, tmp_path):
+    days = [f"2026-01-{i:02d}" for i in range(2, 30)]
+    _chain_bucket(fake_s3, days)
+
+    n = s3_cache.sync_s3_to_local(tmp_path, bucket="b", dates=["2026-01-05", "2026-01-09"])
+    assert n == 4
+    assert fake_s3.list_calls == 1
+    assert sorted(p.parent.name for p in tmp_path.glob("*/*.json")) == \
+        ["2026-01-05", "2026-01-05", "2026-01-09", "2026-01-09"]
+
+    # Whole bucket: index object skipped, only missing files fetched, in parallel
+    fake_s3.downloads.clear()
+    n = s3_cache.sync_s3_to_local(tmp_path, bucket="b")
+    assert n == 2 * len(days) - 4
+    assert "_index/settlements.json" not in fake_s3.downloads
+    assert len(fake_s3.threads) > 1
+    assert not list(tmp_path.rglob("*.part"))
+
+
+def test_manifest_skips_unchanged_and_refetches_changed(fake_s3, tmp_path):
+    _chain_bucket(fake_s3, ["2026-01-02", "2026-01-05"])
+    # A pre-existing local file of the right size is adopted, not downloaded
+    local = tmp_path / "2026-01-02" / "open.json"
+    local.parent.mkdir(parents=True)
+    local.write_bytes(fake_s3.objects["2026-01-02/open.json"])
+
+    assert s3_cache.sync_s3_to_local(tmp_path, bucket="b") == 3
+    assert s3_cache.sync_s3_to_local(tmp_path, bucket="b") == 0
+
+    fake_s3.put("2026-01-05/close5.json", json.dumps({"recollected": True}))
+    fake_s3.downloads.clear()
+    assert s3_cache.sync_s3_to_local(tmp_path, bucket="b") == 1
+    assert fake_s3.downloads == ["2026-01-05/close5.json"]
+    assert json.loads((tmp_path / "2026-01-05" / "close5.json").read_text()) == {"recollected": True}
+
+
+def test_get_json_and_upload_many(fake_s3, tmp_path):
+    fake_s3.put("2026-01-02/close5.json", '{"spot": 1}')
+    assert s3_cache.s3_get_json("2026-01-02", "close5.json", bucket="b") == {"spot": 1}
+    assert s3_cache.s3_get_json("2026-01-03", "close5.json", bucket="b") is None
+
+    files = []
+    for i in range(5):
+        p = tmp_path / f"ev{i}.jsonl"
+        p.write_text(f"{i}\n")
+        files.append((p, f"events/2026-01-02/ev{i}.jsonl"))
+    done, errors = s3_transfer.upload_many("b", files + [(tmp_path / "missing", "x")])
+    assert (len(done), errors) == (5, 1)
+    assert fake_s3.objects["events/2026-01-02/ev3.jsonl"] == b"3\n"
+
+
+def test_sync_against_moto(tmp_path, monkeypatch):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        s3_transfer.reset_client()
+        try:
+            client = boto3.client("s3")
+            client.create_bucket(Bucket="sim-cache-test")
+            for d in ("2026-01-02", "2026-01-05"):
+                client.put_object(Bucket="sim-cache-test", Key=f"{d}/close5.json", Body=b"{}")
+            assert s3_cache.sync_s3_to_local(tmp_path, bucket="sim-cache-test") == 2
+            assert s3_cache.sync_s3_to_local(tmp_path, bucket="sim-cache-test") == 0
+        finally:
+            s3_transfer.reset_client()
@@ -0,0 +1,140 @@
+"""Tests for SessionRunner's concurrent agent decision phase (local stub clients)."""
+
+import threading
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from sim.agents.base_agent import BaseAgent
+from sim.data.chain_snapshot import OptionContract
+from sim.orchestrator import session
+
+
+class StubAnthropic:
+    """Minimal stand-in for anthropic.Anthropic: messages.create -> canned JSON."""
+
+    def __init__(self, text='{"action": "hold"}', delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.text)])
+
+
+class SleepyAgent(BaseAgent):
+    def __init__(self, agent_id, delay, log):
+        super().__init__(agent_id, model="stub")
+        self.delay = delay
+        self.log = log
+
+    def decide(self, chain, account, session_id, memory=None):
+        self.log.append((self.agent_id, threading.current_thread().name))
+        time.sleep(self.delay)
+        return None, f"{self.agent_id} holds"
+
+
+@pytest.fixture(autouse=True)
+def no_baselines(monkeypatch):
+    """The decision phase only involves agents; skip baseline construction."""
+    monkeypatch.setattr(session, "default_baselines", lambda params=None: [])
+
+
+@pytest.fixture
+def cold_agents(monkeypatch):
+    """Registry agents without the trained playbook (its module is not in the tree)."""
+    configs = {aid: cfg for aid, cfg in session.get_agent_configs().items()
+               if not cfg.get("trained")}
+    configs["opus-cold-2"] = dict(configs["opus-cold"])
+    monkeypatch.setattr(session, "get_agent_configs", lambda: configs)
+
+
+@pytest.fixture
+def runner(tmp_path):
+    r = session.SessionRunner(db_path=tmp_path / "sim.db")
+    return r
+
+
+def _chain():
+    return SimpleNamespace(underlying_price=5900.0, vix=15.0, contracts={}, strikes=[],
+                           expirations=[])
+
+
+def _small_chain():
+    exp = date(2026, 3, 13)
+    contracts = {
+        f"{pc}{k}": OptionContract(
+            symbol=f"{pc}{k}", strike=float(k), expiration=exp, put_call=pc,
+            bid=1.0, ask=1.2, last=1.1, mark=1.1, volume=10, open_interest=100,
+            implied_vol=0.15, delta=0.5 if pc == "C" else -0.5, gamma=0.002,
+            theta=-1.0, vega=0.5, rho=0.0, days_to_exp=1, in_the_money=False)
+        for k in range(5880, 5925, 5) for pc in "CP"
+    }
+    return session.ChainSnapshot(
+        timestamp=datetime(2026, 3, 12, 16, 5), phase="close5", underlying_price=5900.0,
+        underlying_symbol="$SPX", vix=15.0, contracts=contracts, expirations=[exp],
+        strikes=sorted({c.strike for c in contracts.values()}))
+
+
+def test_decisions_run_concurrently_in_agent_order(runner):
+    log = []
+    runner.agents = {aid: SleepyAgent(aid, 0.3, log) for aid in ("c", "a", "b")}
+    runner._ensure_accounts(list(runner.agents))
+
+    started = time.monotonic()
+    decisions = runner._decide_agents(1, _chain())
+    elapsed = time.monotonic() - started
+
+    assert list(decisions) == ["c", "a", "b"]
+    assert decisions["a"] == (None, "a holds")
+    assert elapsed < 0.75  # ~max latency, not the 0.9s sum
+    assert all(name.startswith("agent-decide") for _, name in log)
+
+
+def test_slow_agent_times_out_to_hold(runner):
+    log = []
+    runner.decision_timeout = 0.2
+    runner.agents = {"fast": SleepyAgent("fast", 0.0, log),
+                     "slow": SleepyAgent("slow", 1.0, log)}
+    runner._ensure_accounts(list(runner.agents))
+
+    decisions = runner._decide_agents(1, _chain())
+    assert decisions["fast"] == (None, "fast holds")
+    assert decisions["slow"] == (None, "TIMEOUT_HOLD")
+
+
+def test_claude_agents_with_stub_client(tmp_path, cold_agents):
+    stub = StubAnthropic(delay=0.2)
+    r = session.SessionRunner(anthropic_client=stub, db_path=tmp_path / "sim.db")
+    assert list(r.agents) == ["opus-cold", "opus-cold-2"]  # anthropic providers only
+    r._ensure_accounts(list(r.agents))
+
+    chain = _small_chain()
+    decisions = r._decide_agents(1, chain)
+    assert list(decisions) == list(r.agents)
+    assert all(order is None for order, _ in decisions.values())
+    assert stub.calls == len(r.agents)
+
+
+def test_claude_agent_replays_cached_response(tmp_path, cold_agents):
+    from sim.persistence.response_cache import ResponseCache
+
+    stub = StubAnthropic()
+    cache = ResponseCache(tmp_path / "cache.db")
+    r = session.SessionRunner(anthropic_client=stub, db_path=tmp_path / "sim.db",
+                              response_cache=cache)
+    agent = next(iter(r.agents.values()))
+    r._ensure_accounts([agent.agent_id])
+    chain = _small_chain()
+
+    first = agent.decide(chain, r.accounts[agent.agent_id], 1, memory={})
+    second = agent.decide(chain, r.accounts[agent.agent_id], 1, memory={})
+    assert first == second == (None, '{"action": "hold"}')
+    assert stub.calls == 1
+    assert cache.stats()["hits"] == 1
+    cache.close()
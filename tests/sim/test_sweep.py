@@ -0,0 +1,94 @@
+"""Tests for sim.orchestrator.sweep — cell planning, manifest resume, overrides, merge."""
+
+from pathlib import Path
+
+import pytest
+
+import sim.config
+from sim.engine import slippage
+from sim.orchestrator import sweep
+from sim.persistence.db import init_db
+
+WINDOWS = [["2026-01-05", "2026-01-06"], ["2026-01-07", "2026-01-08", "2026-01-09"]]
+
+
+def _fake_cell(spec, shard_path):
+    """Write a tiny shard: one agent whose P&L depends on the config."""
+    pnl = spec["config"]["overrides"].get("SLIPPAGE_BASE", 0.05) * -1000
+    conn = init_db(Path(shard_path))
+    for sid, day in enumerate(spec["dates"], 1):
+        conn.execute("INSERT OR IGNORE INTO sessions (session_id, trading_date) VALUES (?, ?)",
+                     (sid, day))
+        conn.execute(
+            "INSERT OR REPLACE INTO accounts (agent_id, session_id, starting_balance, "
+            "ending_balance) VALUES ('bot-a', ?, 30000, ?)",
+            (sid, 30000 + pnl * sid))
+    conn.commit()
+    conn.close()
+    return {"sessions": len(spec["dates"]), "elapsed_s": 0.0}
+
+
+def test_sweep_resumes_and_merges(tmp_path):
+    configs = [sweep.SweepConfig("base"),
+               sweep.SweepConfig("slip2x", overrides={"SLIPPAGE_BASE": 0.10})]
+    calls = []
+
+    def runner(spec, shard):
+        calls.append(shard)
+        if spec["config"]["name"] == "slip2x" and spec["dates"][0] == "2026-01-07" \
+                and len(calls) < 5:
+            raise RuntimeError("boom")
+        return _fake_cell(spec, shard)
+
+    first = sweep.run_sweep(configs, WINDOWS, tmp_path, workers=1, cell_runner=runner)
+    assert (first["cells"], first["done"], first["failed"]) == (4, 3, 1)
+
+    # Re-run only retries the failed cell
+    second = sweep.run_sweep(configs, WINDOWS, tmp_path, workers=1, cell_runner=runner)
+    assert (second["ran"], second["done"], second["failed"]) == (1, 4, 0)
+    third = sweep.run_sweep(configs, WINDOWS, tmp_path, workers=1, cell_runner=runner)
+    assert third["ran"] == 0 and len(calls) == 5
+
+    board = sweep.merge_shards(tmp_path)
+    assert [r["config"] for r in board["configs"]] == ["base", "slip2x"]
+    base = board["configs"][0]
+    assert base["windows"] == 2 and base["sessions"] == 5
+    assert base["total_pnl"] == pytest.approx(-50 * 2 - 50 * 3)
+    assert len(board["cells"]) == 4
+
+
+def test_process_pool_runs_every_cell(tmp_path):
+    configs = [sweep.SweepConfig("base"),
+               sweep.SweepConfig("slip2x", overrides={"SLIPPAGE_BASE": 0.10})]
+
+    summary = sweep.run_sweep(configs, WINDOWS, tmp_path, workers=2, cell_runner=_fake_cell)
+
+    assert (summary["cells"], summary["done"], summary["failed"]) == (4, 4, 0)
+    board = sweep.merge_shards(tmp_path)
+    slip = {r["config"]: r["total_pnl"] for r in board["configs"]}
+    assert slip == {"base": pytest.approx(-250.0), "slip2x": pytest.approx(-500.0)}
+
+
+def test_changed_cell_spec_is_rejected(tmp_path):
+    sweep.run_sweep([sweep.SweepConfig("base")], WINDOWS[:1], tmp_path,
+                    workers=1, cell_runner=_fake_cell)
+    with pytest.raises(ValueError, match="different"):
+        sweep.run_sweep([sweep.SweepConfig("base", overrides={"SLIPPAGE_BASE": 0.2})],
+                        WINDOWS[:1], tmp_path, workers=1, cell_runner=_fake_cell)
+
+
+def test_apply_overrides_patches_importers_and_restores():
+    original = sim.config.SLIPPAGE_BASE
+    with sweep.apply_overrides({"SLIPPAGE_BASE": 1.23}):
+        assert sim.config.SLIPPAGE_BASE == 1.23
+        assert slippage.SLIPPAGE_BASE == 1.23
+    assert sim.config.SLIPPAGE_BASE == original
+    assert slippage.SLIPPAGE_BASE == original
+
+
+def test_config_validation_and_windows():
+    with pytest.raises(ValueError):
+        sweep.SweepConfig("bad name")
+    with pytest.raises(ValueError):
+        sweep.SweepConfig("ok", overrides={"NOT_A_SETTING": 1})
+    assert sweep.split_windows([["d3", "d1", "d2"]], 2) == [["d1", "d2"], ["d3"]]
@@ -0,0 +1,196 @@
+"""Tests for the DXLink chain collector in sim.data.tt_market_data (local websocket stand-in)."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from sim.data import tt_market_data
+
+
+class FakeDXLink:
+    """Tiny DXLink server: handshake, then COMPACT events for known symbols."""
+
+    def __init__(self, known, greeks_only=(), no_summary=(), late_summary=()):
+        self.known = set(known)
+        self.greeks_only = set(greeks_only)    # these never get a Quote
+        self.no_summary = set(no_summary)      # these never get a Summary
+        self.late_summary = set(late_summary)  # Summary only after the Quote
+        self.subscriptions = []
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    async def _handler(self, ws):
+        async for raw in ws:
+            msg = json.loads(raw)
+            kind = msg["type"]
+            if kind == "AUTH":
+                await ws.send(json.dumps({"type": "AUTH_STATE", "channel": 0,
+                                          "state": "AUTHORIZED"}))
+            elif kind == "CHANNEL_REQUEST":
+                await ws.send(json.dumps({"type": "CHANNEL_OPENED", "channel": 1}))
+            elif kind == "FEED_SETUP":
+                await ws.send(json.dumps({"type": "FEED_CONFIG", "channel": 1,
+                                          "eventFields": msg["acceptEventFields"]}))
+            elif kind == "FEED_SUBSCRIPTION":
+                self.subscriptions.append(msg["add"])
+                await self._publish(ws, sorted({a["symbol"] for a in msg["add"]}))
+
+    async def _publish(self, ws, symbols):
+        quotes, greeks, trades, summaries, late = [], [], [], [], []
+        for i, sym in enumerate(s for s in symbols if s in self.known):
+            if sym not in self.greeks_only:
+                quotes += ["Quote", sym, 1.0 + i, 1.2 + i, 10, "NaN"]
+            greeks += ["Greeks", sym, 0.15, 0.5, 0.002, -1.0, 0.0, 0.4]
+            trades += ["Trade", sym, 1.1 + i, 100 * (i + 1)]
+            if sym in self.late_summary:
+                late += ["Summary", sym, 1000 * (i + 1), 1.0, 1.0]
+            elif sym not in self.no_summary:
+                summaries += ["Summary", sym, 1000 * (i + 1), 1.0, 1.0]
+        # Trades and Greeks first, then quotes in one flattened COMPACT message
+        await ws.send(json.dumps({"type": "FEED_DATA", "channel": 1,
+                                  "data": ["Trade", trades]}))
+        if summaries:
+            await ws.send(json.dumps({"type": "FEED_DATA", "channel": 1,
+                                      "data": ["Summary", summaries]}))
+        await ws.send(json.dumps({"type": "FEED_DATA", "channel": 1,
+                                  "data": ["Greeks", greeks]}))
+        await ws.send(json.dumps({"type": "FEED_DATA", "channel": 1,
+                                  "data": ["Quote", quotes]}))
+        if late:
+            await asyncio.sleep(0.2)
+            await ws.send(json.dumps({"type": "FEED_DATA", "channel": 1,
+                                      "data": ["Summary", late]}))
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+
+        async def main():
+            self.stop = self.loop.create_future()
+            async with websockets.serve(self._handler, "127.0.0.1", 0) as server:
+                self.port = server.sockets[0].getsockname()[1]
+                self.ready.set()
+                await self.stop
+
+        self.loop.run_until_complete(main())
+        self.loop.close()
+
+    def __enter__(self):
+        self.thread.start()
+        self.ready.wait(5)
+        return f"ws://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.stop.set_result, None)
+        self.thread.join(5)
+
+
+STREAMER = {
+    "SPXW  260313C05900000": ".SPXW260313C5900",
+    "SPXW  260313P05900000": ".SPXW260313P5900",
+    "SPXW  260313C05905000": ".SPXW260313C5905",
+}
+
+
+def test_stream_collects_whole_window_in_one_subscription():
+    server = FakeDXLink(STREAMER.values())
+    with server as url:
+        quotes = tt_market_data._stream_quotes(STREAMER, timeout_s=3, token="t", url=url)
+
+    (subscription,) = server.subscriptions
+    assert {a["type"] for a in subscription} == {"Quote", "Greeks", "Summary", "Trade"}
+    assert len(subscription) == 4 * len(STREAMER)
+    assert set(quotes) == set(STREAMER)
+    q = quotes["SPXW  260313C05900000"]
+    assert (q["bid"], q["ask"], q["mark"]) == (1.0, 1.2, pytest.approx(1.1))
+    assert (q["delta"], q["volatility"]) == (0.5, 0.15)
+
+
+def test_streamed_day_volume_reaches_contract(monkeypatch):
+    real_stream = tt_market_data._stream_quotes
+    strikes = [{"strike-price": "5900",
+                "call": "SPXW  260313C05900000", "call-streamer-symbol": ".SPXW260313C5900",
+                "put": "SPXW  260313P05900000", "put-streamer-symbol": ".SPXW260313P5900"}]
+    monkeypatch.setattr(tt_market_data, "_fetch_nested_chain", lambda: {"data": {}})
+    monkeypatch.setattr(tt_market_data, "_find_1dte_expiration",
+                        lambda chain: ("2026-03-13", strikes))
+    monkeypatch.setattr(tt_market_data, "_fetch_underlying_price", lambda: 5900.0)
+    monkeypatch.setattr(tt_market_data, "_fetch_vix", lambda: 18.0)
+    monkeypatch.setattr(tt_market_data, "_fetch_underlying_ohlc", lambda: {})
+    monkeypatch.setattr(tt_market_data, "_fetch_quotes_batch",
+                        lambda symbols, **kw: pytest.fail("stream should cover the window"))
+
+    with FakeDXLink([".SPXW260313C5900", ".SPXW260313P5900"]) as url:
+        monkeypatch.setattr(
+            tt_market_data, "_stream_quotes",
+            lambda streamer, **kw: real_stream(streamer, timeout_s=3, token="t", url=url))
+        chain = tt_market_data.fetch_tt_spx_chain()
+
+    contracts = chain["contracts"]
+    assert contracts["SPXW  260313C05900000"]["volume"] == 100
+    assert contracts["SPXW  260313P05900000"]["volume"] == 200
+    assert contracts["SPXW  260313P05900000"]["last"] == pytest.approx(2.1)
+    assert contracts["SPXW  260313C05900000"]["open_interest"] == 1000
+
+
+def test_missing_symbols_fall_back_to_rest(monkeypatch):
+    real_stream = tt_market_data._stream_quotes
+    known = [".SPXW260313C5900", ".SPXW260313P5900", ".SPXW260313C5905"]
+    rest_calls = []
+
+    def fake_rest(symbols, symbol_candidates=None, **kw):
+        rest_calls.append(list(symbols))
+        return {s: {"bid": 9.0, "ask": 9.5} for s in symbols}
+
+    with FakeDXLink(known, greeks_only={".SPXW260313C5905"}) as url:
+        monkeypatch.setattr(tt_market_data, "_fetch_quotes_batch", fake_rest)
+        monkeypatch.setattr(
+            tt_market_data, "_stream_quotes",
+            lambda streamer, **kw: real_stream(streamer, timeout_s=1, token="t", url=url))
+        quotes = tt_market_data._fetch_quotes(list(STREAMER), STREAMER)
+
+    assert rest_calls == [["SPXW  260313C05905000"]]
+    assert quotes["SPXW  260313C05905000"]["bid"] == 9.0
+    assert quotes["SPXW  260313P05900000"]["delta"] == 0.5
+
+
+def test_stream_waits_for_late_summary():
+    late = ".SPXW260313C5905"
+    with FakeDXLink(STREAMER.values(), late_summary={late}) as url:
+        quotes = tt_market_data._stream_quotes(STREAMER, timeout_s=3, token="t", url=url)
+
+    assert set(quotes) == set(STREAMER)
+    assert quotes["SPXW  260313C05905000"]["openInterest"] == 2000
+
+
+def test_symbol_without_summary_falls_back_to_rest(monkeypatch):
+    real_stream = tt_market_data._stream_quotes
+    rest_calls = []
+
+    def fake_rest(symbols, symbol_candidates=None, **kw):
+        rest_calls.append(list(symbols))
+        return {s: {"bid": 9.0, "ask": 9.5, "openInterest": 777} for s in symbols}
+
+    with FakeDXLink(STREAMER.values(), no_summary={".SPXW260313P5900"}) as url:
+        monkeypatch.setattr(tt_market_data, "_fetch_quotes_batch", fake_rest)
+        monkeypatch.setattr(
+            tt_market_data, "_stream_quotes",
+            lambda streamer, **kw: real_stream(streamer, timeout_s=1, token="t", url=url))
+        quotes = tt_market_data._fetch_quotes(list(STREAMER), STREAMER)
+
+    assert rest_calls == [["SPXW  260313P05900000"]]
+    assert quotes["SPXW  260313P05900000"]["openInterest"] == 777
+    assert quotes["SPXW  260313C05900000"]["openInterest"] == 1000
+
+
+def test_stream_disabled_uses_rest_only(monkeypatch):
+    monkeypatch.setenv("TT_CHAIN_STREAM", "0")
+    monkeypatch.setattr(tt_market_data, "_stream_quotes",
+                        lambda *a, **k: pytest.fail("stream should be off"))
+    monkeypatch.setattr(tt_market_data, "_fetch_quotes_batch",
+                        lambda symbols, **kw: {s: {} for s in symbols})
+    assert set(tt_market_data._fetch_quotes(list(STREAMER), STREAMER)) == set(STREAMER)
@@ -0,0 +1,91 @@
+"""Tests for sim.persistence.db.unit_of_work — batched, single-transaction writes."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from sim.persistence import queries
+from sim.persistence.db import get_connection, init_db, unit_of_work
+
+
+@pytest.fixture
+def conn(tmp_path):
+    c = init_db(tmp_path / "sim.db")
+    yield c
+    c.close()
+
+
+def _account(balance=30_000.0):
+    return SimpleNamespace(balance=balance, realized_pnl=0.0, total_commissions=0.0,
+                           buying_power_used=0.0, open_position_count=0)
+
+
+def _write_session(conn, session_id, agents=("a", "b", "c")):
+    queries.insert_session(conn, session_id, "2026-01-05")
+    for aid in agents:
+        queries.insert_action(conn, aid, session_id, "hold")
+    for aid in agents:
+        queries.save_account_snapshot(conn, aid, session_id, _account())
+
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_session_writes_commit_once(conn, tmp_path):
+    with unit_of_work(conn):
+        _write_session(conn, 1)
+        # Reads inside the unit of work see the queued writes
+        assert _count(conn, "agent_actions") == 3
+        # ...but another connection does not until the block exits
+        other = get_connection(tmp_path / "sim.db")
+        assert _count(other, "accounts") == 0
+
+    assert _count(other, "accounts") == 3
+    assert _count(other, "sessions") == 1
+    other.close()
+
+
+def test_same_statement_runs_are_batched(conn):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    with unit_of_work(conn):
+        _write_session(conn, 1, agents=[f"bot-{i}" for i in range(11)])
+    conn.set_trace_callback(None)
+
+    # executemany traces each row, but no COMMIT until the end
+    commits = [s for s in statements if s.strip().upper() == "COMMIT"]
+    assert len(commits) == 1
+    assert statements[-1].strip().upper() == "COMMIT"
+    assert _count(conn, "accounts") == 11
+
+
+def test_failure_rolls_back_whole_session(conn):
+    _write_session(conn, 1)
+    with pytest.raises(RuntimeError):
+        with unit_of_work(conn):
+            _write_session(conn, 2)
+            raise RuntimeError("fill engine blew up")
+
+    assert _count(conn, "sessions") == 1
+    assert _count(conn, "accounts") == 3
+    assert not conn.in_unit_of_work
+
+    # The connection is usable afterwards
+    _write_session(conn, 2)
+    assert _count(conn, "accounts") == 6
+
+
+def test_nested_units_join_outer(conn):
+    with pytest.raises(ValueError):
+        with unit_of_work(conn):
+            with unit_of_work(conn):
+                _write_session(conn, 1)
+            raise ValueError
+    assert _count(conn, "sessions") == 0
+
+
+def test_fast_mode_sets_synchronous_normal(tmp_path):
+    fast = init_db(tmp_path / "fast.db", fast=True)
+    assert fast.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    fast.close()
@@ -0,0 +1,246 @@
+"""Tests for the shared HTTP session pool / rate budget and the token caches."""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+REPO = Path(__file__).resolve().parents[1]
+TT_SCRIPT = REPO / "TT" / "Script"
+if str(TT_SCRIPT) not in sys.path:
+    sys.path.insert(0, str(TT_SCRIPT))
+
+
+class FakeAPI:
+    """HTTP/1.1 server counting connections; ``statuses`` are served in order, then 200."""
+
+    def __init__(self, statuses=(), retry_after="0.2"):
+        self.statuses = list(statuses)
+        self.connections = 0
+        self.requests = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                api.connections += 1
+                super().setup()
+
+            def _reply(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                api.requests.append((self.command, self.path, self.headers.get("Authorization")))
+                status = api.statuses.pop(0) if api.statuses else 200
+                body = json.dumps({"data": {"n": len(api.requests)}}).encode()
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", retry_after)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.mark.parametrize("module", ["http_pool.py", "schwab_token_keeper.py"])
+def test_scripts_copy_matches_tt_script(module):
+    # Shipped in both scripts/ and TT/Script; tests exercise the TT copy
+    assert (REPO / "scripts" / module).read_bytes() == (TT_SCRIPT / module).read_bytes()
+
+
+@pytest.fixture
+def pool():
+    import http_pool
+
+    http_pool.close_all()
+    http_pool._budgets.clear()
+    yield http_pool
+    http_pool.close_all()
+    http_pool._budgets.clear()
+
+
+@pytest.fixture
+def tt(pool, tmp_path, monkeypatch):
+    import tt_token_keeper
+
+    path = tmp_path / "tt_token.json"
+    path.write_text(json.dumps({"access_token": "tok1", "refresh_token": "r1"}))
+    monkeypatch.setenv("TT_TOKEN_PATH", str(path))
+    tt_token_keeper._cache.clear()
+    return importlib.import_module("tt_client")
+
+
+def test_tt_requests_share_one_keepalive_connection(tt, pool, monkeypatch):
+    with FakeAPI() as api:
+        monkeypatch.setenv("TT_BASE_URL", api.url)
+        for i in range(20):
+            tt.request("GET", f"/accounts/A/orders/{i}", headers={"Accept": "application/json"})
+
+    assert len(api.requests) == 20
+    assert api.connections == 1
+    assert {auth for _, _, auth in api.requests} == {"Bearer tok1"}
+    assert pool.budget("tt").stats()["calls"] == 20
+
+
+def test_429_backs_off_and_retries(tt, pool, monkeypatch):
+    with FakeAPI(statuses=[429, 429]) as api:
+        monkeypatch.setenv("TT_BASE_URL", api.url)
+        t0 = time.time()
+        r = tt.request("GET", "/accounts/A/orders/1")
+
+    assert r.status_code == 200
+    assert len(api.requests) == 3
+    assert time.time() - t0 >= 0.4  # two Retry-After: 0.2 pauses
+    assert pool.budget("tt").stats()["throttled"] == 2
+
+
+def test_order_post_429_is_sent_once_and_pauses_the_next_call(tt, pool, monkeypatch):
+    with FakeAPI(statuses=[429]) as api:
+        monkeypatch.setenv("TT_BASE_URL", api.url)
+        with pytest.raises(requests.HTTPError):
+            tt.request("POST", "/accounts/A/orders", json={"size": 1})
+        assert len(api.requests) == 1  # the placer's own loop owns the retry
+
+        t0 = time.time()
+        r = tt.request("POST", "/accounts/A/orders", json={"size": 1})
+
+    assert r.status_code == 200
+    assert time.time() - t0 >= 0.15  # shared Retry-After pause still applies
+    assert len(api.requests) == 2
+
+
+def test_429_pause_is_shared_across_callers(pool):
+    b = pool.budget("shared")
+    b.record(429, "0.3")
+    t0 = time.time()
+    threads = [threading.Thread(target=b.acquire) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert time.time() - t0 >= 0.25
+    assert b.stats()["calls"] == 3
+
+
+def test_rate_limit_paces_calls(pool, monkeypatch):
+    monkeypatch.setenv("PACED_RATE_LIMIT", "2")
+    monkeypatch.setenv("PACED_RATE_WINDOW_SECS", "0.3")
+    b = pool.budget("paced")
+    t0 = time.time()
+    for _ in range(5):
+        b.acquire()
+
+    assert time.time() - t0 >= 0.55  # calls 3-4 wait one window, call 5 a second
+    assert b.stats()["calls"] == 5
+
+
+def test_token_cached_until_file_changes(tt, monkeypatch):
+    import tt_token_keeper
+
+    reads = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        if str(path) == os.environ["TT_TOKEN_PATH"]:
+            reads.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    assert [tt_token_keeper.get_access_token() for _ in range(5)] == ["tok1"] * 5
+    assert len(reads) == 1
+
+    time.sleep(0.01)
+    Path(os.environ["TT_TOKEN_PATH"]).write_text(json.dumps({"access_token": "tok2"}))
+    assert tt_token_keeper.get_access_token() == "tok2"
+
+
+def test_token_refreshed_ahead_of_expiry_once(tt, monkeypatch):
+    import tt_token_keeper
+
+    Path(os.environ["TT_TOKEN_PATH"]).write_text(json.dumps({
+        "access_token": "old", "refresh_token": "r1", "expires_at": int(time.time()) + 30,
+    }))
+    monkeypatch.setenv("TT_CLIENT_ID", "id")
+    monkeypatch.setenv("TT_CLIENT_SECRET", "secret")
+    posts = []
+
+    class Resp:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"access_token": "new", "expires_in": 900}
+
+    monkeypatch.setattr(tt_token_keeper.requests, "post", lambda *a, **k: posts.append(k) or Resp())
+
+    assert [tt_token_keeper.get_access_token() for _ in range(3)] == ["new"] * 3
+    assert len(posts) == 1
+    saved = json.loads(Path(os.environ["TT_TOKEN_PATH"]).read_text())
+    assert saved["refresh_token"] == "r1"
+    assert saved["expires_at"] >= time.time() + 800
+
+
+def test_schwab_client_reused_and_rate_tracked(pool, tmp_path, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("schwab")
+    keeper = importlib.import_module("schwab_token_keeper")
+    keeper._clients.clear()
+    built = []
+
+    class FakeClient:
+        def __init__(self):
+            self.session = httpx.Client(transport=httpx.MockTransport(
+                lambda request: httpx.Response(429 if "limit" in request.url.path else 200,
+                                               headers={"Retry-After": "0.2"})))
+
+    def fake_from_token_file(**kwargs):
+        built.append(kwargs["token_path"])
+        return FakeClient()
+
+    monkeypatch.setattr(keeper, "client_from_token_file", fake_from_token_file)
+    monkeypatch.setenv("SCHWAB_APP_KEY", "key")
+    monkeypatch.setenv("SCHWAB_APP_SECRET", "secret")
+    monkeypatch.setenv("SCHWAB_TOKEN_PATH", str(tmp_path / "schwab_token.json"))
+    monkeypatch.setenv("SCHWAB_TOKEN_JSON", json.dumps({"token": {"access_token": "a"}}))
+
+    c = keeper.schwab_client()
+    assert keeper.schwab_client() is c
+    assert len(built) == 1
+
+    c.session.get("https://api.schwabapi.com/limit")
+    t0 = time.time()
+    c.session.get("https://api.schwabapi.com/accounts")
+    assert time.time() - t0 >= 0.15
+    assert pool.budget("schwab").stats() == {"calls": 2, "throttled": 1,
+                                             "waited_s": pytest.approx(0.2, abs=0.1)}
+
+    monkeypatch.setenv("SCHWAB_TOKEN_JSON", json.dumps({"token": {"access_token": "b"}}))
+    assert keeper.schwab_client() is not c
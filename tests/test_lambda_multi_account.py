@@ -0,0 +1,101 @@
+"""Tests for the multi-account fan-out in lambda/handler.py."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambda"
+
+
+@pytest.fixture
+def handler(monkeypatch, tmp_path):
+    monkeypatch.syspath_prepend(str(LAMBDA_DIR))
+    spec = importlib.util.spec_from_file_location("lambda_handler_multi", LAMBDA_DIR / "handler.py")
+    mod = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(mod)
+    monkeypatch.setattr(mod, "TASK_ROOT", str(tmp_path))
+    return mod
+
+
+def _account(tmp_path, name, body, **env):
+    (tmp_path / f"{name}.py").write_text(body)
+    return {"cfg": {"orchestrator": f"{name}.py"}, "env": {"PATH": "", **env}}
+
+
+def test_accounts_run_concurrently_and_fail_independently(handler, tmp_path, capsys):
+    sleeper = "import os, sys, time\ntime.sleep(0.6)\nprint('done', os.environ['ACCT'])\nsys.exit(int(os.environ['RC']))\n"
+    runs = {
+        "a": _account(tmp_path, "a", sleeper, ACCT="a", RC="0"),
+        "b": _account(tmp_path, "b", sleeper, ACCT="b", RC="3"),
+        "c": _account(tmp_path, "c", "raise RuntimeError('broker down')\n"),
+    }
+
+    t0 = time.time()
+    rcs = asyncio.run(handler._fan_out(runs, {}, timeout_s=10))
+
+    assert rcs == {"a": 0, "b": 3, "c": 1}
+    assert time.time() - t0 < 1.1  # serial would be ≥ 1.2s
+    out = capsys.readouterr().out
+    assert "  [a] done a" in out and "  [b] done b" in out
+    assert "  [c] RuntimeError: broker down" in out
+
+
+def test_timeout_kills_only_that_account(handler, tmp_path):
+    runs = {
+        "slow": _account(tmp_path, "slow", "import time\ntime.sleep(10)\n"),
+        "fast": _account(tmp_path, "fast", "print('ok')\n"),
+        "gone": {"cfg": {"orchestrator": "missing.py"}, "env": {}},
+    }
+
+    t0 = time.time()
+    rcs = asyncio.run(handler._fan_out(runs, {}, timeout_s=0.5))
+
+    assert rcs == {"slow": 124, "fast": 0, "gone": -1}
+    assert time.time() - t0 < 3
+
+
+def test_signal_fetched_once_for_all_readers(handler, tmp_path, monkeypatch):
+    calls = []
+
+    def fake_fetch(env, endpoint):
+        calls.append(endpoint)
+        time.sleep(0.2)
+        return {"Trade": [{"Date": "2026-10-16"}]}
+
+    monkeypatch.setattr(handler, "_gw_fetch", fake_fetch)
+    reader = (
+        "import json, os, time\n"
+        "path = os.environ['GW_SIGNAL_FILE']\n"
+        "while not os.path.exists(path):\n"
+        "    time.sleep(0.05)\n"
+        "print(json.load(open(path))['Trade'][0]['Date'])\n"
+    )
+    signal = str(tmp_path / "signal.json")
+    runs = {n: _account(tmp_path, n, reader, GW_SIGNAL_FILE=signal) for n in ("x", "y")}
+
+    rcs = asyncio.run(handler._fan_out(runs, {"rapi/GetX": ({}, signal)}, timeout_s=10))
+
+    assert rcs == {"x": 0, "y": 0}
+    assert calls == ["rapi/GetX"]
+    assert json.load(open(signal)) == {"Trade": [{"Date": "2026-10-16"}]}
+
+
+def test_failed_fetch_is_published_as_error(handler, tmp_path, monkeypatch):
+    def fake_fetch(env, endpoint):
+        raise RuntimeError("401 Unauthorized")
+
+    monkeypatch.setattr(handler, "_gw_fetch", fake_fetch)
+    signal = str(tmp_path / "signal.json")
+
+    asyncio.run(handler._share_signal("rapi/GetX", {}, signal))
+
+    assert json.load(open(signal)) == {"_error": "GW fetch failed: 401 Unauthorized"}
@@ -0,0 +1,127 @@
+"""Tests for lambda/script_runner.py — in-process script execution."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+
+def _load_module():
+    path = Path(__file__).resolve().parents[1] / "lambda" / "script_runner.py"
+    spec = importlib.util.spec_from_file_location("script_runner", path)
+    mod = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    mod = _load_module()
+    # Orchestrators find the runner through sys.modules, as in the Lambda
+    monkeypatch.setitem(sys.modules, "script_runner", mod)
+    return mod
+
+
+def _script(tmp_path, name, body):
+    path = tmp_path / name
+    path.write_text(body)
+    return name
+
+
+def _ctx(runner, tmp_path, script, timeout_s=10, **env):
+    return runner.ScriptContext(script, {"PATH": os.environ.get("PATH", ""), **env},
+                                cwd=str(tmp_path), timeout_s=timeout_s, label=script)
+
+
+def test_env_cwd_and_output_are_scoped_to_the_run(runner, tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTER_ONLY", "1")
+    script = _script(tmp_path, "hello.py", (
+        "import os, sys\n"
+        "print('acct', os.environ['CS_RUNNER_ACCOUNT'], 'OUTER_ONLY' in os.environ)\n"
+        "print('cwd', os.getcwd())\n"
+        "print('warn', file=sys.stderr)\n"
+        "if __name__ == '__main__':\n"
+        "    sys.exit(3)\n"
+    ))
+    cwd = os.getcwd()
+
+    rc, out, err = runner.run_in_process(_ctx(runner, tmp_path, script, CS_RUNNER_ACCOUNT="5WT09219"))
+
+    assert rc == 3
+    assert "acct 5WT09219 False" in out
+    assert f"cwd {tmp_path}" in out
+    assert err.strip() == "warn"
+    assert os.getcwd() == cwd
+    assert os.environ["OUTER_ONLY"] == "1"
+    assert "CS_RUNNER_ACCOUNT" not in os.environ
+    assert not runner.active()
+
+
+def test_uncaught_exception_is_rc_1(runner, tmp_path):
+    script = _script(tmp_path, "boom.py", "raise ValueError('bad quote')\n")
+
+    rc, _, err = runner.run_in_process(_ctx(runner, tmp_path, script))
+
+    assert rc == 1
+    assert "ValueError: bad quote" in err
+
+
+def test_timeout_cannot_be_swallowed(runner, tmp_path):
+    script = _script(tmp_path, "slow.py", (
+        "import time\n"
+        "print('started', flush=True)\n"
+        "try:\n"
+        "    time.sleep(5)\n"
+        "except Exception:\n"
+        "    print('swallowed')\n"
+    ))
+
+    rc, out, _ = runner.run_in_process(_ctx(runner, tmp_path, script, timeout_s=0.2))
+
+    assert rc == runner.TIMEOUT_RC
+    assert "started" in out and "swallowed" not in out
+
+
+def test_timeout_off_main_thread(runner, tmp_path):
+    script = _script(tmp_path, "slow.py", "import time\ntime.sleep(2)\n")
+    result = {}
+
+    def call():
+        result["rc"] = runner.run_in_process(_ctx(runner, tmp_path, script, timeout_s=0.2))[0]
+
+    t = threading.Thread(target=call)
+    t.start()
+    t.join()
+    assert result["rc"] == runner.TIMEOUT_RC
+
+
+def test_nested_placer_shares_capture_and_drops_project_modules(runner, tmp_path):
+    (tmp_path / "cs_helper_mod.py").write_text("VALUE = 'helper'\n")
+    _script(tmp_path, "place.py", (
+        "import os, sys\n"
+        "import cs_helper_mod\n"
+        "print('placer', os.environ['VERT_NAME'], cs_helper_mod.VALUE)\n"
+        "sys.exit(0 if os.environ['VERT_NAME'] == 'PUT' else 4)\n"
+    ))
+    script = _script(tmp_path, "orchestrator.py", (
+        "import os, subprocess, sys\n"
+        "def _run_placer(script, env):\n"
+        "    runner = sys.modules.get('script_runner')\n"
+        "    if runner is not None and runner.active():\n"
+        "        return runner.run_nested(script, env)\n"
+        "    return subprocess.call([sys.executable, script], env=env)\n"
+        "rcs = [_run_placer('place.py', dict(os.environ, VERT_NAME=n)) for n in ('PUT', 'CALL')]\n"
+        "print('rcs', rcs, 'VERT_NAME' in os.environ)\n"
+    ))
+
+    rc, out, _ = runner.run_in_process(_ctx(runner, tmp_path, script))
+
+    assert rc == 0
+    assert out.splitlines() == ["placer PUT helper", "placer CALL helper", "rcs [0, 4] False"]
+    assert "cs_helper_mod" not in sys.modules
@@ -0,0 +1,235 @@
+"""Tests for TT/Script/tt_order_events.py against a local fake broker (REST + account streamer)."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import itertools
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+requests = pytest.importorskip("requests")
+
+TT_SCRIPT = Path(__file__).resolve().parents[1] / "TT" / "Script"
+if str(TT_SCRIPT) not in sys.path:
+    sys.path.insert(0, str(TT_SCRIPT))
+
+import tt_order_events  # noqa: E402
+
+ACCOUNT = "5WT00001"
+
+
+class FakeResponse:
+    def __init__(self, body, status=200):
+        self.status_code = status
+        self.text = json.dumps(body)
+        self.headers = {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FakeBroker:
+    """Orders REST endpoints plus an account streamer pushing Order notifications.
+
+    ``plans`` is consumed one per POST: ("fill", delay) or ("reject", delay)
+    moves the order there after ``delay`` seconds; ("rest",) leaves it Live.
+    """
+
+    def __init__(self, plans, stream=True):
+        self.plans = list(plans)
+        self.stream = stream
+        self.orders = {}
+        self.calls = []
+        self.clients = set()
+        self._ids = itertools.count(1001)
+        self._lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    # -- REST (stands in for tt_client.request) ----------------------------
+
+    def request(self, method, path, **kwargs):
+        self.calls.append((method, path))
+        parts = path.strip("/").split("/")
+        if method == "POST":
+            oid = next(self._ids)
+            size = kwargs["json"]["size"]
+            order = {"id": oid, "status": "Live", "size": size,
+                     "legs": [{"quantity": size, "remaining-quantity": size}]}
+            with self._lock:
+                self.orders[oid] = order
+            plan = self.plans.pop(0) if self.plans else ("rest",)
+            if plan[0] != "rest":
+                threading.Timer(plan[1], self._transition, (oid, plan[0])).start()
+            self._publish(order)
+            return FakeResponse({"data": {"order": {"id": oid}}}, 201)
+        oid = int(parts[-1])
+        with self._lock:
+            order = self.orders[oid]
+        if method == "GET":
+            return FakeResponse({"data": dict(order)})
+        if method == "DELETE":
+            if order["status"] != "Live":
+                resp = FakeResponse({"error": "not cancellable"}, 422)
+                raise requests.HTTPError(response=resp)
+            self._set(oid, status="Cancelled")
+            return FakeResponse({"data": dict(order)})
+        raise AssertionError(method)
+
+    def gets(self):
+        return sum(1 for m, _ in self.calls if m == "GET")
+
+    def _transition(self, oid, what):
+        if what == "fill":
+            self._set(oid, status="Filled", legs=[dict(leg, **{"remaining-quantity": 0})
+                                                  for leg in self.orders[oid]["legs"]])
+        else:
+            self._set(oid, status="Rejected")
+
+    def _set(self, oid, **changes):
+        with self._lock:
+            if self.orders[oid]["status"] != "Live":
+                return
+            self.orders[oid] = dict(self.orders[oid], **changes)
+            order = self.orders[oid]
+        self._publish(order)
+
+    # -- account streamer ---------------------------------------------------
+
+    def _publish(self, order):
+        if not self.stream or not self.ready.is_set():
+            return
+
+        async def send_all():
+            for ws in list(self.clients):
+                await ws.send(json.dumps({"type": "Order", "data": order}))
+        asyncio.run_coroutine_threadsafe(send_all(), self.loop).result(5)
+
+    async def _handler(self, ws):
+        async for raw in ws:
+            msg = json.loads(raw)
+            if msg["action"] == "connect":
+                assert msg["value"] == [ACCOUNT] and msg["auth-token"] == "Bearer tok"
+                self.clients.add(ws)
+                await ws.send(json.dumps({"status": "ok", "action": "connect",
+                                          "value": msg["value"], "request-id": msg["request-id"]}))
+        self.clients.discard(ws)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+
+        async def main():
+            self.stop = self.loop.create_future()
+            async with websockets.serve(self._handler, "127.0.0.1", 0) as server:
+                self.port = server.sockets[0].getsockname()[1]
+                self.ready.set()
+                await self.stop
+
+        self.loop.run_until_complete(main())
+        self.loop.close()
+
+    def __enter__(self):
+        self.thread.start()
+        self.ready.wait(5)
+        return f"ws://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.stop.set_result, None)
+        self.thread.join(5)
+
+
+def _load_place():
+    path = TT_SCRIPT / "ConstantStable" / "place.py"
+    spec = importlib.util.spec_from_file_location("cs_place_orders", path)
+    mod = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture
+def place(monkeypatch):
+    monkeypatch.setenv("VERT_STEP_WAIT", "5")
+    monkeypatch.setenv("VERT_POLL_SECS", "1.5")
+    monkeypatch.setenv("VERT_CANCEL_SETTLE", "0")
+    monkeypatch.setenv("VERT_MAX_LADDER", "3")
+    mod = _load_place()
+    yield mod
+    mod.close_order_tracker()
+
+
+def _ladder(place, broker, monkeypatch, url=None, qty=2):
+    monkeypatch.setattr(place, "tt_request", broker.request)
+    place._ORDER_TRACKER = tt_order_events.OrderTracker(
+        ACCOUNT, stream=url is not None, url=url or "", poll_min_s=0.25, poll_max_s=1.5,
+        verify_s=5.0, token_fn=lambda: "tok").start()
+    if url is not None:
+        assert place._ORDER_TRACKER.wait_connected(3)
+    t0 = time.time()
+    res = place.place_order_with_ladder(
+        None, ACCOUNT, "DEBIT", qty,
+        nbbo_fn=lambda refresh: (1.0, 1.2, 1.1),
+        payload_fn=lambda price, q: {"price": price, "size": q, "legs": []},
+        tag_prefix="TEST",
+    )
+    return res, time.time() - t0
+
+
+def test_stream_fill_ends_rung_without_polling(place, monkeypatch):
+    broker = FakeBroker([("fill", 0.2)])
+    with broker as url:
+        res, elapsed = _ladder(place, broker, monkeypatch, url=url)
+
+    assert (res["filled"], res["reason"]) == (2, "OK")
+    assert elapsed < 2.0
+    assert broker.gets() == 0
+    assert place._ORDER_TRACKER.events >= 2
+
+
+def test_reject_advances_to_next_rung_immediately(place, monkeypatch):
+    broker = FakeBroker([("reject", 0.1), ("fill", 0.1)])
+    with broker as url:
+        res, elapsed = _ladder(place, broker, monkeypatch, url=url)
+
+    assert res["order_ids"] == ["1001", "1002"]
+    assert (res["filled"], res["reason"]) == (2, "OK")
+    assert elapsed < 2.0
+    assert not [c for c in broker.calls if c[0] == "DELETE"]
+
+
+def test_unfilled_rung_is_cancelled_after_wait(place, monkeypatch):
+    monkeypatch.setenv("VERT_STEP_WAIT", "0.5")
+    monkeypatch.setenv("VERT_MAX_LADDER", "1")
+    broker = FakeBroker([("rest",)])
+    with broker as url:
+        res, _ = _ladder(place, broker, monkeypatch, url=url)
+
+    assert res["reason"] == "NO_FILL"
+    assert ("DELETE", f"/accounts/{ACCOUNT}/orders/1001") in broker.calls
+    assert broker.orders[1001]["status"] == "Cancelled"
+
+
+def test_adaptive_polling_without_stream(place, monkeypatch):
+    broker = FakeBroker([("fill", 0.3)], stream=False)
+    res, elapsed = _ladder(place, broker, monkeypatch, url=None)
+
+    assert (res["filled"], res["reason"]) == (2, "OK")
+    # fixed 1.5s polling would notice the fill no earlier than 1.5s
+    assert elapsed < 1.2
+    assert 2 <= broker.gets() <= 5
+
+
+def test_final_state_not_rolled_back_by_stale_poll():
+    tracker = tt_order_events.OrderTracker(ACCOUNT, stream=False)
+    assert tracker.update({"id": 7, "status": "Filled"})
+    assert not tracker.update({"data": {"id": 7, "status": "Live"}})
+    assert tracker.latest("7")["status"] == "Filled"
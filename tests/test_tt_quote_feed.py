@@ -0,0 +1,174 @@
+"""Tests for the persistent DXLink QuoteFeed (TT/Script/tt_dxlink.py) and its use in the CS placer."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+TT_SCRIPT = Path(__file__).resolve().parents[1] / "TT" / "Script"
+if str(TT_SCRIPT) not in sys.path:
+    sys.path.insert(0, str(TT_SCRIPT))
+
+import tt_dxlink  # noqa: E402
+
+
+class FakeDXLink:
+    """DXLink stand-in: handshake, then a COMPACT Quote per subscribed symbol; push() sends more."""
+
+    def __init__(self, quotes):
+        self.quotes = dict(quotes)
+        self.subscriptions = []
+        self.connections = 0
+        self.clients = set()
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    async def _handler(self, ws):
+        self.connections += 1
+        self.clients.add(ws)
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                kind = msg["type"]
+                if kind == "AUTH":
+                    await ws.send(json.dumps({"type": "AUTH_STATE", "channel": 0,
+                                              "state": "AUTHORIZED"}))
+                elif kind == "CHANNEL_REQUEST":
+                    await ws.send(json.dumps({"type": "CHANNEL_OPENED", "channel": 1}))
+                elif kind == "FEED_SETUP":
+                    await ws.send(json.dumps({"type": "FEED_CONFIG", "channel": 1,
+                                              "eventFields": msg["acceptEventFields"]}))
+                    await ws.send(json.dumps({"type": "KEEPALIVE", "channel": 0}))
+                elif kind == "FEED_SUBSCRIPTION":
+                    syms = [a["symbol"] for a in msg["add"]]
+                    self.subscriptions.append(syms)
+                    await self._send(ws, {s: self.quotes[s] for s in syms if s in self.quotes})
+        finally:
+            self.clients.discard(ws)
+
+    async def _send(self, ws, quotes):
+        rows = []
+        for sym, (bid, ask) in quotes.items():
+            rows += ["Quote", sym, bid, ask, 10, "NaN"]
+        if rows:
+            await ws.send(json.dumps({"type": "FEED_DATA", "channel": 1, "data": ["Quote", rows]}))
+
+    def push(self, quotes):
+        async def send_all():
+            for ws in list(self.clients):
+                await self._send(ws, quotes)
+        asyncio.run_coroutine_threadsafe(send_all(), self.loop).result(5)
+
+    def drop_clients(self):
+        async def close_all():
+            for ws in list(self.clients):
+                await ws.close()
+        asyncio.run_coroutine_threadsafe(close_all(), self.loop).result(5)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+
+        async def main():
+            self.stop = self.loop.create_future()
+            async with websockets.serve(self._handler, "127.0.0.1", 0) as server:
+                self.port = server.sockets[0].getsockname()[1]
+                self.ready.set()
+                await self.stop
+
+        self.loop.run_until_complete(main())
+        self.loop.close()
+
+    def __enter__(self):
+        self.thread.start()
+        self.ready.wait(5)
+        return f"ws://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.stop.set_result, None)
+        self.thread.join(5)
+
+
+SHORT, LONG = ".SPXW260313P5900", ".SPXW260313P5895"
+
+
+def _wait(pred, timeout=3.0):
+    end = time.time() + timeout
+    while time.time() < end and not pred():
+        time.sleep(0.01)
+    return pred()
+
+
+def test_feed_keeps_latest_quote_per_symbol():
+    server = FakeDXLink({SHORT: (2.0, 2.2), LONG: (1.0, 1.1)})
+    with server as url, tt_dxlink.QuoteFeed(token="t", url=url) as feed:
+        feed.subscribe([SHORT, LONG])
+        assert feed.wait_for([SHORT, LONG], timeout_s=3) == {SHORT: (2.0, 2.2), LONG: (1.0, 1.1)}
+
+        server.push({SHORT: (2.05, 2.25)})
+        assert _wait(lambda: feed.get(SHORT) == (2.05, 2.25))
+        assert feed.get(LONG) == (1.0, 1.1)
+        assert feed.get(".SPXW260313P5800") is None
+
+        # already-subscribed symbols are not re-sent
+        feed.subscribe([SHORT])
+        assert server.subscriptions == [[LONG, SHORT]]
+
+
+def test_disconnect_drops_quotes_and_resubscribes():
+    server = FakeDXLink({SHORT: (2.0, 2.2)})
+    with server as url, tt_dxlink.QuoteFeed(token="t", url=url, reconnect_s=0.05) as feed:
+        assert feed.wait_for([SHORT], timeout_s=3) == {SHORT: (2.0, 2.2)}
+
+        server.quotes[SHORT] = (2.4, 2.6)
+        server.drop_clients()
+        assert _wait(lambda: feed.get(SHORT) == (2.4, 2.6))
+        assert server.connections == 2
+        assert server.subscriptions == [[SHORT], [SHORT]]
+
+
+def test_wait_for_times_out_with_partial_quotes():
+    with FakeDXLink({SHORT: (2.0, 2.2)}) as url, tt_dxlink.QuoteFeed(token="t", url=url) as feed:
+        assert feed.wait_for([SHORT, LONG], timeout_s=0.5) == {SHORT: (2.0, 2.2)}
+
+
+def _load_place():
+    path = TT_SCRIPT / "ConstantStable" / "place.py"
+    spec = importlib.util.spec_from_file_location("cs_place", path)
+    mod = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def test_nbbo_reads_feed_state_without_one_shot_quotes(monkeypatch):
+    place = _load_place()
+    streamer = {"SPXW  260313P05900000": SHORT, "SPXW  260313P05895000": LONG}
+    monkeypatch.setattr(place, "resolve_tt_option_symbols",
+                        lambda osi: {"order": osi, "streamer": streamer[osi]})
+    monkeypatch.setattr(place, "get_quotes_once", lambda *a, **k: pytest.fail("one-shot quote"))
+    monkeypatch.setattr(place, "get_quote_json_with_retry", lambda *a, **k: pytest.fail("REST quote"))
+
+    server = FakeDXLink({SHORT: (2.0, 2.2), LONG: (1.0, 1.1)})
+    with server as url:
+        place._QUOTE_FEED = tt_dxlink.QuoteFeed(token="t", url=url).start()
+        try:
+            bid, ask, mid = place.vertical_nbbo("CREDIT", *streamer, c=None)
+            assert (bid, ask, mid) == (0.9, 1.2, 1.05)
+
+            server.push({SHORT: (2.3, 2.5)})
+            assert _wait(lambda: place.vertical_nbbo("CREDIT", *streamer, c=None)[0] == 1.2)
+        finally:
+            place.close_quote_feed()
+
+    assert server.subscriptions == [[LONG, SHORT]]
+    assert place._QUOTE_FEED is None